@@ -0,0 +1,197 @@
+"""comprobantes_huella_logica
+
+Revision ID: a4b5c6d7e8f9
+Revises: f3a4b5c6d7e8
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import date
+from decimal import Decimal
+from typing import Any, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "a4b5c6d7e8f9"
+down_revision: Union[str, None] = "f3a4b5c6d7e8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TAMANO_TRAMO = 500
+
+
+def upgrade() -> None:
+    """Persiste la huella lógica de cada comprobante y la indexa por emisor."""
+    op.add_column(
+        "comprobantes",
+        sa.Column("huella_logica", sa.String(length=64), nullable=True),
+    )
+    connection = op.get_bind()
+    connection.execute(
+        sa.text(
+            """
+            UPDATE comprobantes
+            SET huella_logica = (
+                SELECT i.huella_logica
+                FROM intentos_emision_fiscal AS i
+                WHERE i.comprobante_id = comprobantes.id
+                  AND i.estado = 'autorizado'
+                ORDER BY i.created_at DESC, i.id DESC
+                LIMIT 1
+            )
+            """
+        )
+    )
+    _completar_huellas_sin_intento(connection)
+    op.create_index(
+        "ix_comprobantes_empresa_huella_logica",
+        "comprobantes",
+        ["empresa_id", "huella_logica"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Elimina la huella persistida; vuelve a calcularse al buscar duplicados."""
+    op.drop_index("ix_comprobantes_empresa_huella_logica", table_name="comprobantes")
+    with op.batch_alter_table("comprobantes") as batch_op:
+        batch_op.drop_column("huella_logica")
+
+
+def _completar_huellas_sin_intento(connection: sa.engine.Connection) -> None:
+    """
+    Calcula la huella de comprobantes sin intento autorizado.
+
+    Copia fija de la regla de `calcular_huella_logica` al momento de esta
+    revisión, aplicada a comprobantes guardados, para que la migración no
+    dependa de la versión del servicio.
+    """
+    ultimo_id = 0
+    while True:
+        comprobantes = (
+            connection.execute(
+                sa.text(
+                    """
+                    SELECT
+                        c.id,
+                        c.empresa_id,
+                        c.tipo_comprobante,
+                        c.fecha_emision,
+                        c.receptor_tipo_documento,
+                        c.receptor_numero_documento,
+                        c.total,
+                        pv.numero AS punto_venta_numero
+                    FROM comprobantes AS c
+                    JOIN puntos_venta AS pv ON pv.id = c.punto_venta_id
+                    WHERE c.huella_logica IS NULL
+                      AND c.id > :ultimo_id
+                    ORDER BY c.id
+                    LIMIT :limite
+                    """
+                ),
+                {"ultimo_id": ultimo_id, "limite": TAMANO_TRAMO},
+            )
+            .mappings()
+            .all()
+        )
+        if not comprobantes:
+            return
+        ultimo_id = comprobantes[-1]["id"]
+
+        items_por_comprobante: dict[int, list[Any]] = {
+            comprobante["id"]: [] for comprobante in comprobantes
+        }
+        items = connection.execute(
+            sa.text(
+                """
+                SELECT
+                    comprobante_id,
+                    codigo,
+                    descripcion,
+                    cantidad,
+                    precio_unitario,
+                    descuento_porcentaje,
+                    iva_porcentaje,
+                    orden
+                FROM comprobante_items
+                WHERE comprobante_id IN :ids
+                """
+            ).bindparams(sa.bindparam("ids", expanding=True)),
+            {"ids": list(items_por_comprobante)},
+        ).mappings()
+        for item in items:
+            items_por_comprobante[item["comprobante_id"]].append(item)
+
+        connection.execute(
+            sa.text("UPDATE comprobantes SET huella_logica = :huella WHERE id = :id"),
+            [
+                {
+                    "id": comprobante["id"],
+                    "huella": _huella_comprobante(
+                        comprobante, items_por_comprobante[comprobante["id"]]
+                    ),
+                }
+                for comprobante in comprobantes
+            ],
+        )
+
+
+def _huella_comprobante(comprobante: Any, items: list[Any]) -> str:
+    """Huella lógica de un comprobante guardado sin comprobantes asociados."""
+    payload = {
+        "empresa_id": comprobante["empresa_id"],
+        "tipo_comprobante": comprobante["tipo_comprobante"],
+        "punto_venta_numero": comprobante["punto_venta_numero"],
+        "fecha_emision": _fecha_iso(comprobante["fecha_emision"]),
+        "receptor": {
+            "tipo_documento": comprobante["receptor_tipo_documento"],
+            "numero_documento": "".join(
+                c
+                for c in str(comprobante["receptor_numero_documento"] or "")
+                if c.isdigit()
+            ),
+        },
+        "total": _money(comprobante["total"]),
+        "items": [
+            {
+                "codigo": (item["codigo"] or "").strip(),
+                "descripcion": item["descripcion"].strip(),
+                "cantidad": _decimal_str(item["cantidad"]),
+                "precio_unitario": _money(item["precio_unitario"]),
+                "descuento_porcentaje": _decimal_str(item["descuento_porcentaje"]),
+                "iva_porcentaje": _decimal_str(item["iva_porcentaje"]),
+                "orden": item["orden"],
+            }
+            for item in sorted(items, key=lambda item: item["orden"])
+        ],
+        "comprobantes_asociados": [],
+    }
+    encoded = json.dumps(
+        payload,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        sort_keys=True,
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _fecha_iso(valor: Any) -> str:
+    """Normaliza fechas leídas como `date` (PostgreSQL) o texto (SQLite)."""
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return str(valor)[:10]
+
+
+def _decimal_str(value: Any) -> str:
+    """Serializa decimales sin notación flotante."""
+    return format(Decimal(str(value)).normalize(), "f")
+
+
+def _money(value: Any) -> str:
+    """Serializa un importe a centavos."""
+    return format(Decimal(str(value)).quantize(Decimal("0.01")), "f")
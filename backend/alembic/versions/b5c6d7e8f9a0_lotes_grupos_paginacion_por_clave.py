@@ -0,0 +1,55 @@
+"""lotes_grupos_paginacion_por_clave
+
+Revision ID: b5c6d7e8f9a0
+Revises: a4b5c6d7e8f9
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "b5c6d7e8f9a0"
+down_revision: Union[str, None] = "a4b5c6d7e8f9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Indexa la clave de orden de los grupos y la relación de filas."""
+    op.create_index(
+        "ix_lotes_comprobantes_grupos_lote_orden",
+        "lotes_comprobantes_grupos",
+        ["lote_id", "orden", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_lotes_comprobantes_grupos_lote_estado_orden",
+        "lotes_comprobantes_grupos",
+        ["lote_id", "estado", "orden", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_lotes_comprobantes_filas_grupo",
+        "lotes_comprobantes_filas",
+        ["grupo_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Elimina los índices de paginación por clave."""
+    op.drop_index(
+        "ix_lotes_comprobantes_filas_grupo", table_name="lotes_comprobantes_filas"
+    )
+    op.drop_index(
+        "ix_lotes_comprobantes_grupos_lote_estado_orden",
+        table_name="lotes_comprobantes_grupos",
+    )
+    op.drop_index(
+        "ix_lotes_comprobantes_grupos_lote_orden",
+        table_name="lotes_comprobantes_grupos",
+    )
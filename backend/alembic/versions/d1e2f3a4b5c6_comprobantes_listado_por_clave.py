@@ -0,0 +1,40 @@
+"""comprobantes_listado_por_clave
+
+Revision ID: d1e2f3a4b5c6
+Revises: c0d1e2f3a4b
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "d1e2f3a4b5c6"
+down_revision: Union[str, None] = "c0d1e2f3a4b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Extiende el índice del listado con la clave completa de orden."""
+    op.create_index(
+        "ix_comprobantes_empresa_fecha_numero_id",
+        "comprobantes",
+        ["empresa_id", "fecha_emision", "numero", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_comprobantes_empresa_fecha", table_name="comprobantes")
+
+
+def downgrade() -> None:
+    """Restaura el índice compuesto anterior."""
+    op.create_index(
+        "ix_comprobantes_empresa_fecha",
+        "comprobantes",
+        ["empresa_id", "fecha_emision"],
+        unique=False,
+    )
+    op.drop_index("ix_comprobantes_empresa_fecha_numero_id", table_name="comprobantes")
@@ -0,0 +1,96 @@
+"""resumen_ventas_diario
+
+Revision ID: f3a4b5c6d7e8
+Revises: d1e2f3a4b5c6
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "f3a4b5c6d7e8"
+down_revision: Union[str, None] = "d1e2f3a4b5c6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Crea el resumen diario de ventas y lo completa con lo ya autorizado."""
+    op.create_table(
+        "resumen_ventas_diario",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("empresa_id", sa.Integer(), nullable=False),
+        sa.Column("fecha", sa.Date(), nullable=False),
+        sa.Column("tipo_comprobante", sa.Integer(), nullable=False),
+        sa.Column("punto_venta_id", sa.Integer(), nullable=False),
+        sa.Column("cantidad", sa.Integer(), nullable=False),
+        sa.Column("subtotal", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("iva_21", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("iva_10_5", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("iva_27", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column(
+            "importe_iva_cero", sa.Numeric(precision=14, scale=2), nullable=False
+        ),
+        sa.Column("total", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(["empresa_id"], ["empresas.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["punto_venta_id"], ["puntos_venta.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "empresa_id",
+            "fecha",
+            "tipo_comprobante",
+            "punto_venta_id",
+            name="uq_resumen_ventas_diario_clave",
+        ),
+    )
+    op.execute(
+        """
+        INSERT INTO resumen_ventas_diario (
+            empresa_id, fecha, tipo_comprobante, punto_venta_id, cantidad,
+            subtotal, iva_21, iva_10_5, iva_27, importe_iva_cero, total
+        )
+        SELECT
+            c.empresa_id,
+            c.fecha_emision,
+            c.tipo_comprobante,
+            c.punto_venta_id,
+            COUNT(c.id),
+            SUM(c.subtotal),
+            SUM(c.iva_21),
+            SUM(c.iva_10_5),
+            SUM(c.iva_27),
+            SUM(
+                CASE
+                    WHEN EXISTS (
+                        SELECT 1 FROM comprobante_items i
+                        WHERE i.comprobante_id = c.id
+                    ) THEN COALESCE(
+                        (
+                            SELECT SUM(i.subtotal) FROM comprobante_items i
+                            WHERE i.comprobante_id = c.id
+                              AND i.iva_porcentaje = 0
+                        ),
+                        0
+                    )
+                    WHEN c.iva_21 + c.iva_10_5 + c.iva_27 = 0 THEN c.subtotal
+                    ELSE 0
+                END
+            ),
+            SUM(c.total)
+        FROM comprobantes c
+        WHERE c.estado = 'autorizado'
+        GROUP BY c.empresa_id, c.fecha_emision, c.tipo_comprobante, c.punto_venta_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Elimina el resumen diario; es derivado y no pierde información."""
+    op.drop_table("resumen_ventas_diario")
@@ -14,6 +14,7 @@ from app.models.usuario import Usuario
 from app.core.config import settings
 from app.core.database import get_db
 from app.arca.config import ArcaAmbiente
+from app.arca.sesiones import get_gestor_sesiones_arca
 from app.arca.wsaa import WSAAClient
 from app.arca.wsfev1 import WSFEv1Client
 from app.arca.models import (
@@ -141,20 +142,16 @@ async def get_wsfe_client(
         # Obtener ambiente
         ambiente = get_ambiente()
 
-        # Autenticar con WSAA
-        wsaa_client = WSAAClient(ambiente=ambiente)
-        ticket = await wsaa_client.login(
+        # Reutilizar la sesión ARCA del proceso; autentica solo sin ticket vigente
+        return await get_gestor_sesiones_arca().obtener_cliente_wsfe(
+            ambiente=ambiente,
+            cuit=empresa.cuit,
             cert_path=str(cert_path),
             key_path=str(key_path),
-            cuit=empresa.cuit,
-            servicio="wsfe",
+            crear_wsaa=WSAAClient,
+            crear_wsfe=WSFEv1Client,
         )
 
-        # Crear cliente WSFEv1
-        wsfe_client = WSFEv1Client(ambiente=ambiente, ticket=ticket, cuit=empresa.cuit)
-
-        return wsfe_client
-
     except ArcaAuthError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
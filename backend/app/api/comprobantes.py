@@ -6,11 +6,12 @@ from typing import Literal, Optional
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import String, and_, cast, func, or_, select
+from sqlalchemy import String, and_, cast, func, or_, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from app.api.deps import get_current_empresa_id, get_current_empresa_user, get_db
+from app.api.paginacion import codificar_cursor, decodificar_cursor
 from app.core.config import settings
 from app.core.database import DATABASE_TEMPORARILY_UNAVAILABLE_ERRORS
 from app.models.cliente import Cliente
@@ -529,6 +530,10 @@ async def listar_comprobantes(
     buscar: Optional[str] = Query(None, description="Búsqueda por número o cliente"),
     page: int = Query(1, ge=1, description="Página"),
     per_page: int = Query(20, ge=1, le=100, description="Resultados por página"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor devuelto en next_cursor (reemplaza a page)"
+    ),
+    incluir_total: bool = Query(True, description="Calcular total y páginas"),
     db: AsyncSession = Depends(get_db),
     empresa_activa_id: int = Depends(get_current_empresa_id),
 ):
@@ -540,25 +545,24 @@ async def listar_comprobantes(
     - tipo: Tipo de comprobante
     - cliente_id: Cliente específico
     - buscar: Búsqueda por número o nombre de cliente
+
+    Con `cursor` la página se resuelve por clave (fecha, número, id) sobre
+    `ix_comprobantes_empresa_fecha_numero_id`, sin recorrer las filas previas.
+    `incluir_total=false` evita el conteo completo en cada página.
     """
-    # Base query
-    stmt = (
-        select(Comprobante)
-        .where(Comprobante.empresa_id == empresa_activa_id)
-        .options(joinedload(Comprobante.cliente), joinedload(Comprobante.punto_venta))
-    )
+    condiciones = [Comprobante.empresa_id == empresa_activa_id]
 
     # Aplicar filtros
     if desde:
-        stmt = stmt.where(Comprobante.fecha_emision >= desde)
+        condiciones.append(Comprobante.fecha_emision >= desde)
     if hasta:
-        stmt = stmt.where(Comprobante.fecha_emision <= hasta)
+        condiciones.append(Comprobante.fecha_emision <= hasta)
     if tipo:
-        stmt = stmt.where(Comprobante.tipo_comprobante == tipo)
+        condiciones.append(Comprobante.tipo_comprobante == tipo)
     if cliente_id:
-        stmt = stmt.where(Comprobante.cliente_id == cliente_id)
+        condiciones.append(Comprobante.cliente_id == cliente_id)
     if buscar:
-        stmt = stmt.where(
+        condiciones.append(
             or_(
                 cast(Comprobante.numero, String).like(f"%{buscar}%"),
                 Comprobante.receptor_razon_social.like(f"%{buscar}%"),
@@ -572,18 +576,38 @@ async def listar_comprobantes(
             )
         )
 
-    # Contar total
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar_one()
+    # Contar total sin los joins de carga del listado
+    total = None
+    if incluir_total:
+        count_stmt = select(func.count(Comprobante.id)).where(*condiciones)
+        total = (await db.execute(count_stmt)).scalar_one()
 
-    # Aplicar paginación
-    stmt = stmt.order_by(Comprobante.fecha_emision.desc(), Comprobante.numero.desc())
-    stmt = stmt.offset((page - 1) * per_page).limit(per_page)
+    stmt = (
+        select(Comprobante)
+        .where(*condiciones)
+        .options(joinedload(Comprobante.cliente), joinedload(Comprobante.punto_venta))
+        .order_by(
+            Comprobante.fecha_emision.desc(),
+            Comprobante.numero.desc(),
+            Comprobante.id.desc(),
+        )
+    )
+
+    # Aplicar paginación: por clave si llega cursor, por desplazamiento si no
+    if cursor:
+        stmt = stmt.where(
+            tuple_(Comprobante.fecha_emision, Comprobante.numero, Comprobante.id)
+            < tuple_(*decodificar_cursor(cursor, (date, int, int)))
+        )
+    else:
+        stmt = stmt.offset((page - 1) * per_page)
+    stmt = stmt.limit(per_page + 1)
 
     # Ejecutar query
     result = await db.execute(stmt)
     comprobantes = result.scalars().all()
+    hay_mas = len(comprobantes) > per_page
+    comprobantes = comprobantes[:per_page]
 
     # Mapear a response
     items = [
@@ -614,7 +638,18 @@ async def listar_comprobantes(
         total=total,
         page=page,
         per_page=per_page,
-        pages=(total + per_page - 1) // per_page,
+        pages=(total + per_page - 1) // per_page if total is not None else None,
+        next_cursor=(
+            codificar_cursor(
+                (
+                    comprobantes[-1].fecha_emision,
+                    comprobantes[-1].numero,
+                    comprobantes[-1].id,
+                )
+            )
+            if hay_mas
+            else None
+        ),
     )
 
 
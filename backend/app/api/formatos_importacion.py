@@ -34,6 +34,7 @@ from app.schemas.formato_importacion import (
     FormatoImportacionVersionResponse,
 )
 from app.services.formatos_importacion_service import (
+    EXTENSIONES_ARCHIVO_IMPORTACION,
     FormatoImportacionError,
     FormatosImportacionService,
 )
@@ -231,11 +232,13 @@ async def detectar_formato_importacion(
     _current_user: Usuario = Depends(get_current_empresa_user),
     empresa_id: int = Depends(get_current_empresa_id),
 ):
-    """Detecta formatos posibles a partir de encabezados de un Excel."""
-    if not archivo.filename or not archivo.filename.lower().endswith(".xlsx"):
+    """Detecta formatos posibles a partir de encabezados de un Excel o CSV/TSV."""
+    if not archivo.filename or not archivo.filename.lower().endswith(
+        EXTENSIONES_ARCHIVO_IMPORTACION
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Debes subir un archivo Excel .xlsx",
+            detail="Debes subir un archivo Excel .xlsx o un .csv/.tsv",
         )
 
     contenido = await archivo.read(settings.batch_max_upload_bytes + 1)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 import logging
 from collections.abc import AsyncIterator
 from contextlib import AsyncExitStack, asynccontextmanager
@@ -23,6 +24,7 @@ from fastapi import (
     UploadFile,
     status,
 )
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError as PydanticValidationError
 from sqlalchemy import select
 from sqlalchemy.exc import TimeoutError as SQLAlchemyTimeoutError
@@ -30,9 +32,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_empresa_id, get_current_empresa_user
 from app.api.arca import get_wsfe_client
+from app.api.paginacion import codificar_cursor, decodificar_cursor
 from app.core.config import settings
 from app.core.database import DATABASE_TEMPORARILY_UNAVAILABLE_ERRORS
-from app.core.database import get_db
+from app.core.database import engine, get_db
 from app.core.date_parsing import parse_fecha_input
 from app.models.empresa import Empresa
 from app.models.idempotencia_fiscal import OperacionIdempotente
@@ -42,7 +45,9 @@ from app.schemas.comprobante import ErrorArcaFiscalResponse
 from app.schemas.lote_comprobante import (
     LoteAccionResponse,
     LoteComprobanteDetalleResponse,
+    LoteComprobanteFilaEstadoResponse,
     LoteComprobanteGrupoDetalleResponse,
+    LoteComprobanteGrupoResponse,
     LoteComprobanteGruposPageResponse,
     LoteComprobanteResponse,
     LoteComprobanteResumenResponse,
@@ -53,8 +58,10 @@ from app.schemas.lote_comprobante import (
     LoteProcesamientoResponse,
     LoteReconciliacionExternaRequest,
     LoteValidacionResponse,
+    LoteValidacionTrabajoResponse,
 )
 from app.services.facturacion_service import FaseSolicitudArca
+from app.services.formatos_importacion_service import EXTENSIONES_ARCHIVO_IMPORTACION
 from app.services.lote_comprobantes_service import (
     LoteComprobanteConflictoError,
     LoteComprobanteError,
@@ -63,6 +70,16 @@ from app.services.lote_comprobantes_service import (
     OpcionesDescripcionItemLote,
     OpcionesFechasLote,
     OpcionesPuntoVentaLote,
+    ParametrosValidacionLote,
+)
+from app.services.lote_notificaciones import (
+    asegurar_escucha_progreso_lotes,
+    seguir_progreso_lote,
+)
+from app.services.lote_validacion_trabajos import (
+    TrabajoValidacionLote,
+    ValidacionLoteSaturadaError,
+    validacion_lote_trabajos,
 )
 from app.services.lote_worker import ensure_lote_worker_running
 from app.services.idempotencia_fiscal_service import (
@@ -569,9 +586,17 @@ def _descripcion_facturada_grupo(grupo) -> str | None:
     return None
 
 
-def _serialize_grupo_detalle(grupo) -> LoteComprobanteGrupoDetalleResponse:
-    data = LoteComprobanteGrupoDetalleResponse.model_validate(grupo).model_dump()
-    data["descripcion_facturada"] = _descripcion_facturada_grupo(grupo)
+def _serialize_grupo_detalle(
+    grupo, filas: str = "descripcion"
+) -> LoteComprobanteGrupoDetalleResponse:
+    data = LoteComprobanteGrupoResponse.model_validate(grupo).model_dump()
+    if filas == "descripcion":
+        data["descripcion_facturada"] = _descripcion_facturada_grupo(grupo)
+    elif filas == "resumen":
+        data["filas"] = [
+            LoteComprobanteFilaEstadoResponse.model_validate(fila)
+            for fila in sorted(grupo.filas, key=lambda fila: fila.fila_excel)
+        ]
     return LoteComprobanteGrupoDetalleResponse(**data)
 
 
@@ -613,9 +638,7 @@ async def descargar_plantilla(
     )
 
 
-@router.post("/validar", response_model=LoteValidacionResponse)
-async def validar_archivo_lote(
-    archivo: UploadFile = File(...),
+async def _parametros_validacion_lote(
     formato_version_id: int | None = Form(None),
     perfil_carga_masiva_id: int | None = Form(None),
     punto_venta_modo: str = Form("archivo"),
@@ -632,36 +655,9 @@ async def validar_archivo_lote(
     fecha_vto_pago_modo: str | None = Form(None),
     fecha_vto_pago_fija: str | None = Form(None),
     db: AsyncSession = Depends(get_db),
-    current_user: Usuario = Depends(get_current_empresa_user),
     empresa_activa_id: int = Depends(get_current_empresa_id),
-):
-    """Valida y registra un lote de comprobantes a partir de un Excel."""
-    if not archivo.filename or not archivo.filename.lower().endswith(".xlsx"):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Debes subir un archivo Excel .xlsx generado desde la plantilla oficial",
-        )
-
-    contenido = await archivo.read(settings.batch_max_upload_bytes + 1)
-    if len(contenido) > settings.batch_max_upload_bytes:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=(
-                "El archivo supera el tamaño máximo permitido "
-                f"de {settings.batch_max_upload_bytes // (1024 * 1024)} MB"
-            ),
-        )
-    empresa = await _get_empresa(db, empresa_activa_id)
-    service = LoteComprobantesService(db)
-    opciones_concepto = OpcionesConceptoLote(concepto_modo=concepto_modo)
-    opciones_descripcion_item = OpcionesDescripcionItemLote(
-        descripcion_item_modo=descripcion_item_modo,
-        descripcion_item_fija=descripcion_item_fija,
-    )
-    opciones_punto_venta = OpcionesPuntoVentaLote(
-        punto_venta_modo=punto_venta_modo,
-        punto_venta_numero=punto_venta_numero,
-    )
+) -> ParametrosValidacionLote:
+    """Arma las opciones de validación enviadas junto con el archivo."""
     opciones_fechas = OpcionesFechasLote(
         fecha_emision_modo=fecha_emision_modo,
         fecha_emision_fija=_parse_fecha_form(fecha_emision_fija, "fecha_emision_fija"),
@@ -690,30 +686,172 @@ async def validar_archivo_lote(
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
             ) from exc
+    return ParametrosValidacionLote(
+        opciones_fechas=opciones_fechas,
+        opciones_concepto=OpcionesConceptoLote(concepto_modo=concepto_modo),
+        opciones_descripcion_item=OpcionesDescripcionItemLote(
+            descripcion_item_modo=descripcion_item_modo,
+            descripcion_item_fija=descripcion_item_fija,
+        ),
+        opciones_punto_venta=OpcionesPuntoVentaLote(
+            punto_venta_modo=punto_venta_modo,
+            punto_venta_numero=punto_venta_numero,
+        ),
+        formato_version_id=formato_version_id,
+        perfil_carga_masiva_snapshot=perfil_snapshot,
+    )
+
+
+def _exigir_archivo_importable(archivo: UploadFile) -> None:
+    """Rechaza archivos que no sean .xlsx, .csv o .tsv antes de leerlos."""
+    if not archivo.filename or not archivo.filename.lower().endswith(
+        EXTENSIONES_ARCHIVO_IMPORTACION
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                "Debes subir un archivo Excel .xlsx generado desde la plantilla "
+                "oficial o un .csv/.tsv de una plantilla configurada"
+            ),
+        )
+
+
+def _respuesta_validacion_lote(lote: LoteComprobante) -> LoteValidacionResponse:
+    """Resume un lote recién validado para la UI."""
+    return LoteValidacionResponse(
+        lote=_serialize_lote(lote),
+        puede_emitirse=_lote_puede_emitirse(lote),
+        requiere_background=lote.total_grupos > settings.batch_sync_limit,
+        mensaje=lote.mensaje_resumen or "Lote validado",
+    )
+
+
+async def _serialize_trabajo_validacion(
+    trabajo: TrabajoValidacionLote,
+    db: AsyncSession,
+) -> LoteValidacionTrabajoResponse:
+    """Serializa el trabajo y, si terminó bien, el lote resultante."""
+    resultado = None
+    if trabajo.estado == "completado" and trabajo.lote_id is not None:
+        try:
+            lote = await LoteComprobantesService(db).obtener_lote_resumen(
+                trabajo.lote_id, trabajo.empresa_id
+            )
+        except LoteComprobanteError:
+            # El lote pudo eliminarse después de validarse.
+            lote = None
+        if lote is not None:
+            resultado = _respuesta_validacion_lote(lote)
+    return LoteValidacionTrabajoResponse(
+        id=trabajo.id,
+        estado=trabajo.estado,
+        nombre_archivo=trabajo.nombre_archivo,
+        creado_at=trabajo.creado_at,
+        actualizado_at=trabajo.actualizado_at,
+        total_filas=trabajo.total_filas,
+        total_grupos=trabajo.total_grupos,
+        grupos_registrados=trabajo.grupos_registrados,
+        error=trabajo.error,
+        resultado=resultado,
+    )
+
+
+@router.post("/validar", response_model=LoteValidacionResponse)
+async def validar_archivo_lote(
+    archivo: UploadFile = File(...),
+    parametros: ParametrosValidacionLote = Depends(_parametros_validacion_lote),
+    db: AsyncSession = Depends(get_db),
+    current_user: Usuario = Depends(get_current_empresa_user),
+    empresa_activa_id: int = Depends(get_current_empresa_id),
+):
+    """Valida y registra un lote de comprobantes a partir de un Excel."""
+    _exigir_archivo_importable(archivo)
+
+    contenido = await archivo.read(settings.batch_max_upload_bytes + 1)
+    if len(contenido) > settings.batch_max_upload_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                "El archivo supera el tamaño máximo permitido "
+                f"de {settings.batch_max_upload_bytes // (1024 * 1024)} MB"
+            ),
+        )
+    empresa = await _get_empresa(db, empresa_activa_id)
+    service = LoteComprobantesService(db)
     try:
         lote = await service.validar_y_registrar_lote(
             contenido,
             archivo.filename,
             empresa,
             current_user,
-            opciones_fechas=opciones_fechas,
-            opciones_concepto=opciones_concepto,
-            opciones_descripcion_item=opciones_descripcion_item,
-            opciones_punto_venta=opciones_punto_venta,
-            formato_version_id=formato_version_id,
-            perfil_carga_masiva_snapshot=perfil_snapshot,
+            opciones_fechas=parametros.opciones_fechas,
+            opciones_concepto=parametros.opciones_concepto,
+            opciones_descripcion_item=parametros.opciones_descripcion_item,
+            opciones_punto_venta=parametros.opciones_punto_venta,
+            formato_version_id=parametros.formato_version_id,
+            perfil_carga_masiva_snapshot=parametros.perfil_carga_masiva_snapshot,
         )
     except LoteComprobanteError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
         ) from exc
 
-    return LoteValidacionResponse(
-        lote=_serialize_lote(lote),
-        puede_emitirse=_lote_puede_emitirse(lote),
-        requiere_background=lote.total_grupos > settings.batch_sync_limit,
-        mensaje=lote.mensaje_resumen or "Lote validado",
-    )
+    return _respuesta_validacion_lote(lote)
+
+
+@router.post(
+    "/validaciones",
+    response_model=LoteValidacionTrabajoResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def crear_validacion_lote(
+    archivo: UploadFile = File(...),
+    parametros: ParametrosValidacionLote = Depends(_parametros_validacion_lote),
+    db: AsyncSession = Depends(get_db),
+    current_user: Usuario = Depends(get_current_empresa_user),
+    empresa_activa_id: int = Depends(get_current_empresa_id),
+):
+    """
+    Acepta un Excel de lote y lo valida en segundo plano.
+
+    Responde apenas el archivo queda en disco; el avance y el resultado se
+    consultan en `GET /validaciones/{trabajo_id}`.
+    """
+    _exigir_archivo_importable(archivo)
+    await _get_empresa(db, empresa_activa_id)
+    try:
+        trabajo = await validacion_lote_trabajos.crear(
+            archivo=archivo.file,
+            nombre_archivo=archivo.filename,
+            empresa_id=empresa_activa_id,
+            usuario_id=current_user.id,
+            parametros=parametros,
+        )
+    except ValidacionLoteSaturadaError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": "5"},
+        ) from exc
+    except LoteComprobanteError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    return await _serialize_trabajo_validacion(trabajo, db)
+
+
+@router.get("/validaciones/{trabajo_id}", response_model=LoteValidacionTrabajoResponse)
+async def obtener_validacion_lote(
+    trabajo_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: Usuario = Depends(get_current_empresa_user),
+    empresa_activa_id: int = Depends(get_current_empresa_id),
+):
+    """Devuelve el avance de una validación y, al terminar, su resultado."""
+    trabajo = validacion_lote_trabajos.obtener(trabajo_id, empresa_activa_id)
+    if trabajo is None:
+        raise HTTPException(status_code=404, detail="Validación de lote no encontrada")
+    return await _serialize_trabajo_validacion(trabajo, db)
 
 
 @router.post("/{lote_id}/procesar", response_model=LoteProcesamientoResponse)
@@ -1544,37 +1682,112 @@ async def obtener_seguimiento_lote(
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
 
+@router.get("/{lote_id}/seguimiento/stream")
+async def seguir_lote_en_vivo(
+    lote_id: int,
+    db: AsyncSession = Depends(get_db),
+    _current_user: Usuario = Depends(get_current_empresa_user),
+    empresa_activa_id: int = Depends(get_current_empresa_id),
+) -> StreamingResponse:
+    """
+    Transmite el seguimiento de un lote como server-sent events.
+
+    Envía un evento `seguimiento` con el estado actual y otro por cada avance
+    confirmado por el worker; termina cuando el lote deja de estar activo. La
+    conexión a la base se libera entre lecturas, así un cliente conectado no
+    ocupa el pool de la API.
+    """
+    service = LoteComprobantesService(db)
+
+    async def leer_seguimiento() -> dict:
+        try:
+            seguimiento = await service.obtener_seguimiento_lote(
+                lote_id, empresa_activa_id
+            )
+        finally:
+            await db.rollback()
+        return seguimiento.model_dump(mode="json")
+
+    try:
+        await leer_seguimiento()
+    except LoteComprobanteError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    if settings.batch_worker_listen_notify:
+        await asegurar_escucha_progreso_lotes(engine)
+
+    async def eventos() -> AsyncIterator[str]:
+        try:
+            async for seguimiento in seguir_progreso_lote(
+                lote_id,
+                leer_seguimiento,
+                intervalo_refresco=settings.batch_progress_refresh_seconds,
+            ):
+                if seguimiento is None:
+                    yield ": sin cambios\n\n"
+                    continue
+                yield f"event: seguimiento\ndata: {json.dumps(seguimiento)}\n\n"
+        except LoteComprobanteError:
+            return
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{lote_id}/grupos", response_model=LoteComprobanteGruposPageResponse)
 async def listar_grupos_lote(
     lote_id: int,
     page: int = Query(1, ge=1),
     per_page: int = Query(100, ge=1, le=200),
     estado: str | None = Query(None),
+    cursor: str
+    | None = Query(
+        None, description="Cursor devuelto en next_cursor (reemplaza a page)"
+    ),
+    filas: Literal["descripcion", "resumen", "omitir"] = Query(
+        "descripcion",
+        description=(
+            "descripcion deriva la descripción facturada, resumen devuelve id, "
+            "fila y estado de cada fila, omitir no consulta filas"
+        ),
+    ),
     db: AsyncSession = Depends(get_db),
     current_user: Usuario = Depends(get_current_empresa_user),
     empresa_activa_id: int = Depends(get_current_empresa_id),
 ):
-    """Lista los grupos de un lote con paginación server-side."""
+    """
+    Lista los grupos de un lote con paginación server-side.
+
+    Con `cursor` la página se resuelve por clave `(orden, id)` sin recorrer
+    los grupos previos. El total sale de los contadores del lote.
+    """
+    despues_de = decodificar_cursor(cursor, (int, int)) if cursor else None
     service = LoteComprobantesService(db)
     try:
-        grupos, total = await service.obtener_grupos_lote_paginados(
+        pagina = await service.obtener_grupos_lote_paginados(
             lote_id=lote_id,
             empresa_id=empresa_activa_id,
             page=page,
             per_page=per_page,
             estado=estado,
+            despues_de=despues_de,
+            filas=filas,
         )
     except LoteComprobanteError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
+    total = pagina.total
     total_pages = (total + per_page - 1) // per_page if total else 0
     return LoteComprobanteGruposPageResponse(
-        items=[_serialize_grupo_detalle(grupo) for grupo in grupos],
+        items=[_serialize_grupo_detalle(grupo, filas) for grupo in pagina.grupos],
         page=page,
         per_page=per_page,
         total=total,
         total_pages=total_pages,
         estado=estado,
+        next_cursor=(codificar_cursor(pagina.siguiente) if pagina.siguiente else None),
     )
 
 
@@ -0,0 +1,50 @@
+"""Cursores opacos para los listados paginados por clave."""
+
+import base64
+import json
+from datetime import date
+from typing import Any
+
+from fastapi import HTTPException, status
+
+MENSAJE_CURSOR_INVALIDO = "Cursor de paginación inválido."
+
+
+def codificar_cursor(clave: tuple[int | date, ...]) -> str:
+    """Codifica la clave de orden del último elemento de una página."""
+    valores = [
+        valor.isoformat() if isinstance(valor, date) else valor for valor in clave
+    ]
+    return (
+        base64.urlsafe_b64encode(json.dumps(valores).encode("utf-8"))
+        .decode("ascii")
+        .rstrip("=")
+    )
+
+
+def decodificar_cursor(cursor: str, tipos: tuple[type, ...]) -> tuple[Any, ...]:
+    """
+    Decodifica un cursor con una clave de los `tipos` indicados.
+
+    Responde 400 si el cursor no es base64/JSON válido, si la clave no tiene
+    tantos valores como `tipos` o si alguno no es del tipo esperado.
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if not isinstance(valores, list) or len(valores) != len(tipos):
+            raise ValueError
+        return tuple(_leer_valor(valor, tipo) for valor, tipo in zip(valores, tipos))
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=MENSAJE_CURSOR_INVALIDO
+        ) from None
+
+
+def _leer_valor(valor: Any, tipo: type) -> Any:
+    """Convierte un valor de la clave al tipo esperado o lanza `ValueError`."""
+    if tipo is date:
+        return date.fromisoformat(valor)
+    if tipo is int and isinstance(valor, int) and not isinstance(valor, bool):
+        return valor
+    raise ValueError
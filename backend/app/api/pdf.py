@@ -1,6 +1,9 @@
 """API endpoints para generación de PDFs."""
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+import asyncio
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -8,7 +11,13 @@ from sqlalchemy.orm import selectinload
 from app.api.deps import get_current_empresa_id
 from app.core.database import get_db
 from app.models.comprobante import Comprobante
-from app.services.pdf_service import pdf_service
+from app.schemas.pdf import ExportacionPdfRequest
+from app.services.exportacion_pdf_service import (
+    ExportacionPdfError,
+    ExportacionPdfService,
+    ExportacionPdfSinComprobantesError,
+)
+from app.services.pdf_service import PdfRenderSaturadoError, pdf_service
 
 router = APIRouter()
 
@@ -29,11 +38,49 @@ def _validar_comprobante_autorizado_para_pdf(comprobante: Comprobante) -> None:
         )
 
 
+def _etag_coincide(if_none_match: str | None, etag: str | None) -> bool:
+    """Evalúa If-None-Match contra el ETag fuerte del PDF cacheable."""
+    if not if_none_match or etag is None:
+        return False
+    candidatos = {valor.strip() for valor in if_none_match.split(",")}
+    return "*" in candidatos or f'"{etag}"' in candidatos
+
+
+def _headers_cache_pdf(etag: str | None) -> dict[str, str]:
+    """Arma headers de revalidación para PDFs inmutables."""
+    if etag is None:
+        return {}
+    return {"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"}
+
+
+async def _generar_pdf(comprobante: Comprobante) -> bytes:
+    """Genera el PDF traduciendo saturación y errores de render a HTTP."""
+    try:
+        return await pdf_service.generar_pdf_comprobante(
+            comprobante, comprobante.empresa
+        )
+    except PdfRenderSaturadoError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": "2"},
+        ) from exc
+    except asyncio.TimeoutError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="La generación del PDF demoró demasiado. Intentá nuevamente.",
+            headers={"Retry-After": "5"},
+        ) from exc
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al generar PDF: {str(e)}")
+
+
 @router.get("/comprobante/{comprobante_id}")
 async def descargar_pdf_comprobante(
     comprobante_id: int,
     db: AsyncSession = Depends(get_db),
     empresa_activa_id: int = Depends(get_current_empresa_id),
+    if_none_match: str | None = Header(default=None),
 ):
     """
     Genera y descarga el PDF de un comprobante.
@@ -69,26 +116,25 @@ async def descargar_pdf_comprobante(
         )
     _validar_comprobante_autorizado_para_pdf(comprobante)
 
-    # Generar PDF
-    try:
-        pdf_bytes = await pdf_service.generar_pdf_comprobante(
-            comprobante, comprobante.empresa
+    etag = pdf_service.calcular_etag_pdf(comprobante, comprobante.empresa)
+    if _etag_coincide(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=_headers_cache_pdf(etag),
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al generar PDF: {str(e)}")
 
-    # Nombre del archivo
-    letra = pdf_service._get_letra_comprobante(comprobante.tipo_comprobante)
-    tipo_nombre = pdf_service._get_nombre_comprobante(comprobante.tipo_comprobante)
-    filename = (
-        f"{tipo_nombre}_{letra}_{comprobante.punto_venta.numero:04d}-"
-        f"{comprobante.numero:08d}.pdf"
-    )
+    # Generar PDF (o leerlo de la caché en disco)
+    pdf_bytes = await _generar_pdf(comprobante)
+
+    filename = pdf_service.nombre_archivo_pdf(comprobante)
 
     return Response(
         content=pdf_bytes,
         media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            **_headers_cache_pdf(etag),
+        },
     )
 
 
@@ -97,6 +143,7 @@ async def preview_pdf_comprobante(
     comprobante_id: int,
     db: AsyncSession = Depends(get_db),
     empresa_activa_id: int = Depends(get_current_empresa_id),
+    if_none_match: str | None = Header(default=None),
 ):
     """
     Muestra el PDF en el navegador (sin descargar).
@@ -132,16 +179,63 @@ async def preview_pdf_comprobante(
         )
     _validar_comprobante_autorizado_para_pdf(comprobante)
 
-    # Generar PDF
-    try:
-        pdf_bytes = await pdf_service.generar_pdf_comprobante(
-            comprobante, comprobante.empresa
+    etag = pdf_service.calcular_etag_pdf(comprobante, comprobante.empresa)
+    if _etag_coincide(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=_headers_cache_pdf(etag),
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al generar PDF: {str(e)}")
+
+    # Generar PDF (o leerlo de la caché en disco)
+    pdf_bytes = await _generar_pdf(comprobante)
 
     return Response(
         content=pdf_bytes,
         media_type="application/pdf",
-        headers={"Content-Disposition": "inline"},
+        headers={"Content-Disposition": "inline", **_headers_cache_pdf(etag)},
+    )
+
+
+@router.post("/exportar")
+async def exportar_pdfs_comprobantes(
+    solicitud: ExportacionPdfRequest,
+    db: AsyncSession = Depends(get_db),
+    empresa_activa_id: int = Depends(get_current_empresa_id),
+):
+    """
+    Exporta en un ZIP los PDFs de comprobantes autorizados.
+
+    El ZIP se emite por tramos mientras se renderizan los PDFs, sin armarlo
+    completo en memoria. Los PDFs que no se puedan generar se listan en
+    `errores_exportacion.txt` dentro del mismo archivo.
+
+    Args:
+        solicitud: Rango de fechas, lote o lista de IDs a exportar
+        db: Sesión de base de datos
+
+    Returns:
+        ZIP con los PDFs seleccionados
+    """
+    servicio = ExportacionPdfService(db, pdf_service)
+    try:
+        ids = await servicio.resolver_ids(
+            empresa_activa_id,
+            desde=solicitud.desde,
+            hasta=solicitud.hasta,
+            lote_id=solicitud.lote_id,
+            comprobante_ids=solicitud.comprobante_ids,
+        )
+    except ExportacionPdfSinComprobantesError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ExportacionPdfError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    filename = ExportacionPdfService.nombre_zip(solicitud.model_dump())
+    return StreamingResponse(
+        servicio.iterar_zip(ids),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Comprobantes-Total": str(len(ids)),
+        },
     )
@@ -1,12 +1,19 @@
 """API endpoints para reportes."""
 
 from datetime import date
+from typing import Literal
+
 from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_empresa_id, get_current_empresa_user
 from app.core.database import get_db
 from app.models.usuario import Usuario
+from app.services.exportacion_iva_service import (
+    FORMATOS_EXPORTACION_IVA,
+    ExportacionIvaService,
+)
 from app.services.reportes_service import reportes_service
 
 router = APIRouter()
@@ -16,6 +23,9 @@ router = APIRouter()
 async def reporte_ventas(
     desde: date = Query(..., description="Fecha desde (YYYY-MM-DD)"),
     hasta: date = Query(..., description="Fecha hasta (YYYY-MM-DD)"),
+    incluir_detalle: bool = Query(
+        True, description="Incluir el listado de comprobantes"
+    ),
     db: AsyncSession = Depends(get_db),
     current_user: Usuario = Depends(get_current_empresa_user),
     empresa_activa_id: int = Depends(get_current_empresa_id),
@@ -27,6 +37,7 @@ async def reporte_ventas(
         empresa_activa_id: Empresa activa resuelta por header o usuario
         desde: Fecha desde
         hasta: Fecha hasta
+        incluir_detalle: Si es False solo se calcula el resumen
         db: Sesión de base de datos
 
     Returns:
@@ -40,7 +51,7 @@ async def reporte_ventas(
 
     try:
         reporte = await reportes_service.generar_reporte_ventas(
-            db, empresa_activa_id, desde, hasta
+            db, empresa_activa_id, desde, hasta, incluir_detalle
         )
         return reporte
     except Exception as e:
@@ -53,6 +64,9 @@ async def reporte_ventas(
 async def reporte_iva_ventas(
     periodo_mes: int = Query(..., ge=1, le=12, description="Mes del período (1-12)"),
     periodo_anio: int = Query(..., ge=2000, le=2100, description="Año del período"),
+    incluir_detalle: bool = Query(
+        True, description="Incluir el listado de comprobantes"
+    ),
     db: AsyncSession = Depends(get_db),
     current_user: Usuario = Depends(get_current_empresa_user),
     empresa_activa_id: int = Depends(get_current_empresa_id),
@@ -64,6 +78,7 @@ async def reporte_iva_ventas(
         empresa_activa_id: Empresa activa resuelta por header o usuario
         periodo_mes: Mes del período (1-12)
         periodo_anio: Año del período
+        incluir_detalle: Si es False solo se calcula el resumen
         db: Sesión de base de datos
 
     Returns:
@@ -71,7 +86,7 @@ async def reporte_iva_ventas(
     """
     try:
         reporte = await reportes_service.generar_reporte_iva(
-            db, empresa_activa_id, periodo_mes, periodo_anio
+            db, empresa_activa_id, periodo_mes, periodo_anio, incluir_detalle
         )
         return reporte
     except Exception as e:
@@ -80,6 +95,41 @@ async def reporte_iva_ventas(
         )
 
 
+@router.get("/iva-ventas/exportar")
+async def exportar_iva_ventas(
+    periodo_mes: int = Query(..., ge=1, le=12, description="Mes del período (1-12)"),
+    periodo_anio: int = Query(..., ge=2000, le=2100, description="Año del período"),
+    formato: Literal["csv", "xlsx"] = Query("csv", description="csv o xlsx"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Usuario = Depends(get_current_empresa_user),
+    empresa_activa_id: int = Depends(get_current_empresa_id),
+):
+    """
+    Exporta el subdiario de IVA Ventas como CSV o XLSX.
+
+    Las líneas se leen por tramos con un cursor del servidor y se emiten a
+    medida que se codifican, así la memoria no crece con el período.
+
+    Args:
+        empresa_activa_id: Empresa activa resuelta por header o usuario
+        periodo_mes: Mes del período (1-12)
+        periodo_anio: Año del período
+        formato: Formato del archivo
+        db: Sesión de base de datos
+
+    Returns:
+        Archivo del subdiario para descargar
+    """
+    filename = ExportacionIvaService.nombre_archivo(periodo_mes, periodo_anio, formato)
+    return StreamingResponse(
+        ExportacionIvaService().iterar(
+            db, empresa_activa_id, periodo_mes, periodo_anio, formato
+        ),
+        media_type=FORMATOS_EXPORTACION_IVA[formato],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/clientes")
 async def reporte_clientes(
     desde: date = Query(..., description="Fecha desde (YYYY-MM-DD)"),
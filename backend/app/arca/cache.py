@@ -2,8 +2,10 @@
 
 import asyncio
 import json
+import logging
 import os
-import stat
+import tempfile
+import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, Optional
@@ -11,6 +13,8 @@ from typing import Dict, Optional
 from app.arca.models import TicketAcceso
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class TokenCache:
     """
@@ -18,13 +22,26 @@ class TokenCache:
 
     Los tickets de WSAA tienen validez de hasta 12 horas. Este cache permite
     reutilizar tokens válidos y evitar autenticaciones innecesarias.
+
+    La memoria es la fuente de verdad. Los cambios marcan el cache como sucio
+    y una tarea en segundo plano los vuelca a disco tras `flush_delay`
+    segundos, agrupando todos los cambios de ese intervalo en una sola
+    escritura atómica (temporal + `os.replace`) fuera del event loop.
     """
 
-    def __init__(self, storage_path: str | None = None):
+    def __init__(self, storage_path: str | None = None, flush_delay: float = 0.2):
         """Inicializa el cache."""
         self._cache: Dict[str, TicketAcceso] = {}
         self._lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task[None] | None = None
+        self.flush_delay = flush_delay
         self.storage_path = Path(storage_path or settings.arca_token_cache_path)
+        self._pending_writes = 0
+        self._flushes = 0
+        self._flush_errors = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
         self._load_from_disk()
 
     async def get(self, key: str) -> Optional[TicketAcceso]:
@@ -46,7 +63,7 @@ class TokenCache:
             # Verificar si está expirado (con margen de 5 minutos)
             if ticket.is_expired() or self._is_near_expiration(ticket):
                 del self._cache[key]
-                self._save_to_disk()
+                self._mark_dirty()
                 return None
 
             return ticket
@@ -61,7 +78,7 @@ class TokenCache:
         """
         async with self._lock:
             self._cache[key] = ticket
-            self._save_to_disk()
+            self._mark_dirty()
 
     async def delete(self, key: str) -> None:
         """
@@ -71,8 +88,8 @@ class TokenCache:
             key: Clave del cache
         """
         async with self._lock:
-            self._cache.pop(key, None)
-            self._save_to_disk()
+            if self._cache.pop(key, None) is not None:
+                self._mark_dirty()
 
     async def delete_prefix(self, prefix: str) -> int:
         """Elimina todos los tickets cuya clave coincide con el prefijo."""
@@ -81,7 +98,7 @@ class TokenCache:
             for key in matching_keys:
                 del self._cache[key]
             if matching_keys:
-                self._save_to_disk()
+                self._mark_dirty()
             return len(matching_keys)
 
     async def clear(self) -> None:
@@ -89,7 +106,7 @@ class TokenCache:
         async with self._lock:
             if self._cache:
                 self._cache.clear()
-                self._save_to_disk()
+                self._mark_dirty()
 
     async def cleanup_expired(self) -> int:
         """
@@ -107,10 +124,112 @@ class TokenCache:
                 del self._cache[key]
 
             if expired_keys:
-                self._save_to_disk()
+                self._mark_dirty()
 
             return len(expired_keys)
 
+    async def flush(self) -> None:
+        """
+        Vuelca a disco los cambios pendientes y espera a que terminen.
+
+        Se usa al apagar la aplicación para no perder tickets recién obtenidos.
+        """
+        while True:
+            if not await self._flush_pending():
+                return
+            task = self._flush_task
+            if task is not None and not task.done():
+                # Tras el volcado la tarea diferida solo puede estar esperando.
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+            if not self._pending_writes:
+                return
+
+    async def aclose(self) -> None:
+        """
+        Vuelca los cambios pendientes y cancela el volcado diferido.
+
+        Después de cerrar no queda ninguna tarea del cache en el event loop; un
+        cambio posterior vuelve a agendar su volcado.
+        """
+        try:
+            await self.flush()
+        finally:
+            task, self._flush_task = self._flush_task, None
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+    def stats(self) -> dict[str, float | int]:
+        """Devuelve métricas del cache y de su persistencia en disco."""
+        return {
+            "tickets": len(self._cache),
+            "escrituras_pendientes": self._pending_writes,
+            "flushes": self._flushes,
+            "flushes_fallidos": self._flush_errors,
+            "ultimo_flush_ms": round(self._last_flush_ms, 3),
+            "max_flush_ms": round(self._max_flush_ms, 3),
+        }
+
+    def _mark_dirty(self) -> None:
+        """Registra un cambio pendiente y agenda un volcado si no hay uno."""
+        self._pending_writes += 1
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        """
+        Espera `flush_delay` para agrupar cambios y luego los vuelca.
+
+        Repite mientras lleguen cambios durante la escritura, porque esos no
+        agendan otra tarea; si el volcado falla, quedan para el próximo cambio
+        o para `flush`.
+        """
+        while self._pending_writes:
+            await asyncio.sleep(self.flush_delay)
+            if not await self._flush_pending():
+                return
+
+    async def _flush_pending(self) -> bool:
+        """
+        Escribe una instantánea del cache si hay cambios sin volcar.
+
+        Returns:
+            False si la escritura falló y los cambios siguen pendientes
+        """
+        async with self._flush_lock:
+            if not self._pending_writes:
+                return True
+            started = time.perf_counter()
+            try:
+                async with self._lock:
+                    pending = self._pending_writes
+                    payload = self._serialize()
+                await asyncio.to_thread(self._save_to_disk, payload)
+            except Exception as exc:
+                # Si falla la persistencia, el cache en memoria sigue siendo
+                # usable; los cambios quedan pendientes para el próximo volcado.
+                self._flush_errors += 1
+                logger.warning(
+                    "event=arca_token_cache_flush_fallido path=%s error=%s",
+                    self.storage_path,
+                    type(exc).__name__,
+                )
+                return False
+            # Los cambios llegados durante la escritura siguen pendientes.
+            self._pending_writes -= pending
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._flushes += 1
+            self._last_flush_ms = elapsed_ms
+            self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+            return True
+
     def _is_near_expiration(
         self, ticket: TicketAcceso, margin_minutes: int = 5
     ) -> bool:
@@ -181,33 +300,42 @@ class TokenCache:
 
             self._cache[key] = ticket
 
-    def _save_to_disk(self) -> None:
-        """Persist tickets vigentes para reutilizarlos entre reinicios."""
-        valid_tickets = {
+    def _serialize(self) -> dict[str, dict]:
+        """Arma el contenido a persistir con los tickets vigentes."""
+        return {
             key: ticket.model_dump(mode="json")
             for key, ticket in self._cache.items()
             if not ticket.is_expired() and not self._is_near_expiration(ticket)
         }
 
-        try:
-            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-            if valid_tickets:
-                fd = os.open(
-                    self.storage_path,
-                    os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
-                    stat.S_IRUSR | stat.S_IWUSR,
-                )
-                with os.fdopen(fd, "w", encoding="utf-8") as cache_file:
-                    cache_file.write(
-                        json.dumps(valid_tickets, ensure_ascii=True, indent=2)
-                    )
-                self.storage_path.chmod(stat.S_IRUSR | stat.S_IWUSR)
-            elif self.storage_path.exists():
-                self.storage_path.unlink()
-        except OSError:
-            # Si falla la persistencia, el cache en memoria sigue siendo usable.
+    def _save_to_disk(self, valid_tickets: dict[str, dict]) -> None:
+        """
+        Persiste tickets vigentes para reutilizarlos entre reinicios.
+
+        `mkstemp` crea el temporal con permisos 0600 en el mismo directorio;
+        luego se renombra sobre el archivo final, así una caída a mitad de escritura
+        nunca deja un JSON truncado.
+        """
+        if not valid_tickets:
+            self.storage_path.unlink(missing_ok=True)
             return
 
+        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.storage_path.parent,
+            prefix=f".{self.storage_path.name}.",
+            suffix=".tmp",
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as cache_file:
+                cache_file.write(json.dumps(valid_tickets, ensure_ascii=True, indent=2))
+                cache_file.flush()
+                os.fsync(cache_file.fileno())
+            os.replace(tmp_name, self.storage_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
 
 # Instancia global del cache
 _token_cache = TokenCache()
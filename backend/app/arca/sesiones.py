@@ -0,0 +1,315 @@
+"""Sesiones ARCA de larga vida con ticket WSAA en memoria."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from app.arca.config import ArcaAmbiente
+from app.arca.exceptions import ArcaAuthError
+from app.arca.models import TicketAcceso
+from app.arca.utils import clean_cuit
+from app.arca.wsaa import CODIGO_TICKET_YA_EMITIDO, WSAAClient
+from app.arca.wsfev1 import WSFEv1Client
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ClaveSesionArca = tuple[str, str, str, str, str]
+
+REINTENTO_RENOVACION_SEGUNDOS = 60
+
+
+@dataclass
+class SesionArca:
+    """Ticket vigente y cliente WSFEv1 listo para una identidad ARCA."""
+
+    ambiente: ArcaAmbiente
+    cuit: str
+    servicio: str
+    cert_path: str
+    key_path: str
+    ticket: TicketAcceso | None = None
+    cliente_wsfe: WSFEv1Client | None = None
+    ultimo_uso: float = 0.0
+    obtenido_en: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    renovacion: asyncio.Task[None] | None = None
+
+    def ticket_utilizable(self) -> TicketAcceso | None:
+        """Devuelve el ticket si todavía no venció."""
+        if self.ticket is None or self.ticket.is_expired():
+            return None
+        return self.ticket
+
+
+class GestorSesionesArca:
+    """
+    Mantiene una sesión ARCA por ambiente, CUIT, servicio y certificado.
+
+    El camino caliente es una búsqueda en memoria: no construye `WSAAClient`,
+    no hashea el certificado ni toca el `TokenCache`. Cuando falta el ticket,
+    un único `loginCms` por sesión atiende a todos los que esperan. Antes del
+    vencimiento una tarea renueva el ticket en segundo plano; si la sesión no
+    se usó desde la última renovación, se descarta en lugar de renovarse. Si
+    WSAA contesta que el ticket vigente todavía vale, se lo conserva y la
+    renovación se reintenta una sola vez, cuando vence.
+    """
+
+    def __init__(self, margen_renovacion: timedelta | None = None):
+        """Inicializa el gestor sin sesiones."""
+        self.margen_renovacion = margen_renovacion or timedelta(
+            seconds=settings.arca_ticket_refresh_margin_seconds
+        )
+        self._sesiones: dict[ClaveSesionArca, SesionArca] = {}
+        self._hits = 0
+        self._logins = 0
+        self._renovaciones = 0
+        self._renovaciones_fallidas = 0
+        self._renovaciones_aplazadas = 0
+
+    async def obtener_ticket(
+        self,
+        *,
+        ambiente: ArcaAmbiente,
+        cuit: str,
+        cert_path: str,
+        key_path: str,
+        servicio: str = "wsfe",
+        crear_wsaa: Callable[[ArcaAmbiente], WSAAClient] = WSAAClient,
+    ) -> TicketAcceso:
+        """Devuelve el ticket de la sesión, autenticando solo si no hay uno vigente."""
+        sesion = self._sesion(ambiente, cuit, servicio, cert_path, key_path)
+        sesion.ultimo_uso = time.monotonic()
+        ticket = sesion.ticket_utilizable()
+        if ticket is not None:
+            self._hits += 1
+            return ticket
+
+        async with sesion.lock:
+            ticket = sesion.ticket_utilizable()
+            if ticket is not None:
+                self._hits += 1
+                return ticket
+            ticket = await crear_wsaa(ambiente).login(
+                cert_path=cert_path,
+                key_path=key_path,
+                cuit=sesion.cuit,
+                servicio=servicio,
+            )
+            self._logins += 1
+            self._instalar_ticket(sesion, ticket, crear_wsaa)
+            return ticket
+
+    async def obtener_cliente_wsfe(
+        self,
+        *,
+        ambiente: ArcaAmbiente,
+        cuit: str,
+        cert_path: str,
+        key_path: str,
+        crear_wsaa: Callable[[ArcaAmbiente], WSAAClient] = WSAAClient,
+        crear_wsfe: Callable[..., WSFEv1Client] = WSFEv1Client,
+    ) -> WSFEv1Client:
+        """
+        Devuelve el cliente WSFEv1 de la sesión con su ticket vigente.
+
+        El cliente se comparte entre llamadas; al renovarse el ticket se
+        actualiza en el mismo objeto.
+        """
+        ticket = await self.obtener_ticket(
+            ambiente=ambiente,
+            cuit=cuit,
+            cert_path=cert_path,
+            key_path=key_path,
+            servicio="wsfe",
+            crear_wsaa=crear_wsaa,
+        )
+        sesion = self._sesion(ambiente, cuit, "wsfe", cert_path, key_path)
+        if sesion.cliente_wsfe is None:
+            sesion.cliente_wsfe = crear_wsfe(
+                ambiente=ambiente, ticket=ticket, cuit=sesion.cuit
+            )
+        else:
+            sesion.cliente_wsfe.ticket = ticket
+        return sesion.cliente_wsfe
+
+    def invalidar(self, cuit: str | None = None) -> int:
+        """Descarta las sesiones de un CUIT, o todas, y cancela sus renovaciones."""
+        cuit_limpio = clean_cuit(cuit) if cuit else None
+        claves = [
+            clave
+            for clave, sesion in self._sesiones.items()
+            if cuit_limpio is None or sesion.cuit == cuit_limpio
+        ]
+        for clave in claves:
+            sesion = self._sesiones.pop(clave)
+            if sesion.renovacion is not None:
+                sesion.renovacion.cancel()
+        return len(claves)
+
+    async def cerrar(self) -> None:
+        """Cancela las renovaciones pendientes y vacía el gestor."""
+        tareas = [
+            sesion.renovacion
+            for sesion in self._sesiones.values()
+            if sesion.renovacion is not None
+        ]
+        self.invalidar()
+        for tarea in tareas:
+            try:
+                await tarea
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict[str, int]:
+        """Devuelve contadores de uso del gestor."""
+        return {
+            "sesiones": len(self._sesiones),
+            "hits": self._hits,
+            "logins": self._logins,
+            "renovaciones": self._renovaciones,
+            "renovaciones_fallidas": self._renovaciones_fallidas,
+            "renovaciones_aplazadas": self._renovaciones_aplazadas,
+        }
+
+    def _sesion(
+        self,
+        ambiente: ArcaAmbiente,
+        cuit: str,
+        servicio: str,
+        cert_path: str,
+        key_path: str,
+    ) -> SesionArca:
+        """Obtiene o crea la sesión de una identidad ARCA."""
+        cuit_limpio = clean_cuit(cuit)
+        clave = (ambiente.value, cuit_limpio, servicio, cert_path, key_path)
+        sesion = self._sesiones.get(clave)
+        if sesion is None:
+            sesion = SesionArca(
+                ambiente=ambiente,
+                cuit=cuit_limpio,
+                servicio=servicio,
+                cert_path=cert_path,
+                key_path=key_path,
+            )
+            self._sesiones[clave] = sesion
+        return sesion
+
+    def _instalar_ticket(
+        self,
+        sesion: SesionArca,
+        ticket: TicketAcceso,
+        crear_wsaa: Callable[[ArcaAmbiente], WSAAClient],
+    ) -> None:
+        """Guarda el ticket en la sesión y programa su renovación."""
+        sesion.ticket = ticket
+        sesion.obtenido_en = time.monotonic()
+        if sesion.cliente_wsfe is not None:
+            sesion.cliente_wsfe.ticket = ticket
+        if sesion.renovacion is not None and not sesion.renovacion.done():
+            if sesion.renovacion is not asyncio.current_task():
+                sesion.renovacion.cancel()
+        sesion.renovacion = asyncio.create_task(
+            self._renovar(sesion, crear_wsaa, self._segundos_hasta_renovar(ticket))
+        )
+
+    def _segundos_hasta_renovar(
+        self, ticket: TicketAcceso, margen: timedelta | None = None
+    ) -> float:
+        """Segundos hasta entrar en el margen de renovación del ticket."""
+        expiracion = ticket.expiracion
+        if expiracion.tzinfo is None:
+            expiracion = expiracion.replace(tzinfo=timezone.utc)
+        renovar_en = expiracion - (self.margen_renovacion if margen is None else margen)
+        return max((renovar_en - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+    async def _renovar(
+        self,
+        sesion: SesionArca,
+        crear_wsaa: Callable[[ArcaAmbiente], WSAAClient],
+        espera: float | None,
+    ) -> None:
+        """Renueva el ticket antes de vencer mientras la sesión siga en uso."""
+        while espera is not None:
+            await asyncio.sleep(espera)
+            if sesion.ultimo_uso < sesion.obtenido_en:
+                self._descartar(sesion)
+                return
+            async with sesion.lock:
+                espera = await self._intentar_renovacion(sesion, crear_wsaa)
+
+    async def _intentar_renovacion(
+        self,
+        sesion: SesionArca,
+        crear_wsaa: Callable[[ArcaAmbiente], WSAAClient],
+    ) -> float | None:
+        """
+        Pide un ticket nuevo y devuelve cuánto esperar para el próximo intento.
+
+        Devuelve `None` si no hay que volver a intentar: el ticket se renovó o
+        el vigente ya no sirve y el próximo uso hará un login normal.
+        """
+        try:
+            ticket = await crear_wsaa(sesion.ambiente).login(
+                cert_path=sesion.cert_path,
+                key_path=sesion.key_path,
+                cuit=sesion.cuit,
+                servicio=sesion.servicio,
+                force_new=True,
+            )
+        except Exception as exc:
+            vigente = sesion.ticket_utilizable()
+            if (
+                vigente is not None
+                and isinstance(exc, ArcaAuthError)
+                and exc.codigo == CODIGO_TICKET_YA_EMITIDO
+            ):
+                self._renovaciones_aplazadas += 1
+                logger.info(
+                    "event=arca_ticket_renovacion_aplazada cuit=%s servicio=%s "
+                    "expiracion=%s",
+                    sesion.cuit,
+                    sesion.servicio,
+                    vigente.expiracion.isoformat(),
+                )
+                return self._segundos_hasta_renovar(vigente, timedelta(0))
+            self._renovaciones_fallidas += 1
+            logger.warning(
+                "event=arca_ticket_renovacion_fallida cuit=%s servicio=%s error=%s",
+                sesion.cuit,
+                sesion.servicio,
+                type(exc).__name__,
+            )
+            return REINTENTO_RENOVACION_SEGUNDOS if vigente is not None else None
+        self._renovaciones += 1
+        self._instalar_ticket(sesion, ticket, crear_wsaa)
+        return None
+
+    def _descartar(self, sesion: SesionArca) -> None:
+        """Quita una sesión inactiva del gestor."""
+        clave = (
+            sesion.ambiente.value,
+            sesion.cuit,
+            sesion.servicio,
+            sesion.cert_path,
+            sesion.key_path,
+        )
+        if self._sesiones.get(clave) is sesion:
+            del self._sesiones[clave]
+
+
+# Instancia global del gestor
+_gestor_sesiones_arca = GestorSesionesArca()
+
+
+def get_gestor_sesiones_arca() -> GestorSesionesArca:
+    """
+    Obtiene el gestor global de sesiones ARCA.
+
+    Returns:
+        Instancia de GestorSesionesArca
+    """
+    return _gestor_sesiones_arca
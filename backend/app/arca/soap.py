@@ -1,6 +1,7 @@
 """Utilidades para clientes SOAP de ARCA."""
 
 import ssl
+import threading
 from collections.abc import Callable
 from functools import partial
 from typing import Any, TypeVar
@@ -30,11 +31,18 @@ class ArcaTLSAdapter(HTTPAdapter):
         return super().proxy_manager_for(*args, **kwargs)
 
 
-def create_soap_client(wsdl_url: str, timeout: int = 30) -> Client:
+DEFAULT_POOL_MAXSIZE = 10
+
+
+def create_soap_client(
+    wsdl_url: str,
+    timeout: int = 30,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+) -> Client:
     """Crea un cliente SOAP con transporte TLS compatible con ARCA."""
 
     session = requests.Session()
-    adapter = ArcaTLSAdapter()
+    adapter = ArcaTLSAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
     session.mount("https://", adapter)
     session.mount("http://", adapter)
     transport = Transport(
@@ -45,6 +53,102 @@ def create_soap_client(wsdl_url: str, timeout: int = 30) -> Client:
     return Client(wsdl_url, transport=transport)
 
 
+class SoapClientRegistry:
+    """
+    Registro de clientes SOAP compartidos por proceso.
+
+    Parsear el WSDL de ARCA cuesta más que la llamada SOAP en sí. El registro
+    construye un único cliente Zeep por ambiente, URL y timeout, y lo reutiliza
+    junto con su `requests.Session`, de modo que las conexiones HTTPS keep-alive
+    del `ArcaTLSAdapter` quedan disponibles entre requests. Los clientes Zeep no
+    guardan estado de autenticación: token, sign y CUIT viajan en cada llamada.
+    """
+
+    def __init__(self, pool_maxsize: int = DEFAULT_POOL_MAXSIZE):
+        """Inicializa el registro vacío."""
+        self.pool_maxsize = pool_maxsize
+        self._clients: dict[tuple[str, str, int], Client] = {}
+        self._key_locks: dict[tuple[str, str, int], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_client(self, ambiente: str, wsdl_url: str, timeout: int = 30) -> Client:
+        """
+        Obtiene el cliente compartido, parseando el WSDL solo la primera vez.
+
+        La creación se serializa por clave: requests concurrentes para el mismo
+        WSDL esperan al primero en lugar de descargarlo en paralelo.
+        """
+        key = (ambiente, wsdl_url, timeout)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._hits += 1
+                return client
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is not None:
+                    self._hits += 1
+                    return client
+
+            client = create_soap_client(
+                wsdl_url,
+                timeout=timeout,
+                pool_maxsize=self.pool_maxsize,
+            )
+
+            with self._lock:
+                self._clients[key] = client
+                self._misses += 1
+            return client
+
+    def invalidate(self, ambiente: str | None = None) -> int:
+        """Descarta clientes cacheados, opcionalmente solo de un ambiente."""
+        with self._lock:
+            keys = [
+                key for key in self._clients if ambiente is None or key[0] == ambiente
+            ]
+            for key in keys:
+                client = self._clients.pop(key)
+                transport = getattr(client, "transport", None)
+                session = getattr(transport, "session", None)
+                if session is not None:
+                    session.close()
+            return len(keys)
+
+    def stats(self) -> dict[str, int]:
+        """Devuelve contadores de reutilización del registro."""
+        with self._lock:
+            return {
+                "clientes": len(self._clients),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+_soap_client_registry = SoapClientRegistry()
+
+
+def get_soap_client_registry() -> SoapClientRegistry:
+    """
+    Obtiene el registro global de clientes SOAP.
+
+    Returns:
+        Instancia de SoapClientRegistry
+    """
+    return _soap_client_registry
+
+
+def get_soap_client(ambiente: str, wsdl_url: str, timeout: int = 30) -> Client:
+    """Obtiene un cliente SOAP compartido para el ambiente y WSDL indicados."""
+
+    return _soap_client_registry.get_client(ambiente, wsdl_url, timeout=timeout)
+
+
 async def run_soap_call(
     func: Callable[..., T],
     /,
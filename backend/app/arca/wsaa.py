@@ -14,11 +14,15 @@ from app.arca.crypto import create_signed_tra
 from app.arca.cache import get_token_cache
 from app.arca.models import TicketAcceso
 from app.arca.exceptions import ArcaAuthError, ArcaConnectionError
-from app.arca.soap import create_soap_client, run_soap_call
+from app.arca.soap import get_soap_client, run_soap_call
 from app.arca.utils import clean_cuit
 
 logger = logging.getLogger(__name__)
 
+# Falla de loginCms cuando el certificado ya tiene un ticket vigente para el
+# servicio: WSAA no emite otro hasta que ese venza.
+CODIGO_TICKET_YA_EMITIDO = "coe.alreadyAuthenticated"
+
 
 class WSAAClient:
     """
@@ -40,7 +44,9 @@ class WSAAClient:
 
         # Cliente SOAP
         try:
-            self.client = create_soap_client(self.config.wsaa_url)
+            self.client = get_soap_client(
+                self.config.ambiente.value, self.config.wsaa_url
+            )
         except Exception as e:
             raise ArcaConnectionError(f"Error al conectar con WSAA: {str(e)}")
 
@@ -123,7 +129,12 @@ class WSAAClient:
         except Fault as e:
             error_msg = f"Error SOAP en WSAA: {e.message}"
             logger.error(error_msg)
-            raise ArcaAuthError(error_msg)
+            codigo = (
+                CODIGO_TICKET_YA_EMITIDO
+                if "alreadyAuthenticated" in f"{e.code} {e.message}"
+                else None
+            )
+            raise ArcaAuthError(error_msg, codigo=codigo)
 
         except TransportError as e:
             error_msg = f"Error de transporte en WSAA: {str(e)}"
@@ -30,7 +30,7 @@ from app.arca.exceptions import (
     CabeceraRespuestaFecae,
     MensajeArcaEstructurado,
 )
-from app.arca.soap import create_soap_client, run_soap_call
+from app.arca.soap import get_soap_client, run_soap_call
 from app.arca.utils import clean_cuit, format_importe
 
 logger = logging.getLogger(__name__)
@@ -62,7 +62,9 @@ class WSFEv1Client:
 
         # Cliente SOAP
         try:
-            self.client = create_soap_client(self.config.wsfe_url)
+            self.client = get_soap_client(
+                self.config.ambiente.value, self.config.wsfe_url
+            )
         except Exception as e:
             raise ArcaConnectionError(f"Error al conectar con WSFEv1: {str(e)}")
 
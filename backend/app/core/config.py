@@ -85,7 +85,7 @@ class Settings(BaseSettings):
     database_worker_pool_size: int = Field(
         default=1,
         ge=1,
-        le=1,
+        le=4,
         alias="DATABASE_WORKER_POOL_SIZE",
     )
     database_pool_timeout_seconds: float = Field(
@@ -122,6 +122,9 @@ class Settings(BaseSettings):
     arca_token_cache_path: str = Field(
         default="./data/arca_token_cache.json", alias="ARCA_TOKEN_CACHE_PATH"
     )
+    arca_ticket_refresh_margin_seconds: int = Field(
+        default=300, ge=30, le=3600, alias="ARCA_TICKET_REFRESH_MARGIN_SECONDS"
+    )
     certificate_max_upload_bytes: int = Field(
         default=64 * 1024, alias="CERTIFICATE_MAX_UPLOAD_BYTES"
     )
@@ -131,9 +134,41 @@ class Settings(BaseSettings):
     )
     batch_max_rows: int = Field(default=20000, alias="BATCH_MAX_ROWS")
     batch_max_groups: int = Field(default=5000, alias="BATCH_MAX_GROUPS")
+    batch_validation_workers: int = Field(
+        default=1,
+        ge=0,
+        le=16,
+        alias="BATCH_VALIDATION_WORKERS",
+    )
+    batch_validation_max_jobs: int = Field(
+        default=4,
+        ge=1,
+        le=64,
+        alias="BATCH_VALIDATION_MAX_JOBS",
+    )
     batch_worker_enabled: bool = Field(default=True, alias="BATCH_WORKER_ENABLED")
     batch_worker_poll_seconds: int = Field(default=5, alias="BATCH_WORKER_POLL_SECONDS")
+    batch_worker_idle_max_seconds: int = Field(
+        default=60,
+        ge=1,
+        alias="BATCH_WORKER_IDLE_MAX_SECONDS",
+    )
+    batch_worker_listen_notify: bool = Field(
+        default=True,
+        alias="BATCH_WORKER_LISTEN_NOTIFY",
+    )
+    batch_progress_refresh_seconds: int = Field(
+        default=15,
+        ge=1,
+        alias="BATCH_PROGRESS_REFRESH_SECONDS",
+    )
     batch_worker_batch_size: int = Field(default=1, alias="BATCH_WORKER_BATCH_SIZE")
+    batch_worker_concurrency: int = Field(
+        default=1,
+        ge=1,
+        le=4,
+        alias="BATCH_WORKER_CONCURRENCY",
+    )
     batch_processing_stale_minutes: int = Field(
         default=120, alias="BATCH_PROCESSING_STALE_MINUTES"
     )
@@ -146,6 +181,35 @@ class Settings(BaseSettings):
     arca_fecaesolicitar_batch_max_registros: int = Field(
         default=0, alias="ARCA_FECAESOLICITAR_BATCH_MAX_REGISTROS"
     )
+    pdf_render_workers: int = Field(
+        default=2,
+        ge=0,
+        le=16,
+        alias="PDF_RENDER_WORKERS",
+    )
+    pdf_render_max_pending: int = Field(
+        default=8,
+        ge=1,
+        le=256,
+        alias="PDF_RENDER_MAX_PENDING",
+    )
+    pdf_render_timeout_seconds: float = Field(
+        default=60.0,
+        gt=0,
+        le=600,
+        alias="PDF_RENDER_TIMEOUT_SECONDS",
+    )
+    pdf_cache_path: str = Field(default="./data/pdf_cache", alias="PDF_CACHE_PATH")
+    pdf_cache_max_bytes: int = Field(
+        default=256 * 1024 * 1024,
+        ge=0,
+        alias="PDF_CACHE_MAX_BYTES",
+    )
+    pdf_export_max_comprobantes: int = Field(
+        default=10000,
+        ge=1,
+        alias="PDF_EXPORT_MAX_COMPROBANTES",
+    )
     storage_limit_bytes: Optional[int] = Field(
         default=None, alias="STORAGE_LIMIT_BYTES"
     )
@@ -392,6 +392,14 @@ def get_database_pool_status() -> DatabasePoolStatus:
     }
 
 
+def get_worker_connection_capacity() -> int:
+    """Devuelve cuántas conexiones puede usar el worker en simultáneo."""
+    if worker_engine is engine:
+        # SQLite comparte engine con la API y serializa escrituras.
+        return 1
+    return settings.database_worker_pool_size
+
+
 def _record_pool_timeout(role: PoolRole, wait_ms: float) -> None:
     """Registra un timeout del pool sin conservar detalles de conexión."""
     metrics = _record_acquisition(role, wait_ms, timed_out=True)
@@ -11,9 +11,14 @@ from starlette.responses import JSONResponse
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 import app.models  # noqa: F401
+from app.arca.cache import get_token_cache
+from app.arca.sesiones import get_gestor_sesiones_arca
 from app.core.config import settings
 from app.core.database import Base, dispose_database_engines, engine
+from app.services.lote_notificaciones import detener_escucha_progreso_lotes
+from app.services.lote_validacion_trabajos import validacion_lote_trabajos
 from app.services.lote_worker import ensure_lote_worker_running, stop_lote_worker
+from app.services.pdf_service import pdf_render_executor
 from app.api import (
     almacenamiento,
     arca,
@@ -232,6 +237,11 @@ async def startup():
 async def shutdown():
     """Detiene tareas de background de forma ordenada."""
     await stop_lote_worker(app)
+    await validacion_lote_trabajos.cerrar()
+    await detener_escucha_progreso_lotes()
+    await get_gestor_sesiones_arca().cerrar()
+    await get_token_cache().aclose()
+    pdf_render_executor.shutdown()
     await dispose_database_engines()
 
 
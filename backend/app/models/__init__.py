@@ -7,6 +7,7 @@ from app.models.certificado import Certificado
 from app.models.cliente import Cliente
 from app.models.comprobante import Comprobante
 from app.models.comprobante_item import ComprobanteItem
+from app.models.resumen_ventas import ResumenVentasDiario
 from app.models.lote_comprobante import (
     LoteComprobante,
     LoteComprobanteGrupo,
@@ -41,6 +42,7 @@ __all__ = [
     "Cliente",
     "Comprobante",
     "ComprobanteItem",
+    "ResumenVentasDiario",
     "LoteComprobante",
     "LoteComprobanteGrupo",
     "LoteComprobanteFila",
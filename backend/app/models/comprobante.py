@@ -64,8 +64,16 @@ class Comprobante(Base):
         Index("ix_comprobantes_cae", "cae"),
         # Índice para filtro por estado
         Index("ix_comprobantes_estado", "estado"),
-        # Índice compuesto para listados paginados
-        Index("ix_comprobantes_empresa_fecha", "empresa_id", "fecha_emision"),
+        # Índice compuesto para listados paginados por clave
+        Index(
+            "ix_comprobantes_empresa_fecha_numero_id",
+            "empresa_id",
+            "fecha_emision",
+            "numero",
+            "id",
+        ),
+        # Índice para detectar duplicados lógicos por huella
+        Index("ix_comprobantes_empresa_huella_logica", "empresa_id", "huella_logica"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -128,6 +136,10 @@ class Comprobante(Base):
     receptor_condicion_iva = Column(String(50), nullable=True)
     receptor_domicilio = Column(String(255), nullable=True)
 
+    # Huella lógica fiscal (SHA-256) del request autorizado; ver
+    # IdempotenciaFiscalService.calcular_huella_logica.
+    huella_logica = Column(String(64), nullable=True)
+
     # Items del comprobante
     items = relationship(
         "ComprobanteItem", back_populates="comprobante", cascade="all, delete-orphan"
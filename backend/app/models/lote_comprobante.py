@@ -182,6 +182,14 @@ class LoteComprobanteGrupo(Base):
             ondelete="RESTRICT",
         ),
         Index("ix_lotes_comprobantes_grupos_lote_ref", "lote_id", "comprobante_ref"),
+        Index("ix_lotes_comprobantes_grupos_lote_orden", "lote_id", "orden", "id"),
+        Index(
+            "ix_lotes_comprobantes_grupos_lote_estado_orden",
+            "lote_id",
+            "estado",
+            "orden",
+            "id",
+        ),
         Index(
             "uq_lotes_comprobantes_grupos_comprobante_id",
             "comprobante_id",
@@ -288,6 +296,7 @@ class LoteComprobanteFila(Base):
     __tablename__ = "lotes_comprobantes_filas"
     __table_args__ = (
         Index("ix_lotes_comprobantes_filas_lote_fila", "lote_id", "fila_excel"),
+        Index("ix_lotes_comprobantes_filas_grupo", "grupo_id"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
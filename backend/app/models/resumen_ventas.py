@@ -0,0 +1,58 @@
+"""Modelo ResumenVentasDiario - Totales diarios de comprobantes autorizados."""
+
+from sqlalchemy import (
+    Column,
+    Date,
+    ForeignKey,
+    Integer,
+    Numeric,
+    UniqueConstraint,
+)
+
+from app.core.database import Base
+
+
+class ResumenVentasDiario(Base):
+    """
+    Acumulado diario por emisor, tipo de comprobante y punto de venta.
+
+    Es un dato derivado de `comprobantes`: se actualiza al guardar cada
+    comprobante autorizado y puede reconstruirse desde cero con
+    `python -m app.scripts.reconstruir_resumen_ventas`.
+    """
+
+    __tablename__ = "resumen_ventas_diario"
+    __table_args__ = (
+        UniqueConstraint(
+            "empresa_id",
+            "fecha",
+            "tipo_comprobante",
+            "punto_venta_id",
+            name="uq_resumen_ventas_diario_clave",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    empresa_id = Column(
+        Integer, ForeignKey("empresas.id", ondelete="CASCADE"), nullable=False
+    )
+    fecha = Column(Date, nullable=False)
+    tipo_comprobante = Column(Integer, nullable=False)
+    punto_venta_id = Column(
+        Integer, ForeignKey("puntos_venta.id", ondelete="CASCADE"), nullable=False
+    )
+
+    cantidad = Column(Integer, nullable=False, default=0)
+    subtotal = Column(Numeric(14, 2), nullable=False, default=0)
+    iva_21 = Column(Numeric(14, 2), nullable=False, default=0)
+    iva_10_5 = Column(Numeric(14, 2), nullable=False, default=0)
+    iva_27 = Column(Numeric(14, 2), nullable=False, default=0)
+    # Base sin IVA: no gravado en A/B, exento en C
+    importe_iva_cero = Column(Numeric(14, 2), nullable=False, default=0)
+    total = Column(Numeric(14, 2), nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return (
+            f"<ResumenVentasDiario {self.fecha} tipo={self.tipo_comprobante} "
+            f"pv={self.punto_venta_id} cantidad={self.cantidad}>"
+        )
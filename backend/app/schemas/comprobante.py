@@ -259,13 +259,20 @@ class ComprobanteListResponse(BaseModel):
 
 
 class PaginatedComprobantesResponse(BaseModel):
-    """Respuesta paginada de comprobantes."""
+    """
+    Respuesta paginada de comprobantes.
+
+    `total` y `pages` quedan en `None` cuando se pide el listado sin conteo.
+    `next_cursor` permite pedir la página siguiente por clave en lugar de
+    por desplazamiento.
+    """
 
     items: List[ComprobanteListResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     per_page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class ProximoNumeroResponse(BaseModel):
@@ -2,7 +2,7 @@
 
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
@@ -50,10 +50,22 @@ class LoteComprobanteGrupoResponse(BaseModel):
         from_attributes = True
 
 
+class LoteComprobanteFilaEstadoResponse(BaseModel):
+    """Identifica una fila del Excel y su estado, sin sus datos."""
+
+    id: int
+    fila_excel: int
+    estado: str
+
+    class Config:
+        from_attributes = True
+
+
 class LoteComprobanteGrupoDetalleResponse(LoteComprobanteGrupoResponse):
     """Representa un comprobante agrupado con datos derivados para la UI."""
 
     descripcion_facturada: Optional[str] = None
+    filas: list[LoteComprobanteFilaEstadoResponse] | None = None
 
 
 class LoteComprobanteResponse(BaseModel):
@@ -158,6 +170,7 @@ class LoteComprobanteGruposPageResponse(BaseModel):
     total: int
     total_pages: int
     estado: Optional[str] = None
+    next_cursor: Optional[str] = None
 
 
 class LoteValidacionResponse(BaseModel):
@@ -169,6 +182,21 @@ class LoteValidacionResponse(BaseModel):
     mensaje: str
 
 
+class LoteValidacionTrabajoResponse(BaseModel):
+    """Estado de una validación de lote en segundo plano."""
+
+    id: str
+    estado: Literal["en_cola", "validando", "registrando", "completado", "error"]
+    nombre_archivo: str
+    creado_at: datetime
+    actualizado_at: datetime
+    total_filas: int | None = None
+    total_grupos: int | None = None
+    grupos_registrados: int = 0
+    error: str | None = None
+    resultado: LoteValidacionResponse | None = None
+
+
 class LoteProcesamientoResponse(BaseModel):
     """Respuesta al iniciar o completar la emisión de un lote."""
 
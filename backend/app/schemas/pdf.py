@@ -0,0 +1,33 @@
+"""Schemas para exportación de PDFs."""
+
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class ExportacionPdfRequest(BaseModel):
+    """Criterio de selección de comprobantes para exportar en un ZIP."""
+
+    desde: Optional[date] = None
+    hasta: Optional[date] = None
+    lote_id: Optional[int] = Field(None, ge=1)
+    comprobante_ids: Optional[list[int]] = Field(None, min_length=1)
+
+    @model_validator(mode="after")
+    def validar_criterio_unico(self) -> "ExportacionPdfRequest":
+        """Exige exactamente un criterio: rango de fechas, lote o IDs."""
+        por_fechas = self.desde is not None or self.hasta is not None
+        criterios = sum(
+            [por_fechas, self.lote_id is not None, self.comprobante_ids is not None]
+        )
+        if criterios != 1:
+            raise ValueError(
+                "Indicá un único criterio: rango de fechas, lote o lista de comprobantes"
+            )
+        if por_fechas:
+            if self.desde is None or self.hasta is None:
+                raise ValueError("El rango de fechas requiere desde y hasta")
+            if self.desde > self.hasta:
+                raise ValueError("La fecha desde no puede ser posterior a hasta")
+        return self
@@ -0,0 +1,60 @@
+"""Reconstruir el resumen diario de ventas desde los comprobantes autorizados."""
+
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.database import AsyncSessionLocal
+from app.services.resumen_ventas_service import ResumenVentasService
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Construir el parser CLI del script."""
+    parser = argparse.ArgumentParser(
+        description=(
+            "Vacía y recalcula resumen_ventas_diario desde comprobantes. "
+            "Usa la base configurada por DATABASE_URL."
+        )
+    )
+    parser.add_argument(
+        "--empresa-id",
+        type=int,
+        default=None,
+        help="Reconstruir solo el resumen de una empresa. Omitir para todas.",
+    )
+    return parser
+
+
+async def _reconstruir(empresa_id: int | None) -> int:
+    """Reconstruir el resumen en una única transacción."""
+    async with AsyncSessionLocal() as db:
+        filas = await ResumenVentasService(db).reconstruir(empresa_id)
+        await db.commit()
+        return filas
+
+
+def main() -> int:
+    """Punto de entrada del comando."""
+    parser = _build_parser()
+    args = parser.parse_args()
+
+    try:
+        filas = asyncio.run(_reconstruir(args.empresa_id))
+    except KeyboardInterrupt:
+        print("\nOperacion cancelada.", file=sys.stderr)
+        return 130
+    except SQLAlchemyError as exc:
+        print(f"Error: {type(exc).__name__}", file=sys.stderr)
+        return 1
+
+    alcance = (
+        f"empresa_id={args.empresa_id}" if args.empresa_id is not None else "todas"
+    )
+    print(f"Resumen de ventas reconstruido: filas={filas} alcance={alcance}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
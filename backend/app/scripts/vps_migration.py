@@ -53,6 +53,9 @@ from app.schemas.lote_comprobante import (
     LoteProcesamientoResponse,
 )
 from app.services.resolucion_legacy_pf19_service import BackupLegacyPF19
+from app.services.resumen_ventas_service import (
+    sentencias_reconstruccion as sentencias_reconstruccion_resumen_ventas,
+)
 
 
 MIGRATION_PACKAGE_VERSION = 2
@@ -87,7 +90,10 @@ EXCLUDED_TABLES = [
     "lotes_comprobantes_eventos",
     "eventos_sistema",
     "exportaciones_almacenamiento",
+    "resumen_ventas_diario",
 ]
+# Datos derivados: no viajan en el paquete y se recalculan al importar.
+DERIVED_TABLES = ["resumen_ventas_diario"]
 
 # Alembic crea formatos globales seed; el importador los reemplaza por el paquete.
 OPERATIONAL_TARGET_EMPTY_TABLES = [
@@ -221,6 +227,7 @@ SAFE_OMITTED_COUNT_KEYS = {
     "lotes_comprobantes_eventos": "eventos_lote_omitidos",
     "eventos_sistema": "eventos_sistema_omitidos",
     "exportaciones_almacenamiento": "exportaciones_omitidas",
+    "resumen_ventas_diario": "resumenes_ventas_recalculables",
 }
 ARCA_RECHAZO_GLOBAL_CATEGORIA = "arca_rechazo_global_excluyente"
 ARCA_RECHAZO_GLOBAL_MENSAJE = (
@@ -646,6 +653,7 @@ def import_package(
             for table_name in INCLUDED_TABLES:
                 insert_rows(conn, table_name, package_rows[table_name])
             validate_imported_database(conn, manifest, package_rows)
+            rebuild_derived_tables(conn)
             reset_postgres_sequences(conn)
             verify_postgres_sequences(conn)
             verify_restored_certificate_files(
@@ -2443,6 +2451,9 @@ def classify_safe_omissions(conn: sqlite3.Connection) -> dict[str, Any]:
                 "SELECT COUNT(*) FROM exportaciones_almacenamiento"
             ).fetchone()[0]
         ),
+        "resumenes_ventas_recalculables": int(
+            conn.execute("SELECT COUNT(*) FROM resumen_ventas_diario").fetchone()[0]
+        ),
     }
 
 
@@ -4364,6 +4375,8 @@ def validate_imported_database(
             )
         actual_rows[table_name] = rows
     for table_name in EXCLUDED_TABLES:
+        if table_name in DERIVED_TABLES:
+            continue
         if scalar_count(conn, table_name) != 0:
             raise MigrationError(f"La tabla excluida {table_name} no quedó vacía")
 
@@ -4472,6 +4485,12 @@ def insert_rows(conn, table_name: str, rows: list[dict[str, Any]]) -> None:
         conn.execute(table.insert(), rows[start : start + 500])
 
 
+def rebuild_derived_tables(conn) -> None:
+    """Recalcula las tablas derivadas desde los comprobantes importados."""
+    for statement in sentencias_reconstruccion_resumen_ventas():
+        conn.execute(statement)
+
+
 def reset_postgres_sequences(conn) -> None:
     """Reinicia secuencias transaccionalmente al próximo ID libre."""
     for table_name in INCLUDED_TABLES:
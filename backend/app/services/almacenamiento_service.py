@@ -30,6 +30,7 @@ from app.services.lote_comprobantes_service import (
     LoteComprobanteError,
     LoteComprobantesService,
 )
+from app.services.pdf_cache_service import pdf_cache
 
 
 class AlmacenamientoError(Exception):
@@ -74,6 +75,7 @@ class AlmacenamientoService:
         active_log_bytes = self._active_log_size()
         temporales = self.listar_temporales()
         cache_bytes = self._safe_file_size(Path(settings.arca_token_cache_path))
+        pdf_cache_uso = await pdf_cache.uso()
 
         categorias.append(
             self._categoria(
@@ -135,6 +137,16 @@ class AlmacenamientoService:
                 "Caché operativo de tokens; no se limpia desde este gestor.",
             )
         )
+        categorias.append(
+            self._categoria(
+                "pdfs",
+                "Caché de PDFs",
+                pdf_cache_uso["bytes_usados"],
+                0,
+                pdf_cache_uso["archivos"],
+                "PDFs de comprobantes autorizados; se regeneran y se podan solos.",
+            )
+        )
 
         total_usado = (
             db_bytes
@@ -143,6 +155,7 @@ class AlmacenamientoService:
             + sum(item.bytes_usados for item in logs)
             + sum(item.bytes_usados for item in temporales)
             + cache_bytes
+            + pdf_cache_uso["bytes_usados"]
         )
         total_recuperable = sum(item["bytes_recuperables"] for item in categorias)
         disk = self._disk_usage()
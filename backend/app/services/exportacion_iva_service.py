@@ -0,0 +1,149 @@
+"""Exportación del subdiario IVA ventas en CSV o XLSX por streaming."""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import tempfile
+from collections.abc import AsyncIterator
+from typing import Any
+
+from openpyxl import Workbook
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.reportes_service import ReportesService, reportes_service
+
+FORMATOS_EXPORTACION_IVA = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+COLUMNAS_SUBDIARIO_IVA = (
+    ("fecha_emision", "Fecha"),
+    ("tipo_letra", "Letra"),
+    ("tipo_nombre", "Tipo"),
+    ("numero_completo", "Número"),
+    ("cuit_receptor", "CUIT/Documento"),
+    ("razon_social_receptor", "Razón social"),
+    ("gravado_21", "Neto gravado 21%"),
+    ("iva_21", "IVA 21%"),
+    ("gravado_10_5", "Neto gravado 10,5%"),
+    ("iva_10_5", "IVA 10,5%"),
+    ("gravado_27", "Neto gravado 27%"),
+    ("iva_27", "IVA 27%"),
+    ("no_gravado", "No gravado"),
+    ("exento", "Exento"),
+    ("total", "Total"),
+)
+COLUMNAS_IMPORTE = frozenset(
+    {
+        "gravado_21",
+        "iva_21",
+        "gravado_10_5",
+        "iva_10_5",
+        "gravado_27",
+        "iva_27",
+        "no_gravado",
+        "exento",
+        "total",
+    }
+)
+
+
+class ExportacionIvaService:
+    """
+    Emite el subdiario IVA ventas sin armar el reporte completo en memoria.
+
+    Las líneas llegan por tramos desde un cursor del servidor. El CSV se envía
+    a medida que se escribe cada tramo; el XLSX se arma con openpyxl en modo
+    write-only, que vuelca las filas a disco, y se emite por bloques al cerrar.
+    """
+
+    FILAS_POR_TRAMO_CSV = 500
+    BYTES_POR_BLOQUE = 64 * 1024
+    MAX_XLSX_EN_MEMORIA = 1024 * 1024
+
+    def __init__(self, servicio_reportes: ReportesService | None = None):
+        """Inicializa el servicio con el generador de líneas de reportes."""
+        self.servicio_reportes = servicio_reportes or reportes_service
+
+    @staticmethod
+    def nombre_archivo(periodo_mes: int, periodo_anio: int, formato: str) -> str:
+        """Nombre de descarga del subdiario del período."""
+        return f"subdiario_iva_ventas_{periodo_anio}_{periodo_mes:02d}.{formato}"
+
+    def iterar(
+        self,
+        db: AsyncSession,
+        empresa_id: int,
+        periodo_mes: int,
+        periodo_anio: int,
+        formato: str,
+    ) -> AsyncIterator[bytes]:
+        """Recorre el subdiario del período y lo codifica en el formato pedido."""
+        lineas = self.servicio_reportes.iterar_detalle_iva(
+            db, empresa_id, periodo_mes, periodo_anio
+        )
+        if formato == "xlsx":
+            return self.iterar_xlsx(lineas)
+        return self.iterar_csv(lineas)
+
+    async def iterar_csv(
+        self, lineas: AsyncIterator[dict[str, Any]]
+    ) -> AsyncIterator[bytes]:
+        """
+        Emite el CSV por tramos de `FILAS_POR_TRAMO_CSV` líneas.
+
+        Lleva BOM UTF-8 para que Excel reconozca los acentos al abrirlo.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([titulo for _, titulo in COLUMNAS_SUBDIARIO_IVA])
+        yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+        pendientes = 0
+        async for linea in lineas:
+            writer.writerow(self._valores_csv(linea))
+            pendientes += 1
+            if pendientes >= self.FILAS_POR_TRAMO_CSV:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+                pendientes = 0
+        if pendientes:
+            yield buffer.getvalue().encode("utf-8")
+
+    async def iterar_xlsx(
+        self, lineas: AsyncIterator[dict[str, Any]]
+    ) -> AsyncIterator[bytes]:
+        """
+        Emite el XLSX por bloques una vez cerrado el libro.
+
+        El formato es un ZIP con índice al final, así que no puede enviarse
+        antes de terminar; la memoria igual queda acotada porque openpyxl
+        write-only escribe las filas en un temporal y el libro final se
+        desborda a disco por encima de `MAX_XLSX_EN_MEMORIA`.
+        """
+        libro = Workbook(write_only=True)
+        hoja = libro.create_sheet("IVA Ventas")
+        hoja.append([titulo for _, titulo in COLUMNAS_SUBDIARIO_IVA])
+        async for linea in lineas:
+            hoja.append([linea[clave] for clave, _ in COLUMNAS_SUBDIARIO_IVA])
+
+        with tempfile.SpooledTemporaryFile(
+            max_size=self.MAX_XLSX_EN_MEMORIA
+        ) as destino:
+            await asyncio.to_thread(libro.save, destino)
+            destino.seek(0)
+            while bloque := destino.read(self.BYTES_POR_BLOQUE):
+                yield bloque
+
+    def _valores_csv(self, linea: dict[str, Any]) -> list[Any]:
+        """Ordena una línea y fija dos decimales en los importes."""
+        return [
+            f"{linea[clave]:.2f}" if clave in COLUMNAS_IMPORTE else linea[clave]
+            for clave, _ in COLUMNAS_SUBDIARIO_IVA
+        ]
@@ -0,0 +1,230 @@
+"""Exportación masiva de PDFs de comprobantes autorizados en un ZIP."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import zipfile
+from collections.abc import AsyncIterator
+from datetime import date
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.models.comprobante import ESTADO_COMPROBANTE_AUTORIZADO, Comprobante
+from app.models.lote_comprobante import LoteComprobanteGrupo
+from app.services.pdf_service import PDFService, PdfRenderSaturadoError, pdf_service
+
+logger = logging.getLogger(__name__)
+
+ARCHIVO_ERRORES_EXPORTACION = "errores_exportacion.txt"
+
+
+class ExportacionPdfError(Exception):
+    """Error controlado de la exportación masiva de PDFs."""
+
+
+class ExportacionPdfSinComprobantesError(ExportacionPdfError):
+    """El criterio no selecciona comprobantes autorizados del emisor."""
+
+
+class _DestinoZipIncremental:
+    """
+    Destino no seekable para `zipfile` que acumula bytes por tramos.
+
+    `zipfile` detecta que no puede hacer seek y escribe descriptores de datos
+    al final de cada entrada, así que el ZIP se emite de forma incremental y
+    solo retiene el tramo pendiente de enviar.
+    """
+
+    def __init__(self) -> None:
+        """Inicializa el buffer vacío."""
+        self._partes: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        """Acumula bytes escritos por `zipfile`."""
+        self._partes.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        """No hay nada que sincronizar; los bytes se consumen por tramo."""
+
+    def consumir(self) -> bytes:
+        """Devuelve y descarta los bytes pendientes."""
+        contenido = b"".join(self._partes)
+        self._partes.clear()
+        return contenido
+
+
+class ExportacionPdfService:
+    """Resuelve, renderiza y empaqueta PDFs sin acumular el ZIP en memoria."""
+
+    TAMANO_BLOQUE = 50
+    ESPERA_SATURACION_SEGUNDOS = 0.5
+
+    def __init__(self, db: AsyncSession, servicio_pdf: PDFService | None = None):
+        """Inicializa el servicio con la sesión del request."""
+        self.db = db
+        self.servicio_pdf = servicio_pdf or pdf_service
+
+    async def resolver_ids(
+        self,
+        empresa_id: int,
+        *,
+        desde: date | None = None,
+        hasta: date | None = None,
+        lote_id: int | None = None,
+        comprobante_ids: list[int] | None = None,
+    ) -> list[int]:
+        """
+        Obtiene en una sola consulta los IDs autorizados a exportar.
+
+        Solo considera comprobantes autorizados con CAE del emisor activo; los
+        IDs ajenos o sin autorización quedan fuera sin revelar su existencia.
+        """
+        query = select(Comprobante.id).where(
+            Comprobante.empresa_id == empresa_id,
+            Comprobante.estado == ESTADO_COMPROBANTE_AUTORIZADO,
+            Comprobante.cae.is_not(None),
+        )
+        if lote_id is not None:
+            query = query.join(
+                LoteComprobanteGrupo,
+                LoteComprobanteGrupo.comprobante_id == Comprobante.id,
+            ).where(
+                LoteComprobanteGrupo.lote_id == lote_id,
+                LoteComprobanteGrupo.empresa_id == empresa_id,
+            )
+        elif comprobante_ids:
+            query = query.where(Comprobante.id.in_(comprobante_ids))
+        else:
+            query = query.where(
+                Comprobante.fecha_emision >= desde,
+                Comprobante.fecha_emision <= hasta,
+            )
+
+        result = await self.db.execute(
+            query.order_by(
+                Comprobante.fecha_emision,
+                Comprobante.punto_venta_id,
+                Comprobante.tipo_comprobante,
+                Comprobante.numero,
+            ).limit(settings.pdf_export_max_comprobantes + 1)
+        )
+        ids = list(result.scalars().all())
+        if not ids:
+            raise ExportacionPdfSinComprobantesError(
+                "No hay comprobantes autorizados para exportar con ese criterio"
+            )
+        if len(ids) > settings.pdf_export_max_comprobantes:
+            raise ExportacionPdfError(
+                "La exportación supera el máximo de "
+                f"{settings.pdf_export_max_comprobantes} comprobantes. "
+                "Dividí el período en rangos más chicos."
+            )
+        return ids
+
+    async def iterar_zip(self, comprobante_ids: list[int]) -> AsyncIterator[bytes]:
+        """
+        Emite el ZIP por tramos a medida que se renderiza cada bloque.
+
+        Cada bloque se carga con una consulta por relación y se renderiza en
+        paralelo; en memoria solo conviven los PDFs del bloque en curso.
+        """
+        destino = _DestinoZipIncremental()
+        nombres_usados: set[str] = set()
+        errores: list[str] = []
+        concurrencia = asyncio.Semaphore(self._concurrencia_render())
+
+        with zipfile.ZipFile(destino, mode="w", compression=zipfile.ZIP_STORED) as zf:
+            for inicio in range(0, len(comprobante_ids), self.TAMANO_BLOQUE):
+                bloque = comprobante_ids[inicio : inicio + self.TAMANO_BLOQUE]
+                comprobantes = await self._cargar_bloque(bloque)
+                resultados = await asyncio.gather(
+                    *(
+                        self._renderizar(comprobante, concurrencia)
+                        for comprobante in comprobantes
+                    ),
+                    return_exceptions=True,
+                )
+                for comprobante, resultado in zip(comprobantes, resultados):
+                    nombre = self._nombre_unico(comprobante, nombres_usados)
+                    if isinstance(resultado, BaseException):
+                        logger.warning(
+                            "event=exportacion_pdf_render_fallido "
+                            "comprobante_id=%s type_error=%s",
+                            comprobante.id,
+                            type(resultado).__name__,
+                        )
+                        errores.append(f"{nombre}: no se pudo generar el PDF")
+                        continue
+                    zf.writestr(nombre, resultado)
+                    yield destino.consumir()
+
+            if errores:
+                zf.writestr(ARCHIVO_ERRORES_EXPORTACION, "\n".join(errores) + "\n")
+
+        yield destino.consumir()
+
+    async def _cargar_bloque(self, ids: list[int]) -> list[Comprobante]:
+        """Carga un bloque con sus relaciones y respeta el orden solicitado."""
+        result = await self.db.execute(
+            select(Comprobante)
+            .options(
+                selectinload(Comprobante.empresa),
+                selectinload(Comprobante.cliente),
+                selectinload(Comprobante.punto_venta),
+                selectinload(Comprobante.items),
+            )
+            .where(Comprobante.id.in_(ids))
+        )
+        por_id = {comprobante.id: comprobante for comprobante in result.scalars()}
+        return [
+            por_id[comprobante_id] for comprobante_id in ids if comprobante_id in por_id
+        ]
+
+    async def _renderizar(
+        self, comprobante: Comprobante, concurrencia: asyncio.Semaphore
+    ) -> bytes:
+        """Renderiza un PDF reintentando mientras el executor esté saturado."""
+        async with concurrencia:
+            while True:
+                try:
+                    return await self.servicio_pdf.generar_pdf_comprobante(
+                        comprobante, comprobante.empresa
+                    )
+                except PdfRenderSaturadoError:
+                    await asyncio.sleep(self.ESPERA_SATURACION_SEGUNDOS)
+
+    def _concurrencia_render(self) -> int:
+        """Deja lugar en la cola de render para descargas interactivas."""
+        return max(
+            1,
+            min(
+                settings.pdf_render_workers or 1,
+                settings.pdf_render_max_pending - 1,
+            ),
+        )
+
+    def _nombre_unico(self, comprobante: Comprobante, usados: set[str]) -> str:
+        """Evita entradas repetidas dentro del ZIP."""
+        nombre = self.servicio_pdf.nombre_archivo_pdf(comprobante)
+        if nombre in usados:
+            nombre = nombre.removesuffix(".pdf") + f"_{comprobante.id}.pdf"
+        usados.add(nombre)
+        return nombre
+
+    @staticmethod
+    def nombre_zip(criterio: dict[str, Any]) -> str:
+        """Nombre descriptivo del ZIP según el criterio de selección."""
+        if criterio.get("lote_id") is not None:
+            return f"comprobantes_lote_{criterio['lote_id']}.zip"
+        if criterio.get("desde") and criterio.get("hasta"):
+            return (
+                f"comprobantes_{criterio['desde'].isoformat()}_"
+                f"{criterio['hasta'].isoformat()}.zip"
+            )
+        return "comprobantes.zip"
@@ -5,7 +5,7 @@ import logging
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import Literal, Optional
+from typing import Awaitable, Callable, Literal, Optional
 
 from pydantic import ValidationError as PydanticValidationError
 from sqlalchemy import desc, select, text, update
@@ -21,6 +21,7 @@ from app.arca.exceptions import (
     clasificar_error_global_fecae,
 )
 from app.arca.models import CbteAsocItem, ComprobanteRequest, IvaItem
+from app.arca.sesiones import get_gestor_sesiones_arca
 from app.arca.utils import clean_cuit, validate_cuit
 from app.arca.wsaa import WSAAClient
 from app.arca.wsfev1 import WSFEv1Client
@@ -47,6 +48,7 @@ from app.services.contencion_fiscal_service import (
     obtener_bloqueo_preautorizacion,
 )
 from app.services.idempotencia_fiscal_service import IdempotenciaFiscalService
+from app.services.resumen_ventas_service import ResumenVentasService
 from app.services.elegibilidad_rece_service import (
     ContextoElegibilidadRece,
     ElegibilidadReceError,
@@ -162,6 +164,23 @@ class ValidationError(Exception):
     pass
 
 
+@dataclass(frozen=True)
+class SubloteEmisionPreparado:
+    """
+    Sublote normalizado y totalizado antes de tomar el lock de numeración.
+
+    No consulta la base ni depende del número fiscal, por eso puede armarse
+    mientras el sublote anterior espera la respuesta de ARCA. `origen` y
+    `max_registros` atan la preparación a la lista exacta que se emite.
+    """
+
+    origen: list[EmitirComprobanteRequest]
+    max_registros: int | None
+    requests: list[EmitirComprobanteRequest]
+    totales_por_request: list[dict]
+    error: ValidationError | None = None
+
+
 class ReconciliacionNumeracionError(ValidationError):
     """Error cuando ARCA registra comprobantes ausentes en FactuFlow."""
 
@@ -229,6 +248,7 @@ class FacturacionService:
 
     def __init__(self, db: AsyncSession):
         self.db = db
+        self._referencias_validadas: set[tuple[str, int, int]] | None = None
 
     async def emitir_comprobante(
         self,
@@ -266,8 +286,14 @@ class FacturacionService:
         contextos: list[dict[str, object]] | None = None,
         fase_solicitud_arca: FaseSolicitudArca | None = None,
         commit_rechazo_global: bool = True,
+        preparado: SubloteEmisionPreparado | None = None,
     ) -> list[EmitirComprobanteResponse]:
-        """Emite un sublote homogéneo de comprobantes en un request ARCA."""
+        """
+        Emite un sublote homogéneo de comprobantes en un request ARCA.
+
+        `preparado` permite reutilizar la normalización hecha por
+        `preparar_sublote_emision`; si no corresponde a `requests`, se recalcula.
+        """
         if not requests:
             return []
 
@@ -283,7 +309,40 @@ class FacturacionService:
                 contextos=contextos,
                 fase_solicitud_arca=fase_solicitud_arca,
                 commit_rechazo_global=commit_rechazo_global,
+                preparado=preparado,
+            )
+
+    def preparar_sublote_emision(
+        self,
+        requests: list[EmitirComprobanteRequest],
+        max_registros: int | None = None,
+    ) -> SubloteEmisionPreparado:
+        """
+        Normaliza receptores, valida homogeneidad y calcula totales del sublote.
+
+        Es trabajo puro de CPU: no toca la sesión ni el lock de numeración, así
+        que se puede ejecutar en un thread. Los errores de validación quedan en
+        el resultado para que la emisión los informe como siempre.
+        """
+        try:
+            normalizados = [self.normalizar_receptor(request) for request in requests]
+            self._validar_lote_homogeneo(normalizados, max_registros=max_registros)
+        except ValidationError as exc:
+            return SubloteEmisionPreparado(
+                origen=requests,
+                max_registros=max_registros,
+                requests=list(requests),
+                totales_por_request=[],
+                error=exc,
             )
+        return SubloteEmisionPreparado(
+            origen=requests,
+            max_registros=max_registros,
+            requests=normalizados,
+            totales_por_request=[
+                self._calcular_totales(request.items) for request in normalizados
+            ],
+        )
 
     async def obtener_registros_maximos_por_request(self, empresa_id: int) -> int:
         """Consulta en ARCA el máximo de comprobantes permitido por request."""
@@ -466,6 +525,7 @@ class FacturacionService:
         contextos: list[dict[str, object]] | None = None,
         fase_solicitud_arca: FaseSolicitudArca | None = None,
         commit_rechazo_global: bool = True,
+        preparado: SubloteEmisionPreparado | None = None,
     ) -> list[EmitirComprobanteResponse]:
         """Ejecuta la emisión batch asumiendo que el lock local ya fue tomado."""
         fase_solicitud_arca = fase_solicitud_arca or FaseSolicitudArca()
@@ -477,15 +537,29 @@ class FacturacionService:
         guarda_id_durable: int | None = None
         resultados_arca = []
         try:
-            requests = [self.normalizar_receptor(request) for request in requests]
-            self._validar_lote_homogeneo(requests, max_registros=max_registros)
+            if (
+                preparado is None
+                or preparado.origen is not requests
+                or preparado.max_registros != max_registros
+            ):
+                preparado = self.preparar_sublote_emision(
+                    requests, max_registros=max_registros
+                )
+            if preparado.error is not None:
+                raise preparado.error
+            requests = preparado.requests
             if contextos is None or len(contextos) != len(requests):
                 raise ElegibilidadReceError(
                     "El sublote no tiene operación y snapshots RECE completos."
                 )
 
-            for request in requests:
-                await self._validar_datos(request)
+            # Empresa, punto y clientes se consultan una vez por sublote.
+            self._referencias_validadas = set()
+            try:
+                for request in requests:
+                    await self._validar_datos(request)
+            finally:
+                self._referencias_validadas = None
 
             primer_request = requests[0]
             await self._tomar_lock_numeracion(
@@ -494,9 +568,7 @@ class FacturacionService:
                 primer_request.tipo_comprobante,
             )
 
-            totales_por_request = [
-                self._calcular_totales(request.items) for request in requests
-            ]
+            totales_por_request = preparado.totales_por_request
             empresa = await self._obtener_empresa(primer_request.empresa_id)
             punto_venta = await self._obtener_punto_venta(
                 primer_request.punto_venta_id,
@@ -2183,23 +2255,28 @@ class FacturacionService:
         self._validar_fecha_emision_arca(request.fecha_emision, request.concepto)
 
         # Validar que exista la empresa
-        empresa = await self._obtener_empresa(request.empresa_id)
-        if not empresa:
-            raise ValidationError("Empresa no encontrada")
+        await self._validar_referencia(
+            ("empresa", request.empresa_id, request.empresa_id),
+            lambda: self._obtener_empresa(request.empresa_id),
+            "Empresa no encontrada",
+        )
 
         # Validar que exista el punto de venta en la empresa activa
-        punto_venta = await self._obtener_punto_venta(
-            request.punto_venta_id, request.empresa_id
+        await self._validar_referencia(
+            ("punto_venta", request.empresa_id, request.punto_venta_id),
+            lambda: self._obtener_punto_venta(
+                request.punto_venta_id, request.empresa_id
+            ),
+            "Punto de venta no encontrado para la empresa activa",
         )
-        if not punto_venta:
-            raise ValidationError("Punto de venta no encontrado para la empresa activa")
 
         if request.cliente_id is not None:
-            cliente = await self._obtener_cliente(
-                request.cliente_id, request.empresa_id
+            cliente_id = request.cliente_id
+            await self._validar_referencia(
+                ("cliente", request.empresa_id, cliente_id),
+                lambda: self._obtener_cliente(cliente_id, request.empresa_id),
+                "Cliente no encontrado para la empresa activa",
             )
-            if not cliente:
-                raise ValidationError("Cliente no encontrado para la empresa activa")
 
         # Validar items
         if not request.items or len(request.items) == 0:
@@ -2209,6 +2286,21 @@ class FacturacionService:
         if request.tipo_documento == 80 and not validate_cuit(request.numero_documento):
             raise ValidationError("El CUIT informado es inválido")
 
+    async def _validar_referencia(
+        self,
+        clave: tuple[str, int, int],
+        obtener: Callable[[], Awaitable[object | None]],
+        mensaje: str,
+    ) -> None:
+        """Exige que exista una referencia, consultándola una vez por sublote."""
+        validadas = self._referencias_validadas
+        if validadas is not None and clave in validadas:
+            return
+        if not await obtener():
+            raise ValidationError(mensaje)
+        if validadas is not None:
+            validadas.add(clave)
+
     def normalizar_receptor(
         self, request: EmitirComprobanteRequest
     ) -> EmitirComprobanteRequest:
@@ -3051,17 +3143,23 @@ class FacturacionService:
         raise ValidationError("El ambiente ARCA configurado no es válido")
 
     async def _obtener_ticket_acceso(self, empresa: Empresa, certificado: Certificado):
-        """Obtiene ticket WSAA para la empresa con material local utilizable."""
+        """
+        Obtiene ticket WSAA para la empresa con material local utilizable.
+
+        El ticket sale de la sesión ARCA del proceso; solo se autentica contra
+        WSAA cuando la sesión no tiene uno vigente.
+        """
         cert_path, key_path = requerir_material_certificado(
             certificado.archivo_crt,
             certificado.archivo_key,
         )
-        wsaa_client = WSAAClient(self._get_arca_ambiente())
-        return await wsaa_client.login(
+        return await get_gestor_sesiones_arca().obtener_ticket(
+            ambiente=self._get_arca_ambiente(),
+            cuit=clean_cuit(empresa.cuit),
             cert_path=str(cert_path),
             key_path=str(key_path),
-            cuit=clean_cuit(empresa.cuit),
             servicio="wsfe",
+            crear_wsaa=WSAAClient,
         )
 
     async def _validar_punto_venta_habilitado(
@@ -4217,12 +4315,18 @@ class FacturacionService:
                 request.condicion_iva
             ),
             receptor_domicilio=request.domicilio,
+            huella_logica=IdempotenciaFiscalService.calcular_huella_logica(
+                request=request,
+                punto_venta_numero=punto_venta.numero,
+                total=totales["total"],
+            ),
         )
 
         self.db.add(comprobante)
         await self.db.flush()
 
         # Crear items
+        items = []
         for idx, item_data in enumerate(request.items):
             # Calcular subtotal del item
             item_subtotal = item_data.cantidad * item_data.precio_unitario
@@ -4243,6 +4347,9 @@ class FacturacionService:
                 comprobante_id=comprobante.id,
             )
             self.db.add(item)
+            items.append(item)
+
+        await ResumenVentasService(self.db).registrar_comprobante(comprobante, items)
 
         if commit:
             await self.db.commit()
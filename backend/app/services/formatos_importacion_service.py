@@ -2,13 +2,21 @@
 
 from __future__ import annotations
 
+import codecs
+import csv
+import hashlib
+import json
 import re
+import threading
+import time
 import unicodedata
+from collections import OrderedDict
 from copy import deepcopy
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
-from io import BytesIO
+from io import BytesIO, StringIO
+from collections.abc import Callable, Iterable, Iterator
 from typing import Any
 from zipfile import BadZipFile
 
@@ -56,7 +64,7 @@ class CandidatoFormato:
 class ImportacionNormalizada:
     """Archivo externo convertido al contrato interno de lotes."""
 
-    filas: list[dict[str, Any]]
+    filas: Iterable[dict[str, Any]]
     headers_detectados: list[str]
     mapeo_usado: dict[str, Any]
     formato: FormatoImportacion
@@ -520,6 +528,461 @@ TRANSFORMACIONES_PERMITIDAS_POR_CAMPO = {
 EXCEL_FORMULA_PREFIXES = ("=", "+", "-", "@")
 EXCEL_MAX_COLUMN_INDEX = 16383
 
+TIPOS_ARCHIVO_IMPORTACION = {"xlsx", "csv", "tsv"}
+EXTENSIONES_ARCHIVO_IMPORTACION = (".xlsx", ".csv", ".tsv")
+DELIMITADORES_CSV = {",", ";", "|"}
+CODIFICACION_TEXTO_PREDETERMINADA = "utf-8-sig"
+# Campos cuyo texto se normaliza según el separador decimal declarado.
+CAMPOS_NUMERICOS_IMPORTACION = {
+    "importe_total",
+    "item_cantidad",
+    "item_precio_unitario",
+    "item_descuento_porcentaje",
+    "item_iva_porcentaje",
+}
+# Números de CSV/TSV: miles opcionales en grupos de tres y el separador decimal
+# declarado. Lo que no respete el formato es un error de la fila.
+NUMERO_TEXTO_PUNTO_DECIMAL = re.compile(r"([+-]?)(\d{1,3}(?:,\d{3})+|\d+)(?:\.(\d+))?")
+NUMERO_TEXTO_COMA_DECIMAL = re.compile(r"([+-]?)(\d{1,3}(?:\.\d{3})+|\d+)(?:,(\d+))?")
+FIRMA_ZIP = b"PK\x03\x04"
+
+# Hojas parseadas que se conservan para reutilizar entre detección e importación.
+HOJAS_EN_CACHE = 4
+VIGENCIA_HOJA_CACHE_SEGUNDOS = 300
+# Celdas que puede retener el cache en total y que puede tener una hoja para
+# cargarse entera; por encima se vuelve a leer fila por fila en cada recorrido.
+CELDAS_EN_CACHE = 1_000_000
+CELDAS_MAXIMAS_HOJA_EN_CACHE = 250_000
+
+
+@dataclass(frozen=True)
+class FuenteArchivoImportacion:
+    """
+    Tipo de archivo que lee una versión de formato.
+
+    Se declara en `configuracion_json["archivo"]`. Sin esa clave el formato
+    lee Excel; `csv` y `tsv` se leen con el módulo `csv` sin pasar por
+    openpyxl.
+    """
+
+    tipo: str = "xlsx"
+    delimitador: str = ","
+    codificacion: str = CODIFICACION_TEXTO_PREDETERMINADA
+    coma_decimal: bool = False
+
+    @classmethod
+    def desde_configuracion(
+        cls, configuracion: dict[str, Any]
+    ) -> "FuenteArchivoImportacion":
+        """Lee la fuente declarada, con los valores por defecto de cada tipo."""
+        archivo = configuracion.get("archivo") or {}
+        tipo = str(archivo.get("tipo") or "xlsx").strip().lower()
+        return cls(
+            tipo=tipo,
+            delimitador=(
+                "\t" if tipo == "tsv" else str(archivo.get("delimitador") or ",")
+            ),
+            codificacion=str(
+                archivo.get("codificacion") or CODIFICACION_TEXTO_PREDETERMINADA
+            ),
+            coma_decimal=bool(archivo.get("coma_decimal", False)),
+        )
+
+    @property
+    def es_texto(self) -> bool:
+        """Indica si el archivo es CSV/TSV en lugar de Excel."""
+        return self.tipo != "xlsx"
+
+
+@dataclass(frozen=True)
+class HojaImportacion:
+    """
+    Valores de una hoja de Excel leídos una sola vez, guardados por columna.
+
+    Cada columna es una tupla con un valor por fila, empezando por la fila 1
+    del Excel. Las filas vacías del final se descartan y las filas más cortas
+    se completan con `None`, así que todas las columnas tienen el mismo largo.
+    """
+
+    titulo: str
+    hojas_libro: tuple[str, ...]
+    hoja_predeterminada: str
+    columnas: tuple[tuple[Any, ...], ...]
+    total_filas: int
+
+    @property
+    def celdas(self) -> int:
+        """Celdas que ocupa la hoja guardada, incluido el relleno."""
+        return self.total_filas * len(self.columnas)
+
+    @classmethod
+    def desde_hoja(
+        cls,
+        sheet,
+        hojas_libro: tuple[str, ...],
+        hoja_predeterminada: str,
+        max_celdas: int | None = None,
+    ) -> "HojaImportacion | None":
+        """
+        Recorre la hoja en modo read-only y la pasa a columnas.
+
+        Con `max_celdas`, deja de leer y devuelve `None` apenas la hoja lo
+        supera, así el pico de memoria queda acotado a ese tamaño.
+        """
+        filas: list[tuple[Any, ...]] = []
+        ancho = 0
+        for row in sheet.iter_rows(values_only=True):
+            largo = len(row)
+            while largo and row[largo - 1] is None:
+                largo -= 1
+            filas.append(tuple(row[:largo]))
+            ancho = max(ancho, largo)
+            if max_celdas is not None and len(filas) * ancho > max_celdas:
+                return None
+        while filas and not filas[-1]:
+            filas.pop()
+        relleno = (None,) * ancho
+        columnas = tuple(
+            zip(*(fila + relleno[len(fila) :] for fila in filas), strict=True)
+        )
+        return cls(
+            titulo=sheet.title,
+            hojas_libro=hojas_libro,
+            hoja_predeterminada=hoja_predeterminada,
+            columnas=columnas,
+            total_filas=len(filas),
+        )
+
+    def resolver_titulo(self, sheet_name: str | None) -> str:
+        """Aplica la regla de elección de hoja sobre las hojas de este libro."""
+        if sheet_name and sheet_name in self.hojas_libro:
+            return sheet_name
+        return self.hoja_predeterminada
+
+    def fila(self, numero: int) -> tuple[Any, ...]:
+        """Devuelve la fila indicada (base 1) o una tupla vacía si no existe."""
+        if numero < 1 or numero > self.total_filas:
+            return ()
+        indice = numero - 1
+        return tuple(columna[indice] for columna in self.columnas)
+
+    def iterar_filas(self, desde: int) -> Iterator[tuple[int, tuple[Any, ...]]]:
+        """Recorre las filas desde el número indicado junto con su número."""
+        inicio = max(desde, 1) - 1
+        if not self.columnas:
+            return iter(())
+        filas = zip(*(columna[inicio:] for columna in self.columnas))
+        return enumerate(filas, start=inicio + 1)
+
+
+@dataclass(frozen=True)
+class HojaImportacionEnStream:
+    """
+    Hoja demasiado grande para el cache, releída del archivo en cada recorrido.
+
+    Ofrece `titulo`, `fila` e `iterar_filas` igual que `HojaImportacion`,
+    pero sin guardar las celdas: conserva el consumo de memoria constante de
+    la lectura fila por fila a cambio de volver a abrir el libro.
+    """
+
+    titulo: str
+    file_bytes: bytes = field(repr=False)
+
+    def fila(self, numero: int) -> tuple[Any, ...]:
+        """Devuelve la fila indicada (base 1) o una tupla vacía si no existe."""
+        if numero < 1:
+            return ()
+        for row in self._filas(numero, numero):
+            return tuple(row)
+        return ()
+
+    def iterar_filas(self, desde: int) -> Iterator[tuple[int, tuple[Any, ...]]]:
+        """Recorre las filas desde el número indicado junto con su número."""
+        inicio = max(desde, 1)
+        return enumerate((tuple(row) for row in self._filas(inicio, None)), inicio)
+
+    def _filas(self, desde: int, hasta: int | None) -> Iterator[tuple[Any, ...]]:
+        """Abre el libro en modo read-only y lo cierra al terminar el recorrido."""
+        workbook = load_workbook(
+            BytesIO(self.file_bytes), data_only=True, read_only=True
+        )
+        try:
+            yield from workbook[self.titulo].iter_rows(
+                min_row=desde, max_row=hasta, values_only=True
+            )
+        finally:
+            workbook.close()
+
+
+HojaExcelImportacion = HojaImportacion | HojaImportacionEnStream
+
+
+class CacheHojasImportacion:
+    """
+    LRU corto de hojas parseadas, indexado por hash del contenido del archivo.
+
+    Detectar el formato de un archivo y después validarlo como lote lee la
+    misma hoja; con este cache el `load_workbook` y el recorrido de celdas se
+    hacen una sola vez por archivo y hoja. Las hojas son inmutables, así que
+    pueden compartirse entre requests y threads.
+
+    Guardar una hoja entera cuesta memoria proporcional a sus celdas, así que
+    el cache tiene un presupuesto total de celdas además del de hojas. Una
+    hoja que supera `max_celdas_hoja` no se carga: se devuelve como
+    `HojaImportacionEnStream` y cada recorrido la vuelve a leer.
+    """
+
+    def __init__(
+        self,
+        max_hojas: int = HOJAS_EN_CACHE,
+        vigencia_segundos: float = VIGENCIA_HOJA_CACHE_SEGUNDOS,
+        max_celdas: int = CELDAS_EN_CACHE,
+        max_celdas_hoja: int = CELDAS_MAXIMAS_HOJA_EN_CACHE,
+    ):
+        """Inicializa el cache vacío."""
+        self.max_hojas = max_hojas
+        self.vigencia_segundos = vigencia_segundos
+        self.max_celdas = max_celdas
+        self.max_celdas_hoja = min(max_celdas_hoja, max_celdas)
+        self._hojas: OrderedDict[
+            tuple[str, str], tuple[float, HojaImportacion]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+        self._celdas = 0
+        self._aciertos = 0
+        self._lecturas = 0
+
+    def obtener(
+        self, file_bytes: bytes, sheet_name: str | None = None
+    ) -> HojaExcelImportacion:
+        """
+        Devuelve la hoja elegida del archivo, parseándolo solo si no está.
+
+        La hoja se elige igual que siempre: `sheet_name` si existe en el libro,
+        si no "Comprobantes" y, en último caso, la hoja activa.
+
+        Raises:
+            FormatoImportacionError: Si el archivo no es un .xlsx legible.
+        """
+        file_hash = hashlib.sha256(file_bytes).hexdigest()
+        with self._lock:
+            self._descartar_vencidas()
+            hoja = self._buscar(file_hash, sheet_name)
+            if hoja is not None:
+                self._aciertos += 1
+                return hoja
+
+        hoja = self._leer(file_bytes, sheet_name)
+        with self._lock:
+            self._lecturas += 1
+            if isinstance(hoja, HojaImportacionEnStream):
+                return hoja
+            clave = (file_hash, hoja.titulo)
+            anterior = self._hojas.pop(clave, None)
+            if anterior is not None:
+                self._celdas -= anterior[1].celdas
+            self._hojas[clave] = (time.monotonic(), hoja)
+            self._celdas += hoja.celdas
+            while len(self._hojas) > self.max_hojas or self._celdas > self.max_celdas:
+                _clave, (_guardada, descartada) = self._hojas.popitem(last=False)
+                self._celdas -= descartada.celdas
+        return hoja
+
+    def limpiar(self) -> None:
+        """Descarta todas las hojas guardadas."""
+        with self._lock:
+            self._hojas.clear()
+            self._celdas = 0
+
+    def stats(self) -> dict[str, int]:
+        """Devuelve contadores de uso del cache."""
+        with self._lock:
+            return {
+                "hojas": len(self._hojas),
+                "celdas": self._celdas,
+                "aciertos": self._aciertos,
+                "lecturas": self._lecturas,
+            }
+
+    def _buscar(self, file_hash: str, sheet_name: str | None) -> HojaImportacion | None:
+        """Busca la hoja resolviendo el nombre con los datos de otra hoja del libro."""
+        for (hash_guardado, _titulo), (_guardada, hoja) in self._hojas.items():
+            if hash_guardado != file_hash:
+                continue
+            clave = (file_hash, hoja.resolver_titulo(sheet_name))
+            encontrada = self._hojas.get(clave)
+            if encontrada is None:
+                return None
+            self._hojas.move_to_end(clave)
+            return encontrada[1]
+        return None
+
+    def _descartar_vencidas(self) -> None:
+        """Quita las hojas que superaron la vigencia."""
+        limite = time.monotonic() - self.vigencia_segundos
+        vencidas = [
+            clave
+            for clave, (guardada, _hoja) in self._hojas.items()
+            if guardada < limite
+        ]
+        for clave in vencidas:
+            _guardada, hoja = self._hojas.pop(clave)
+            self._celdas -= hoja.celdas
+
+    def _leer(self, file_bytes: bytes, sheet_name: str | None) -> HojaExcelImportacion:
+        """Abre el libro, parsea la hoja elegida y lo cierra."""
+        try:
+            workbook = load_workbook(
+                BytesIO(file_bytes), data_only=True, read_only=True
+            )
+        except (BadZipFile, InvalidFileException, OSError, ValueError) as exc:
+            raise FormatoImportacionError(
+                "No se pudo leer el archivo Excel. Verificá que sea un .xlsx válido."
+            ) from exc
+        try:
+            hojas_libro = tuple(workbook.sheetnames)
+            hoja_predeterminada = (
+                "Comprobantes"
+                if "Comprobantes" in hojas_libro
+                else workbook.active.title
+            )
+            titulo = (
+                sheet_name
+                if sheet_name and sheet_name in hojas_libro
+                else hoja_predeterminada
+            )
+            sheet = workbook[titulo]
+            hoja = None
+            # La dimensión declarada evita cargar a medias una hoja grande.
+            if (sheet.max_row or 0) * (sheet.max_column or 0) <= self.max_celdas_hoja:
+                hoja = HojaImportacion.desde_hoja(
+                    sheet,
+                    hojas_libro,
+                    hoja_predeterminada,
+                    max_celdas=self.max_celdas_hoja,
+                )
+            if hoja is None:
+                return HojaImportacionEnStream(titulo=titulo, file_bytes=file_bytes)
+            return hoja
+        finally:
+            workbook.close()
+
+
+cache_hojas_importacion = CacheHojasImportacion()
+
+# Planes de mapeo compilados que se conservan, uno por versión de formato.
+PLANES_MAPEO_EN_CACHE = 256
+
+PasoMapeo = tuple[str, int | None, Any, Callable[[Any], Any]]
+
+
+@dataclass(frozen=True)
+class PlanMapeoVersion:
+    """
+    Mapeo de una versión de formato compilado una sola vez.
+
+    Guarda las constantes ya resueltas y, para cada campo que sale del
+    archivo, su valor por defecto y la función de transformación ya elegida.
+    Lo único que depende del archivo son los índices de columna, que se
+    vinculan una vez por archivo con `vincular`.
+    """
+
+    constantes: tuple[tuple[str, Any], ...]
+    campos_archivo: tuple[str, ...]
+    defaults: tuple[Any, ...]
+    transformadores: tuple[Callable[[Any], Any], ...]
+    documentos_limpios: frozenset[str]
+
+    def vincular(self, mapeo: dict[str, Any]) -> tuple[PasoMapeo, ...]:
+        """Arma los pasos por fila con los índices resueltos para un archivo."""
+        campos = mapeo["campos"]
+        return tuple(
+            zip(
+                self.campos_archivo,
+                (campos[campo].get("index") for campo in self.campos_archivo),
+                self.defaults,
+                self.transformadores,
+                strict=True,
+            )
+        )
+
+    def extraer(
+        self, pasos: tuple[PasoMapeo, ...], row: tuple[Any, ...] | list[Any]
+    ) -> dict[str, Any]:
+        """Extrae y transforma los valores de una fila."""
+        valores = dict(self.constantes)
+        largo = len(row)
+        for campo, index, default, transformar in pasos:
+            valores[campo] = transformar(
+                row[index] if index is not None and index < largo else default
+            )
+        return valores
+
+
+class CachePlanesMapeo:
+    """
+    Planes de mapeo por id de versión de formato, con descarte LRU.
+
+    Cada plan guarda la huella de la configuración con la que se compiló: si
+    la versión cambió en el lugar o el id se reutilizó, se vuelve a compilar
+    en lugar de aplicar un mapeo viejo. Quien edita una configuración llama
+    además a `invalidar`.
+    """
+
+    def __init__(self, max_planes: int = PLANES_MAPEO_EN_CACHE):
+        """Inicializa el cache vacío."""
+        self.max_planes = max_planes
+        self._planes: OrderedDict[int, tuple[str, PlanMapeoVersion]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._aciertos = 0
+        self._compilaciones = 0
+
+    def obtener(
+        self,
+        version_id: int | None,
+        configuracion: dict[str, Any],
+        compilar: Callable[[], PlanMapeoVersion],
+    ) -> PlanMapeoVersion:
+        """Devuelve el plan de la versión, compilándolo si no está o cambió."""
+        if version_id is None:
+            return compilar()
+        huella = json.dumps(configuracion, sort_keys=True, default=str)
+        with self._lock:
+            guardado = self._planes.get(version_id)
+            if guardado is not None and guardado[0] == huella:
+                self._planes.move_to_end(version_id)
+                self._aciertos += 1
+                return guardado[1]
+        plan = compilar()
+        with self._lock:
+            self._compilaciones += 1
+            self._planes[version_id] = (huella, plan)
+            self._planes.move_to_end(version_id)
+            while len(self._planes) > self.max_planes:
+                self._planes.popitem(last=False)
+        return plan
+
+    def invalidar(self, version_ids: Iterable[int | None] | None = None) -> None:
+        """Descarta los planes de las versiones indicadas, o todos."""
+        with self._lock:
+            if version_ids is None:
+                self._planes.clear()
+                return
+            for version_id in version_ids:
+                self._planes.pop(version_id, None)
+
+    def stats(self) -> dict[str, int]:
+        """Devuelve contadores de uso del cache."""
+        with self._lock:
+            return {
+                "planes": len(self._planes),
+                "aciertos": self._aciertos,
+                "compilaciones": self._compilaciones,
+            }
+
+
+cache_planes_mapeo = CachePlanesMapeo()
+
 
 class FormatosImportacionService:
     """Gestiona formatos reutilizables y aplica mapeos de Excel externos."""
@@ -589,6 +1052,7 @@ class FormatosImportacionService:
                 FORMATO_BANCARIO_CONFIG
             )
             await self.db.commit()
+            cache_planes_mapeo.invalidar([version_vigente.id])
             return
 
         for version in formato.versiones:
@@ -770,6 +1234,8 @@ class FormatosImportacionService:
                 self._agregar_campos_desde_config(version.id, configuracion)
 
         await self.db.commit()
+        if configuracion is not None:
+            cache_planes_mapeo.invalidar(version.id for version in formato.versiones)
         return await self.obtener_formato(formato.id, empresa_id)
 
     async def desactivar_formato(self, formato_id: int, empresa_id: int) -> None:
@@ -844,6 +1310,9 @@ class FormatosImportacionService:
         template_columns: list[str],
     ) -> tuple[list[str], list[CandidatoFormato]]:
         """Detecta candidatos por encabezados y cantidad de columnas."""
+        if not self.es_libro_excel(file_bytes):
+            return await self._detectar_formato_texto(file_bytes, empresa_id)
+
         headers = self.leer_headers(file_bytes)
         candidatos: list[CandidatoFormato] = []
         if self.es_plantilla_oficial(headers, template_columns):
@@ -867,14 +1336,57 @@ class FormatosImportacionService:
             version = self._version_vigente(formato)
             if version is None:
                 continue
+            if FuenteArchivoImportacion.desde_configuracion(
+                version.configuracion_json
+            ).es_texto:
+                continue
             candidatos.append(self._evaluar_formato(headers, formato, version))
 
         candidatos.sort(key=lambda item: item.score, reverse=True)
         return headers, candidatos
 
+    async def _detectar_formato_texto(
+        self, file_bytes: bytes, empresa_id: int
+    ) -> tuple[list[str], list[CandidatoFormato]]:
+        """
+        Evalúa un CSV/TSV contra los formatos que declaran ese tipo de archivo.
+
+        Cada formato se lee con su propio separador y codificación; los que no
+        pueden leer el archivo quedan fuera de los candidatos.
+        """
+        evaluados: list[tuple[CandidatoFormato, list[str]]] = []
+        for formato in await self.listar_formatos(empresa_id):
+            version = self._version_vigente(formato)
+            if version is None:
+                continue
+            fuente = FuenteArchivoImportacion.desde_configuracion(
+                version.configuracion_json
+            )
+            if not fuente.es_texto:
+                continue
+            header_row = int(version.configuracion_json.get("header_row", 1))
+            try:
+                _lector, headers = self._leer_texto_y_headers(
+                    file_bytes, fuente, header_row
+                )
+            except FormatoImportacionError:
+                continue
+            evaluados.append(
+                (self._evaluar_formato(headers, formato, version), headers)
+            )
+
+        if not evaluados:
+            raise FormatoImportacionError(
+                "No hay plantillas para archivos CSV/TSV que puedan leer este "
+                "archivo. Configurá una plantilla con el tipo de archivo, "
+                "separador y codificación correspondientes."
+            )
+        evaluados.sort(key=lambda item: item[0].score, reverse=True)
+        return evaluados[0][1], [candidato for candidato, _headers in evaluados]
+
     def analizar_excel(self, file_bytes: bytes) -> ExcelAnalisis:
         """Analiza encabezados de un Excel para iniciar una plantilla."""
-        sheet, headers = self._leer_sheet_y_headers(file_bytes)
+        hoja, headers = self._leer_sheet_y_headers(file_bytes)
         columnas = [
             ExcelColumnaAnalizada(
                 indice=index,
@@ -885,7 +1397,7 @@ class FormatosImportacionService:
             if str(header or "").strip()
         ]
         return ExcelAnalisis(
-            hoja=sheet.title,
+            hoja=hoja.titulo,
             fila_encabezado=1,
             columnas=columnas,
         )
@@ -1308,7 +1820,38 @@ class FormatosImportacionService:
         version: FormatoImportacionVersion,
     ) -> ImportacionNormalizada:
         """Convierte un Excel externo al formato interno de lote."""
-        sheet, headers = self._leer_sheet_y_headers(file_bytes, version)
+        importacion = self.abrir_importacion_con_version(file_bytes, empresa, version)
+        filas = list(importacion.filas)
+        if not filas:
+            raise FormatoImportacionError(
+                "La plantilla no contiene filas para procesar"
+            )
+        importacion.filas = filas
+        return importacion
+
+    def abrir_importacion_con_version(
+        self,
+        file_bytes: bytes,
+        empresa: Empresa,
+        version: FormatoImportacionVersion,
+    ) -> ImportacionNormalizada:
+        """
+        Valida encabezados y mapeo, y devuelve las filas como iterador perezoso.
+
+        La hoja sale de `cache_hojas_importacion`, así que si el archivo ya se
+        leyó para detectar el formato no se vuelve a parsear. Los formatos
+        CSV/TSV se leen con `csv.reader` sin pasar por openpyxl. Cada fila se
+        convierte al contrato interno recién al consumirla. Quien consume el
+        iterador valida que haya al menos una fila.
+        """
+        fuente = FuenteArchivoImportacion.desde_configuracion(
+            version.configuracion_json
+        )
+        header_row = int(version.configuracion_json.get("header_row", 1))
+        if fuente.es_texto:
+            lector, headers = self._leer_texto_y_headers(file_bytes, fuente, header_row)
+        else:
+            hoja, headers = self._leer_sheet_y_headers(file_bytes, version)
         mapeo = self._resolver_mapeo(headers, version.configuracion_json)
         faltantes = [
             campo
@@ -1321,22 +1864,18 @@ class FormatosImportacionService:
                 + ", ".join(faltantes)
             )
 
-        header_row = int(version.configuracion_json.get("header_row", 1))
-        filas: list[dict[str, Any]] = []
-        for fila_excel, row in enumerate(
-            sheet.iter_rows(min_row=header_row + 1, values_only=True),
-            start=header_row + 1,
-        ):
-            if all(cell in (None, "") for cell in row):
-                continue
-            valores = self._extraer_valores_configurados(row, mapeo)
-            filas.append(self._armar_fila_canonica(valores, empresa, fila_excel))
-
-        if not filas:
-            raise FormatoImportacionError(
-                "La plantilla no contiene filas para procesar"
+        plan = self._plan_mapeo(version)
+        pasos = plan.vincular(mapeo)
+        empresa_cuit = clean_cuit(empresa.cuit)
+        filas = (
+            self._iterar_filas_texto(
+                lector, plan, pasos, mapeo, empresa_cuit, header_row, fuente
             )
-
+            if fuente.es_texto
+            else self._iterar_filas_configuradas(
+                hoja, plan, pasos, empresa_cuit, header_row
+            )
+        )
         return ImportacionNormalizada(
             filas=filas,
             headers_detectados=headers,
@@ -1345,9 +1884,103 @@ class FormatosImportacionService:
             version=version,
         )
 
+    def _iterar_filas_configuradas(
+        self,
+        hoja: HojaExcelImportacion,
+        plan: PlanMapeoVersion,
+        pasos: tuple[PasoMapeo, ...],
+        empresa_cuit: str,
+        header_row: int,
+    ) -> Iterator[dict[str, Any]]:
+        """Convierte fila por fila al contrato interno."""
+        for fila_excel, row in hoja.iterar_filas(desde=header_row + 1):
+            if all(cell in (None, "") for cell in row):
+                continue
+            yield self._armar_fila_canonica(
+                plan.extraer(pasos, row),
+                empresa_cuit,
+                fila_excel,
+                plan.documentos_limpios,
+            )
+
+    def _iterar_filas_texto(
+        self,
+        lector: Iterator[list[str]],
+        plan: PlanMapeoVersion,
+        pasos: tuple[PasoMapeo, ...],
+        mapeo: dict[str, Any],
+        empresa_cuit: str,
+        header_row: int,
+        fuente: FuenteArchivoImportacion,
+    ) -> Iterator[dict[str, Any]]:
+        """Convierte un CSV/TSV fila por fila al contrato interno."""
+        campos_numericos = {
+            detalle["index"]: campo
+            for campo, detalle in mapeo["campos"].items()
+            if detalle.get("index") is not None
+            and (
+                campo in CAMPOS_NUMERICOS_IMPORTACION
+                or detalle.get("transformacion") == "decimal"
+            )
+        }
+        fila_archivo = header_row
+        try:
+            for fila_archivo, row in enumerate(lector, start=header_row + 1):
+                if all(not cell.strip() for cell in row):
+                    continue
+                for index, campo in campos_numericos.items():
+                    if index >= len(row):
+                        continue
+                    numero = self._normalizar_numero_texto(
+                        row[index], fuente.coma_decimal
+                    )
+                    if numero is None:
+                        separador = "coma" if fuente.coma_decimal else "punto"
+                        raise FormatoImportacionError(
+                            f"La fila {fila_archivo} tiene un número inválido en "
+                            f"{campo}: '{row[index].strip()}'. El formato usa "
+                            f"{separador} como separador decimal."
+                        )
+                    row[index] = numero
+                yield self._armar_fila_canonica(
+                    plan.extraer(pasos, row),
+                    empresa_cuit,
+                    fila_archivo,
+                    plan.documentos_limpios,
+                )
+        except csv.Error as exc:
+            raise FormatoImportacionError(
+                f"No se pudo leer la fila {fila_archivo + 1} del archivo: {exc}"
+            ) from exc
+
+    def _normalizar_numero_texto(self, value: str, coma_decimal: bool) -> str | None:
+        """
+        Lee un número de CSV/TSV según el separador decimal declarado.
+
+        Acepta miles en grupos de tres y devuelve el número con punto decimal.
+        Si el texto no respeta el formato devuelve `None`, sin adivinar qué
+        separador quiso usar el archivo.
+        """
+        text = value.strip().replace("$", "").replace(" ", "")
+        if not text:
+            return ""
+        patron = (
+            NUMERO_TEXTO_COMA_DECIMAL if coma_decimal else NUMERO_TEXTO_PUNTO_DECIMAL
+        )
+        coincidencia = patron.fullmatch(text)
+        if coincidencia is None:
+            return None
+        signo, entero, decimales = coincidencia.groups()
+        entero = re.sub(r"\D", "", entero)
+        return f"{signo}{entero}.{decimales}" if decimales else f"{signo}{entero}"
+
+    def es_libro_excel(self, file_bytes: bytes) -> bool:
+        """Indica si el archivo es un libro .xlsx (zip) y no un CSV/TSV."""
+        return file_bytes.startswith(FIRMA_ZIP)
+
     def leer_headers(self, file_bytes: bytes) -> list[str]:
         """Lee los encabezados de la hoja más probable del Excel."""
-        sheet, headers = self._leer_sheet_y_headers(file_bytes)
+        _hoja, headers = self._leer_sheet_y_headers(file_bytes)
         return headers
 
     def es_plantilla_oficial(
@@ -1784,6 +2417,8 @@ class FormatosImportacionService:
                     )
                 campos_visuales.add(campo)
 
+        self._validar_fuente_archivo(configuracion.get("archivo"))
+
         campos = configuracion.get("campos")
         if not isinstance(campos, dict) or not campos:
             raise FormatoImportacionError(
@@ -1890,6 +2525,39 @@ class FormatosImportacionService:
                         f"{self._etiqueta_campo(campo_requerido)}."
                     )
 
+    def _validar_fuente_archivo(self, archivo: Any) -> None:
+        """Valida el tipo de archivo declarado por el formato, si lo hay."""
+        if archivo is None:
+            return
+        if not isinstance(archivo, dict):
+            raise FormatoImportacionError(
+                "La configuración del archivo del formato debe ser un objeto"
+            )
+        tipo = str(archivo.get("tipo") or "xlsx").strip().lower()
+        if tipo not in TIPOS_ARCHIVO_IMPORTACION:
+            raise FormatoImportacionError(
+                "El tipo de archivo del formato debe ser xlsx, csv o tsv"
+            )
+        if tipo == "xlsx":
+            return
+        delimitador = archivo.get("delimitador")
+        if tipo == "csv" and delimitador not in (None, "", *DELIMITADORES_CSV):
+            raise FormatoImportacionError(
+                "El separador del CSV debe ser coma, punto y coma o barra vertical"
+            )
+        codificacion = archivo.get("codificacion")
+        if codificacion not in (None, ""):
+            try:
+                codecs.lookup(str(codificacion))
+            except LookupError as exc:
+                raise FormatoImportacionError(
+                    f"La codificación {codificacion} no es válida"
+                ) from exc
+        if not isinstance(archivo.get("coma_decimal", False), bool):
+            raise FormatoImportacionError(
+                "El indicador de coma decimal debe ser verdadero o falso"
+            )
+
     def _campo_requerido_resuelto_por_plantilla(
         self,
         campo: str,
@@ -2047,34 +2715,59 @@ class FormatosImportacionService:
         self,
         file_bytes: bytes,
         version: FormatoImportacionVersion | None = None,
-    ):
-        try:
-            workbook = load_workbook(
-                BytesIO(file_bytes), data_only=True, read_only=True
-            )
-        except (BadZipFile, InvalidFileException, OSError, ValueError) as exc:
-            raise FormatoImportacionError(
-                "No se pudo leer el archivo Excel. Verificá que sea un .xlsx válido."
-            ) from exc
+    ) -> tuple[HojaExcelImportacion, list[str]]:
         sheet_name = None
         header_row = 1
         if version is not None:
             sheet_name = version.configuracion_json.get("sheet_name")
             header_row = int(version.configuracion_json.get("header_row", 1))
 
-        if sheet_name and sheet_name in workbook.sheetnames:
-            sheet = workbook[sheet_name]
-        elif "Comprobantes" in workbook.sheetnames:
-            sheet = workbook["Comprobantes"]
-        else:
-            sheet = workbook.active
-
-        headers = [self.reparar_texto(cell.value) for cell in sheet[header_row]]
+        hoja = cache_hojas_importacion.obtener(file_bytes, sheet_name)
+        headers = [self.reparar_texto(value) for value in hoja.fila(header_row)]
         if not any(headers):
             raise FormatoImportacionError(
                 "No se detectaron encabezados en la primera fila del Excel"
             )
-        return sheet, headers
+        return hoja, headers
+
+    def _leer_texto_y_headers(
+        self,
+        file_bytes: bytes,
+        fuente: FuenteArchivoImportacion,
+        header_row: int,
+    ) -> tuple[Iterator[list[str]], list[str]]:
+        """
+        Abre un CSV/TSV y avanza hasta la fila de encabezados.
+
+        El archivo se decodifica completo para que un error de codificación se
+        informe antes de empezar; las filas se separan recién al consumirse.
+        """
+        if self.es_libro_excel(file_bytes):
+            raise FormatoImportacionError(
+                "La plantilla espera un archivo CSV/TSV y se subió un Excel."
+            )
+        try:
+            texto = file_bytes.decode(fuente.codificacion)
+        except (UnicodeDecodeError, LookupError) as exc:
+            raise FormatoImportacionError(
+                "No se pudo leer el archivo con la codificación "
+                f"{fuente.codificacion}. Revisá la codificación de la plantilla."
+            ) from exc
+        lector = csv.reader(StringIO(texto, newline=""), delimiter=fuente.delimitador)
+        fila: list[str] = []
+        try:
+            for _ in range(max(header_row, 1)):
+                fila = next(lector, [])
+        except csv.Error as exc:
+            raise FormatoImportacionError(
+                f"No se pudieron leer los encabezados del archivo: {exc}"
+            ) from exc
+        headers = [self.reparar_texto(value) for value in fila]
+        if not any(headers):
+            raise FormatoImportacionError(
+                "No se detectaron encabezados en la primera fila del archivo"
+            )
+        return lector, headers
 
     def _resolver_mapeo(
         self, headers: list[str], configuracion: dict[str, Any]
@@ -2139,50 +2832,74 @@ class FormatosImportacionService:
                 "La configuración de columna del formato es inválida"
             ) from exc
 
-    def _extraer_valores_configurados(
-        self, row: tuple[Any, ...], mapeo: dict[str, Any]
-    ) -> dict[str, Any]:
-        valores: dict[str, Any] = {}
-        for campo, detalle in mapeo["campos"].items():
-            if detalle["origen"] == "constante":
-                valores[campo] = detalle.get("valor")
+    def _plan_mapeo(self, version: FormatoImportacionVersion) -> PlanMapeoVersion:
+        """Obtiene el plan compilado de la versión desde `cache_planes_mapeo`."""
+        return cache_planes_mapeo.obtener(
+            version.id,
+            version.configuracion_json,
+            lambda: self._compilar_plan_mapeo(version.configuracion_json),
+        )
+
+    def _compilar_plan_mapeo(self, configuracion: dict[str, Any]) -> PlanMapeoVersion:
+        """Resuelve una vez constantes, defaults y transformaciones del mapeo."""
+        constantes: list[tuple[str, Any]] = []
+        campos_archivo: list[str] = []
+        defaults: list[Any] = []
+        transformadores: list[Callable[[Any], Any]] = []
+        documentos_limpios: set[str] = set()
+        for campo, config in configuracion.get("campos", {}).items():
+            origen = config.get("origen", "header")
+            if origen == "constante":
+                constantes.append((campo, config.get("valor")))
                 continue
-            if detalle["origen"] == "empresa":
+            if origen == "empresa":
                 continue
-
-            value = detalle.get("default", "")
-            index = detalle.get("index")
-            if index is not None and index < len(row):
-                value = row[index]
-            valores[campo] = self._aplicar_transformacion(
-                value, detalle.get("transformacion")
-            )
-        return valores
+            transformacion = config.get("transformacion")
+            campos_archivo.append(campo)
+            defaults.append(config.get("default"))
+            transformadores.append(self._transformador(transformacion))
+            if transformacion == "documento":
+                documentos_limpios.add(campo)
+        return PlanMapeoVersion(
+            constantes=tuple(constantes),
+            campos_archivo=tuple(campos_archivo),
+            defaults=tuple(defaults),
+            transformadores=tuple(transformadores),
+            documentos_limpios=frozenset(documentos_limpios),
+        )
 
     def _armar_fila_canonica(
         self,
         valores: dict[str, Any],
-        empresa: Empresa,
+        empresa_cuit: str,
         fila_excel: int,
+        documentos_limpios: frozenset[str] = frozenset(),
     ) -> dict[str, Any]:
-        documento = clean_cuit(valores.get("cliente_numero_documento", ""))
-        importe_total = self._parse_decimal(valores.get("importe_total"))
-        precio_unitario = self._parse_decimal(valores.get("item_precio_unitario"))
-        total_receptor = importe_total or precio_unitario or Decimal("0")
+        """
+        Arma la fila del contrato interno a partir de los valores mapeados.
+
+        `empresa_cuit` es el CUIT ya limpio del emisor, usado si el archivo no
+        lo trae. Los campos de `documentos_limpios` ya pasaron por la
+        transformación `documento` y no se vuelven a limpiar.
+        """
+        documento = valores.get("cliente_numero_documento", "")
+        if "cliente_numero_documento" not in documentos_limpios:
+            documento = clean_cuit(documento)
         condicion_iva = str(
             valores.get("cliente_condicion_iva", "Consumidor Final") or ""
         ).strip()
-        es_consumidor_final = condicion_iva.upper() in {"CF", "CONSUMIDOR FINAL"}
-        if (
-            es_consumidor_final
-            and total_receptor < self.CONSUMIDOR_FINAL_IDENTIFICACION_MINIMA
-        ):
-            documento = ""
-        empresa_cuit = (
-            clean_cuit(valores.get("empresa_cuit", ""))
-            if "empresa_cuit" in valores
-            else clean_cuit(empresa.cuit)
-        )
+        if condicion_iva.upper() in {"CF", "CONSUMIDOR FINAL"}:
+            total_receptor = (
+                self._parse_decimal(valores.get("importe_total"))
+                or self._parse_decimal(valores.get("item_precio_unitario"))
+                or Decimal("0")
+            )
+            if total_receptor < self.CONSUMIDOR_FINAL_IDENTIFICACION_MINIMA:
+                documento = ""
+        if "empresa_cuit" in valores:
+            empresa_cuit = valores["empresa_cuit"]
+            if "empresa_cuit" not in documentos_limpios:
+                empresa_cuit = clean_cuit(empresa_cuit)
         item_precio_unitario = valores.get(
             "item_precio_unitario", valores.get("importe_total", "")
         )
@@ -2218,26 +2935,61 @@ class FormatosImportacionService:
             "asociado_cuit": valores.get("asociado_cuit", ""),
         }
 
-    def _aplicar_transformacion(self, value: Any, transformacion: str | None) -> Any:
+    @classmethod
+    def _transformador(cls, transformacion: str | None) -> Callable[[Any], Any]:
+        """Devuelve la función que aplica la transformación indicada."""
+        return {
+            "decimal": cls._transformar_decimal,
+            "entero": cls._transformar_entero,
+            "documento": cls._transformar_documento,
+            "fecha": cls._transformar_fecha,
+            "texto": cls._transformar_texto,
+        }.get(transformacion or "", cls._transformar_sin_cambio)
+
+    @staticmethod
+    def _transformar_sin_cambio(value: Any) -> Any:
         if value in (None, ""):
             return ""
-        if transformacion == "decimal":
-            parsed = self._parse_decimal(value)
-            return str(parsed) if parsed is not None else ""
-        if transformacion == "entero":
-            try:
-                return int(Decimal(str(self._parse_decimal(value) or value)))
-            except (InvalidOperation, ValueError):
-                return value
-        if transformacion == "documento":
-            return clean_cuit(value)
-        if transformacion == "fecha":
-            return self._parse_date(value) or value
-        if transformacion == "texto":
-            return str(value).strip()
         return value
 
-    def _parse_decimal(self, value: Any) -> Decimal | None:
+    @staticmethod
+    def _transformar_decimal(value: Any) -> Any:
+        if value in (None, ""):
+            return ""
+        parsed = FormatosImportacionService._parse_decimal(value)
+        return str(parsed) if parsed is not None else ""
+
+    @staticmethod
+    def _transformar_entero(value: Any) -> Any:
+        if value in (None, ""):
+            return ""
+        try:
+            return int(
+                Decimal(str(FormatosImportacionService._parse_decimal(value) or value))
+            )
+        except (InvalidOperation, ValueError):
+            return value
+
+    @staticmethod
+    def _transformar_documento(value: Any) -> Any:
+        if value in (None, ""):
+            return ""
+        return clean_cuit(value)
+
+    @staticmethod
+    def _transformar_fecha(value: Any) -> Any:
+        if value in (None, ""):
+            return ""
+        return FormatosImportacionService._parse_date(value) or value
+
+    @staticmethod
+    def _transformar_texto(value: Any) -> Any:
+        if value in (None, ""):
+            return ""
+        return str(value).strip()
+
+    @staticmethod
+    def _parse_decimal(value: Any) -> Decimal | None:
         if isinstance(value, Decimal):
             return value
         if isinstance(value, (int, float)):
@@ -2255,7 +3007,8 @@ class FormatosImportacionService:
         except (InvalidOperation, ValueError):
             return None
 
-    def _parse_date(self, value: Any) -> str | None:
+    @staticmethod
+    def _parse_date(value: Any) -> str | None:
         if isinstance(value, datetime):
             return value.date().isoformat()
         if isinstance(value, date):
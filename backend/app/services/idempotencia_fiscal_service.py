@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import hashlib
 import json
+from collections.abc import Iterator, Sequence
 from datetime import date
 from decimal import Decimal
 from typing import TYPE_CHECKING, Any
@@ -14,7 +15,6 @@ from sqlalchemy import exists, inspect as sa_inspect, null, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.exc import TimeoutError as SQLAlchemyTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.arca.utils import clean_cuit
 from app.core.database import DATABASE_TEMPORARILY_UNAVAILABLE_ERRORS
@@ -57,6 +57,7 @@ class IdempotenciaFiscalService:
 
     ESTADOS_INTENTO_ACTIVOS = ESTADOS_RESERVA_FISCAL_ACTIVA
     ESTADOS_INTENTO_BLOQUEANTES = ESTADOS_INTENTO_FISCAL_BLOQUEANTES
+    TAMANO_TRAMO_DUPLICADOS = 500
 
     def __init__(self, db: AsyncSession) -> None:
         """Inicializa el servicio con una sesión async."""
@@ -1071,65 +1072,63 @@ class IdempotenciaFiscalService:
         total: Decimal,
     ) -> Comprobante | None:
         """Busca un comprobante local probablemente duplicado."""
-        receptor_doc = clean_cuit(request.numero_documento)
-        result = await self.db.execute(
-            select(Comprobante)
-            .options(
-                selectinload(Comprobante.items),
-                selectinload(Comprobante.punto_venta),
-            )
-            .where(
-                Comprobante.empresa_id == request.empresa_id,
-                Comprobante.punto_venta_id == punto_venta.id,
-                Comprobante.tipo_comprobante == request.tipo_comprobante,
-                Comprobante.fecha_emision == request.fecha_emision,
-                Comprobante.total == total,
-                Comprobante.receptor_numero_documento == receptor_doc,
-                Comprobante.estado == "autorizado",
-            )
+        duplicados = await self.buscar_duplicados_logicos(
+            [(request, punto_venta, total)]
         )
-        huella_request = self.calcular_huella_logica(
-            request=request,
-            punto_venta_numero=punto_venta.numero,
-            total=total,
-        )
-        comprobantes = result.scalars().all()
-        huellas_intentos = await self._huellas_autorizadas_por_comprobante(
-            [comprobante.id for comprobante in comprobantes]
-        )
-        for comprobante in comprobantes:
-            huella_comprobante = huellas_intentos.get(comprobante.id)
-            if huella_comprobante is None:
-                huella_comprobante = self.calcular_huella_logica_comprobante(
-                    comprobante
-                )
-            if huella_comprobante == huella_request:
-                return comprobante
-        return None
+        return duplicados[0]
 
-    async def _huellas_autorizadas_por_comprobante(
-        self, comprobante_ids: list[int]
-    ) -> dict[int, str]:
-        """Obtiene snapshots lógicos autorizados por comprobante persistido."""
-        if not comprobante_ids:
-            return {}
-        result = await self.db.execute(
-            select(
-                IntentoEmisionFiscal.comprobante_id,
-                IntentoEmisionFiscal.huella_logica,
-            )
-            .where(
-                IntentoEmisionFiscal.comprobante_id.in_(comprobante_ids),
-                IntentoEmisionFiscal.estado == "autorizado",
-                IntentoEmisionFiscal.huella_logica.is_not(None),
+    async def buscar_duplicados_logicos(
+        self,
+        candidatos: Sequence[tuple[EmitirComprobanteRequest, PuntoVenta, Decimal]],
+    ) -> list[Comprobante | None]:
+        """
+        Busca duplicados lógicos de muchos requests por huella persistida.
+
+        Cada comprobante autorizado guarda la huella de su request en
+        `comprobantes.huella_logica`, así la búsqueda es una igualdad indexada
+        por tramo de huellas, sin cargar items ni snapshots de intentos.
+        Devuelve, en el mismo orden de `candidatos`, el comprobante duplicado o
+        `None`.
+        """
+        huellas_request = [
+            (
+                request.empresa_id,
+                self.calcular_huella_logica(
+                    request=request,
+                    punto_venta_numero=punto_venta.numero,
+                    total=total,
+                ),
             )
-            .order_by(IntentoEmisionFiscal.created_at.desc())
-        )
-        huellas: dict[int, str] = {}
-        for comprobante_id, huella_logica in result.all():
-            if comprobante_id is not None and comprobante_id not in huellas:
-                huellas[comprobante_id] = huella_logica
-        return huellas
+            for request, punto_venta, total in candidatos
+        ]
+        huellas_por_empresa: dict[int, list[str]] = {}
+        for empresa_id, huella in dict.fromkeys(huellas_request):
+            huellas_por_empresa.setdefault(empresa_id, []).append(huella)
+
+        comprobantes: dict[tuple[int, str], Comprobante] = {}
+        for empresa_id, huellas in huellas_por_empresa.items():
+            for tramo in self._tramos(huellas):
+                result = await self.db.execute(
+                    select(Comprobante)
+                    .where(
+                        Comprobante.empresa_id == empresa_id,
+                        Comprobante.huella_logica.in_(tramo),
+                        Comprobante.estado == "autorizado",
+                    )
+                    .order_by(Comprobante.id)
+                )
+                for comprobante in result.scalars():
+                    comprobantes.setdefault(
+                        (comprobante.empresa_id, comprobante.huella_logica),
+                        comprobante,
+                    )
+        return [comprobantes.get(clave) for clave in huellas_request]
+
+    @classmethod
+    def _tramos(cls, valores: list[Any]) -> Iterator[list[Any]]:
+        """Parte una lista para acotar los parámetros de cada `IN`."""
+        for inicio in range(0, len(valores), cls.TAMANO_TRAMO_DUPLICADOS):
+            yield valores[inicio : inicio + cls.TAMANO_TRAMO_DUPLICADOS]
 
     @classmethod
     def calcular_huella_logica(
@@ -1177,37 +1176,6 @@ class IdempotenciaFiscalService:
         }
         return cls.calcular_payload_hash(payload)
 
-    @classmethod
-    def calcular_huella_logica_comprobante(cls, comprobante: Comprobante) -> str:
-        """Calcula la huella lógica desde un comprobante local guardado."""
-        payload = {
-            "empresa_id": comprobante.empresa_id,
-            "tipo_comprobante": comprobante.tipo_comprobante,
-            "punto_venta_numero": comprobante.punto_venta.numero,
-            "fecha_emision": comprobante.fecha_emision.isoformat(),
-            "receptor": {
-                "tipo_documento": comprobante.receptor_tipo_documento,
-                "numero_documento": clean_cuit(
-                    comprobante.receptor_numero_documento or ""
-                ),
-            },
-            "total": cls._money(comprobante.total),
-            "items": [
-                {
-                    "codigo": (item.codigo or "").strip(),
-                    "descripcion": item.descripcion.strip(),
-                    "cantidad": cls._decimal_str(item.cantidad),
-                    "precio_unitario": cls._money(item.precio_unitario),
-                    "descuento_porcentaje": cls._decimal_str(item.descuento_porcentaje),
-                    "iva_porcentaje": cls._decimal_str(item.iva_porcentaje),
-                    "orden": item.orden,
-                }
-                for item in sorted(comprobante.items, key=lambda item: item.orden)
-            ],
-            "comprobantes_asociados": [],
-        }
-        return cls.calcular_payload_hash(payload)
-
     async def _obtener_operacion(
         self,
         empresa_id: int,
@@ -2,25 +2,27 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
 import logging
 import unicodedata
-from collections import defaultdict
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import Executor
 from contextlib import AsyncExitStack
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import date, datetime, timedelta
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from io import BytesIO
+from pathlib import Path
 from typing import Any, Literal
-from zipfile import BadZipFile
 
-from openpyxl import Workbook, load_workbook
-from openpyxl.utils.exceptions import InvalidFileException
+from openpyxl import Workbook
 from openpyxl.utils.datetime import from_excel
 from openpyxl.styles import Font, PatternFill
 from pydantic import ValidationError as PydanticValidationError
-from sqlalchemy import delete, exists, func, null, select, update
+from sqlalchemy import delete, exists, func, insert, null, select, tuple_, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.exc import TimeoutError as SQLAlchemyTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -30,10 +32,19 @@ from app.arca.config import ArcaAmbiente
 from app.arca.exceptions import ArcaServiceError, ArcaValidationError
 from app.arca.utils import clean_cuit, validate_cuit
 from app.core.config import settings
-from app.core.database import DATABASE_TEMPORARILY_UNAVAILABLE_ERRORS
+from app.core.database import (
+    DATABASE_TEMPORARILY_UNAVAILABLE_ERRORS,
+    WorkerSessionLocal,
+    acquire_database_connection,
+    get_worker_connection_capacity,
+)
 from app.models.certificado import Certificado
 from app.models.comprobante import Comprobante
 from app.models.empresa import Empresa
+from app.models.formato_importacion import (
+    FormatoImportacion,
+    FormatoImportacionVersion,
+)
 from app.models.elegibilidad_rece import (
     FASES_GUARDA_RECE_ACTIVAS,
     PuntoVentaGuardaEmisionRece,
@@ -62,12 +73,15 @@ from app.schemas.lote_comprobante import (
 from app.services.facturacion_service import (
     FacturacionService,
     FaseSolicitudArca,
+    SubloteEmisionPreparado,
     ValidationError,
 )
 from app.services.formatos_importacion_service import (
     FormatoImportacionError,
     FormatosImportacionService,
+    HojaExcelImportacion,
     ImportacionNormalizada,
+    cache_hojas_importacion,
 )
 from app.services.idempotencia_fiscal_service import IdempotenciaFiscalService
 from app.services.elegibilidad_rece_service import (
@@ -75,6 +89,10 @@ from app.services.elegibilidad_rece_service import (
     ElegibilidadReceError,
     ElegibilidadReceService,
 )
+from app.services.lote_notificaciones import (
+    marcar_lote_encolado,
+    marcar_progreso_lote,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +102,16 @@ ERROR_ARCA_GLOBAL_10005_RECE = ErrorArcaFiscalResponse(
     mensaje="El punto de venta no está dado de alta como RECE en ARCA.",
 )
 
+CONTADOR_LOTE_POR_ESTADO_GRUPO = {
+    "validado": "grupos_validos",
+    "con_error": "grupos_con_error",
+    "autorizado": "grupos_emitidos",
+    "fallido": "grupos_fallidos",
+    "autorizado_externo": "grupos_reconciliados_externos",
+    "descartado": "grupos_descartados",
+}
+MODOS_FILAS_GRUPO = ("descripcion", "resumen", "omitir")
+
 
 class LoteComprobanteError(Exception):
     """Error funcional durante la validación o emisión del lote."""
@@ -130,6 +158,123 @@ class OpcionesPuntoVentaLote:
     punto_venta_numero: int | None = None
 
 
+@dataclass(frozen=True)
+class ParametrosValidacionLote:
+    """Opciones elegidas al subir un archivo de lote."""
+
+    opciones_fechas: OpcionesFechasLote
+    opciones_concepto: OpcionesConceptoLote
+    opciones_descripcion_item: OpcionesDescripcionItemLote
+    opciones_punto_venta: OpcionesPuntoVentaLote = OpcionesPuntoVentaLote()
+    formato_version_id: int | None = None
+    perfil_carga_masiva_snapshot: dict[str, Any] | None = None
+
+
+@dataclass(frozen=True)
+class EmisorLote:
+    """Datos del emisor que usa la validación de un archivo sin sesión ORM."""
+
+    id: int
+    cuit: str
+    condicion_iva: str | None
+
+    @classmethod
+    def desde_empresa(cls, empresa: Empresa | EmisorLote) -> EmisorLote:
+        """Copia los datos de la empresa que necesita la validación."""
+        return cls(
+            id=empresa.id, cuit=empresa.cuit, condicion_iva=empresa.condicion_iva
+        )
+
+
+@dataclass(frozen=True)
+class PuntoVentaLote:
+    """Punto de venta habilitado, reducido a lo que usa la validación."""
+
+    id: int
+    numero: int
+
+    @classmethod
+    def desde_puntos_venta(
+        cls, puntos_venta: dict[int, PuntoVenta] | dict[int, PuntoVentaLote]
+    ) -> dict[int, PuntoVentaLote]:
+        """Reduce los puntos de venta habilitados, indexados por número."""
+        return {
+            numero: cls(id=punto.id, numero=punto.numero)
+            for numero, punto in puntos_venta.items()
+        }
+
+
+@dataclass(frozen=True)
+class FormatoVersionLote:
+    """Versión de formato de importación resuelta antes de leer el archivo."""
+
+    formato_id: int
+    formato_nombre: str
+    version_id: int
+    configuracion_json: dict[str, Any]
+
+    @classmethod
+    def desde_version(cls, version: FormatoImportacionVersion) -> FormatoVersionLote:
+        """Copia los datos de una versión cargada en la sesión."""
+        return cls(
+            formato_id=version.formato.id,
+            formato_nombre=version.formato.nombre,
+            version_id=version.id,
+            configuracion_json=dict(version.configuracion_json),
+        )
+
+    def como_version(self) -> FormatoImportacionVersion:
+        """Reconstruye una versión transitoria, sin sesión, para leer el archivo."""
+        return FormatoImportacionVersion(
+            id=self.version_id,
+            configuracion_json=self.configuracion_json,
+            formato=FormatoImportacion(id=self.formato_id, nombre=self.formato_nombre),
+        )
+
+
+@dataclass(frozen=True)
+class EntradaValidacionArchivoLote:
+    """Lo que necesita un proceso worker para validar un archivo de lote."""
+
+    ruta_archivo: str
+    emisor: EmisorLote
+    puntos_venta: dict[int, PuntoVentaLote]
+    formato_version: FormatoVersionLote | None
+    opciones_fechas: OpcionesFechasLote
+    opciones_concepto: OpcionesConceptoLote
+    opciones_descripcion_item: OpcionesDescripcionItemLote
+    opciones_punto_venta: OpcionesPuntoVentaLote
+
+
+GrupoArchivoValidado = tuple[str, dict[str, Any], list[tuple[int, dict[str, Any]]]]
+
+
+@dataclass(frozen=True)
+class TramoValidacionGrupos:
+    """Grupos consecutivos que valida un worker del pool, con su contexto."""
+
+    emisor: EmisorLote
+    puntos_venta: dict[int, PuntoVentaLote]
+    grupos: list[tuple[str, list[tuple[int, dict[str, Any]]]]]
+
+
+@dataclass(frozen=True)
+class PreparacionValidacionArchivoLote:
+    """Datos resueltos en la base antes de validar un archivo en un worker."""
+
+    archivo_hash: str
+    entrada: EntradaValidacionArchivoLote
+
+
+@dataclass(frozen=True)
+class ArchivoLoteValidado:
+    """Archivo leído, agrupado y validado, listo para registrarse en la base."""
+
+    importacion: dict[str, Any]
+    total_filas: int
+    grupos: list[GrupoArchivoValidado]
+
+
 @dataclass(frozen=True)
 class GrupoPendienteEmision:
     """Agrupa el registro del lote con el request listo para emitir."""
@@ -139,6 +284,14 @@ class GrupoPendienteEmision:
     contexto_rece: ContextoElegibilidadRece
 
 
+@dataclass(frozen=True)
+class PreparacionSubloteEnCurso:
+    """Preparación de un sublote ARCA que corre mientras se emite el anterior."""
+
+    requests: list[EmitirComprobanteRequest]
+    tarea: asyncio.Task[SubloteEmisionPreparado]
+
+
 @dataclass(frozen=True)
 class ConfiguracionBatchArca:
     """Configuración efectiva de emisión por sublotes ARCA."""
@@ -150,6 +303,51 @@ class ConfiguracionBatchArca:
     fallback_motivo: str | None = None
 
 
+@dataclass(frozen=True)
+class CorteEmisionLote:
+    """Sublote cuya respuesta obliga a cerrar el lote sin enviar más grupos."""
+
+    rechazo_global: bool
+    grupo_ids: frozenset[int]
+
+
+@dataclass
+class EmisionLoteEnCurso:
+    """
+    Estado que comparten las cadenas de emisión de un lote.
+
+    Cada clave de numeración emite sus sublotes en orden; las cadenas solo
+    comparten conteos, grupos procesados y cortes, todo dentro del mismo
+    event loop. El lock por punto de venta respeta la única guarda RECE activa
+    que admite cada punto mientras un sublote espera a ARCA.
+    """
+
+    lote_id: int
+    operacion_id: int | None
+    usuario_id: int | None
+    contextos_rece: list[ContextoElegibilidadRece]
+    config_batch: ConfiguracionBatchArca
+    conteos: Counter[str]
+    grupos_procesados_ids: set[int]
+    cortes: list[CorteEmisionLote]
+    locks_punto_venta: defaultdict[int, asyncio.Lock]
+    detenida: bool = False
+
+    def cortar(self, corte: CorteEmisionLote) -> None:
+        """Registra un corte; las demás cadenas no envían más sublotes."""
+        self.cortes.append(corte)
+        self.detenida = True
+
+
+@dataclass(frozen=True)
+class PaginaGruposLote:
+    """Página de grupos de un lote con el cursor para seguir leyendo."""
+
+    grupos: list[LoteComprobanteGrupo]
+    total: int
+    siguiente: tuple[int, int] | None
+
+
 @dataclass(frozen=True)
 class ClasificacionGruposStale:
     """Clasifica grupos válidos de un lote interrumpido según evidencia fiscal."""
@@ -178,6 +376,19 @@ class LoteComprobantesService:
         "requiere_reconciliacion",
     }
     ESTADOS_PROCESABLES = {"validado", "en_cola"}
+    GRUPOS_POR_INSERCION = 500
+    # Por debajo de este tamaño levantar el pool cuesta más que validar en serie.
+    MIN_GRUPOS_VALIDACION_PARALELA = 1000
+    GRUPOS_POR_TRAMO_VALIDACION = 250
+    FILAS_POR_INSERCION = 1000
+    MENSAJE_ARCHIVO_YA_CARGADO = (
+        "Ese archivo ya fue cargado previamente. Revisá el lote existente antes "
+        "de volver a subirlo."
+    )
+    MENSAJE_EMPRESA_LOTE_INVALIDA = (
+        "El archivo mezcla empresas o no coincide con la empresa activa. "
+        "Revisa la columna empresa_cuit y vuelve a subir el lote."
+    )
     ESTADOS_RESOLUBLES = {"validado", "con_error", "fallido"}
     ESTADOS_RECONCILIABLES = ESTADOS_RESOLUBLES | {
         "requiere_reconciliacion",
@@ -383,12 +594,11 @@ class LoteComprobantesService:
         if not file_bytes:
             raise LoteComprobanteError("El archivo está vacío")
         opciones_punto_venta = opciones_punto_venta or OpcionesPuntoVentaLote()
-        self._validar_opciones_concepto(opciones_concepto)
-        self._validar_opciones_descripcion_item(opciones_descripcion_item)
-        self._validar_opciones_punto_venta(opciones_punto_venta)
-        self._validar_opciones_fechas(
+        self._validar_opciones_lote(
             opciones_fechas,
-            requiere_fechas_servicio=opciones_concepto.concepto_modo != "productos",
+            opciones_concepto,
+            opciones_descripcion_item,
+            opciones_punto_venta,
         )
 
         file_hash = self._calcular_hash_lote(
@@ -406,45 +616,276 @@ class LoteComprobantesService:
             empresa=empresa,
             formato_version_id=formato_version_id,
         )
-        filas_excel = importacion["filas"]
-        if len(filas_excel) > settings.batch_max_rows:
-            raise LoteComprobanteError(
-                f"El archivo supera el máximo permitido de {settings.batch_max_rows} filas"
-            )
-        self._validar_empresa_del_lote(filas_excel, empresa)
         self._validar_concepto_archivo_si_corresponde(importacion, opciones_concepto)
         self._validar_descripcion_item_archivo_si_corresponde(
             importacion, opciones_descripcion_item
         )
-        filas_excel = [
-            self._aplicar_opciones_concepto(row, opciones_concepto)
-            for row in filas_excel
-        ]
-        filas_excel = [
-            self._aplicar_opciones_descripcion_item(row, opciones_descripcion_item)
-            for row in filas_excel
-        ]
-        filas_excel = [
-            self._aplicar_opciones_fechas(row, opciones_fechas) for row in filas_excel
-        ]
+        puntos_venta = await self._obtener_puntos_venta(empresa.id)
+        self._validar_punto_venta_fijo(opciones_punto_venta, puntos_venta)
+        await self._exigir_certificado_activo(empresa.id)
+
+        grupos_por_ref, total_filas = self._agrupar_filas_lote(
+            importacion.pop("filas"),
+            empresa=empresa,
+            opciones_fechas=opciones_fechas,
+            opciones_concepto=opciones_concepto,
+            opciones_descripcion_item=opciones_descripcion_item,
+            opciones_punto_venta=opciones_punto_venta,
+        )
+        return await self._registrar_lote_validado(
+            filename=filename,
+            file_hash=file_hash,
+            empresa=empresa,
+            usuario=usuario,
+            importacion=importacion,
+            total_filas=total_filas,
+            parametros=ParametrosValidacionLote(
+                opciones_fechas=opciones_fechas,
+                opciones_concepto=opciones_concepto,
+                opciones_descripcion_item=opciones_descripcion_item,
+                opciones_punto_venta=opciones_punto_venta,
+                formato_version_id=formato_version_id,
+                perfil_carga_masiva_snapshot=perfil_carga_masiva_snapshot,
+            ),
+            puntos_venta=puntos_venta,
+            grupos=await self._validar_grupos_lote(
+                grupos_por_ref, empresa, puntos_venta
+            ),
+        )
+
+    async def preparar_validacion_desde_archivo(
+        self,
+        ruta_archivo: Path,
+        empresa: Empresa,
+        parametros: ParametrosValidacionLote,
+    ) -> PreparacionValidacionArchivoLote:
+        """
+        Resuelve lo que la validación de un archivo en disco necesita de la base.
+
+        Solo lee: verifica que el archivo no esté cargado, copia la versión de
+        formato y los puntos de venta habilitados y exige certificado. Así el
+        llamador puede cerrar la sesión antes de derivar la validación a un
+        proceso worker, sin retener conexión ni filas bloqueadas mientras
+        tanto.
+        """
+        opciones_punto_venta = parametros.opciones_punto_venta
+        self._validar_opciones_lote(
+            parametros.opciones_fechas,
+            parametros.opciones_concepto,
+            parametros.opciones_descripcion_item,
+            opciones_punto_venta,
+        )
+        file_bytes = await asyncio.to_thread(ruta_archivo.read_bytes)
+        if not file_bytes:
+            raise LoteComprobanteError("El archivo está vacío")
+        file_hash = await asyncio.to_thread(
+            self._calcular_hash_lote,
+            file_bytes,
+            parametros.formato_version_id,
+            parametros.opciones_fechas,
+            parametros.opciones_concepto,
+            parametros.opciones_descripcion_item,
+            opciones_punto_venta,
+        )
+        del file_bytes
+        await self._verificar_archivo_no_cargado(empresa.id, file_hash)
 
+        formato_version = None
+        if parametros.formato_version_id is not None:
+            formato_version = FormatoVersionLote.desde_version(
+                await self._obtener_version_formato_lote(
+                    parametros.formato_version_id, empresa.id
+                )
+            )
         puntos_venta = await self._obtener_puntos_venta(empresa.id)
         self._validar_punto_venta_fijo(opciones_punto_venta, puntos_venta)
-        filas_excel = [
-            self._aplicar_opciones_punto_venta(row, opciones_punto_venta)
-            for row in filas_excel
-        ]
-        certificado = await self._obtener_certificado_activo(empresa.id)
-        if certificado is None:
-            raise LoteComprobanteError(
-                "No hay un certificado activo para la empresa en el ambiente configurado"
+        await self._exigir_certificado_activo(empresa.id)
+
+        return PreparacionValidacionArchivoLote(
+            archivo_hash=file_hash,
+            entrada=EntradaValidacionArchivoLote(
+                ruta_archivo=str(ruta_archivo),
+                emisor=EmisorLote.desde_empresa(empresa),
+                puntos_venta=PuntoVentaLote.desde_puntos_venta(puntos_venta),
+                formato_version=formato_version,
+                opciones_fechas=parametros.opciones_fechas,
+                opciones_concepto=parametros.opciones_concepto,
+                opciones_descripcion_item=parametros.opciones_descripcion_item,
+                opciones_punto_venta=opciones_punto_venta,
+            ),
+        )
+
+    async def registrar_lote_desde_archivo(
+        self,
+        preparacion: PreparacionValidacionArchivoLote,
+        archivo: ArchivoLoteValidado,
+        filename: str,
+        empresa: Empresa,
+        usuario: Usuario,
+        parametros: ParametrosValidacionLote,
+        al_registrar_grupos: Callable[[int], None] | None = None,
+    ) -> LoteComprobante:
+        """
+        Registra un archivo ya validado fuera de la base.
+
+        La idempotencia se vuelve a resolver en esta sesión, porque otro lote
+        con el mismo archivo pudo registrarse mientras se validaba.
+        """
+        await self._preparar_idempotencia(empresa.id, preparacion.archivo_hash)
+        return await self._registrar_lote_validado(
+            filename=filename,
+            file_hash=preparacion.archivo_hash,
+            empresa=empresa,
+            usuario=usuario,
+            importacion=archivo.importacion,
+            total_filas=archivo.total_filas,
+            parametros=parametros,
+            puntos_venta=preparacion.entrada.puntos_venta,
+            grupos=archivo.grupos,
+            al_registrar_grupos=al_registrar_grupos,
+        )
+
+    def validar_archivo_lote(
+        self, entrada: EntradaValidacionArchivoLote
+    ) -> ArchivoLoteValidado:
+        """Lee, agrupa y valida un archivo de lote sin consultar la base."""
+        file_bytes = Path(entrada.ruta_archivo).read_bytes()
+        importacion = self._abrir_importacion_lote(
+            file_bytes,
+            entrada.emisor,
+            (
+                entrada.formato_version.como_version()
+                if entrada.formato_version is not None
+                else None
+            ),
+        )
+        self._validar_concepto_archivo_si_corresponde(
+            importacion, entrada.opciones_concepto
+        )
+        self._validar_descripcion_item_archivo_si_corresponde(
+            importacion, entrada.opciones_descripcion_item
+        )
+        grupos_por_ref, total_filas = self._agrupar_filas_lote(
+            importacion.pop("filas"),
+            empresa=entrada.emisor,
+            opciones_fechas=entrada.opciones_fechas,
+            opciones_concepto=entrada.opciones_concepto,
+            opciones_descripcion_item=entrada.opciones_descripcion_item,
+            opciones_punto_venta=entrada.opciones_punto_venta,
+        )
+        # Los grupos se validan en este mismo worker, que ya los tiene: el pool
+        # reparte archivos entre procesos y otro reparto por tramos volvería a
+        # serializar los grupos y sumaría procesos.
+        return ArchivoLoteValidado(
+            importacion=importacion,
+            total_filas=total_filas,
+            grupos=list(
+                self._iterar_grupos_validados(
+                    grupos_por_ref, entrada.emisor, entrada.puntos_venta
+                )
+            ),
+        )
+
+    def _validar_opciones_lote(
+        self,
+        opciones_fechas: OpcionesFechasLote,
+        opciones_concepto: OpcionesConceptoLote,
+        opciones_descripcion_item: OpcionesDescripcionItemLote,
+        opciones_punto_venta: OpcionesPuntoVentaLote,
+    ) -> None:
+        """Rechaza combinaciones de opciones inválidas antes de leer el archivo."""
+        self._validar_opciones_concepto(opciones_concepto)
+        self._validar_opciones_descripcion_item(opciones_descripcion_item)
+        self._validar_opciones_punto_venta(opciones_punto_venta)
+        self._validar_opciones_fechas(
+            opciones_fechas,
+            requiere_fechas_servicio=opciones_concepto.concepto_modo != "productos",
+        )
+
+    def _iterar_grupos_validados(
+        self,
+        grupos_por_ref: dict[str, list[tuple[int, dict[str, Any]]]],
+        empresa: Empresa | EmisorLote,
+        puntos_venta: dict[int, PuntoVenta] | dict[int, PuntoVentaLote],
+    ) -> Iterator[GrupoArchivoValidado]:
+        """Valida los grupos en orden de aparición y los va soltando."""
+        for comprobante_ref in list(grupos_por_ref):
+            # Cada grupo se libera apenas se escribe para no duplicar el archivo.
+            row_group = grupos_por_ref.pop(comprobante_ref)
+            yield (
+                comprobante_ref,
+                self._validar_grupo(
+                    comprobante_ref=comprobante_ref,
+                    rows=row_group,
+                    empresa=empresa,
+                    puntos_venta=puntos_venta,
+                ),
+                row_group,
             )
+
+    async def _validar_grupos_lote(
+        self,
+        grupos_por_ref: dict[str, list[tuple[int, dict[str, Any]]]],
+        empresa: Empresa,
+        puntos_venta: dict[int, PuntoVenta],
+    ) -> Iterable[GrupoArchivoValidado]:
+        """
+        Valida en serie o, en archivos grandes, por tramos en el pool de trabajos.
+
+        Es el mismo pool de las validaciones en segundo plano, así todas las
+        validaciones de lotes comparten `BATCH_VALIDATION_WORKERS` procesos.
+        """
+        if len(grupos_por_ref) < self.MIN_GRUPOS_VALIDACION_PARALELA:
+            return self._iterar_grupos_validados(grupos_por_ref, empresa, puntos_venta)
+        # El gestor de trabajos importa este módulo.
+        from app.services.lote_validacion_trabajos import validacion_lote_trabajos
+
+        grupos = list(grupos_por_ref.items())
+        grupos_por_ref.clear()
+        return await validacion_lote_trabajos.validar_grupos(
+            grupos,
+            EmisorLote.desde_empresa(empresa),
+            PuntoVentaLote.desde_puntos_venta(puntos_venta),
+        )
+
+    def _validar_tramo(self, tramo: TramoValidacionGrupos) -> list[dict[str, Any]]:
+        """Valida los grupos de un tramo en orden."""
+        return [
+            self._validar_grupo(
+                comprobante_ref=comprobante_ref,
+                rows=row_group,
+                empresa=tramo.emisor,
+                puntos_venta=tramo.puntos_venta,
+            )
+            for comprobante_ref, row_group in tramo.grupos
+        ]
+
+    async def _registrar_lote_validado(
+        self,
+        *,
+        filename: str,
+        file_hash: str,
+        empresa: Empresa,
+        usuario: Usuario,
+        importacion: dict[str, Any],
+        total_filas: int,
+        parametros: ParametrosValidacionLote,
+        puntos_venta: dict[int, PuntoVenta] | dict[int, PuntoVentaLote],
+        grupos: Iterable[GrupoArchivoValidado],
+        al_registrar_grupos: Callable[[int], None] | None = None,
+    ) -> LoteComprobante:
+        """Persiste el lote con sus grupos ya validados y el contexto RECE."""
+        opciones_fechas = parametros.opciones_fechas
+        opciones_concepto = parametros.opciones_concepto
+        opciones_descripcion_item = parametros.opciones_descripcion_item
+        opciones_punto_venta = parametros.opciones_punto_venta
+        perfil_carga_masiva_snapshot = parametros.perfil_carga_masiva_snapshot
         logger.info(
             "Validando lote '%s' para empresa %s (%s) con %s filas",
             filename,
             empresa.id,
             empresa.cuit,
-            len(filas_excel),
+            total_filas,
         )
 
         lote = LoteComprobante(
@@ -453,7 +894,7 @@ class LoteComprobantesService:
             estado="cargado",
             modo_procesamiento="sincronico",
             procesamiento_async=False,
-            total_filas=len(filas_excel),
+            total_filas=total_filas,
             empresa_id=empresa.id,
             usuario_id=usuario.id,
             formato_importacion_id=importacion["formato_importacion_id"],
@@ -483,88 +924,88 @@ class LoteComprobantesService:
         self.db.add(lote)
         await self.db.flush()
 
-        grupos_por_ref: dict[str, list[tuple[int, dict[str, Any]]]] = defaultdict(list)
-        for fila_excel, row in enumerate(filas_excel, start=2):
-            comprobante_ref = str(row["comprobante_ref"]).strip()
-            if not comprobante_ref:
-                raise LoteComprobanteError(
-                    "Todas las filas deben incluir comprobante_ref"
-                )
-            grupos_por_ref[comprobante_ref].append((fila_excel, row))
-
-        if len(grupos_por_ref) > settings.batch_max_groups:
-            raise LoteComprobanteError(
-                f"El archivo supera el máximo permitido de {settings.batch_max_groups} comprobantes"
-            )
-
         orden = 0
         elegibilidad = ElegibilidadReceService(self.db)
-        for comprobante_ref, row_group in grupos_por_ref.items():
-            group_result = self._validar_grupo(
-                comprobante_ref=comprobante_ref,
-                rows=row_group,
-                empresa=empresa,
-                puntos_venta=puntos_venta,
-            )
+        contextos_por_punto_tipo: dict[
+            tuple[int, int], ContextoElegibilidadRece | ElegibilidadReceError
+        ] = {}
+        grupos_pendientes: list[
+            tuple[dict[str, Any], list[tuple[int, dict[str, Any]]]]
+        ] = []
+        for comprobante_ref, group_result, row_group in grupos:
             contexto_rece: ContextoElegibilidadRece | None = None
             if group_result["estado"] == "validado":
                 punto_numero = int(group_result["punto_venta_numero"])
                 punto = puntos_venta[punto_numero]
-                try:
-                    contexto_rece = await elegibilidad.exigir_contexto_preautorizacion(
-                        empresa_id=empresa.id,
-                        punto_venta_id=punto.id,
-                        ambiente=settings.arca_env,
-                        tipo_comprobante=int(group_result["tipo_comprobante"]),
-                    )
-                except ElegibilidadReceError as exc:
+                clave_contexto = (punto.id, int(group_result["tipo_comprobante"]))
+                if clave_contexto not in contextos_por_punto_tipo:
+                    try:
+                        contextos_por_punto_tipo[
+                            clave_contexto
+                        ] = await elegibilidad.exigir_contexto_preautorizacion(
+                            empresa_id=empresa.id,
+                            punto_venta_id=punto.id,
+                            ambiente=settings.arca_env,
+                            tipo_comprobante=clave_contexto[1],
+                        )
+                    except ElegibilidadReceError as exc:
+                        contextos_por_punto_tipo[clave_contexto] = exc
+                resultado_contexto = contextos_por_punto_tipo[clave_contexto]
+                if isinstance(resultado_contexto, ElegibilidadReceError):
                     group_result["estado"] = "con_error"
                     group_result["mensajes"] = [
-                        exc.mensaje,
+                        resultado_contexto.mensaje,
                         "No se creó un payload emitible para este comprobante.",
                     ]
                     group_result["payload"] = None
+                else:
+                    contexto_rece = resultado_contexto
             orden += 1
-            grupo = LoteComprobanteGrupo(
-                lote_id=lote.id,
-                empresa_id=empresa.id,
-                comprobante_ref=comprobante_ref,
-                orden=orden,
-                estado=group_result["estado"],
-                tipo_comprobante=group_result.get("tipo_comprobante"),
-                punto_venta_numero=group_result.get("punto_venta_numero"),
-                cliente_documento=group_result.get("cliente_documento"),
-                cliente_razon_social=group_result.get("cliente_razon_social"),
-                total_estimado=group_result.get("total_estimado", Decimal("0")),
-                payload_json=group_result.get("payload"),
-                mensajes_json=group_result["mensajes"],
-                punto_venta_id=(
-                    contexto_rece.punto_venta_id if contexto_rece else None
-                ),
-                ambiente=contexto_rece.ambiente if contexto_rece else None,
-                punto_venta_elegibilidad_revision_id=(
-                    contexto_rece.elegibilidad_revision_id if contexto_rece else None
-                ),
-                punto_venta_revision_fiscal=(
-                    contexto_rece.punto_venta_revision_fiscal if contexto_rece else None
-                ),
-            )
-            self.db.add(grupo)
-            await self.db.flush()
-
-            for fila_excel, row in row_group:
-                fila = LoteComprobanteFila(
-                    lote_id=lote.id,
-                    grupo_id=grupo.id,
-                    fila_excel=fila_excel,
-                    comprobante_ref=comprobante_ref,
-                    estado=grupo.estado,
-                    datos_json=row,
-                    mensajes_json=group_result["mensajes"],
+            grupos_pendientes.append(
+                (
+                    {
+                        "lote_id": lote.id,
+                        "empresa_id": empresa.id,
+                        "comprobante_ref": comprobante_ref,
+                        "orden": orden,
+                        "estado": group_result["estado"],
+                        "tipo_comprobante": group_result.get("tipo_comprobante"),
+                        "punto_venta_numero": group_result.get("punto_venta_numero"),
+                        "cliente_documento": group_result.get("cliente_documento"),
+                        "cliente_razon_social": group_result.get(
+                            "cliente_razon_social"
+                        ),
+                        "total_estimado": group_result.get(
+                            "total_estimado", Decimal("0")
+                        ),
+                        "payload_json": group_result.get("payload"),
+                        "mensajes_json": group_result["mensajes"],
+                        "punto_venta_id": (
+                            contexto_rece.punto_venta_id if contexto_rece else None
+                        ),
+                        "ambiente": contexto_rece.ambiente if contexto_rece else None,
+                        "punto_venta_elegibilidad_revision_id": (
+                            contexto_rece.elegibilidad_revision_id
+                            if contexto_rece
+                            else None
+                        ),
+                        "punto_venta_revision_fiscal": (
+                            contexto_rece.punto_venta_revision_fiscal
+                            if contexto_rece
+                            else None
+                        ),
+                    },
+                    row_group,
                 )
-                self.db.add(fila)
+            )
+            if len(grupos_pendientes) >= self.GRUPOS_POR_INSERCION:
+                await self._insertar_grupos_y_filas(grupos_pendientes)
+                if al_registrar_grupos is not None:
+                    al_registrar_grupos(orden)
 
-        await self.db.flush()
+        await self._insertar_grupos_y_filas(grupos_pendientes)
+        if al_registrar_grupos is not None:
+            al_registrar_grupos(orden)
         duplicados_logicos = await self.obtener_confirmacion_duplicado_logico_grupos(
             lote_id=lote.id,
             empresa_id=empresa.id,
@@ -587,9 +1028,7 @@ class LoteComprobantesService:
             await self.db.commit()
         except IntegrityError as exc:
             await self.db.rollback()
-            raise LoteComprobanteError(
-                "Ese archivo ya fue cargado previamente. Revisá el lote existente antes de volver a subirlo."
-            ) from exc
+            raise LoteComprobanteError(self.MENSAJE_ARCHIVO_YA_CARGADO) from exc
         await self.db.refresh(lote)
         logger.info(
             "Lote %s validado: %s grupos, %s validos, %s con error",
@@ -600,6 +1039,103 @@ class LoteComprobantesService:
         )
         return lote
 
+    def _agrupar_filas_lote(
+        self,
+        filas: Iterable[dict[str, Any]],
+        empresa: Empresa | EmisorLote,
+        opciones_fechas: OpcionesFechasLote,
+        opciones_concepto: OpcionesConceptoLote,
+        opciones_descripcion_item: OpcionesDescripcionItemLote,
+        opciones_punto_venta: OpcionesPuntoVentaLote,
+    ) -> tuple[dict[str, list[tuple[int, dict[str, Any]]]], int]:
+        """
+        Consume las filas una vez, aplica las opciones y agrupa por comprobante.
+
+        Las filas llegan perezosas desde el lector, se completan en el lugar y
+        se validan contra la empresa y los topes del lote a medida que se leen,
+        así un archivo inválido se corta sin terminar de recorrerse.
+        """
+        cuit_esperado = clean_cuit(empresa.cuit)
+        cuit_detectado = False
+        grupos_por_ref: dict[str, list[tuple[int, dict[str, Any]]]] = defaultdict(list)
+        total_filas = 0
+        for fila_excel, row in enumerate(filas, start=2):
+            total_filas += 1
+            if total_filas > settings.batch_max_rows:
+                raise LoteComprobanteError(
+                    f"El archivo supera el máximo permitido de {settings.batch_max_rows} filas"
+                )
+            cuit_fila = clean_cuit(row.get("empresa_cuit", ""))
+            if cuit_fila:
+                if cuit_fila != cuit_esperado:
+                    raise LoteComprobanteError(self.MENSAJE_EMPRESA_LOTE_INVALIDA)
+                cuit_detectado = True
+
+            self._aplicar_opciones_concepto(row, opciones_concepto)
+            self._aplicar_opciones_descripcion_item(row, opciones_descripcion_item)
+            self._aplicar_opciones_fechas(row, opciones_fechas)
+            self._aplicar_opciones_punto_venta(row, opciones_punto_venta)
+
+            comprobante_ref = str(row["comprobante_ref"]).strip()
+            if not comprobante_ref:
+                raise LoteComprobanteError(
+                    "Todas las filas deben incluir comprobante_ref"
+                )
+            if (
+                comprobante_ref not in grupos_por_ref
+                and len(grupos_por_ref) >= settings.batch_max_groups
+            ):
+                raise LoteComprobanteError(
+                    f"El archivo supera el máximo permitido de {settings.batch_max_groups} comprobantes"
+                )
+            grupos_por_ref[comprobante_ref].append((fila_excel, row))
+
+        if total_filas == 0:
+            raise LoteComprobanteError("La plantilla no contiene filas para procesar")
+        if not cuit_detectado:
+            raise LoteComprobanteError(self.MENSAJE_EMPRESA_LOTE_INVALIDA)
+        return grupos_por_ref, total_filas
+
+    async def _insertar_grupos_y_filas(
+        self,
+        pendientes: list[tuple[dict[str, Any], list[tuple[int, dict[str, Any]]]]],
+    ) -> None:
+        """
+        Persiste un tramo de grupos y sus filas con INSERT multi-fila.
+
+        Los grupos se insertan con `RETURNING` en el orden de los parámetros
+        para asociar cada id con sus filas sin cargar objetos en la sesión.
+        El tramo queda vacío al terminar.
+        """
+        if not pendientes:
+            return
+        result = await self.db.execute(
+            insert(LoteComprobanteGrupo).returning(
+                LoteComprobanteGrupo.id, sort_by_parameter_order=True
+            ),
+            [valores for valores, _rows in pendientes],
+        )
+        grupo_ids = result.scalars().all()
+        filas = [
+            {
+                "lote_id": valores["lote_id"],
+                "grupo_id": grupo_id,
+                "fila_excel": fila_excel,
+                "comprobante_ref": valores["comprobante_ref"],
+                "estado": valores["estado"],
+                "datos_json": row,
+                "mensajes_json": valores["mensajes_json"],
+            }
+            for grupo_id, (valores, rows) in zip(grupo_ids, pendientes)
+            for fila_excel, row in rows
+        ]
+        pendientes.clear()
+        for inicio in range(0, len(filas), self.FILAS_POR_INSERCION):
+            await self.db.execute(
+                insert(LoteComprobanteFila),
+                filas[inicio : inicio + self.FILAS_POR_INSERCION],
+            )
+
     def _calcular_hash_lote(
         self,
         file_bytes: bytes,
@@ -812,18 +1348,14 @@ class LoteComprobantesService:
 
     def _aplicar_opciones_concepto(
         self, row: dict[str, Any], opciones: OpcionesConceptoLote
-    ) -> dict[str, Any]:
-        """Completa el concepto fiscal según la elección del usuario."""
-        updated = dict(row)
+    ) -> None:
+        """Completa en la fila el concepto fiscal según la elección del usuario."""
         if opciones.concepto_modo == "productos":
-            updated["concepto"] = 1
+            row["concepto"] = 1
         elif opciones.concepto_modo == "servicios":
-            updated["concepto"] = 2
+            row["concepto"] = 2
         else:
-            updated["concepto"] = self._resolver_concepto_archivo(
-                updated.get("concepto")
-            )
-        return updated
+            row["concepto"] = self._resolver_concepto_archivo(row.get("concepto"))
 
     def _validar_descripcion_item_archivo_si_corresponde(
         self,
@@ -850,23 +1382,19 @@ class LoteComprobantesService:
         self,
         row: dict[str, Any],
         opciones: OpcionesDescripcionItemLote,
-    ) -> dict[str, Any]:
-        """Completa la descripción facturada según la elección del usuario."""
-        updated = dict(row)
+    ) -> None:
+        """Completa en la fila la descripción facturada elegida por el usuario."""
         if opciones.descripcion_item_modo == "fija":
-            updated["item_descripcion"] = (opciones.descripcion_item_fija or "").strip()
-        return updated
+            row["item_descripcion"] = (opciones.descripcion_item_fija or "").strip()
 
     def _aplicar_opciones_punto_venta(
         self,
         row: dict[str, Any],
         opciones: OpcionesPuntoVentaLote,
-    ) -> dict[str, Any]:
-        """Completa el punto de venta según la elección del usuario."""
-        updated = dict(row)
+    ) -> None:
+        """Completa en la fila el punto de venta elegido por el usuario."""
         if opciones.punto_venta_modo == "fijo":
-            updated["punto_venta_numero"] = opciones.punto_venta_numero
-        return updated
+            row["punto_venta_numero"] = opciones.punto_venta_numero
 
     def _resolver_concepto_archivo(self, value: Any) -> int | str:
         """Convierte Producto/Servicio del archivo al código ARCA."""
@@ -885,33 +1413,29 @@ class LoteComprobantesService:
 
     def _aplicar_opciones_fechas(
         self, row: dict[str, Any], opciones: OpcionesFechasLote
-    ) -> dict[str, Any]:
-        """Completa las fechas fiscales del comprobante según la elección del usuario."""
-        updated = dict(row)
-        fuente_archivo = updated.get("fecha_emision") or updated.get("fecha_origen")
-        updated["fecha_emision"] = self._resolver_fecha_lote(
+    ) -> None:
+        """Completa en la fila las fechas fiscales elegidas por el usuario."""
+        fuente_archivo = row.get("fecha_emision") or row.get("fecha_origen")
+        row["fecha_emision"] = self._resolver_fecha_lote(
             modo=opciones.fecha_emision_modo,
             fecha_fija=opciones.fecha_emision_fija,
             valor_archivo=fuente_archivo,
         )
-        updated["fecha_servicio_desde"] = self._resolver_fecha_lote(
+        row["fecha_servicio_desde"] = self._resolver_fecha_lote(
             modo=opciones.fecha_servicio_desde_modo,
             fecha_fija=opciones.fecha_servicio_desde_fija,
-            valor_archivo=updated.get("fecha_servicio_desde")
-            or updated.get("fecha_origen"),
+            valor_archivo=row.get("fecha_servicio_desde") or row.get("fecha_origen"),
         )
-        updated["fecha_servicio_hasta"] = self._resolver_fecha_lote(
+        row["fecha_servicio_hasta"] = self._resolver_fecha_lote(
             modo=opciones.fecha_servicio_hasta_modo,
             fecha_fija=opciones.fecha_servicio_hasta_fija,
-            valor_archivo=updated.get("fecha_servicio_hasta")
-            or updated.get("fecha_origen"),
+            valor_archivo=row.get("fecha_servicio_hasta") or row.get("fecha_origen"),
         )
-        updated["fecha_vto_pago"] = self._resolver_fecha_lote(
+        row["fecha_vto_pago"] = self._resolver_fecha_lote(
             modo=opciones.fecha_vto_pago_modo,
             fecha_fija=opciones.fecha_vto_pago_fija,
-            valor_archivo=updated.get("fecha_vto_pago") or updated.get("fecha_origen"),
+            valor_archivo=row.get("fecha_vto_pago") or row.get("fecha_origen"),
         )
-        return updated
 
     def _resolver_fecha_lote(
         self, modo: str, fecha_fija: date | None, valor_archivo: Any
@@ -960,6 +1484,7 @@ class LoteComprobantesService:
             metadata["confirmacion_duplicado_logico"] = confirmacion_duplicado_logico
             metadata["pf19b_rece_material"] = material_rece
             lote.metadata_json = metadata
+        await marcar_lote_encolado(self.db)
         if commit:
             await self.db.commit()
             await self.db.refresh(lote)
@@ -1121,6 +1646,7 @@ class LoteComprobantesService:
             operacion_id = metadata.get("operacion_idempotente_id")
             if operacion_id is not None:
                 await self._guardar_respuesta_operacion_background(lote, operacion_id)
+            await marcar_lote_encolado(self.db)
             if commit:
                 await self.db.commit()
                 await self.db.refresh(lote)
@@ -1494,27 +2020,77 @@ class LoteComprobantesService:
         page: int,
         per_page: int,
         estado: str | None = None,
-    ) -> tuple[list[LoteComprobanteGrupo], int]:
-        """Obtiene una página de grupos del lote validando el emisor activo."""
-        await self.obtener_lote_resumen(lote_id, empresa_id)
+        despues_de: tuple[int, int] | None = None,
+        filas: str = "descripcion",
+    ) -> PaginaGruposLote:
+        """
+        Obtiene una página de grupos del lote validando el emisor activo.
+
+        Con `despues_de` pagina por clave `(orden, id)` y no por `OFFSET`, así
+        el costo no crece al avanzar sobre lotes grandes. `filas` define qué
+        se carga de las filas: `descripcion` trae su `datos_json` para derivar
+        la descripción facturada, `resumen` solo id, fila y estado, y `omitir`
+        no las consulta. El total sale de los contadores del lote cuando el
+        estado tiene uno.
+        """
+        if filas not in MODOS_FILAS_GRUPO:
+            raise LoteComprobanteError(f"Modo de filas no soportado: {filas}")
+        lote = await self.obtener_lote_resumen(lote_id, empresa_id)
         filtros = [LoteComprobanteGrupo.lote_id == lote_id]
         if estado:
             filtros.append(LoteComprobanteGrupo.estado == estado)
+        total = await self._contar_grupos_pagina(lote, estado, filtros)
 
-        total_result = await self.db.execute(
-            select(func.count()).select_from(LoteComprobanteGrupo).where(*filtros)
-        )
-        total = int(total_result.scalar_one() or 0)
-        offset = max(page - 1, 0) * per_page
-        grupos_result = await self.db.execute(
+        consulta = (
             select(LoteComprobanteGrupo)
-            .options(selectinload(LoteComprobanteGrupo.filas))
             .where(*filtros)
             .order_by(LoteComprobanteGrupo.orden, LoteComprobanteGrupo.id)
-            .offset(offset)
-            .limit(per_page)
+            .limit(per_page + 1)
         )
-        return list(grupos_result.scalars().all()), total
+        if despues_de is not None:
+            consulta = consulta.where(
+                tuple_(LoteComprobanteGrupo.orden, LoteComprobanteGrupo.id)
+                > tuple_(*despues_de)
+            )
+        else:
+            consulta = consulta.offset(max(page - 1, 0) * per_page)
+        if filas == "descripcion":
+            consulta = consulta.options(
+                selectinload(LoteComprobanteGrupo.filas).load_only(
+                    LoteComprobanteFila.id,
+                    LoteComprobanteFila.fila_excel,
+                    LoteComprobanteFila.datos_json,
+                )
+            )
+        elif filas == "resumen":
+            consulta = consulta.options(
+                selectinload(LoteComprobanteGrupo.filas).load_only(
+                    LoteComprobanteFila.id,
+                    LoteComprobanteFila.fila_excel,
+                    LoteComprobanteFila.estado,
+                )
+            )
+
+        grupos = list((await self.db.execute(consulta)).scalars().all())
+        siguiente = None
+        if len(grupos) > per_page:
+            grupos = grupos[:per_page]
+            siguiente = (grupos[-1].orden, grupos[-1].id)
+        return PaginaGruposLote(grupos=grupos, total=total, siguiente=siguiente)
+
+    async def _contar_grupos_pagina(
+        self, lote: LoteComprobante, estado: str | None, filtros: list[Any]
+    ) -> int:
+        """Total de grupos del listado; cuenta en la base solo sin contador."""
+        if not estado:
+            return int(lote.total_grupos or 0)
+        contador = CONTADOR_LOTE_POR_ESTADO_GRUPO.get(estado)
+        if contador is not None:
+            return int(getattr(lote, contador) or 0)
+        total_result = await self.db.execute(
+            select(func.count()).select_from(LoteComprobanteGrupo).where(*filtros)
+        )
+        return int(total_result.scalar_one() or 0)
 
     async def obtener_resumen_operativo_lote(
         self, lote_id: int, empresa_id: int
@@ -1688,6 +2264,7 @@ class LoteComprobantesService:
         huellas: dict[int, str] = {}
         refs: dict[int, str] = {}
         duplicados_ids: set[int] = set()
+        candidatos: list[tuple[int, EmitirComprobanteRequest, Decimal]] = []
         for grupo_id, comprobante_ref, payload, punto_venta_numero in filas:
             try:
                 request = EmitirComprobanteRequest.model_validate(payload or {})
@@ -1697,22 +2274,29 @@ class LoteComprobantesService:
                     punto_venta_numero=int(punto_venta_numero or 0),
                     total=totales["total"],
                 )
-                huellas[int(grupo_id)] = huella
-                refs[int(grupo_id)] = str(comprobante_ref)
-                punto_venta = await self.facturacion_service._obtener_punto_venta(
-                    request.punto_venta_id,
-                    empresa_id,
-                )
-                if punto_venta and await idempotencia.buscar_duplicado_logico(
-                    request=request,
-                    punto_venta=punto_venta,
-                    total=totales["total"],
-                ):
-                    duplicados_ids.add(int(grupo_id))
-            except DATABASE_TEMPORARILY_UNAVAILABLE_ERRORS:
-                raise
             except Exception:  # pragma: no cover - defensivo, no bloquea validación
                 continue
+            huellas[int(grupo_id)] = huella
+            refs[int(grupo_id)] = str(comprobante_ref)
+            candidatos.append((int(grupo_id), request, totales["total"]))
+
+        puntos_venta = await self._obtener_puntos_venta_por_id(
+            empresa_id, {request.punto_venta_id for _, request, _ in candidatos}
+        )
+        candidatos = [
+            candidato
+            for candidato in candidatos
+            if candidato[1].punto_venta_id in puntos_venta
+        ]
+        duplicados = await idempotencia.buscar_duplicados_logicos(
+            [
+                (request, puntos_venta[request.punto_venta_id], total)
+                for _, request, total in candidatos
+            ]
+        )
+        for (grupo_id, _, _), duplicado in zip(candidatos, duplicados):
+            if duplicado is not None:
+                duplicados_ids.add(grupo_id)
 
         grupos_por_huella: dict[str, list[int]] = defaultdict(list)
         for grupo_id, huella in huellas.items():
@@ -2401,6 +2985,7 @@ class LoteComprobantesService:
             raise LoteComprobanteError(
                 "No se pudo inmovilizar el lote para reconciliación."
             )
+        marcar_progreso_lote(self.db, await self.db.get(LoteComprobante, lote_id))
 
     async def reintentar_grupos_fallidos(
         self,
@@ -2443,6 +3028,10 @@ class LoteComprobantesService:
 
         grupos_seleccionados_ids = {int(grupo.id) for grupo in grupos}
         grupos_procesados_ids: set[int] = set()
+        # Cada reintento ajusta estos conteos en lugar de recontar el lote; el
+        # recuento completo queda para el cierre (ver `_verificar_conteos_lote`).
+        conteos = await self._contar_grupos_por_estado(lote_id)
+        conteos_sin_verificar = False
         for grupo in grupos:
             mensajes_previos = list(grupo.mensajes_json or [])
             try:
@@ -2476,6 +3065,8 @@ class LoteComprobantesService:
             if grupo_reclamado is None:
                 continue
             owner_metadata_esperado = operacion_id
+            # Las salidas de error recuentan el lote completo por su cuenta.
+            conteos_sin_verificar = False
 
             try:
                 request = EmitirComprobanteRequest.model_validate(
@@ -2588,6 +3179,7 @@ class LoteComprobantesService:
                             grupos_procesados_ids=grupos_procesados_ids,
                             grupos_rechazo_ids={int(grupo_reclamado.id)},
                         )
+                        conteos_sin_verificar = False
                     elif resultado.requiere_reconciliacion:
                         lote = await self._cerrar_lote_por_incertidumbre_post_arca(
                             lote_id=lote_id,
@@ -2599,9 +3191,14 @@ class LoteComprobantesService:
                                 - (grupos_procesados_ids - {int(grupo_reclamado.id)})
                             ),
                         )
+                        conteos_sin_verificar = False
                     else:
+                        self._registrar_transicion_grupo(
+                            conteos, "fallido", grupo_reclamado.estado
+                        )
                         lote = await self.obtener_lote_resumen(lote_id, empresa_id)
-                        await self._actualizar_estado_lote(lote)
+                        await self._actualizar_estado_lote(lote, conteos)
+                        conteos_sin_verificar = True
                     await self.db.commit()
                 except LoteComprobanteConflictoError:
                     await self.db.rollback()
@@ -2684,6 +3281,10 @@ class LoteComprobantesService:
             ):
                 break
 
+        if conteos_sin_verificar:
+            lote = await self.obtener_lote_resumen(lote_id, empresa_id)
+            await self._verificar_conteos_lote(lote, conteos)
+            await self.db.commit()
         return await self.obtener_lote_resumen(lote_id, empresa_id)
 
     async def descartar_grupos(
@@ -3781,6 +4382,20 @@ class LoteComprobantesService:
             commit=False,
         )
 
+    async def _obtener_puntos_venta_por_id(
+        self, empresa_id: int, punto_venta_ids: set[int]
+    ) -> dict[int, PuntoVenta]:
+        """Carga en una consulta los puntos de venta del emisor por ID."""
+        if not punto_venta_ids:
+            return {}
+        result = await self.db.execute(
+            select(PuntoVenta).where(
+                PuntoVenta.empresa_id == empresa_id,
+                PuntoVenta.id.in_(punto_venta_ids),
+            )
+        )
+        return {punto_venta.id: punto_venta for punto_venta in result.scalars()}
+
     async def _obtener_punto_venta_por_numero(
         self, empresa_id: int, numero: int
     ) -> PuntoVenta | None:
@@ -4186,75 +4801,299 @@ class LoteComprobantesService:
         config_batch = await self._resolver_configuracion_batch_arca(lote, empresa_id)
         self._registrar_metadata_batch_arca(lote, config_batch)
         await self.db.commit()
+        # Los conteos se cuentan una vez y se ajustan con cada transición de
+        # grupo; al cerrar la corrida se verifican contra un recuento completo.
+        conteos = await self._contar_grupos_por_estado(lote_id)
+
+        pendientes: list[GrupoPendienteEmision] = []
+        for grupo in grupos:
+            try:
+                payload = grupo.payload_json or {}
+                request = EmitirComprobanteRequest.model_validate(payload)
+                request = request.model_copy(
+                    update={
+                        "confirmacion_duplicado_logico": (confirmacion_duplicado_logico)
+                    }
+                )
+                estado_anterior = grupo.estado
+                if reanudar and await self._reconciliar_grupo_autorizado_existente(
+                    grupo, request
+                ):
+                    self._registrar_transicion_grupo(
+                        conteos, estado_anterior, grupo.estado
+                    )
+                    await self.db.flush()
+                    await self._actualizar_progreso_lote(lote_id, conteos)
+                    await self.db.commit()
+                    continue
+
+                pendientes.append(
+                    GrupoPendienteEmision(
+                        grupo=grupo,
+                        request=request,
+                        contexto_rece=self._contexto_rece_de_grupo(
+                            grupo,
+                            contextos_rece,
+                        ),
+                    )
+                )
+            except DATABASE_TEMPORARILY_UNAVAILABLE_ERRORS:
+                raise
+            except Exception as exc:  # pragma: no cover - fallback defensivo
+                logger.exception("Error procesando grupo %s", grupo.comprobante_ref)
+                self._registrar_transicion_grupo(conteos, grupo.estado, "fallido")
+                grupo.estado = "fallido"
+                mensaje = (
+                    "El payload fiscal guardado no cumple el contrato vigente. "
+                    "No se solicitó CAE; revisá el lote antes de reintentar."
+                    if isinstance(exc, PydanticValidationError)
+                    else str(exc)
+                )
+                grupo.mensajes_json = [mensaje]
+                await self._marcar_filas(grupo, "fallido", grupo.mensajes_json)
+                await self.db.flush()
+                await self._actualizar_progreso_lote(lote_id, conteos)
+                await self.db.commit()
+
+        grupos_seleccionados_ids = {int(pendiente.grupo.id) for pendiente in pendientes}
+        emision = EmisionLoteEnCurso(
+            lote_id=lote_id,
+            operacion_id=operacion_id,
+            usuario_id=usuario_id,
+            contextos_rece=contextos_rece,
+            config_batch=config_batch,
+            conteos=conteos,
+            grupos_procesados_ids=set(),
+            cortes=[],
+            locks_punto_venta=defaultdict(asyncio.Lock),
+        )
+        await self._emitir_por_claves(
+            self._iterar_sublotes_emision(pendientes, config_batch),
+            emision,
+            fase_solicitud_arca,
+            concurrente=reanudar and procesamiento_async,
+        )
+        rechazo_global_detectado = False
+        incertidumbre_post_arca_detectada = False
+        ids_inciertos = frozenset().union(
+            *(corte.grupo_ids for corte in emision.cortes if not corte.rechazo_global)
+        )
+        if ids_inciertos:
+            lote = await self._cerrar_lote_por_incertidumbre_post_arca(
+                lote_id=lote_id,
+                empresa_id=empresa_id,
+                operacion_id=operacion_id,
+                grupos_seleccionados_ids=grupos_seleccionados_ids,
+                grupos_inmovilizados_ids=(
+                    grupos_seleccionados_ids
+                    - (emision.grupos_procesados_ids - ids_inciertos)
+                ),
+            )
+            incertidumbre_post_arca_detectada = True
+        elif emision.cortes:
+            lote = await self._cerrar_lote_por_rechazo_global(
+                lote_id=lote_id,
+                empresa_id=empresa_id,
+                operacion_id=operacion_id,
+                grupos_seleccionados_ids=grupos_seleccionados_ids,
+                grupos_procesados_ids=emision.grupos_procesados_ids,
+                grupos_rechazo_ids=set().union(
+                    *(corte.grupo_ids for corte in emision.cortes)
+                ),
+            )
+            rechazo_global_detectado = True
+
+        if not rechazo_global_detectado and not incertidumbre_post_arca_detectada:
+            lote = await self.obtener_lote_resumen(lote_id, empresa_id)
+            lote.finished_at = datetime.utcnow()
+            lote.estado = "cargado"
+            await self._verificar_conteos_lote(lote, conteos)
+            self._aplicar_aviso_batch_arca(lote)
+        if reanudar and operacion_id is not None:
+            await self._guardar_respuesta_operacion_background(
+                lote,
+                operacion_id,
+            )
+        if reanudar or (
+            not rechazo_global_detectado and not incertidumbre_post_arca_detectada
+        ):
+            await self.db.commit()
+        else:
+            await self.db.flush()
+        await self.db.refresh(lote)
+        logger.info(
+            "Lote %s finalizado con estado %s: emitidos=%s fallidos=%s",
+            lote.id,
+            lote.estado,
+            lote.grupos_emitidos,
+            lote.grupos_fallidos,
+        )
+        return lote
+
+    async def _emitir_por_claves(
+        self,
+        sublotes: list[list[GrupoPendienteEmision]],
+        emision: EmisionLoteEnCurso,
+        fase_solicitud_arca: FaseSolicitudArca,
+        concurrente: bool,
+    ) -> None:
+        """
+        Emite los sublotes con una cadena por clave de numeración.
+
+        Cada cadena manda los sublotes de su punto de venta y tipo en orden.
+        En el worker, si le tocan varias conexiones, las cadenas corren a la
+        vez, cada una con su sesión y su `FaseSolicitudArca`; si no, se
+        emiten una después de otra en la sesión del lote.
+        """
+        por_clave: dict[tuple[int, int], list[list[GrupoPendienteEmision]]] = {}
+        for sublote in sublotes:
+            request = sublote[0].request
+            clave = (request.punto_venta_id, request.tipo_comprobante)
+            por_clave.setdefault(clave, []).append(sublote)
+        cadenas = list(por_clave.values())
+        concurrencia = self._cadenas_emision_concurrentes() if concurrente else 1
+        if len(cadenas) < 2 or concurrencia < 2:
+            for sublotes_clave in cadenas:
+                if emision.detenida:
+                    break
+                await self._emitir_sublotes(
+                    sublotes_clave, emision, fase_solicitud_arca
+                )
+            return
+
+        # La sesión del lote devuelve su conexión mientras emiten las cadenas.
+        await self.db.commit()
+        semaforo = asyncio.Semaphore(concurrencia)
+        fases = [FaseSolicitudArca() for _ in cadenas]
+        resultados = await asyncio.gather(
+            *(
+                self._emitir_clave_en_sesion_propia(
+                    sublotes_clave, emision, fase, semaforo
+                )
+                for sublotes_clave, fase in zip(cadenas, fases)
+            ),
+            return_exceptions=True,
+        )
+        self.db.expire_all()
+        # La fase del lote adopta al final la guarda de la cadena que falló,
+        # y una ya iniciada en ARCA antes que una que puede recuperarse.
+        error: BaseException | None = None
+        for fase, resultado in sorted(
+            zip(fases, resultados),
+            key=lambda par: (
+                isinstance(par[1], BaseException),
+                par[0].guarda_actual_iniciada,
+            ),
+        ):
+            fase_solicitud_arca.adoptar_guarda(fase)
+            if isinstance(resultado, BaseException):
+                error = resultado
+        if error is not None:
+            raise error
 
-        pendientes: list[GrupoPendienteEmision] = []
-        for grupo in grupos:
+    async def _emitir_clave_en_sesion_propia(
+        self,
+        sublotes: list[list[GrupoPendienteEmision]],
+        emision: EmisionLoteEnCurso,
+        fase_solicitud_arca: FaseSolicitudArca,
+        semaforo: asyncio.Semaphore,
+    ) -> None:
+        """Emite una clave con una sesión del worker propia de la cadena."""
+        async with semaforo:
+            if emision.detenida:
+                return
             try:
-                payload = grupo.payload_json or {}
-                request = EmitirComprobanteRequest.model_validate(payload)
-                request = request.model_copy(
-                    update={
-                        "confirmacion_duplicado_logico": (confirmacion_duplicado_logico)
-                    }
-                )
-                if reanudar and await self._reconciliar_grupo_autorizado_existente(
-                    grupo, request
-                ):
-                    await self.db.flush()
-                    await self._actualizar_progreso_lote(lote_id)
-                    await self.db.commit()
-                    continue
-
-                pendientes.append(
-                    GrupoPendienteEmision(
-                        grupo=grupo,
-                        request=request,
-                        contexto_rece=self._contexto_rece_de_grupo(
-                            grupo,
-                            contextos_rece,
-                        ),
+                async with WorkerSessionLocal() as db:
+                    await acquire_database_connection(db, "worker")
+                    servicio = LoteComprobantesService(db)
+                    await servicio._emitir_sublotes(
+                        await servicio._recargar_sublotes(sublotes),
+                        emision,
+                        fase_solicitud_arca,
                     )
-                )
-            except DATABASE_TEMPORARILY_UNAVAILABLE_ERRORS:
+                    await db.commit()
+            except BaseException:
+                emision.detenida = True
                 raise
-            except Exception as exc:  # pragma: no cover - fallback defensivo
-                logger.exception("Error procesando grupo %s", grupo.comprobante_ref)
-                grupo.estado = "fallido"
-                mensaje = (
-                    "El payload fiscal guardado no cumple el contrato vigente. "
-                    "No se solicitó CAE; revisá el lote antes de reintentar."
-                    if isinstance(exc, PydanticValidationError)
-                    else str(exc)
+
+    async def _recargar_sublotes(
+        self, sublotes: list[list[GrupoPendienteEmision]]
+    ) -> list[list[GrupoPendienteEmision]]:
+        """Trae a esta sesión los grupos de los sublotes, sin cambiar su orden."""
+        grupo_ids = [
+            int(pendiente.grupo.id) for sublote in sublotes for pendiente in sublote
+        ]
+        grupos = {
+            int(grupo.id): grupo
+            for grupo in (
+                await self.db.execute(
+                    select(LoteComprobanteGrupo)
+                    .options(selectinload(LoteComprobanteGrupo.filas))
+                    .where(LoteComprobanteGrupo.id.in_(grupo_ids))
                 )
-                grupo.mensajes_json = [mensaje]
-                await self._marcar_filas(grupo, "fallido", grupo.mensajes_json)
-                await self.db.flush()
-                await self._actualizar_progreso_lote(lote_id)
-                await self.db.commit()
+            ).scalars()
+        }
+        return [
+            [
+                replace(pendiente, grupo=grupos[int(pendiente.grupo.id)])
+                for pendiente in sublote
+            ]
+            for sublote in sublotes
+        ]
 
-        grupos_seleccionados_ids = {int(pendiente.grupo.id) for pendiente in pendientes}
-        grupos_procesados_ids: set[int] = set()
-        rechazo_global_detectado = False
-        incertidumbre_post_arca_detectada = False
-        for sublote in self._iterar_sublotes_emision(pendientes, config_batch):
+    async def _emitir_sublotes(
+        self,
+        sublotes: list[list[GrupoPendienteEmision]],
+        emision: EmisionLoteEnCurso,
+        fase_solicitud_arca: FaseSolicitudArca,
+    ) -> None:
+        """
+        Emite en orden los sublotes de una clave de numeración.
+
+        Deja de enviar apenas esta u otra cadena registra un corte. Un rechazo
+        global o un resultado incierto se registran como corte sin cerrar el
+        lote; lo cierra `procesar_lote` cuando terminaron todas las cadenas.
+        """
+        lote_id = emision.lote_id
+        config_batch = emision.config_batch
+        conteos = emision.conteos
+        grupos_procesados_ids = emision.grupos_procesados_ids
+        requests_por_sublote = [
+            [pendiente.request for pendiente in sublote] for sublote in sublotes
+        ]
+        preparacion = self._anticipar_preparacion_sublote(
+            sublotes, requests_por_sublote, 0, config_batch
+        )
+        for indice_sublote, sublote in enumerate(sublotes):
+            if emision.detenida:
+                return
+            lock_punto_venta = emision.locks_punto_venta[
+                sublote[0].request.punto_venta_id
+            ]
             if self._sublote_requiere_emision_unitaria(sublote, config_batch):
                 for pendiente in sublote:
+                    if emision.detenida:
+                        return
                     resultado: EmitirComprobanteResponse | None = None
                     try:
-                        resultado = await self.facturacion_service.emitir_comprobante(
-                            pendiente.request,
-                            commit=False,
-                            operacion_id=operacion_id,
-                            usuario_id=usuario_id,
-                            lote_id=lote_id,
-                            grupo_id=pendiente.grupo.id,
-                            contexto_rece=pendiente.contexto_rece,
-                            contextos_operacion=contextos_rece,
-                            fase_solicitud_arca=fase_solicitud_arca,
-                        )
+                        async with lock_punto_venta:
+                            resultado = (
+                                await self.facturacion_service.emitir_comprobante(
+                                    pendiente.request,
+                                    commit=False,
+                                    operacion_id=emision.operacion_id,
+                                    usuario_id=emision.usuario_id,
+                                    lote_id=lote_id,
+                                    grupo_id=pendiente.grupo.id,
+                                    contexto_rece=pendiente.contexto_rece,
+                                    contextos_operacion=emision.contextos_rece,
+                                    fase_solicitud_arca=fase_solicitud_arca,
+                                )
+                            )
                         await self._aplicar_resultado_emision_grupo(
                             pendiente.grupo,
                             resultado,
+                            conteos,
                         )
                         grupos_procesados_ids.add(int(pendiente.grupo.id))
                     except DATABASE_TEMPORARILY_UNAVAILABLE_ERRORS:
@@ -4281,6 +5120,7 @@ class LoteComprobantesService:
                         await self._aplicar_resultado_emision_grupo(
                             pendiente.grupo,
                             resultado,
+                            conteos,
                         )
                         grupos_procesados_ids.add(int(pendiente.grupo.id))
 
@@ -4290,55 +5130,58 @@ class LoteComprobantesService:
                         and resultado.categoria_error
                         == "arca_rechazo_global_excluyente"
                     ):
-                        lote = await self._cerrar_lote_por_rechazo_global(
-                            lote_id=lote_id,
-                            empresa_id=empresa_id,
-                            operacion_id=operacion_id,
-                            grupos_seleccionados_ids=grupos_seleccionados_ids,
-                            grupos_procesados_ids=grupos_procesados_ids,
-                            grupos_rechazo_ids={int(pendiente.grupo.id)},
+                        emision.cortar(
+                            CorteEmisionLote(
+                                rechazo_global=True,
+                                grupo_ids=frozenset({int(pendiente.grupo.id)}),
+                            )
                         )
-                        rechazo_global_detectado = True
-                        break
+                        return
 
                     if resultado is not None and resultado.requiere_reconciliacion:
-                        ids_inmovilizados = grupos_seleccionados_ids - (
-                            grupos_procesados_ids - {int(pendiente.grupo.id)}
-                        )
-                        lote = await self._cerrar_lote_por_incertidumbre_post_arca(
-                            lote_id=lote_id,
-                            empresa_id=empresa_id,
-                            operacion_id=operacion_id,
-                            grupos_seleccionados_ids=grupos_seleccionados_ids,
-                            grupos_inmovilizados_ids=ids_inmovilizados,
+                        emision.cortar(
+                            CorteEmisionLote(
+                                rechazo_global=False,
+                                grupo_ids=frozenset({int(pendiente.grupo.id)}),
+                            )
                         )
-                        incertidumbre_post_arca_detectada = True
-                        break
+                        return
 
-                    await self._actualizar_progreso_lote(lote_id)
+                    await self._actualizar_progreso_lote(lote_id, conteos)
                     await self.db.commit()
-                if rechazo_global_detectado or incertidumbre_post_arca_detectada:
-                    break
                 continue
 
+            requests_sublote = requests_por_sublote[indice_sublote]
+            preparado = await self._tomar_preparacion_sublote(
+                preparacion, requests_sublote
+            )
+            # El sublote siguiente de la clave se normaliza mientras este
+            # espera a ARCA; los de una misma clave se envían en orden.
+            preparacion = self._anticipar_preparacion_sublote(
+                sublotes, requests_por_sublote, indice_sublote + 1, config_batch
+            )
             try:
-                resultados = await self.facturacion_service.emitir_comprobantes_lote(
-                    [pendiente.request for pendiente in sublote],
-                    max_registros=config_batch.chunk_size,
-                    contextos=[
-                        {
-                            "operacion_id": operacion_id,
-                            "usuario_id": usuario_id,
-                            "lote_id": lote_id,
-                            "grupo_id": pendiente.grupo.id,
-                            "contexto_rece": pendiente.contexto_rece,
-                            "contextos_operacion": contextos_rece,
-                        }
-                        for pendiente in sublote
-                    ],
-                    fase_solicitud_arca=fase_solicitud_arca,
-                    commit_rechazo_global=False,
-                )
+                async with lock_punto_venta:
+                    resultados = (
+                        await self.facturacion_service.emitir_comprobantes_lote(
+                            requests_sublote,
+                            max_registros=config_batch.chunk_size,
+                            contextos=[
+                                {
+                                    "operacion_id": emision.operacion_id,
+                                    "usuario_id": emision.usuario_id,
+                                    "lote_id": lote_id,
+                                    "grupo_id": pendiente.grupo.id,
+                                    "contexto_rece": pendiente.contexto_rece,
+                                    "contextos_operacion": emision.contextos_rece,
+                                }
+                                for pendiente in sublote
+                            ],
+                            fase_solicitud_arca=fase_solicitud_arca,
+                            commit_rechazo_global=False,
+                            preparado=preparado,
+                        )
+                    )
             except DATABASE_TEMPORARILY_UNAVAILABLE_ERRORS:
                 raise
             except Exception:  # pragma: no cover - fallback defensivo
@@ -4399,69 +5242,26 @@ class LoteComprobantesService:
                 await self._aplicar_resultado_emision_grupo(
                     pendiente.grupo,
                     resultado,
+                    conteos,
                 )
                 grupos_procesados_ids.add(int(pendiente.grupo.id))
                 if es_rechazo_global or hay_incertidumbre or hay_global_parcial:
                     continue
                 await self.db.flush()
-                await self._actualizar_progreso_lote(lote_id)
+                await self._actualizar_progreso_lote(lote_id, conteos)
                 await self.db.commit()
 
             if es_rechazo_global or hay_incertidumbre or hay_global_parcial:
                 await self.db.flush()
-            if es_rechazo_global:
-                lote = await self._cerrar_lote_por_rechazo_global(
-                    lote_id=lote_id,
-                    empresa_id=empresa_id,
-                    operacion_id=operacion_id,
-                    grupos_seleccionados_ids=grupos_seleccionados_ids,
-                    grupos_procesados_ids=grupos_procesados_ids,
-                    grupos_rechazo_ids={
-                        int(pendiente.grupo.id) for pendiente in sublote
-                    },
-                )
-                rechazo_global_detectado = True
-                break
-            if hay_incertidumbre or hay_global_parcial:
-                ids_sublote = {int(pendiente.grupo.id) for pendiente in sublote}
-                lote = await self._cerrar_lote_por_incertidumbre_post_arca(
-                    lote_id=lote_id,
-                    empresa_id=empresa_id,
-                    operacion_id=operacion_id,
-                    grupos_seleccionados_ids=grupos_seleccionados_ids,
-                    grupos_inmovilizados_ids=(
-                        grupos_seleccionados_ids - (grupos_procesados_ids - ids_sublote)
-                    ),
+                emision.cortar(
+                    CorteEmisionLote(
+                        rechazo_global=es_rechazo_global,
+                        grupo_ids=frozenset(
+                            int(pendiente.grupo.id) for pendiente in sublote
+                        ),
+                    )
                 )
-                incertidumbre_post_arca_detectada = True
-                break
-
-        if not rechazo_global_detectado and not incertidumbre_post_arca_detectada:
-            lote = await self.obtener_lote_resumen(lote_id, empresa_id)
-            lote.finished_at = datetime.utcnow()
-            lote.estado = "cargado"
-            await self._actualizar_estado_lote(lote)
-            self._aplicar_aviso_batch_arca(lote)
-        if reanudar and operacion_id is not None:
-            await self._guardar_respuesta_operacion_background(
-                lote,
-                operacion_id,
-            )
-        if reanudar or (
-            not rechazo_global_detectado and not incertidumbre_post_arca_detectada
-        ):
-            await self.db.commit()
-        else:
-            await self.db.flush()
-        await self.db.refresh(lote)
-        logger.info(
-            "Lote %s finalizado con estado %s: emitidos=%s fallidos=%s",
-            lote.id,
-            lote.estado,
-            lote.grupos_emitidos,
-            lote.grupos_fallidos,
-        )
-        return lote
+                return
 
     async def _cerrar_lote_por_incertidumbre_post_arca(
         self,
@@ -5191,13 +5991,17 @@ class LoteComprobantesService:
                 "El lote ya está siendo procesado o fue procesado previamente."
             )
 
-    async def _actualizar_progreso_lote(self, lote_id: int) -> None:
-        """Persiste los contadores parciales mientras un lote se procesa."""
-        result = await self.db.execute(
-            select(LoteComprobante).where(LoteComprobante.id == lote_id)
-        )
-        lote = result.scalar_one()
-        await self._actualizar_estado_lote(lote)
+    async def _actualizar_progreso_lote(
+        self, lote_id: int, conteos: Counter[str]
+    ) -> None:
+        """
+        Persiste los contadores parciales mientras un lote se procesa.
+
+        Usa los conteos llevados en memoria por el procesamiento, así el avance
+        de cada grupo no recuenta todo el lote.
+        """
+        lote = await self.db.get(LoteComprobante, lote_id)
+        await self._actualizar_estado_lote(lote, conteos)
 
     async def _resolver_configuracion_batch_arca(
         self,
@@ -5322,6 +6126,59 @@ class LoteComprobantesService:
 
         return sublotes
 
+    @staticmethod
+    def _cadenas_emision_concurrentes() -> int:
+        """
+        Cadenas de emisión que un lote del worker puede correr a la vez.
+
+        Reparte las conexiones del worker entre los lotes que procesa en
+        paralelo, así las cadenas nunca esperan una conexión del pool. Con
+        SQLite la capacidad es una y las claves se emiten en serie.
+        """
+        capacidad = get_worker_connection_capacity()
+        return max(1, capacidad // min(settings.batch_worker_concurrency, capacidad))
+
+    def _anticipar_preparacion_sublote(
+        self,
+        sublotes: list[list[GrupoPendienteEmision]],
+        requests_por_sublote: list[list[EmitirComprobanteRequest]],
+        desde: int,
+        config: ConfiguracionBatchArca,
+    ) -> PreparacionSubloteEnCurso | None:
+        """Lanza en un thread la preparación del próximo sublote batch."""
+        for indice in range(desde, len(sublotes)):
+            if self._sublote_requiere_emision_unitaria(sublotes[indice], config):
+                continue
+            requests = requests_por_sublote[indice]
+            tarea = asyncio.create_task(
+                asyncio.to_thread(
+                    self.facturacion_service.preparar_sublote_emision,
+                    requests,
+                    config.chunk_size,
+                )
+            )
+            # Si el lote se corta antes de usarla, el error no queda huérfano.
+            tarea.add_done_callback(lambda t: None if t.cancelled() else t.exception())
+            return PreparacionSubloteEnCurso(requests=requests, tarea=tarea)
+        return None
+
+    @staticmethod
+    async def _tomar_preparacion_sublote(
+        preparacion: PreparacionSubloteEnCurso | None,
+        requests: list[EmitirComprobanteRequest],
+    ) -> SubloteEmisionPreparado | None:
+        """Devuelve la preparación anticipada si corresponde a este sublote."""
+        if preparacion is None or preparacion.requests is not requests:
+            return None
+        try:
+            return await preparacion.tarea
+        except Exception as exc:
+            logger.warning(
+                "event=lote_preparacion_sublote_fallida type_error=%s",
+                type(exc).__name__,
+            )
+            return None
+
     @staticmethod
     def _sublote_requiere_emision_unitaria(
         sublote: list[GrupoPendienteEmision],
@@ -5339,8 +6196,14 @@ class LoteComprobantesService:
         self,
         grupo: LoteComprobanteGrupo,
         resultado: EmitirComprobanteResponse,
+        conteos: Counter[str] | None = None,
     ) -> None:
-        """Actualiza grupo y filas según la respuesta de emisión."""
+        """
+        Actualiza grupo y filas según la respuesta de emisión.
+
+        Si recibe los conteos del lote en curso, les aplica la transición.
+        """
+        estado_anterior = grupo.estado
         if resultado.exito:
             grupo.estado = "autorizado"
             grupo.cae = resultado.cae
@@ -5376,6 +6239,7 @@ class LoteComprobantesService:
             grupo.estado = "fallido"
             grupo.mensajes_json = resultado.errores or [resultado.mensaje]
             await self._marcar_filas(grupo, "fallido", grupo.mensajes_json)
+        self._registrar_transicion_grupo(conteos, estado_anterior, grupo.estado)
 
     @staticmethod
     def _sanitizar_valor_excel_observado(value: Any) -> Any:
@@ -5449,15 +6313,37 @@ class LoteComprobantesService:
         formato_version_id: int | None,
     ) -> dict[str, Any]:
         """Lee una plantilla oficial o aplica un formato configurable."""
+        version = None
+        if formato_version_id is not None:
+            version = await self._obtener_version_formato_lote(
+                formato_version_id, empresa.id
+            )
+        return self._abrir_importacion_lote(file_bytes, empresa, version)
+
+    async def _obtener_version_formato_lote(
+        self, formato_version_id: int, empresa_id: int
+    ) -> FormatoImportacionVersion:
+        """Obtiene la versión de formato elegida para el lote."""
+        try:
+            return await FormatosImportacionService(self.db).obtener_version(
+                formato_version_id,
+                empresa_id,
+            )
+        except FormatoImportacionError as exc:
+            raise LoteComprobanteError(str(exc)) from exc
+
+    def _abrir_importacion_lote(
+        self,
+        file_bytes: bytes,
+        empresa: Empresa | EmisorLote,
+        version: FormatoImportacionVersion | None,
+    ) -> dict[str, Any]:
+        """Abre el archivo con la versión elegida o como plantilla oficial."""
         formatos_service = FormatosImportacionService(self.db)
 
-        if formato_version_id is not None:
+        if version is not None:
             try:
-                version = await formatos_service.obtener_version(
-                    formato_version_id,
-                    empresa.id,
-                )
-                importacion = await formatos_service.importar_con_version(
+                importacion = formatos_service.abrir_importacion_con_version(
                     file_bytes,
                     empresa,
                     version,
@@ -5467,6 +6353,13 @@ class LoteComprobantesService:
 
             return self._serializar_importacion_configurable(importacion)
 
+        if not formatos_service.es_libro_excel(file_bytes):
+            raise LoteComprobanteError(
+                "No se pudo leer el archivo Excel. Verificá que sea un .xlsx "
+                "válido. Los archivos CSV/TSV necesitan una plantilla configurada "
+                "para ese tipo de archivo: elegí y confirmá el formato antes de "
+                "validar el lote."
+            )
         try:
             headers = formatos_service.leer_headers(file_bytes)
         except FormatoImportacionError as exc:
@@ -5474,7 +6367,7 @@ class LoteComprobantesService:
 
         if formatos_service.es_plantilla_oficial(headers, self.TEMPLATE_COLUMNS):
             return {
-                "filas": self._leer_excel(file_bytes),
+                "filas": self._iterar_filas_excel(file_bytes),
                 "headers_detectados": headers,
                 "mapeo_usado": {
                     "tipo": "plantilla_oficial",
@@ -5497,7 +6390,7 @@ class LoteComprobantesService:
     ) -> dict[str, Any]:
         """Adapta la importación configurable a metadatos persistibles."""
         return {
-            "filas": importacion.filas,
+            "filas": self._filas_con_errores_de_lote(importacion.filas),
             "headers_detectados": importacion.headers_detectados,
             "mapeo_usado": importacion.mapeo_usado,
             "formato_importacion_id": importacion.formato.id,
@@ -5505,73 +6398,76 @@ class LoteComprobantesService:
             "formato_nombre": importacion.formato.nombre,
         }
 
-    def _leer_excel(self, file_bytes: bytes) -> list[dict[str, Any]]:
-        """Lee y normaliza las filas del Excel."""
+    def _filas_con_errores_de_lote(
+        self, filas: Iterable[dict[str, Any]]
+    ) -> Iterator[dict[str, Any]]:
+        """Informa como error del lote lo que falle al leer filas del formato."""
         try:
-            workbook = load_workbook(
-                BytesIO(file_bytes), data_only=True, read_only=True
-            )
-        except (BadZipFile, InvalidFileException, OSError, ValueError) as exc:
+            yield from filas
+        except FormatoImportacionError as exc:
+            raise LoteComprobanteError(str(exc)) from exc
+
+    def _iterar_filas_excel(self, file_bytes: bytes) -> Iterator[dict[str, Any]]:
+        """
+        Toma la plantilla oficial y devuelve sus filas normalizadas a demanda.
+
+        La hoja sale de `cache_hojas_importacion`: si ya se leyó para detectar
+        el formato o validar encabezados, no se vuelve a parsear. Los
+        encabezados se validan al abrir y las filas se normalizan al consumirse.
+        """
+        try:
+            hoja = cache_hojas_importacion.obtener(file_bytes)
+        except FormatoImportacionError as exc:
             raise LoteComprobanteError(
                 "No se pudo leer el archivo Excel. Verificá que sea un .xlsx válido generado desde la plantilla."
             ) from exc
-        sheet = (
-            workbook["Comprobantes"]
-            if "Comprobantes" in workbook.sheetnames
-            else workbook.active
-        )
-        headers = [self._normalize_header(cell.value) for cell in sheet[1]]
+        headers = [self._normalize_header(value) for value in hoja.fila(1)]
 
         missing = [col for col in self.TEMPLATE_COLUMNS if col not in headers]
         if missing:
             raise LoteComprobanteError(
                 f"Faltan columnas obligatorias en la plantilla: {', '.join(missing)}"
             )
+        return self._leer_filas_plantilla(hoja, headers)
 
-        filas: list[dict[str, Any]] = []
-        for row in sheet.iter_rows(min_row=2, values_only=True):
+    def _leer_filas_plantilla(
+        self, hoja: HojaExcelImportacion, headers: list[str]
+    ) -> Iterator[dict[str, Any]]:
+        """Normaliza fila por fila la hoja ya validada."""
+        for _fila_excel, row in hoja.iterar_filas(desde=2):
             if all(cell in (None, "") for cell in row):
                 continue
-            row_dict = {
+            yield {
                 headers[idx]: self._normalize_cell_value(value)
                 for idx, value in enumerate(row)
                 if idx < len(headers) and headers[idx]
             }
-            filas.append(row_dict)
-            if len(filas) > settings.batch_max_rows:
-                raise LoteComprobanteError(
-                    f"El archivo supera el máximo permitido de {settings.batch_max_rows} filas"
-                )
-
-        if not filas:
-            raise LoteComprobanteError("La plantilla no contiene filas para procesar")
-        return filas
-
-    def _validar_empresa_del_lote(
-        self, filas_excel: list[dict[str, Any]], empresa: Empresa
-    ) -> None:
-        """Verifica que todo el lote pertenezca a la empresa activa."""
-        cuit_esperado = clean_cuit(empresa.cuit)
-        cuit_detectados = {
-            clean_cuit(row.get("empresa_cuit", ""))
-            for row in filas_excel
-            if clean_cuit(row.get("empresa_cuit", ""))
-        }
-
-        if cuit_detectados != {cuit_esperado}:
-            raise LoteComprobanteError(
-                "El archivo mezcla empresas o no coincide con la empresa activa. Revisa la columna empresa_cuit y vuelve a subir el lote."
-            )
 
-    async def _preparar_idempotencia(self, empresa_id: int, archivo_hash: str) -> None:
-        """Evita duplicados y libera reintentos seguros sin CAE emitido."""
+    async def _obtener_lote_por_hash(
+        self, empresa_id: int, archivo_hash: str
+    ) -> LoteComprobante | None:
+        """Busca el lote registrado con el mismo archivo y opciones."""
         result = await self.db.execute(
             select(LoteComprobante).where(
                 LoteComprobante.empresa_id == empresa_id,
                 LoteComprobante.archivo_hash == archivo_hash,
             )
         )
-        lote_existente = result.scalar_one_or_none()
+        return result.scalar_one_or_none()
+
+    async def _verificar_archivo_no_cargado(
+        self, empresa_id: int, archivo_hash: str
+    ) -> None:
+        """Rechaza un archivo ya cargado sin modificar el lote existente."""
+        lote_existente = await self._obtener_lote_por_hash(empresa_id, archivo_hash)
+        if lote_existente is not None and not self._lote_permite_reintento(
+            lote_existente
+        ):
+            raise LoteComprobanteError(self.MENSAJE_ARCHIVO_YA_CARGADO)
+
+    async def _preparar_idempotencia(self, empresa_id: int, archivo_hash: str) -> None:
+        """Evita duplicados y libera reintentos seguros sin CAE emitido."""
+        lote_existente = await self._obtener_lote_por_hash(empresa_id, archivo_hash)
         if lote_existente is None:
             return
 
@@ -5593,9 +6489,7 @@ class LoteComprobantesService:
             await self.db.flush()
             return
 
-        raise LoteComprobanteError(
-            "Ese archivo ya fue cargado previamente. Revisá el lote existente antes de volver a subirlo."
-        )
+        raise LoteComprobanteError(self.MENSAJE_ARCHIVO_YA_CARGADO)
 
     def _lote_permite_reintento(self, lote: LoteComprobante) -> bool:
         """Indica si un lote previo puede reemplazarse por una nueva validación."""
@@ -5617,6 +6511,15 @@ class LoteComprobantesService:
         puntos = result.scalars().all()
         return {punto.numero: punto for punto in puntos}
 
+    async def _exigir_certificado_activo(self, empresa_id: int) -> Certificado:
+        """Exige un certificado activo antes de registrar un lote."""
+        certificado = await self._obtener_certificado_activo(empresa_id)
+        if certificado is None:
+            raise LoteComprobanteError(
+                "No hay un certificado activo para la empresa en el ambiente configurado"
+            )
+        return certificado
+
     async def _obtener_certificado_activo(self, empresa_id: int) -> Certificado | None:
         """Obtiene el certificado activo para el ambiente actual."""
         ambiente = settings.arca_env.strip().lower()
@@ -5641,8 +6544,8 @@ class LoteComprobantesService:
         self,
         comprobante_ref: str,
         rows: list[tuple[int, dict[str, Any]]],
-        empresa: Empresa,
-        puntos_venta: dict[int, PuntoVenta],
+        empresa: Empresa | EmisorLote,
+        puntos_venta: dict[int, PuntoVenta] | dict[int, PuntoVentaLote],
     ) -> dict[str, Any]:
         """Valida un grupo de filas que forman un comprobante."""
         mensajes: list[str] = []
@@ -6198,31 +7101,74 @@ class LoteComprobantesService:
             await self.db.flush()
         return len(grupos)
 
-    async def _actualizar_contadores_lote(
-        self, lote: LoteComprobante
-    ) -> dict[str, int]:
-        """Recalcula contadores del lote desde sus grupos."""
-        conteos = dict(
-            (
-                await self.db.execute(
-                    select(LoteComprobanteGrupo.estado, func.count())
-                    .where(LoteComprobanteGrupo.lote_id == lote.id)
-                    .group_by(LoteComprobanteGrupo.estado)
-                )
-            ).all()
+    async def _contar_grupos_por_estado(self, lote_id: int) -> Counter[str]:
+        """Cuenta los grupos del lote por estado con una consulta agregada."""
+        return Counter(
+            dict(
+                (
+                    await self.db.execute(
+                        select(LoteComprobanteGrupo.estado, func.count())
+                        .where(LoteComprobanteGrupo.lote_id == lote_id)
+                        .group_by(LoteComprobanteGrupo.estado)
+                    )
+                ).all()
+            )
         )
+
+    @staticmethod
+    def _registrar_transicion_grupo(
+        conteos: Counter[str] | None, estado_anterior: str, estado_nuevo: str
+    ) -> None:
+        """Mueve un grupo entre estados en los conteos llevados en memoria."""
+        if conteos is None or estado_anterior == estado_nuevo:
+            return
+        conteos[estado_anterior] -= 1
+        conteos[estado_nuevo] += 1
+
+    async def _verificar_conteos_lote(
+        self, lote: LoteComprobante, conteos: Counter[str]
+    ) -> None:
+        """
+        Recalcula el estado del lote con un recuento completo de sus grupos.
+
+        Es el control de consistencia de los conteos incrementales: cualquier
+        diferencia se registra y el lote queda con los valores recontados.
+        """
+        reales = await self._contar_grupos_por_estado(lote.id)
+        desvio = {
+            estado: reales[estado] - conteos[estado]
+            for estado in sorted(set(reales) | set(conteos))
+            if reales[estado] != conteos[estado]
+        }
+        if desvio:
+            logger.warning(
+                "event=lote_contadores_desvio lote_id=%s desvio=%s",
+                lote.id,
+                desvio,
+            )
+        await self._actualizar_estado_lote(lote, reales)
+
+    async def _actualizar_contadores_lote(
+        self, lote: LoteComprobante, conteos: Counter[str] | None = None
+    ) -> Counter[str]:
+        """
+        Vuelca en el lote los conteos de sus grupos por estado.
+
+        Sin conteos recibidos los recalcula desde la base.
+        """
+        if conteos is None:
+            conteos = await self._contar_grupos_por_estado(lote.id)
         lote.total_grupos = sum(conteos.values())
-        lote.grupos_validos = conteos.get("validado", 0)
-        lote.grupos_con_error = conteos.get("con_error", 0)
-        lote.grupos_emitidos = conteos.get("autorizado", 0)
-        lote.grupos_fallidos = conteos.get("fallido", 0)
-        lote.grupos_reconciliados_externos = conteos.get("autorizado_externo", 0)
-        lote.grupos_descartados = conteos.get("descartado", 0)
+        for estado, contador in CONTADOR_LOTE_POR_ESTADO_GRUPO.items():
+            setattr(lote, contador, conteos.get(estado, 0))
         return conteos
 
-    async def _actualizar_estado_lote(self, lote: LoteComprobante) -> None:
-        """Recalcula contadores y estado del lote."""
-        conteos = await self._actualizar_contadores_lote(lote)
+    async def _actualizar_estado_lote(
+        self, lote: LoteComprobante, conteos: Counter[str] | None = None
+    ) -> None:
+        """Recalcula contadores y estado del lote y programa su publicación."""
+        marcar_progreso_lote(self.db, lote)
+        conteos = await self._actualizar_contadores_lote(lote, conteos)
         grupos_reconciliacion = conteos.get("requiere_reconciliacion", 0)
         grupos_reconciliacion += conteos.get("reintentando", 0)
         grupos_resueltos = (
@@ -6292,7 +7238,7 @@ class LoteComprobantesService:
             lote.mensaje_resumen = "El lote fue cargado."
 
     def _validar_tipo_comprobante_emisor(
-        self, empresa: Empresa, tipo_comprobante: int
+        self, empresa: Empresa | EmisorLote, tipo_comprobante: int
     ) -> str | None:
         """Valida compatibilidad básica entre emisor y tipo de comprobante."""
         condicion = str(empresa.condicion_iva or "").strip().upper()
@@ -6696,3 +7642,65 @@ class LoteComprobantesService:
     def _parse_condicion_iva(self, value: Any) -> str | None:
         normalized = str(value or "").strip().upper()
         return self.CONDICION_IVA_MAP.get(normalized)
+
+
+_servicio_validacion_proceso: LoteComprobantesService | None = None
+
+
+def _servicio_en_proceso() -> LoteComprobantesService:
+    """Servicio sin sesión que reutilizan las validaciones de cada worker."""
+    global _servicio_validacion_proceso
+    if _servicio_validacion_proceso is None:
+        _servicio_validacion_proceso = LoteComprobantesService(None)
+    return _servicio_validacion_proceso
+
+
+def validar_archivo_lote_en_proceso(
+    entrada: EntradaValidacionArchivoLote,
+) -> ArchivoLoteValidado:
+    """Punto de entrada de la validación en workers; no abre sesiones de base."""
+    return _servicio_en_proceso().validar_archivo_lote(entrada)
+
+
+def validar_grupos_en_proceso(tramo: TramoValidacionGrupos) -> list[dict[str, Any]]:
+    """Punto de entrada del pool de validación de grupos."""
+    return _servicio_en_proceso()._validar_tramo(tramo)
+
+
+async def validar_grupos_en_pool(
+    grupos: Sequence[tuple[str, list[tuple[int, dict[str, Any]]]]],
+    emisor: EmisorLote,
+    puntos_venta: dict[int, PuntoVentaLote],
+    pool: Executor | None,
+) -> list[GrupoArchivoValidado]:
+    """
+    Valida grupos por tramos en `pool` sin bloquear el event loop.
+
+    Los workers reciben el emisor y los puntos de venta ya reducidos a
+    dataclasses, sin objetos ORM. `asyncio.gather` devuelve los tramos en el
+    orden en que se enviaron, así que el resultado es idéntico al de la
+    validación en serie. Sin `pool` los tramos corren en threads del loop.
+    """
+    por_tramo = LoteComprobantesService.GRUPOS_POR_TRAMO_VALIDACION
+    tramos = [
+        TramoValidacionGrupos(
+            emisor=emisor,
+            puntos_venta=puntos_venta,
+            grupos=list(grupos[inicio : inicio + por_tramo]),
+        )
+        for inicio in range(0, len(grupos), por_tramo)
+    ]
+    loop = asyncio.get_running_loop()
+    resultados = await asyncio.gather(
+        *(
+            loop.run_in_executor(pool, validar_grupos_en_proceso, tramo)
+            for tramo in tramos
+        )
+    )
+    return [
+        (comprobante_ref, group_result, row_group)
+        for tramo, resultados_tramo in zip(tramos, resultados)
+        for (comprobante_ref, row_group), group_result in zip(
+            tramo.grupos, resultados_tramo
+        )
+    ]
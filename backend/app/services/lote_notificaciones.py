@@ -0,0 +1,324 @@
+"""
+Señales de lotes: cola para despertar al worker y avance para los clientes.
+
+Las dos se publican en proceso al confirmar la transacción y, en PostgreSQL,
+también por `NOTIFY` para los demás procesos que comparten la base.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.schemas.lote_comprobante import LoteComprobanteSeguimientoResponse
+
+logger = logging.getLogger(__name__)
+
+CANAL_LOTES_EN_COLA = "factuflow_lotes_en_cola"
+CANAL_PROGRESO_LOTES = "factuflow_lotes_progreso"
+ESTADOS_LOTE_ACTIVOS = frozenset({"en_cola", "procesando"})
+_CLAVE_SESION_LOTE_ENCOLADO = "factuflow_lote_encolado"
+_CLAVE_SESION_PROGRESO_PENDIENTE = "factuflow_lote_progreso_pendiente"
+_CLAVE_SESION_PROGRESO_CONFIRMADO = "factuflow_lote_progreso_confirmado"
+# Identifica las notificaciones propias para no publicarlas dos veces.
+_ORIGEN_PROCESO = uuid.uuid4().hex
+
+_suscriptores: set[Callable[[], None]] = set()
+_suscriptores_progreso: defaultdict[
+    int, set[Callable[[dict[str, Any]], None]]
+] = defaultdict(set)
+
+
+def suscribir_cola_lotes(callback: Callable[[], None]) -> None:
+    """Registra un callback que se invoca al confirmar un lote en cola."""
+    _suscriptores.add(callback)
+
+
+def desuscribir_cola_lotes(callback: Callable[[], None]) -> None:
+    """Quita un callback registrado."""
+    _suscriptores.discard(callback)
+
+
+def notificar_cola_lotes() -> None:
+    """Despierta a los workers del proceso."""
+    for callback in tuple(_suscriptores):
+        callback()
+
+
+async def marcar_lote_encolado(db: AsyncSession) -> None:
+    """
+    Programa la señal de lote en cola para cuando la transacción confirme.
+
+    La señal en proceso se dispara en `after_commit`, así el worker nunca ve
+    un lote que todavía no es visible. En PostgreSQL también se emite
+    `pg_notify`, que la base entrega recién al confirmar la transacción.
+    """
+    db.sync_session.info[_CLAVE_SESION_LOTE_ENCOLADO] = True
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(
+            text("SELECT pg_notify(:canal, '')"),
+            {"canal": CANAL_LOTES_EN_COLA},
+        )
+
+
+def suscribir_progreso_lote(
+    lote_id: int, callback: Callable[[dict[str, Any]], None]
+) -> None:
+    """Registra un callback que recibe el seguimiento confirmado de un lote."""
+    _suscriptores_progreso[lote_id].add(callback)
+
+
+def desuscribir_progreso_lote(
+    lote_id: int, callback: Callable[[dict[str, Any]], None]
+) -> None:
+    """Quita un callback de avance registrado."""
+    callbacks = _suscriptores_progreso.get(lote_id)
+    if callbacks is None:
+        return
+    callbacks.discard(callback)
+    if not callbacks:
+        del _suscriptores_progreso[lote_id]
+
+
+def publicar_progreso_lote(seguimiento: dict[str, Any]) -> None:
+    """Entrega un seguimiento a los suscriptores del lote en este proceso."""
+    for callback in tuple(_suscriptores_progreso.get(seguimiento["id"], ())):
+        callback(seguimiento)
+
+
+def marcar_progreso_lote(db: AsyncSession, lote: Any) -> None:
+    """
+    Programa la publicación del avance del lote para cuando confirme.
+
+    Solo anota el lote en la sesión: el seguimiento se proyecta una vez por
+    commit con los valores finales, por más cambios que haya tenido antes.
+    """
+    db.sync_session.info.setdefault(_CLAVE_SESION_PROGRESO_PENDIENTE, {})[
+        lote.id
+    ] = lote
+
+
+@event.listens_for(Session, "before_commit")
+def _emitir_progreso_al_confirmar(session: Session) -> None:
+    """
+    Proyecta el avance de los lotes marcados y lo encola para publicarlo.
+
+    En PostgreSQL emite `pg_notify` dentro de la misma transacción; la base lo
+    entrega recién al confirmar y lo descarta si la transacción se revierte.
+    """
+    lotes = session.info.pop(_CLAVE_SESION_PROGRESO_PENDIENTE, None)
+    if not lotes:
+        return
+    session.flush()
+    seguimientos = [
+        LoteComprobanteSeguimientoResponse.model_validate(
+            lote, from_attributes=True
+        ).model_dump(mode="json")
+        for lote in lotes.values()
+        if inspect(lote).persistent
+    ]
+    if session.get_bind().dialect.name == "postgresql":
+        for seguimiento in seguimientos:
+            session.execute(
+                text("SELECT pg_notify(:canal, :payload)"),
+                {
+                    "canal": CANAL_PROGRESO_LOTES,
+                    "payload": json.dumps(
+                        {"origen": _ORIGEN_PROCESO, "seguimiento": seguimiento}
+                    ),
+                },
+            )
+    session.info.setdefault(_CLAVE_SESION_PROGRESO_CONFIRMADO, []).extend(seguimientos)
+
+
+@event.listens_for(Session, "after_commit")
+def _notificar_al_confirmar(session: Session) -> None:
+    """Dispara las señales pendientes tras un commit exitoso."""
+    if session.info.pop(_CLAVE_SESION_LOTE_ENCOLADO, False):
+        notificar_cola_lotes()
+    for seguimiento in session.info.pop(_CLAVE_SESION_PROGRESO_CONFIRMADO, ()):
+        publicar_progreso_lote(seguimiento)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _descartar_al_cerrar(session: Session, transaction: SessionTransaction) -> None:
+    """Descarta las señales si la transacción raíz terminó sin confirmarse."""
+    if transaction.parent is None:
+        session.info.pop(_CLAVE_SESION_LOTE_ENCOLADO, None)
+        session.info.pop(_CLAVE_SESION_PROGRESO_PENDIENTE, None)
+        session.info.pop(_CLAVE_SESION_PROGRESO_CONFIRMADO, None)
+
+
+async def seguir_progreso_lote(
+    lote_id: int,
+    leer_seguimiento: Callable[[], Awaitable[dict[str, Any]]],
+    *,
+    intervalo_refresco: float,
+) -> AsyncIterator[dict[str, Any] | None]:
+    """
+    Entrega el seguimiento de un lote cada vez que cambia.
+
+    Empieza por el estado persistido y sigue con las publicaciones
+    confirmadas. Si pasa `intervalo_refresco` sin novedades vuelve a leer la
+    base, así un cambio que no pasó por `marcar_progreso_lote` también llega;
+    cuando no hay diferencias entrega `None` para que el llamador mantenga
+    viva la conexión. Termina cuando el lote deja de estar activo.
+    """
+    cola: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+
+    def recibir(seguimiento: dict[str, Any]) -> None:
+        loop.call_soon_threadsafe(cola.put_nowait, seguimiento)
+
+    suscribir_progreso_lote(lote_id, recibir)
+    try:
+        ultimo = await leer_seguimiento()
+        yield ultimo
+        while ultimo["estado"] in ESTADOS_LOTE_ACTIVOS:
+            try:
+                seguimiento = await asyncio.wait_for(
+                    cola.get(), timeout=intervalo_refresco
+                )
+            except asyncio.TimeoutError:
+                seguimiento = await leer_seguimiento()
+            if seguimiento == ultimo:
+                yield None
+                continue
+            ultimo = seguimiento
+            yield ultimo
+    finally:
+        desuscribir_progreso_lote(lote_id, recibir)
+
+
+class _EscuchaCanalPostgresql(ABC):
+    """
+    Mantiene un `LISTEN` dedicado sobre un canal de lotes.
+
+    Usa una conexión propia fuera de los pools API y worker: una conexión en
+    `LISTEN` no puede devolverse al pool. Si no se puede abrir o se corta, el
+    llamador sigue con su polling de respaldo y reintenta después.
+    """
+
+    CANAL: str
+    EVENTO_LOG: str
+
+    def __init__(self, engine: AsyncEngine):
+        """Inicializa la escucha sin conectar todavía."""
+        self.engine = engine
+        self._conexion: Any = None
+
+    @property
+    def activa(self) -> bool:
+        """Indica si la conexión de escucha está abierta."""
+        return self._conexion is not None and not self._conexion.is_closed()
+
+    async def iniciar(self) -> bool:
+        """Abre la conexión y suscribe el canal; devuelve si quedó activa."""
+        if self.activa:
+            return True
+        conexion = None
+        try:
+            import asyncpg
+
+            dsn = self.engine.url.set(drivername="postgresql").render_as_string(
+                hide_password=False
+            )
+            conexion = await asyncpg.connect(dsn)
+            await conexion.add_listener(self.CANAL, self._al_notificar)
+        except Exception as exc:
+            logger.warning(
+                "event=%s_listen_no_disponible type_error=%s",
+                self.EVENTO_LOG,
+                type(exc).__name__,
+            )
+            self._conexion = None
+            if conexion is not None:
+                conexion.terminate()
+            return False
+        self._conexion = conexion
+        return True
+
+    async def detener(self) -> None:
+        """Cierra la conexión de escucha si está abierta."""
+        conexion, self._conexion = self._conexion, None
+        if conexion is None or conexion.is_closed():
+            return
+        try:
+            await conexion.close(timeout=5)
+        except Exception as exc:
+            logger.warning(
+                "event=%s_listen_cierre_fallido type_error=%s",
+                self.EVENTO_LOG,
+                type(exc).__name__,
+            )
+
+    @abstractmethod
+    def _al_notificar(self, *args: Any) -> None:
+        """Recibe `(conexion, pid, canal, payload)` desde asyncpg."""
+
+
+class EscuchaColaLotesPostgresql(_EscuchaCanalPostgresql):
+    """Despierta al worker cuando otro proceso confirma un lote en cola."""
+
+    CANAL = CANAL_LOTES_EN_COLA
+    EVENTO_LOG = "lote_worker"
+
+    def __init__(self, engine: AsyncEngine, callback: Callable[[], None]):
+        """Inicializa la escucha con el callback de despertar."""
+        super().__init__(engine)
+        self.callback = callback
+
+    def _al_notificar(self, *_args: Any) -> None:
+        """Traduce la notificación de PostgreSQL en una señal local."""
+        self.callback()
+
+
+class EscuchaProgresoLotesPostgresql(_EscuchaCanalPostgresql):
+    """Reenvía a este proceso el avance confirmado por otros procesos."""
+
+    CANAL = CANAL_PROGRESO_LOTES
+    EVENTO_LOG = "lote_progreso"
+
+    def _al_notificar(self, *args: Any) -> None:
+        """Publica el seguimiento salvo que lo haya emitido este proceso."""
+        try:
+            mensaje = json.loads(args[-1])
+        except (IndexError, TypeError, ValueError):
+            return
+        if mensaje.get("origen") == _ORIGEN_PROCESO:
+            return
+        publicar_progreso_lote(mensaje["seguimiento"])
+
+
+_escucha_progreso: EscuchaProgresoLotesPostgresql | None = None
+_candado_escucha_progreso = asyncio.Lock()
+
+
+async def asegurar_escucha_progreso_lotes(engine: AsyncEngine) -> None:
+    """Abre, o reabre si se cortó, la escucha de avance en PostgreSQL."""
+    global _escucha_progreso
+    if engine.dialect.name != "postgresql":
+        return
+    async with _candado_escucha_progreso:
+        if _escucha_progreso is None:
+            _escucha_progreso = EscuchaProgresoLotesPostgresql(engine)
+        if not _escucha_progreso.activa:
+            await _escucha_progreso.iniciar()
+
+
+async def detener_escucha_progreso_lotes() -> None:
+    """Cierra la escucha de avance si se abrió."""
+    global _escucha_progreso
+    escucha, _escucha_progreso = _escucha_progreso, None
+    if escucha is not None:
+        await escucha.detener()
@@ -0,0 +1,377 @@
+"""Trabajos de validación de lotes fuera del request y del event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Literal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.empresa import Empresa
+from app.models.usuario import Usuario
+from app.services.lote_comprobantes_service import (
+    ArchivoLoteValidado,
+    EmisorLote,
+    EntradaValidacionArchivoLote,
+    GrupoArchivoValidado,
+    LoteComprobanteError,
+    LoteComprobantesService,
+    ParametrosValidacionLote,
+    PuntoVentaLote,
+    validar_archivo_lote_en_proceso,
+    validar_grupos_en_pool,
+)
+
+logger = logging.getLogger(__name__)
+
+EstadoTrabajoValidacionLote = Literal[
+    "en_cola", "validando", "registrando", "completado", "error"
+]
+ESTADOS_TRABAJO_TERMINADOS = frozenset({"completado", "error"})
+
+# Tiempo que un trabajo terminado sigue consultable antes de olvidarse.
+RETENCION_TRABAJOS_SEGUNDOS = 3600
+BYTES_POR_BLOQUE = 1024 * 1024
+MENSAJE_ERROR_INTERNO = (
+    "No se pudo terminar la validación del lote. Intentá subir el archivo "
+    "nuevamente."
+)
+
+
+class ValidacionLoteSaturadaError(Exception):
+    """No se aceptan más trabajos de validación hasta que terminen otros."""
+
+
+@dataclass
+class TrabajoValidacionLote:
+    """Estado de una validación de lote en segundo plano."""
+
+    id: str
+    empresa_id: int
+    usuario_id: int
+    nombre_archivo: str
+    ruta_archivo: Path
+    estado: EstadoTrabajoValidacionLote = "en_cola"
+    creado_at: datetime = field(default_factory=datetime.utcnow)
+    actualizado_at: datetime = field(default_factory=datetime.utcnow)
+    total_filas: int | None = None
+    total_grupos: int | None = None
+    grupos_registrados: int = 0
+    lote_id: int | None = None
+    error: str | None = None
+    finalizado_monotonic: float | None = field(default=None, repr=False)
+    tarea: asyncio.Task[None] | None = field(default=None, repr=False)
+
+    @property
+    def terminado(self) -> bool:
+        """Indica si el trabajo ya no va a cambiar de estado."""
+        return self.estado in ESTADOS_TRABAJO_TERMINADOS
+
+    def registrar_grupos(self, cantidad: int) -> None:
+        """Actualiza cuántos grupos ya quedaron guardados."""
+        self.grupos_registrados = cantidad
+        self.actualizado_at = datetime.utcnow()
+
+    def avanzar(self, estado: EstadoTrabajoValidacionLote) -> None:
+        """Cambia de etapa y registra el momento."""
+        self.estado = estado
+        self.actualizado_at = datetime.utcnow()
+        if self.terminado:
+            self.finalizado_monotonic = time.monotonic()
+
+
+class ValidacionLoteTrabajos:
+    """
+    Acepta archivos de lote y los valida en segundo plano.
+
+    El archivo se vuelca a `STORAGE_TMP_PATH` y el request responde enseguida
+    con el id del trabajo. Leer el Excel, normalizar filas y validar grupos es
+    CPU puro y corre en un pool de procesos; en el event loop quedan solo las
+    consultas previas y el registro del lote, cada uno con una sesión corta.
+    Como esas sesiones salen del pool de la API, a lo sumo `max_sesiones`
+    trabajos las usan a la vez. El estado vive en memoria del proceso de la
+    API, igual que el resto de los recursos en segundo plano.
+    """
+
+    def __init__(self, max_workers: int, max_trabajos: int, max_sesiones: int):
+        """
+        Inicializa el gestor sin crear procesos hasta el primer trabajo.
+
+        Args:
+            max_workers: Procesos de validación. Con 0 se usa un thread.
+            max_trabajos: Trabajos aceptados simultáneamente, en cola o en curso.
+            max_sesiones: Trabajos que pueden tener a la vez una sesión del
+                pool de la API; debe quedar por debajo de su tamaño.
+        """
+        self.max_workers = max_workers
+        self.max_trabajos = max_trabajos
+        self._sesiones = asyncio.Semaphore(max_sesiones)
+        self._pool: Executor | None = None
+        self._trabajos: dict[str, TrabajoValidacionLote] = {}
+
+    def _obtener_pool(self) -> Executor | None:
+        """Crea el pool de procesos de forma diferida."""
+        if self.max_workers == 0:
+            return None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def _descartar_pool(self) -> None:
+        """Libera el pool; el próximo uso crea uno nuevo."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def validar_grupos(
+        self,
+        grupos: list[tuple[str, list[tuple[int, dict[str, Any]]]]],
+        emisor: EmisorLote,
+        puntos_venta: dict[int, PuntoVentaLote],
+    ) -> list[GrupoArchivoValidado]:
+        """
+        Valida por tramos los grupos de un archivo grande en el mismo pool.
+
+        Así la validación sincrónica no abre otro pool de procesos. Si el pool
+        se rompe, se descarta y los tramos se validan en threads.
+        """
+        try:
+            return await validar_grupos_en_pool(
+                grupos, emisor, puntos_venta, self._obtener_pool()
+            )
+        except BrokenProcessPool:
+            logger.warning(
+                "event=lote_validacion_pool_roto workers=%s grupos=%s",
+                self.max_workers,
+                len(grupos),
+            )
+            self._descartar_pool()
+            return await validar_grupos_en_pool(grupos, emisor, puntos_venta, None)
+
+    async def crear(
+        self,
+        *,
+        archivo: BinaryIO,
+        nombre_archivo: str,
+        empresa_id: int,
+        usuario_id: int,
+        parametros: ParametrosValidacionLote,
+    ) -> TrabajoValidacionLote:
+        """
+        Vuelca el archivo a disco y programa su validación.
+
+        Raises:
+            ValidacionLoteSaturadaError: Si hay demasiados trabajos en curso.
+            LoteComprobanteError: Si el archivo supera el tamaño permitido.
+        """
+        self._olvidar_vencidos()
+        en_curso = sum(
+            1 for trabajo in self._trabajos.values() if not trabajo.terminado
+        )
+        if en_curso >= self.max_trabajos:
+            logger.warning(
+                "event=lote_validacion_saturada en_curso=%s limite=%s",
+                en_curso,
+                self.max_trabajos,
+            )
+            raise ValidacionLoteSaturadaError(
+                "Hay demasiadas validaciones de lotes en curso. Intentá "
+                "nuevamente en unos segundos."
+            )
+
+        trabajo_id = uuid.uuid4().hex
+        ruta = _directorio_trabajos(create=True) / f"{trabajo_id}.upload"
+        await asyncio.to_thread(_volcar_archivo, archivo, ruta)
+
+        trabajo = TrabajoValidacionLote(
+            id=trabajo_id,
+            empresa_id=empresa_id,
+            usuario_id=usuario_id,
+            nombre_archivo=nombre_archivo,
+            ruta_archivo=ruta,
+        )
+        self._trabajos[trabajo_id] = trabajo
+        trabajo.tarea = asyncio.create_task(self._ejecutar(trabajo, parametros))
+        return trabajo
+
+    def obtener(self, trabajo_id: str, empresa_id: int) -> TrabajoValidacionLote | None:
+        """Devuelve el trabajo si pertenece a la empresa indicada."""
+        self._olvidar_vencidos()
+        trabajo = self._trabajos.get(trabajo_id)
+        if trabajo is None or trabajo.empresa_id != empresa_id:
+            return None
+        return trabajo
+
+    def metricas(self) -> dict[str, int]:
+        """Cuenta los trabajos conocidos por estado."""
+        conteo = {
+            "workers": self.max_workers,
+            "max_trabajos": self.max_trabajos,
+            "en_cola": 0,
+            "validando": 0,
+            "registrando": 0,
+            "completado": 0,
+            "error": 0,
+        }
+        for trabajo in self._trabajos.values():
+            conteo[trabajo.estado] += 1
+        return conteo
+
+    async def cerrar(self) -> None:
+        """Cancela los trabajos pendientes y libera el pool."""
+        tareas = [
+            trabajo.tarea
+            for trabajo in self._trabajos.values()
+            if trabajo.tarea is not None and not trabajo.tarea.done()
+        ]
+        for tarea in tareas:
+            tarea.cancel()
+        for tarea in tareas:
+            try:
+                await tarea
+            except asyncio.CancelledError:
+                pass
+        self._trabajos.clear()
+        self._descartar_pool()
+
+    async def _ejecutar(
+        self, trabajo: TrabajoValidacionLote, parametros: ParametrosValidacionLote
+    ) -> None:
+        """
+        Valida y registra el lote en tres etapas.
+
+        Las consultas previas y el registro usan sesiones cortas separadas; la
+        validación en el pool corre sin conexión tomada, para que un archivo
+        grande no retenga el pool de la API ni bloquee filas mientras se lee.
+        """
+        iniciado = time.perf_counter()
+        try:
+            async with self._sesiones, AsyncSessionLocal() as db:
+                empresa, _ = await self._obtener_empresa_y_usuario(db, trabajo)
+                preparacion = await LoteComprobantesService(
+                    db
+                ).preparar_validacion_desde_archivo(
+                    trabajo.ruta_archivo, empresa, parametros
+                )
+            archivo = await self._validar_archivo(trabajo, preparacion.entrada)
+            async with self._sesiones, AsyncSessionLocal() as db:
+                empresa, usuario = await self._obtener_empresa_y_usuario(db, trabajo)
+                lote = await LoteComprobantesService(db).registrar_lote_desde_archivo(
+                    preparacion,
+                    archivo,
+                    trabajo.nombre_archivo,
+                    empresa,
+                    usuario,
+                    parametros,
+                    al_registrar_grupos=trabajo.registrar_grupos,
+                )
+                trabajo.lote_id = lote.id
+            trabajo.avanzar("completado")
+        except LoteComprobanteError as exc:
+            trabajo.error = str(exc)
+            trabajo.avanzar("error")
+        except Exception:
+            logger.exception(
+                "event=lote_validacion_trabajo_error trabajo_id=%s empresa_id=%s",
+                trabajo.id,
+                trabajo.empresa_id,
+            )
+            trabajo.error = MENSAJE_ERROR_INTERNO
+            trabajo.avanzar("error")
+        finally:
+            trabajo.ruta_archivo.unlink(missing_ok=True)
+        logger.info(
+            "event=lote_validacion_trabajo trabajo_id=%s estado=%s lote_id=%s "
+            "duracion_ms=%.1f",
+            trabajo.id,
+            trabajo.estado,
+            trabajo.lote_id,
+            (time.perf_counter() - iniciado) * 1000,
+        )
+
+    @staticmethod
+    async def _obtener_empresa_y_usuario(
+        db: AsyncSession, trabajo: TrabajoValidacionLote
+    ) -> tuple[Empresa, Usuario]:
+        """Carga en la sesión la empresa y el usuario del trabajo."""
+        empresa = await db.get(Empresa, trabajo.empresa_id)
+        usuario = await db.get(Usuario, trabajo.usuario_id)
+        if empresa is None or usuario is None:
+            raise LoteComprobanteError(
+                "La empresa o el usuario que subió el archivo ya no existe"
+            )
+        return empresa, usuario
+
+    async def _validar_archivo(
+        self, trabajo: TrabajoValidacionLote, entrada: EntradaValidacionArchivoLote
+    ) -> ArchivoLoteValidado:
+        """Deriva la lectura y validación del archivo al pool."""
+        trabajo.avanzar("validando")
+        loop = asyncio.get_running_loop()
+        archivo = await loop.run_in_executor(
+            self._obtener_pool(), validar_archivo_lote_en_proceso, entrada
+        )
+        trabajo.total_filas = archivo.total_filas
+        trabajo.total_grupos = len(archivo.grupos)
+        trabajo.avanzar("registrando")
+        return archivo
+
+    def _olvidar_vencidos(self) -> None:
+        """Descarta los trabajos terminados hace más de la retención."""
+        limite = time.monotonic() - RETENCION_TRABAJOS_SEGUNDOS
+        vencidos = [
+            trabajo_id
+            for trabajo_id, trabajo in self._trabajos.items()
+            if trabajo.finalizado_monotonic is not None
+            and trabajo.finalizado_monotonic < limite
+        ]
+        for trabajo_id in vencidos:
+            del self._trabajos[trabajo_id]
+
+
+def _directorio_trabajos(create: bool) -> Path:
+    """Directorio temporal donde esperan los archivos subidos."""
+    path = Path(settings.storage_tmp_path).resolve() / "validaciones_lote"
+    if create:
+        path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _volcar_archivo(origen: BinaryIO, destino: Path) -> None:
+    """Copia el upload a disco respetando `BATCH_MAX_UPLOAD_BYTES`."""
+    copiados = 0
+    try:
+        with destino.open("wb") as salida:
+            while bloque := origen.read(BYTES_POR_BLOQUE):
+                copiados += len(bloque)
+                if copiados > settings.batch_max_upload_bytes:
+                    raise LoteComprobanteError(
+                        "El archivo supera el tamaño máximo permitido "
+                        f"de {settings.batch_max_upload_bytes // (1024 * 1024)} MB"
+                    )
+                salida.write(bloque)
+    except BaseException:
+        destino.unlink(missing_ok=True)
+        raise
+
+
+validacion_lote_trabajos = ValidacionLoteTrabajos(
+    max_workers=settings.batch_validation_workers,
+    max_trabajos=settings.batch_validation_max_jobs,
+    # Siempre queda al menos una conexión del pool de la API para requests.
+    max_sesiones=max(1, settings.database_api_pool_size - 1),
+)
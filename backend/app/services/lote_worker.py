@@ -11,19 +11,48 @@ from typing import Literal, TypedDict
 
 from fastapi import FastAPI
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.database import (
     DATABASE_TEMPORARILY_UNAVAILABLE_ERRORS,
     WorkerSessionLocal,
     acquire_database_connection,
+    get_worker_connection_capacity,
+    worker_engine,
 )
-from app.models.lote_comprobante import LoteComprobante
+from app.models.lote_comprobante import LoteComprobante, LoteComprobanteGrupo
 from app.services.facturacion_service import FaseSolicitudArca
 from app.services.lote_comprobantes_service import LoteComprobantesService
+from app.services.lote_notificaciones import (
+    EscuchaColaLotesPostgresql,
+    desuscribir_cola_lotes,
+    suscribir_cola_lotes,
+)
 
 logger = logging.getLogger(__name__)
 
+# Se leen más lotes que el cupo del ciclo para poder alternar emisores.
+VENTANA_COLA_POR_CUPO = 4
+
+ClaveNumeracion = tuple[int, int | None, int | None]
+ResultadoLoteEnCola = Literal["procesado", "error", "db_no_disponible"]
+
+
+def _claves_conflictan(
+    claves: frozenset[ClaveNumeracion], ocupadas: frozenset[ClaveNumeracion]
+) -> bool:
+    """Indica si dos lotes comparten una numeración fiscal o un comodín."""
+    for empresa_id, punto_venta, tipo in claves:
+        for empresa_ocupada, punto_venta_ocupado, tipo_ocupado in ocupadas:
+            if empresa_id != empresa_ocupada:
+                continue
+            if None in (punto_venta, tipo, punto_venta_ocupado, tipo_ocupado):
+                return True
+            if (punto_venta, tipo) == (punto_venta_ocupado, tipo_ocupado):
+                return True
+    return False
+
 
 class LoteWorkerRuntimeStatus(TypedDict):
     """Contrato interno seguro del estado runtime del worker."""
@@ -51,6 +80,7 @@ class ResultadoCicloLoteWorker:
     lotes_en_cola_detectados: int = 0
     lotes_procesados: int = 0
     tuvo_error: bool = False
+    quedan_en_cola: bool = False
 
 
 @dataclass
@@ -75,36 +105,98 @@ class LoteWorker:
 
     def __init__(self) -> None:
         self._stop_event = asyncio.Event()
+        self._despertar_event = asyncio.Event()
         self._runtime = _EstadoRuntimeLoteWorker()
+        self._ultima_empresa_atendida: int | None = None
 
     async def run(self) -> None:
-        """Ejecuta el loop del worker hasta recibir señal de cierre."""
+        """
+        Ejecuta el loop del worker hasta recibir señal de cierre.
+
+        El worker despierta cuando se confirma un lote en cola, ya sea por la
+        señal en proceso o por `LISTEN/NOTIFY` en PostgreSQL. El polling queda
+        como respaldo y se espacia mientras no haya trabajo.
+        """
         logger.info("Worker de lotes iniciado")
-        while not self._stop_event.is_set():
-            try:
-                await self.procesar_pendientes()
-            except Exception as exc:
-                logger.error(
-                    "Falló el ciclo del worker de lotes tipo_error=%s",
-                    type(exc).__name__,
-                )
+        suscribir_cola_lotes(self.despertar)
+        escucha = self._crear_escucha_postgresql()
+        espera = float(settings.batch_worker_poll_seconds)
+        try:
+            while not self._stop_event.is_set():
+                self._despertar_event.clear()
+                if escucha is not None and not escucha.activa:
+                    await escucha.iniciar()
+                resultado: ResultadoCicloLoteWorker | None = None
+                try:
+                    resultado = await self.procesar_pendientes()
+                except Exception as exc:
+                    logger.error(
+                        "Falló el ciclo del worker de lotes tipo_error=%s",
+                        type(exc).__name__,
+                    )
 
-            try:
-                await asyncio.wait_for(
-                    self._stop_event.wait(),
-                    timeout=settings.batch_worker_poll_seconds,
-                )
-            except asyncio.TimeoutError:
-                continue
+                espera = self._calcular_espera(resultado, espera)
+                if espera <= 0:
+                    continue
+                try:
+                    await asyncio.wait_for(
+                        self._despertar_event.wait(),
+                        timeout=espera,
+                    )
+                except asyncio.TimeoutError:
+                    continue
+                espera = float(settings.batch_worker_poll_seconds)
+        finally:
+            desuscribir_cola_lotes(self.despertar)
+            if escucha is not None:
+                await escucha.detener()
 
         logger.info("Worker de lotes detenido")
 
     def stop(self) -> None:
         """Solicita la detención del worker."""
         self._stop_event.set()
+        self._despertar_event.set()
+
+    def despertar(self) -> None:
+        """Adelanta el próximo ciclo sin esperar el polling."""
+        self._despertar_event.set()
+
+    def _calcular_espera(
+        self,
+        resultado: ResultadoCicloLoteWorker | None,
+        espera_actual: float,
+    ) -> float:
+        """
+        Decide cuánto esperar antes del próximo ciclo.
+
+        Si quedaron lotes en cola fuera del cupo del ciclo se repite sin
+        esperar. Un ciclo sin trabajo duplica la espera hasta
+        `BATCH_WORKER_IDLE_MAX_SECONDS`; un error vuelve al intervalo base.
+        """
+        base = float(settings.batch_worker_poll_seconds)
+        if resultado is None or resultado.tuvo_error:
+            return base
+        if resultado.quedan_en_cola:
+            return 0
+        if resultado.lotes_en_cola_detectados or resultado.stale_detectados:
+            return base
+        return min(
+            max(espera_actual, base) * 2,
+            float(max(settings.batch_worker_idle_max_seconds, base)),
+        )
+
+    def _crear_escucha_postgresql(self) -> EscuchaColaLotesPostgresql | None:
+        """Crea la escucha `LISTEN` solo cuando la base es PostgreSQL."""
+        if (
+            not settings.batch_worker_listen_notify
+            or worker_engine.dialect.name != "postgresql"
+        ):
+            return None
+        return EscuchaColaLotesPostgresql(worker_engine, self.despertar)
 
     async def procesar_pendientes(self) -> ResultadoCicloLoteWorker:
-        """Procesa un ciclo secuencial e instrumenta solo memoria del proceso."""
+        """Procesa un ciclo e instrumenta solo memoria del proceso."""
         self._iniciar_ciclo()
         try:
             resultado = await self._procesar_pendientes()
@@ -119,7 +211,13 @@ class LoteWorker:
         return resultado
 
     async def _procesar_pendientes(self) -> ResultadoCicloLoteWorker:
-        """Ejecuta el orden fiscal stale primero y luego cola, sin paralelismo."""
+        """
+        Ejecuta el orden fiscal: stale primero y luego la cola.
+
+        Los lotes en cola corren en paralelo hasta `BATCH_WORKER_CONCURRENCY`,
+        acotado por las conexiones del worker. Solo se serializan lotes que
+        comparten emisor, punto de venta y tipo de comprobante.
+        """
         stale_before = datetime.utcnow() - timedelta(
             minutes=settings.batch_processing_stale_minutes
         )
@@ -184,76 +282,186 @@ class LoteWorker:
                     stale_detectados=stale_detectados,
                 )
 
+        concurrencia = min(
+            settings.batch_worker_concurrency,
+            get_worker_connection_capacity(),
+        )
+        cupo = max(settings.batch_worker_batch_size, concurrencia)
         async with WorkerSessionLocal() as db:
             await acquire_database_connection(db, "worker")
             result = await db.execute(
                 select(LoteComprobante.id, LoteComprobante.empresa_id)
                 .where(LoteComprobante.estado == "en_cola")
                 .order_by(LoteComprobante.created_at)
-                .limit(settings.batch_worker_batch_size)
+                .limit(cupo * VENTANA_COLA_POR_CUPO)
+            )
+            candidatos = self._ordenar_round_robin(
+                [(lote_id, empresa_id) for lote_id, empresa_id in result.all()]
             )
-            pendientes = result.all()
+            pendientes = candidatos[:cupo]
+            claves_por_lote = await self._obtener_claves_numeracion(db, pendientes)
+
+        if pendientes:
+            self._ultima_empresa_atendida = pendientes[-1][1]
 
         lotes_procesados = 0
         tuvo_error = False
-        for lote_id, empresa_id in pendientes:
-            async with WorkerSessionLocal() as db:
-                await acquire_database_connection(db, "worker")
-                service = LoteComprobantesService(db)
-                fase_solicitud_arca = FaseSolicitudArca()
-                try:
-                    logger.info("Worker procesando lote_id=%s", lote_id)
-                    await service.procesar_lote(
-                        lote_id,
-                        empresa_id,
-                        reanudar=True,
-                        fase_solicitud_arca=fase_solicitud_arca,
-                    )
-                    lotes_procesados += 1
-                except DATABASE_TEMPORARILY_UNAVAILABLE_ERRORS:
-                    recuperacion = "no_recuperable"
-                    if not fase_solicitud_arca.guarda_actual_iniciada:
-                        recuperacion = (
-                            await service.recuperar_lote_worker_interrumpido_pre_arca(
-                                lote_id=lote_id,
-                                empresa_id=empresa_id,
-                                guarda_rece_id=fase_solicitud_arca.guarda_rece_id,
-                                guarda_rece_token=(
-                                    fase_solicitud_arca.guarda_rece_token
-                                ),
-                            )
-                        )
-                        fase_solicitud_arca.registrar_recuperacion_pre_arca(
-                            recuperacion
+        db_no_disponible = False
+        en_curso: dict[asyncio.Task, frozenset[ClaveNumeracion]] = {}
+        espera = list(pendientes)
+        try:
+            while espera or en_curso:
+                if not db_no_disponible:
+                    for lote_id, empresa_id in list(espera):
+                        if len(en_curso) >= concurrencia:
+                            break
+                        claves = claves_por_lote[lote_id]
+                        if any(
+                            _claves_conflictan(claves, ocupadas)
+                            for ocupadas in en_curso.values()
+                        ):
+                            continue
+                        espera.remove((lote_id, empresa_id))
+                        tarea = asyncio.create_task(
+                            self._procesar_lote_en_cola(lote_id, empresa_id)
                         )
-                    logger.warning(
-                        "Worker corta el ciclo por indisponibilidad temporal "
-                        "lote_id=%s fase_arca_iniciada=%s recuperacion_pre_arca=%s",
-                        lote_id,
-                        fase_solicitud_arca.iniciada,
-                        fase_solicitud_arca.resultado_recuperacion_pre_arca,
-                    )
-                    return ResultadoCicloLoteWorker(
-                        stale_detectados=stale_detectados,
-                        lotes_en_cola_detectados=len(pendientes),
-                        lotes_procesados=lotes_procesados,
-                        tuvo_error=True,
-                    )
-                except Exception as exc:
-                    tuvo_error = True
-                    logger.error(
-                        "No se pudo procesar lote_id=%s tipo_error=%s",
-                        lote_id,
-                        type(exc).__name__,
-                    )
+                        en_curso[tarea] = claves
+                if not en_curso:
+                    break
+
+                terminadas, _ = await asyncio.wait(
+                    en_curso, return_when=asyncio.FIRST_COMPLETED
+                )
+                for tarea in terminadas:
+                    en_curso.pop(tarea)
+                    resultado = tarea.result()
+                    if resultado == "procesado":
+                        lotes_procesados += 1
+                    elif resultado == "db_no_disponible":
+                        # No se inician más lotes; los que ya están en curso
+                        # terminan su transacción antes de cerrar el ciclo.
+                        db_no_disponible = True
+                        tuvo_error = True
+                    else:
+                        tuvo_error = True
+        finally:
+            for tarea in en_curso:
+                tarea.cancel()
+            if en_curso:
+                await asyncio.gather(*en_curso, return_exceptions=True)
 
         return ResultadoCicloLoteWorker(
             stale_detectados=stale_detectados,
             lotes_en_cola_detectados=len(pendientes),
             lotes_procesados=lotes_procesados,
             tuvo_error=tuvo_error,
+            quedan_en_cola=len(candidatos) > cupo,
         )
 
+    async def _procesar_lote_en_cola(
+        self, lote_id: int, empresa_id: int
+    ) -> ResultadoLoteEnCola:
+        """Procesa un lote con su propia conexión worker."""
+        async with WorkerSessionLocal() as db:
+            await acquire_database_connection(db, "worker")
+            service = LoteComprobantesService(db)
+            fase_solicitud_arca = FaseSolicitudArca()
+            try:
+                logger.info("Worker procesando lote_id=%s", lote_id)
+                await service.procesar_lote(
+                    lote_id,
+                    empresa_id,
+                    reanudar=True,
+                    fase_solicitud_arca=fase_solicitud_arca,
+                )
+                return "procesado"
+            except DATABASE_TEMPORARILY_UNAVAILABLE_ERRORS:
+                recuperacion = "no_recuperable"
+                if not fase_solicitud_arca.guarda_actual_iniciada:
+                    recuperacion = (
+                        await service.recuperar_lote_worker_interrumpido_pre_arca(
+                            lote_id=lote_id,
+                            empresa_id=empresa_id,
+                            guarda_rece_id=fase_solicitud_arca.guarda_rece_id,
+                            guarda_rece_token=(fase_solicitud_arca.guarda_rece_token),
+                        )
+                    )
+                    fase_solicitud_arca.registrar_recuperacion_pre_arca(recuperacion)
+                logger.warning(
+                    "Worker corta el ciclo por indisponibilidad temporal "
+                    "lote_id=%s fase_arca_iniciada=%s recuperacion_pre_arca=%s",
+                    lote_id,
+                    fase_solicitud_arca.iniciada,
+                    fase_solicitud_arca.resultado_recuperacion_pre_arca,
+                )
+                return "db_no_disponible"
+            except Exception as exc:
+                logger.error(
+                    "No se pudo procesar lote_id=%s tipo_error=%s",
+                    lote_id,
+                    type(exc).__name__,
+                )
+                return "error"
+
+    def _ordenar_round_robin(
+        self, pendientes: list[tuple[int, int]]
+    ) -> list[tuple[int, int]]:
+        """
+        Intercala lotes de distintos emisores respetando la antigüedad.
+
+        Los emisores se ordenan por su lote más antiguo y el último emisor
+        atendido pasa al final, así un emisor con muchos lotes en cola no
+        posterga indefinidamente a los demás entre ciclos.
+        """
+        por_empresa: dict[int, list[tuple[int, int]]] = {}
+        for lote_id, empresa_id in pendientes:
+            por_empresa.setdefault(empresa_id, []).append((lote_id, empresa_id))
+
+        empresas = list(por_empresa)
+        if self._ultima_empresa_atendida in por_empresa and len(empresas) > 1:
+            empresas.remove(self._ultima_empresa_atendida)
+            empresas.append(self._ultima_empresa_atendida)
+
+        ordenados: list[tuple[int, int]] = []
+        colas = [por_empresa[empresa_id] for empresa_id in empresas]
+        for ronda in range(max((len(cola) for cola in colas), default=0)):
+            ordenados.extend(cola[ronda] for cola in colas if ronda < len(cola))
+        return ordenados
+
+    async def _obtener_claves_numeracion(
+        self, db: AsyncSession, pendientes: list[tuple[int, int]]
+    ) -> dict[int, frozenset[ClaveNumeracion]]:
+        """
+        Obtiene las numeraciones fiscales que toca cada lote.
+
+        Equivale a la clave que protege `_tomar_lock_numeracion`: el número de
+        punto de venta es único por emisor y ya está presente antes de resolver
+        el snapshot REC-E. Un grupo sin punto de venta o tipo usa un comodín
+        que serializa el lote contra todos los del mismo emisor.
+        """
+        if not pendientes:
+            return {}
+        lote_ids = [lote_id for lote_id, _ in pendientes]
+        claves: dict[int, set[ClaveNumeracion]] = {
+            lote_id: set() for lote_id in lote_ids
+        }
+        result = await db.execute(
+            select(
+                LoteComprobanteGrupo.lote_id,
+                LoteComprobanteGrupo.empresa_id,
+                LoteComprobanteGrupo.punto_venta_numero,
+                LoteComprobanteGrupo.tipo_comprobante,
+            )
+            .where(LoteComprobanteGrupo.lote_id.in_(lote_ids))
+            .distinct()
+        )
+        for lote_id, empresa_id, punto_venta_numero, tipo_comprobante in result.all():
+            claves[lote_id].add((empresa_id, punto_venta_numero, tipo_comprobante))
+        return {
+            lote_id: frozenset(claves[lote_id] or {(empresa_id, None, None)})
+            for lote_id, empresa_id in pendientes
+        }
+
     def _iniciar_ciclo(self) -> None:
         """Inicia medición efímera sin tocar la base."""
         self._runtime.ocupado = True
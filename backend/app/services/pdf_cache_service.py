@@ -0,0 +1,235 @@
+"""Caché en disco de PDFs de comprobantes autorizados."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from pathlib import Path
+from secrets import token_hex
+from typing import Any
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_PDF_PATH = Path(__file__).parent.parent / "templates" / "pdf"
+TEMPLATES_PDF_CACHEADOS = ("factura.html", "styles.css")
+
+# Al superar el límite se poda hasta este porcentaje para no evictar en cada
+# escritura cuando la caché opera llena.
+FRACCION_OBJETIVO_EVICCION = 0.9
+
+
+class PdfCache:
+    """
+    Caché direccionada por contenido para PDFs fiscales inmutables.
+
+    Un comprobante autorizado con CAE no cambia. La clave combina su ID, un
+    digest de los templates del PDF y los datos visibles del emisor y receptor;
+    cualquier cambio en esos insumos produce otra clave y el archivo anterior
+    queda huérfano hasta que la poda LRU lo elimine. La misma clave se usa como
+    ETag HTTP.
+
+    Los métodos públicos son async y hacen el acceso a disco en un hilo. El
+    orden LRU y el total de bytes se llevan en memoria: el directorio se recorre
+    una vez al primer guardado y en `uso()`, nunca al podar.
+    """
+
+    def __init__(
+        self,
+        base_path: str | Path,
+        max_bytes: int,
+        template_path: Path = TEMPLATE_PDF_PATH,
+    ):
+        """
+        Inicializa la caché sin tocar disco.
+
+        Args:
+            base_path: Carpeta administrada donde se guardan los PDFs.
+            max_bytes: Tamaño máximo acumulado. Con 0 la caché queda deshabilitada.
+            template_path: Carpeta de templates cuyo contenido invalida la caché.
+        """
+        self.base_path = Path(base_path)
+        self.max_bytes = max_bytes
+        self.template_path = template_path
+        self._digest_templates: str | None = None
+        # Clave -> tamaño, del menos al más usado recientemente.
+        self._indice: OrderedDict[str, int] | None = None
+        self._bytes_usados = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictados = 0
+
+    @property
+    def habilitada(self) -> bool:
+        """Indica si la caché debe consultarse y escribirse."""
+        return self.max_bytes > 0
+
+    def digest_templates(self) -> str:
+        """Calcula una vez por proceso el digest de los templates del PDF."""
+        if self._digest_templates is None:
+            digest = hashlib.sha256()
+            for nombre in TEMPLATES_PDF_CACHEADOS:
+                path = self.template_path / nombre
+                digest.update(nombre.encode("utf-8"))
+                try:
+                    digest.update(path.read_bytes())
+                except OSError:
+                    digest.update(b"<ausente>")
+            self._digest_templates = digest.hexdigest()
+        return self._digest_templates
+
+    def calcular_clave(
+        self, comprobante_id: int, datos_visibles: dict[str, Any]
+    ) -> str:
+        """Deriva la clave estable del PDF de un comprobante."""
+        payload = json.dumps(
+            {
+                "comprobante_id": comprobante_id,
+                "templates": self.digest_templates(),
+                "datos": datos_visibles,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            default=self._serializar_valor,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def leer(self, clave: str) -> bytes | None:
+        """Devuelve el PDF cacheado y lo marca como usado recientemente."""
+        if not self.habilitada:
+            return None
+        path = self._path_clave(clave)
+        return await asyncio.to_thread(self._leer, clave, path)
+
+    async def guardar(self, clave: str, contenido: bytes) -> None:
+        """Persiste un PDF con escritura atómica y aplica la poda LRU."""
+        if not self.habilitada or len(contenido) > self.max_bytes:
+            return
+        path = self._path_clave(clave)
+        await asyncio.to_thread(self._guardar, clave, path, contenido)
+
+    async def uso(self) -> dict[str, int]:
+        """Devuelve el uso actual de la caché para el gestor de almacenamiento."""
+        return await asyncio.to_thread(self._uso)
+
+    def _leer(self, clave: str, path: Path) -> bytes | None:
+        """Lee el PDF de disco y actualiza el orden LRU."""
+        try:
+            contenido = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._misses += 1
+                if self._indice is not None and clave in self._indice:
+                    self._bytes_usados -= self._indice.pop(clave)
+            return None
+        with self._lock:
+            self._hits += 1
+            if self._indice is not None:
+                # Puede haberlo escrito otro proceso que comparte la carpeta.
+                self._bytes_usados += len(contenido) - self._indice.pop(clave, 0)
+                self._indice[clave] = len(contenido)
+        return contenido
+
+    def _guardar(self, clave: str, path: Path, contenido: bytes) -> None:
+        """Escribe el PDF y poda los menos usados si se supera el límite."""
+        with self._lock:
+            if self._indice is None:
+                self._cargar_indice(self._archivos())
+        tmp_path = path.with_name(f".{path.name}.{token_hex(4)}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(contenido)
+            os.replace(tmp_path, path)
+        except OSError:
+            # La caché es optimización: un fallo de disco no debe romper la descarga.
+            tmp_path.unlink(missing_ok=True)
+            logger.warning("event=pdf_cache_escritura_fallida")
+            return
+
+        with self._lock:
+            self._bytes_usados += len(contenido) - self._indice.pop(clave, 0)
+            self._indice[clave] = len(contenido)
+            if self._bytes_usados > self.max_bytes:
+                self._evictar()
+
+    def _uso(self) -> dict[str, int]:
+        """Recorre la carpeta y resincroniza el índice con lo que hay en disco."""
+        archivos = self._archivos()
+        with self._lock:
+            self._cargar_indice(archivos)
+            return {
+                "bytes_usados": self._bytes_usados,
+                "archivos": len(self._indice),
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictados": self._evictados,
+            }
+
+    def _evictar(self) -> None:
+        """Elimina los PDFs menos usados hasta volver bajo el objetivo."""
+        objetivo = int(self.max_bytes * FRACCION_OBJETIVO_EVICCION)
+        while self._indice and self._bytes_usados > objetivo:
+            clave, size = self._indice.popitem(last=False)
+            try:
+                self._path_clave(clave).unlink(missing_ok=True)
+            except OSError:
+                continue
+            self._bytes_usados -= size
+            self._evictados += 1
+
+    def _cargar_indice(self, archivos: list[tuple[Path, int, float]]) -> None:
+        """Reemplaza el índice por los archivos dados, ordenados por último uso."""
+        self._indice = OrderedDict(
+            (path.stem, size)
+            for path, size, _ in sorted(archivos, key=lambda item: item[2])
+            if self._es_clave(path.stem)
+        )
+        self._bytes_usados = sum(self._indice.values())
+
+    def _archivos(self) -> list[tuple[Path, int, float]]:
+        """Lista PDFs cacheados con tamaño y último uso."""
+        base = self.base_path.resolve()
+        if not base.exists():
+            return []
+        archivos: list[tuple[Path, int, float]] = []
+        for path in base.rglob("*.pdf"):
+            try:
+                stat_result = path.stat()
+            except OSError:
+                continue
+            archivos.append((path, stat_result.st_size, stat_result.st_mtime))
+        return archivos
+
+    def _path_clave(self, clave: str) -> Path:
+        """Resuelve el archivo de una clave con fan-out de un nivel."""
+        if not self._es_clave(clave):
+            raise ValueError("Clave de caché PDF inválida")
+        return self.base_path / clave[:2] / f"{clave}.pdf"
+
+    @staticmethod
+    def _es_clave(clave: str) -> bool:
+        """Indica si el texto es un digest SHA-256 en hexadecimal."""
+        return len(clave) == 64 and all(c in "0123456789abcdef" for c in clave)
+
+    @staticmethod
+    def _serializar_valor(value: Any) -> Any:
+        """Serializa valores no JSON de forma determinística."""
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        return str(value)
+
+
+pdf_cache = PdfCache(
+    base_path=settings.pdf_cache_path,
+    max_bytes=settings.pdf_cache_max_bytes,
+)
@@ -1,7 +1,12 @@
 """Servicio para generación de PDFs de comprobantes."""
 
+import asyncio
 import base64
 import json
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import date
 from decimal import Decimal
 from io import BytesIO
@@ -15,18 +20,70 @@ import qrcode
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from weasyprint import CSS, HTML, default_url_fetcher
 
+from app.core.config import settings
 from app.models.comprobante import Comprobante
 from app.models.empresa import Empresa
+from app.services.pdf_cache_service import PdfCache, pdf_cache
+
+logger = logging.getLogger(__name__)
 
 # URL oficial heredada del QR ARCA.
 ARCA_QR_BASE_URL = "https://www.afip.gob.ar/fe/qr/?p="
 
+# Campos que el template lee de cada entidad. El contexto de render se arma con
+# copias planas de estos valores para poder enviarlo a otro proceso.
+CAMPOS_COMPROBANTE_PDF = (
+    "cae",
+    "cae_vencimiento",
+    "fecha_emision",
+    "fecha_servicio_desde",
+    "fecha_servicio_hasta",
+    "fecha_vto_pago",
+    "otros_impuestos",
+    "subtotal",
+    "total",
+)
+CAMPOS_EMPRESA_PDF = (
+    "razon_social",
+    "condicion_iva",
+    "domicilio",
+    "localidad",
+    "provincia",
+    "inicio_actividades",
+)
+CAMPOS_EMPRESA_CACHE_PDF = (*CAMPOS_EMPRESA_PDF, "cuit", "ingresos_brutos")
+CAMPOS_RECEPTOR_CACHE_PDF = (
+    "razon_social",
+    "tipo_documento",
+    "numero_documento",
+    "condicion_iva",
+    "domicilio",
+    "localidad",
+)
+
+
+class PdfRenderSaturadoError(Exception):
+    """El executor de render alcanzó su límite de trabajos pendientes."""
+
 
 class PDFService:
     """Servicio para generación de PDFs de comprobantes."""
 
-    def __init__(self):
-        """Inicializa el servicio de PDF con el entorno de templates."""
+    def __init__(
+        self,
+        render_executor: "PdfRenderExecutor | None" = None,
+        cache: PdfCache | None = None,
+    ):
+        """
+        Inicializa el servicio de PDF con el entorno de templates.
+
+        Args:
+            render_executor: Executor para el render pesado. Sin executor, el
+                HTML y el PDF se generan en el proceso actual.
+            cache: Caché en disco para PDFs de comprobantes autorizados.
+        """
+        self.render_executor = render_executor
+        self.cache = cache
         template_path = Path(__file__).parent.parent / "templates" / "pdf"
         self.template_path = template_path.resolve()
         self.env = Environment(
@@ -51,18 +108,76 @@ class PDFService:
         Returns:
             Bytes del PDF generado
         """
-        # 1. Generar código QR
-        qr_base64 = self._generar_qr_arca(comprobante)
+        clave_cache = self.calcular_etag_pdf(comprobante, empresa)
+        if clave_cache is not None:
+            pdf_cacheado = await self.cache.leer(clave_cache)
+            if pdf_cacheado is not None:
+                return pdf_cacheado
+
+        contexto = self.preparar_contexto_pdf(comprobante, empresa)
+        if self.render_executor is None:
+            pdf = self.renderizar_contexto_pdf(contexto)
+        else:
+            pdf = await self.render_executor.renderizar(contexto)
+
+        if clave_cache is not None:
+            await self.cache.guardar(clave_cache, pdf)
+        return pdf
+
+    def calcular_etag_pdf(
+        self, comprobante: Comprobante, empresa: Empresa
+    ) -> str | None:
+        """
+        Devuelve la clave de caché del PDF, usable también como ETag.
+
+        Solo los comprobantes autorizados con CAE son inmutables; para el resto
+        no hay clave y el PDF se genera siempre.
+        """
+        if (
+            self.cache is None
+            or not self.cache.habilitada
+            or getattr(comprobante, "estado", None) != "autorizado"
+            or not getattr(comprobante, "cae", None)
+        ):
+            return None
+        receptor = self._get_receptor_pdf(comprobante)
+        datos_visibles = {
+            "empresa": {
+                campo: getattr(empresa, campo, None)
+                for campo in CAMPOS_EMPRESA_CACHE_PDF
+            },
+            "receptor": {
+                campo: getattr(receptor, campo, None)
+                for campo in CAMPOS_RECEPTOR_CACHE_PDF
+            },
+        }
+        return self.cache.calcular_clave(comprobante.id, datos_visibles)
+
+    def nombre_archivo_pdf(self, comprobante: Comprobante) -> str:
+        """Nombre de descarga del PDF de un comprobante."""
+        letra = self._get_letra_comprobante(comprobante.tipo_comprobante)
+        tipo_nombre = self._get_nombre_comprobante(comprobante.tipo_comprobante)
+        return (
+            f"{tipo_nombre}_{letra}_{comprobante.punto_venta.numero:04d}-"
+            f"{comprobante.numero:08d}.pdf"
+        )
+
+    def preparar_contexto_pdf(
+        self, comprobante: Comprobante, empresa: Empresa
+    ) -> dict[str, Any]:
+        """
+        Arma el contexto del template con valores planos y serializables.
 
-        # 2. Preparar datos para el template
+        Resuelve todo lo que depende del ORM en el proceso que tiene la sesión;
+        el render puede ejecutarse luego en un proceso de trabajo.
+        """
         cliente = self._get_receptor_pdf(comprobante)
         receptor_display = self._get_receptor_display(cliente)
-        datos = {
-            "comprobante": comprobante,
-            "empresa": empresa,
-            "cliente": cliente,
+        return {
+            "comprobante": self._snapshot_pdf(comprobante, CAMPOS_COMPROBANTE_PDF),
+            "empresa": self._snapshot_pdf(empresa, CAMPOS_EMPRESA_PDF),
             "items": self._preparar_items_pdf(comprobante.items),
-            "qr_base64": qr_base64,
+            "qr_url": self._generar_qr_url_arca(comprobante),
             "letra": self._get_letra_comprobante(comprobante.tipo_comprobante),
             "tipo_nombre": self._get_nombre_comprobante(comprobante.tipo_comprobante),
             "tipo_codigo": self._get_codigo_comprobante(comprobante.tipo_comprobante),
@@ -80,11 +195,14 @@ class PDFService:
             "ingresos_brutos": getattr(empresa, "ingresos_brutos", None),
         }
 
-        # 3. Renderizar HTML
+    def renderizar_contexto_pdf(self, contexto: dict[str, Any]) -> bytes:
+        """Genera QR, HTML y PDF a partir de un contexto ya preparado."""
+        datos = dict(contexto)
+        datos["qr_base64"] = self._generar_qr_imagen(datos.pop("qr_url"))
+
         template = self.env.get_template("factura.html")
         html_content = template.render(**datos)
 
-        # 4. Convertir a PDF
         css_path = self.template_path / "styles.css"
         stylesheets = []
         if css_path.exists():
@@ -98,6 +216,12 @@ class PDFService:
 
         return pdf
 
+    def _snapshot_pdf(self, entidad: Any, campos: tuple[str, ...]) -> SimpleNamespace:
+        """Copia los campos visibles de una entidad en un objeto plano."""
+        return SimpleNamespace(
+            **{campo: getattr(entidad, campo, None) for campo in campos}
+        )
+
     def _fetch_recurso_pdf(self, url: str, *args: Any, **kwargs: Any) -> dict[str, Any]:
         """Limita recursos de WeasyPrint a datos embebidos o assets del PDF."""
         parsed = urlparse(url)
@@ -236,8 +360,10 @@ class PDFService:
         Returns:
             Imagen QR en base64 para embeber en HTML
         """
-        url_qr = self._generar_qr_url_arca(comprobante)
+        return self._generar_qr_imagen(self._generar_qr_url_arca(comprobante))
 
+    def _generar_qr_imagen(self, url_qr: str) -> str:
+        """Genera la imagen PNG del QR como data URI base64."""
         # Generar imagen QR
         qr = qrcode.QRCode(
             version=1,
@@ -476,5 +602,148 @@ class PDFService:
         return f"{digits[:2]}-{digits[2:10]}-{digits[10]}"
 
 
+_pdf_service_proceso: PDFService | None = None
+
+
+def renderizar_pdf_en_proceso(contexto: dict[str, Any]) -> bytes:
+    """Punto de entrada del render en workers; reutiliza el entorno Jinja."""
+    global _pdf_service_proceso
+    if _pdf_service_proceso is None:
+        _pdf_service_proceso = PDFService()
+    return _pdf_service_proceso.renderizar_contexto_pdf(contexto)
+
+
+class PdfRenderExecutor:
+    """
+    Ejecuta renders de PDF fuera del event loop con cola acotada.
+
+    WeasyPrint consume CPU durante cientos de milisegundos por comprobante. El
+    executor deriva el render a un pool de procesos y rechaza trabajos nuevos
+    cuando la cantidad pendiente alcanza el límite configurado, para que las
+    descargas de PDF no degraden la emisión ni el resto de la API.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_pendientes: int,
+        timeout_seconds: float,
+    ):
+        """
+        Inicializa el executor sin crear procesos hasta el primer render.
+
+        Args:
+            max_workers: Procesos de render. Con 0 se usa un thread del proceso.
+            max_pendientes: Renders aceptados simultáneamente, en curso o en cola.
+            timeout_seconds: Tiempo máximo de espera por render.
+        """
+        self.max_workers = max_workers
+        self.max_pendientes = max_pendientes
+        self.timeout_seconds = timeout_seconds
+        self._pool: Executor | None = None
+        self._pendientes = 0
+        self._renders = 0
+        self._errores = 0
+        self._rechazados = 0
+        self._timeouts = 0
+        self._total_ms = 0.0
+        self._ultimo_ms: float | None = None
+        self._max_ms: float | None = None
+
+    def _obtener_pool(self) -> Executor | None:
+        """Crea el pool de procesos de forma diferida."""
+        if self.max_workers == 0:
+            return None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    async def renderizar(self, contexto: dict[str, Any]) -> bytes:
+        """
+        Renderiza un contexto PDF respetando el límite de pendientes.
+
+        Raises:
+            PdfRenderSaturadoError: Si el executor no admite más trabajos.
+            TimeoutError: Si el render supera el tiempo máximo configurado.
+        """
+        if self._pendientes >= self.max_pendientes:
+            self._rechazados += 1
+            logger.warning(
+                "event=pdf_render_saturado pendientes=%s limite=%s",
+                self._pendientes,
+                self.max_pendientes,
+            )
+            raise PdfRenderSaturadoError(
+                "El generador de PDF está saturado. Intentá nuevamente en unos "
+                "segundos."
+            )
+
+        self._pendientes += 1
+        iniciado = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        render = loop.run_in_executor(
+            self._obtener_pool(), renderizar_pdf_en_proceso, contexto
+        )
+        # El lugar se libera cuando el worker termina, no cuando se deja de
+        # esperar: un render vencido sigue ocupando el proceso.
+        render.add_done_callback(self._liberar_pendiente)
+        try:
+            pdf = await asyncio.wait_for(
+                asyncio.shield(render), timeout=self.timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            self._errores += 1
+            raise
+        except Exception:
+            self._errores += 1
+            raise
+
+        duracion_ms = (time.perf_counter() - iniciado) * 1000
+        self._renders += 1
+        self._total_ms += duracion_ms
+        self._ultimo_ms = duracion_ms
+        self._max_ms = max(self._max_ms or 0.0, duracion_ms)
+        logger.debug("event=pdf_render duracion_ms=%.1f", duracion_ms)
+        return pdf
+
+    def _liberar_pendiente(self, render: asyncio.Future[bytes]) -> None:
+        """Descuenta un render terminado, incluso si nadie esperó su resultado."""
+        self._pendientes -= 1
+        if not render.cancelled():
+            # Marca la excepción como leída cuando el request ya venció.
+            render.exception()
+
+    def metricas(self) -> dict[str, Any]:
+        """Devuelve métricas acumuladas de render para diagnóstico."""
+        return {
+            "workers": self.max_workers,
+            "max_pendientes": self.max_pendientes,
+            "pendientes": self._pendientes,
+            "renders": self._renders,
+            "errores": self._errores,
+            "rechazados": self._rechazados,
+            "timeouts": self._timeouts,
+            "ultimo_ms": self._ultimo_ms,
+            "max_ms": self._max_ms,
+            "promedio_ms": (self._total_ms / self._renders if self._renders else None),
+        }
+
+    def shutdown(self) -> None:
+        """Libera el pool de procesos si fue creado."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+pdf_render_executor = PdfRenderExecutor(
+    max_workers=settings.pdf_render_workers,
+    max_pendientes=settings.pdf_render_max_pending,
+    timeout_seconds=settings.pdf_render_timeout_seconds,
+)
+
 # Instancia global del servicio
-pdf_service = PDFService()
+pdf_service = PDFService(render_executor=pdf_render_executor, cache=pdf_cache)
@@ -1,28 +1,69 @@
 """Servicio para generación de reportes."""
 
+from collections.abc import AsyncIterator
 from datetime import date
 from typing import List, Dict, Any
 from decimal import Decimal
 from calendar import monthrange
 
-from sqlalchemy import select, and_
+from sqlalchemy import and_, case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.models.cliente import Cliente
 from app.models.comprobante import Comprobante
+from app.models.punto_venta import PuntoVenta
+from app.models.resumen_ventas import ResumenVentasDiario
+from app.services.resumen_ventas_service import (
+    calcular_importe_iva_cero,
+    expresion_importe_iva_cero,
+)
 
 # Constantes de alícuotas de IVA
 IVA_21 = Decimal("0.21")
 IVA_10_5 = Decimal("0.105")
 IVA_27 = Decimal("0.27")
 TIPOS_COMPROBANTE_C = {11, 12, 13}
+TIPOS_FACTURA = (1, 6, 11)
+TIPOS_NOTA_CREDITO = (3, 8, 13)
+TIPOS_NOTA_DEBITO = (2, 7, 12)
+TAMANO_TRAMO_EXPORTACION = 500
 
 
 class ReportesService:
-    """Servicio para generación de reportes de ventas e IVA."""
+    """
+    Servicio para generación de reportes de ventas e IVA.
+
+    Los resúmenes de ventas e IVA leen `resumen_ventas_diario` y el ranking
+    agrupa en la base (`GROUP BY`/`SUM`), así su costo depende de la cantidad
+    de grupos y no del volumen de comprobantes. Los comprobantes se cargan
+    como objetos ORM solo cuando se pide el listado de detalle.
+    """
+
+    def _filtros_periodo(self, empresa_id: int, desde: date, hasta: date) -> list:
+        """Condiciones de comprobantes autorizados de la empresa en el período."""
+        return [
+            Comprobante.empresa_id == empresa_id,
+            Comprobante.fecha_emision >= desde,
+            Comprobante.fecha_emision <= hasta,
+            Comprobante.estado == "autorizado",
+        ]
+
+    def _filtros_resumen(self, empresa_id: int, desde: date, hasta: date) -> list:
+        """Condiciones del resumen diario de la empresa en el período."""
+        return [
+            ResumenVentasDiario.empresa_id == empresa_id,
+            ResumenVentasDiario.fecha >= desde,
+            ResumenVentasDiario.fecha <= hasta,
+        ]
 
     async def obtener_comprobantes_por_periodo(
-        self, db: AsyncSession, empresa_id: int, desde: date, hasta: date
+        self,
+        db: AsyncSession,
+        empresa_id: int,
+        desde: date,
+        hasta: date,
+        cargar_items: bool = True,
     ) -> List[Comprobante]:
         """
         Obtiene todos los comprobantes de un período.
@@ -32,25 +73,21 @@ class ReportesService:
             empresa_id: ID de la empresa
             desde: Fecha desde
             hasta: Fecha hasta
+            cargar_items: Si se cargan también los items de cada comprobante
 
         Returns:
             Lista de comprobantes
         """
+        opciones = [
+            selectinload(Comprobante.cliente),
+            selectinload(Comprobante.punto_venta),
+        ]
+        if cargar_items:
+            opciones.append(selectinload(Comprobante.items))
         query = (
             select(Comprobante)
-            .options(
-                selectinload(Comprobante.cliente),
-                selectinload(Comprobante.punto_venta),
-                selectinload(Comprobante.items),
-            )
-            .where(
-                and_(
-                    Comprobante.empresa_id == empresa_id,
-                    Comprobante.fecha_emision >= desde,
-                    Comprobante.fecha_emision <= hasta,
-                    Comprobante.estado == "autorizado",
-                )
-            )
+            .options(*opciones)
+            .where(and_(*self._filtros_periodo(empresa_id, desde, hasta)))
             .order_by(Comprobante.fecha_emision, Comprobante.numero)
         )
 
@@ -58,7 +95,12 @@ class ReportesService:
         return result.scalars().all()
 
     async def generar_reporte_ventas(
-        self, db: AsyncSession, empresa_id: int, desde: date, hasta: date
+        self,
+        db: AsyncSession,
+        empresa_id: int,
+        desde: date,
+        hasta: date,
+        incluir_detalle: bool = True,
     ) -> Dict[str, Any]:
         """
         Genera reporte de ventas por período.
@@ -68,44 +110,63 @@ class ReportesService:
             empresa_id: ID de la empresa
             desde: Fecha desde
             hasta: Fecha hasta
+            incluir_detalle: Si se devuelve el listado de comprobantes
 
         Returns:
             Diccionario con comprobantes y resumen
         """
-        comprobantes = await self.obtener_comprobantes_por_periodo(
-            db, empresa_id, desde, hasta
+        query = (
+            select(
+                ResumenVentasDiario.tipo_comprobante,
+                func.sum(ResumenVentasDiario.cantidad).label("cantidad"),
+                func.sum(ResumenVentasDiario.total).label("total"),
+            )
+            .where(*self._filtros_resumen(empresa_id, desde, hasta))
+            .group_by(ResumenVentasDiario.tipo_comprobante)
         )
+        totales_por_tipo = (await db.execute(query)).all()
 
         # Calcular totales por tipo
         total_facturas = Decimal(0)
         total_nc = Decimal(0)  # Notas de crédito
         total_nd = Decimal(0)  # Notas de débito
+        cantidad_comprobantes = 0
+        for fila in totales_por_tipo:
+            cantidad_comprobantes += fila.cantidad
+            total = Decimal(fila.total or 0)
+            if fila.tipo_comprobante in TIPOS_FACTURA:
+                total_facturas += total
+            elif fila.tipo_comprobante in TIPOS_NOTA_CREDITO:
+                total_nc += total
+            elif fila.tipo_comprobante in TIPOS_NOTA_DEBITO:
+                total_nd += total
 
         comprobantes_list = []
-        for comp in comprobantes:
-            comp_dict = {
-                "id": comp.id,
-                "fecha_emision": comp.fecha_emision.isoformat(),
-                "tipo_comprobante": comp.tipo_comprobante,
-                "tipo_nombre": self._get_nombre_tipo_comprobante(comp.tipo_comprobante),
-                "letra": self._get_letra_comprobante(comp.tipo_comprobante),
-                "punto_venta": comp.punto_venta.numero,
-                "numero": comp.numero,
-                "numero_completo": f"{comp.punto_venta.numero:04d}-{comp.numero:08d}",
-                "cliente_nombre": self._get_receptor_nombre(comp),
-                "subtotal": float(comp.subtotal),
-                "iva_total": float(comp.iva_21 + comp.iva_10_5 + comp.iva_27),
-                "total": float(comp.total),
-            }
-            comprobantes_list.append(comp_dict)
-
-            # Clasificar por tipo
-            if comp.tipo_comprobante in [1, 6, 11]:  # Facturas
-                total_facturas += comp.total
-            elif comp.tipo_comprobante in [3, 8, 13]:  # Notas de crédito
-                total_nc += comp.total
-            elif comp.tipo_comprobante in [2, 7, 12]:  # Notas de débito
-                total_nd += comp.total
+        if incluir_detalle:
+            comprobantes = await self.obtener_comprobantes_por_periodo(
+                db, empresa_id, desde, hasta, cargar_items=False
+            )
+            for comp in comprobantes:
+                comprobantes_list.append(
+                    {
+                        "id": comp.id,
+                        "fecha_emision": comp.fecha_emision.isoformat(),
+                        "tipo_comprobante": comp.tipo_comprobante,
+                        "tipo_nombre": self._get_nombre_tipo_comprobante(
+                            comp.tipo_comprobante
+                        ),
+                        "letra": self._get_letra_comprobante(comp.tipo_comprobante),
+                        "punto_venta": comp.punto_venta.numero,
+                        "numero": comp.numero,
+                        "numero_completo": (
+                            f"{comp.punto_venta.numero:04d}-{comp.numero:08d}"
+                        ),
+                        "cliente_nombre": self._get_receptor_nombre(comp),
+                        "subtotal": float(comp.subtotal),
+                        "iva_total": float(comp.iva_21 + comp.iva_10_5 + comp.iva_27),
+                        "total": float(comp.total),
+                    }
+                )
 
         total_neto = total_facturas + total_nd - total_nc
 
@@ -114,14 +175,19 @@ class ReportesService:
             "total_notas_credito": float(total_nc),
             "total_notas_debito": float(total_nd),
             "total_neto": float(total_neto),
-            "cantidad_comprobantes": len(comprobantes),
+            "cantidad_comprobantes": cantidad_comprobantes,
             "periodo": {"desde": desde.isoformat(), "hasta": hasta.isoformat()},
         }
 
         return {"comprobantes": comprobantes_list, "resumen": resumen}
 
     async def generar_reporte_iva(
-        self, db: AsyncSession, empresa_id: int, periodo_mes: int, periodo_anio: int
+        self,
+        db: AsyncSession,
+        empresa_id: int,
+        periodo_mes: int,
+        periodo_anio: int,
+        incluir_detalle: bool = True,
     ) -> Dict[str, Any]:
         """
         Genera subdiario de IVA ventas para DDJJ.
@@ -131,6 +197,7 @@ class ReportesService:
             empresa_id: ID de la empresa
             periodo_mes: Mes del período (1-12)
             periodo_anio: Año del período
+            incluir_detalle: Si se devuelve el listado de comprobantes
 
         Returns:
             Diccionario con detalle de IVA
@@ -140,9 +207,20 @@ class ReportesService:
         ultimo_dia = monthrange(periodo_anio, periodo_mes)[1]
         hasta = date(periodo_anio, periodo_mes, ultimo_dia)
 
-        comprobantes = await self.obtener_comprobantes_por_periodo(
-            db, empresa_id, desde, hasta
+        query = (
+            select(
+                ResumenVentasDiario.tipo_comprobante,
+                func.sum(ResumenVentasDiario.iva_21).label("iva_21"),
+                func.sum(ResumenVentasDiario.iva_10_5).label("iva_10_5"),
+                func.sum(ResumenVentasDiario.iva_27).label("iva_27"),
+                func.sum(ResumenVentasDiario.importe_iva_cero).label(
+                    "importe_iva_cero"
+                ),
+            )
+            .where(*self._filtros_resumen(empresa_id, desde, hasta))
+            .group_by(ResumenVentasDiario.tipo_comprobante)
         )
+        totales_por_tipo = (await db.execute(query)).all()
 
         # Procesar IVA
         total_gravado_21 = Decimal(0)
@@ -153,56 +231,31 @@ class ReportesService:
         total_iva_27 = Decimal(0)
         total_no_gravado = Decimal(0)
         total_exento = Decimal(0)
+        for fila in totales_por_tipo:
+            signo = self._get_signo_comprobante(fila.tipo_comprobante)
+            iva_21 = Decimal(fila.iva_21 or 0)
+            iva_10_5 = Decimal(fila.iva_10_5 or 0)
+            iva_27 = Decimal(fila.iva_27 or 0)
+            total_gravado_21 += iva_21 / IVA_21 * signo
+            total_gravado_10_5 += iva_10_5 / IVA_10_5 * signo
+            total_gravado_27 += iva_27 / IVA_27 * signo
+            total_iva_21 += iva_21 * signo
+            total_iva_10_5 += iva_10_5 * signo
+            total_iva_27 += iva_27 * signo
+            importe_iva_cero = Decimal(fila.importe_iva_cero or 0) * signo
+            if fila.tipo_comprobante in TIPOS_COMPROBANTE_C:
+                total_exento += importe_iva_cero
+            else:
+                total_no_gravado += importe_iva_cero
 
         comprobantes_list = []
-        for comp in comprobantes:
-            # Calcular neto gravado por cada alícuota
-            signo = self._get_signo_comprobante(comp.tipo_comprobante)
-            gravado_21 = comp.iva_21 / IVA_21 if comp.iva_21 > 0 else Decimal(0)
-            gravado_10_5 = comp.iva_10_5 / IVA_10_5 if comp.iva_10_5 > 0 else Decimal(0)
-            gravado_27 = comp.iva_27 / IVA_27 if comp.iva_27 > 0 else Decimal(0)
-            gravado_21_firmado = gravado_21 * signo
-            gravado_10_5_firmado = gravado_10_5 * signo
-            gravado_27_firmado = gravado_27 * signo
-            iva_21_firmado = comp.iva_21 * signo
-            iva_10_5_firmado = comp.iva_10_5 * signo
-            iva_27_firmado = comp.iva_27 * signo
-            no_gravado, exento = self._calcular_importes_sin_iva(comp)
-            no_gravado_firmado = no_gravado * signo
-            exento_firmado = exento * signo
-
-            comp_dict = {
-                "fecha_emision": comp.fecha_emision.isoformat(),
-                "tipo_letra": self._get_letra_comprobante(comp.tipo_comprobante),
-                "tipo_nombre": self._get_abreviatura_tipo_comprobante(
-                    comp.tipo_comprobante
-                ),
-                "punto_venta": comp.punto_venta.numero,
-                "numero": comp.numero,
-                "numero_completo": f"{comp.punto_venta.numero:04d}-{comp.numero:08d}",
-                "cuit_receptor": self._get_receptor_documento(comp),
-                "razon_social_receptor": self._get_receptor_nombre(comp),
-                "gravado_21": float(gravado_21_firmado),
-                "iva_21": float(iva_21_firmado),
-                "gravado_10_5": float(gravado_10_5_firmado),
-                "iva_10_5": float(iva_10_5_firmado),
-                "gravado_27": float(gravado_27_firmado),
-                "iva_27": float(iva_27_firmado),
-                "no_gravado": float(no_gravado_firmado),
-                "exento": float(exento_firmado),
-                "total": float(comp.total * signo),
-            }
-            comprobantes_list.append(comp_dict)
-
-            # Acumular totales
-            total_gravado_21 += gravado_21_firmado
-            total_iva_21 += iva_21_firmado
-            total_gravado_10_5 += gravado_10_5_firmado
-            total_iva_10_5 += iva_10_5_firmado
-            total_gravado_27 += gravado_27_firmado
-            total_iva_27 += iva_27_firmado
-            total_no_gravado += no_gravado_firmado
-            total_exento += exento_firmado
+        if incluir_detalle:
+            comprobantes = await self.obtener_comprobantes_por_periodo(
+                db, empresa_id, desde, hasta
+            )
+            comprobantes_list = [
+                self._detalle_iva_comprobante(comp) for comp in comprobantes
+            ]
 
         total_neto = (
             total_gravado_21
@@ -233,6 +286,136 @@ class ReportesService:
 
         return {"comprobantes": comprobantes_list, "resumen": resumen}
 
+    async def iterar_detalle_iva(
+        self,
+        db: AsyncSession,
+        empresa_id: int,
+        periodo_mes: int,
+        periodo_anio: int,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Recorre las líneas del subdiario IVA con un cursor del servidor.
+
+        Lee columnas planas por tramos de `TAMANO_TRAMO_EXPORTACION` filas, con
+        la base sin IVA calculada en SQL, así exportar un año entero no carga
+        comprobantes ni items como objetos ORM.
+
+        Args:
+            db: Sesión de base de datos
+            empresa_id: ID de la empresa
+            periodo_mes: Mes del período (1-12)
+            periodo_anio: Año del período
+
+        Yields:
+            Línea del subdiario con el mismo formato que `generar_reporte_iva`
+        """
+        desde = date(periodo_anio, periodo_mes, 1)
+        hasta = date(
+            periodo_anio, periodo_mes, monthrange(periodo_anio, periodo_mes)[1]
+        )
+        query = (
+            select(
+                Comprobante.fecha_emision,
+                Comprobante.tipo_comprobante,
+                Comprobante.numero,
+                Comprobante.iva_21,
+                Comprobante.iva_10_5,
+                Comprobante.iva_27,
+                Comprobante.total,
+                expresion_importe_iva_cero().label("importe_iva_cero"),
+                PuntoVenta.numero.label("punto_venta_numero"),
+                func.coalesce(
+                    func.nullif(Comprobante.receptor_numero_documento, ""),
+                    Cliente.numero_documento,
+                    "0",
+                ).label("documento"),
+                func.coalesce(
+                    func.nullif(Comprobante.receptor_razon_social, ""),
+                    Cliente.razon_social,
+                    "A CONSUMIDOR FINAL",
+                ).label("razon_social"),
+            )
+            .join(PuntoVenta, PuntoVenta.id == Comprobante.punto_venta_id)
+            .outerjoin(Cliente, Cliente.id == Comprobante.cliente_id)
+            .where(*self._filtros_periodo(empresa_id, desde, hasta))
+            .order_by(Comprobante.fecha_emision, Comprobante.numero, Comprobante.id)
+            .execution_options(yield_per=TAMANO_TRAMO_EXPORTACION)
+        )
+        filas = await db.stream(query)
+        async for fila in filas:
+            yield self._linea_iva(
+                fecha_emision=fila.fecha_emision,
+                tipo=fila.tipo_comprobante,
+                punto_venta=fila.punto_venta_numero,
+                numero=fila.numero,
+                documento=fila.documento,
+                razon_social=fila.razon_social,
+                iva_21=Decimal(fila.iva_21),
+                iva_10_5=Decimal(fila.iva_10_5),
+                iva_27=Decimal(fila.iva_27),
+                importe_iva_cero=Decimal(fila.importe_iva_cero or 0),
+                total=Decimal(fila.total),
+            )
+
+    def _detalle_iva_comprobante(self, comp: Comprobante) -> Dict[str, Any]:
+        """Arma la línea del subdiario IVA de un comprobante."""
+        return self._linea_iva(
+            fecha_emision=comp.fecha_emision,
+            tipo=comp.tipo_comprobante,
+            punto_venta=comp.punto_venta.numero,
+            numero=comp.numero,
+            documento=self._get_receptor_documento(comp),
+            razon_social=self._get_receptor_nombre(comp),
+            iva_21=comp.iva_21,
+            iva_10_5=comp.iva_10_5,
+            iva_27=comp.iva_27,
+            importe_iva_cero=calcular_importe_iva_cero(comp, comp.items or []),
+            total=comp.total,
+        )
+
+    def _linea_iva(
+        self,
+        *,
+        fecha_emision: date,
+        tipo: int,
+        punto_venta: int,
+        numero: int,
+        documento: str,
+        razon_social: str,
+        iva_21: Decimal,
+        iva_10_5: Decimal,
+        iva_27: Decimal,
+        importe_iva_cero: Decimal,
+        total: Decimal,
+    ) -> Dict[str, Any]:
+        """Arma una línea del subdiario IVA a partir de importes ya resueltos."""
+        # Calcular neto gravado por cada alícuota
+        signo = self._get_signo_comprobante(tipo)
+        gravado_21 = iva_21 / IVA_21 if iva_21 > 0 else Decimal(0)
+        gravado_10_5 = iva_10_5 / IVA_10_5 if iva_10_5 > 0 else Decimal(0)
+        gravado_27 = iva_27 / IVA_27 if iva_27 > 0 else Decimal(0)
+        no_gravado, exento = self._clasificar_importe_iva_cero(tipo, importe_iva_cero)
+
+        return {
+            "fecha_emision": fecha_emision.isoformat(),
+            "tipo_letra": self._get_letra_comprobante(tipo),
+            "tipo_nombre": self._get_abreviatura_tipo_comprobante(tipo),
+            "punto_venta": punto_venta,
+            "numero": numero,
+            "numero_completo": f"{punto_venta:04d}-{numero:08d}",
+            "cuit_receptor": documento,
+            "razon_social_receptor": razon_social,
+            "gravado_21": float(gravado_21 * signo),
+            "iva_21": float(iva_21 * signo),
+            "gravado_10_5": float(gravado_10_5 * signo),
+            "iva_10_5": float(iva_10_5 * signo),
+            "gravado_27": float(gravado_27 * signo),
+            "iva_27": float(iva_27 * signo),
+            "no_gravado": float(no_gravado * signo),
+            "exento": float(exento * signo),
+            "total": float(total * signo),
+        }
+
     async def obtener_ranking_clientes(
         self,
         db: AsyncSession,
@@ -244,6 +427,9 @@ class ReportesService:
         """
         Obtiene ranking de clientes por facturación.
 
+        Los comprobantes sin cliente se agrupan por documento del receptor. El
+        nombre y documento mostrados salen del primer comprobante del grupo.
+
         Args:
             db: Sesión de base de datos
             empresa_id: ID de la empresa
@@ -254,72 +440,72 @@ class ReportesService:
         Returns:
             Lista de clientes con totales
         """
-        # Obtener todos los comprobantes del período
-        comprobantes = await self.obtener_comprobantes_por_periodo(
-            db, empresa_id, desde, hasta
+        documento_receptor = case(
+            (
+                Comprobante.cliente_id.is_(None),
+                func.coalesce(
+                    func.nullif(Comprobante.receptor_numero_documento, ""), "0"
+                ),
+            ),
+            else_=None,
         )
-
-        # Agrupar por cliente
-        totales_por_cliente = {}
-        for comp in comprobantes:
-            grupo_key = (
-                f"cliente:{comp.cliente.id}"
-                if comp.cliente
-                else f"receptor:{self._get_receptor_documento(comp)}"
+        # Sumar o restar según el tipo
+        importe_firmado = case(
+            (Comprobante.tipo_comprobante.in_(TIPOS_NOTA_CREDITO), -Comprobante.total),
+            (
+                Comprobante.tipo_comprobante.in_(TIPOS_FACTURA + TIPOS_NOTA_DEBITO),
+                Comprobante.total,
+            ),
+            else_=0,
+        )
+        total_facturado = func.sum(importe_firmado)
+        primer_id = func.min(Comprobante.id)
+        query = (
+            select(
+                Comprobante.cliente_id,
+                total_facturado.label("total_facturado"),
+                func.count(Comprobante.id).label("cantidad_comprobantes"),
+                primer_id.label("primer_id"),
             )
-            if grupo_key not in totales_por_cliente:
-                totales_por_cliente[grupo_key] = {
-                    "cliente_id": comp.cliente.id if comp.cliente else 0,
+            .where(*self._filtros_periodo(empresa_id, desde, hasta))
+            .group_by(Comprobante.cliente_id, documento_receptor)
+            .order_by(total_facturado.desc(), primer_id)
+            .limit(limite)
+        )
+        grupos = (await db.execute(query)).all()
+        if not grupos:
+            return []
+
+        # Nombre y documento del receptor, solo para los grupos del ranking
+        query_receptores = (
+            select(Comprobante)
+            .options(selectinload(Comprobante.cliente))
+            .where(Comprobante.id.in_([grupo.primer_id for grupo in grupos]))
+        )
+        receptores = {
+            comp.id: comp
+            for comp in (await db.execute(query_receptores)).scalars().all()
+        }
+
+        ranking = []
+        for grupo in grupos:
+            comp = receptores[grupo.primer_id]
+            ranking.append(
+                {
+                    "cliente_id": grupo.cliente_id or 0,
                     "razon_social": self._get_receptor_nombre(comp),
                     "numero_documento": self._get_receptor_documento(comp),
-                    "total_facturado": Decimal(0),
-                    "cantidad_comprobantes": 0,
+                    "total_facturado": float(grupo.total_facturado or 0),
+                    "cantidad_comprobantes": grupo.cantidad_comprobantes,
                 }
-
-            # Sumar o restar según el tipo
-            if comp.tipo_comprobante in [1, 6, 11]:  # Facturas
-                totales_por_cliente[grupo_key]["total_facturado"] += comp.total
-            elif comp.tipo_comprobante in [3, 8, 13]:  # NC
-                totales_por_cliente[grupo_key]["total_facturado"] -= comp.total
-            elif comp.tipo_comprobante in [2, 7, 12]:  # ND
-                totales_por_cliente[grupo_key]["total_facturado"] += comp.total
-
-            totales_por_cliente[grupo_key]["cantidad_comprobantes"] += 1
-
-        # Ordenar por total y limitar
-        ranking = sorted(
-            totales_por_cliente.values(),
-            key=lambda x: x["total_facturado"],
-            reverse=True,
-        )[:limite]
-
-        # Convertir Decimal a float
-        for item in ranking:
-            item["total_facturado"] = float(item["total_facturado"])
-
+            )
         return ranking
 
-    def _calcular_importes_sin_iva(
-        self, comprobante: Comprobante
+    def _clasificar_importe_iva_cero(
+        self, tipo: int, importe_iva_cero: Decimal
     ) -> tuple[Decimal, Decimal]:
-        """Clasifica bases sin débito fiscal para el subdiario IVA."""
-        total_iva = comprobante.iva_21 + comprobante.iva_10_5 + comprobante.iva_27
-        items = list(comprobante.items or [])
-        if items:
-            importe_iva_cero = sum(
-                (
-                    item.subtotal
-                    for item in items
-                    if item.iva_porcentaje == Decimal("0")
-                ),
-                Decimal(0),
-            )
-        elif total_iva == 0:
-            importe_iva_cero = comprobante.subtotal
-        else:
-            importe_iva_cero = Decimal(0)
-
-        if comprobante.tipo_comprobante in TIPOS_COMPROBANTE_C:
+        """Separa la base sin IVA en no gravado (A/B) o exento (C)."""
+        if tipo in TIPOS_COMPROBANTE_C:
             return Decimal(0), importe_iva_cero
         return importe_iva_cero, Decimal(0)
 
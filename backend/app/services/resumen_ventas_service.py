@@ -0,0 +1,174 @@
+"""Resumen diario de ventas autorizadas para reportes por período."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import Numeric, case, delete, func, insert, select, type_coerce
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Executable
+
+from app.models.comprobante import ESTADO_COMPROBANTE_AUTORIZADO, Comprobante
+from app.models.comprobante_item import ComprobanteItem
+from app.models.resumen_ventas import ResumenVentasDiario
+
+CLAVE_RESUMEN = ("empresa_id", "fecha", "tipo_comprobante", "punto_venta_id")
+COLUMNAS_ACUMULADAS = (
+    "cantidad",
+    "subtotal",
+    "iva_21",
+    "iva_10_5",
+    "iva_27",
+    "importe_iva_cero",
+    "total",
+)
+
+
+def calcular_importe_iva_cero(
+    comprobante: Comprobante, items: Iterable[ComprobanteItem]
+) -> Decimal:
+    """
+    Base sin IVA de un comprobante para el subdiario.
+
+    Con items suma los de alícuota cero; sin items toma el subtotal solo si el
+    comprobante no tiene IVA.
+    """
+    items = list(items)
+    if items:
+        return sum(
+            (item.subtotal for item in items if item.iva_porcentaje == Decimal("0")),
+            Decimal(0),
+        )
+    if comprobante.iva_21 + comprobante.iva_10_5 + comprobante.iva_27 == 0:
+        return comprobante.subtotal
+    return Decimal(0)
+
+
+def expresion_importe_iva_cero():
+    """Equivalente SQL de `calcular_importe_iva_cero` por comprobante."""
+    items_iva_cero = (
+        select(func.coalesce(func.sum(ComprobanteItem.subtotal), 0))
+        .where(
+            ComprobanteItem.comprobante_id == Comprobante.id,
+            ComprobanteItem.iva_porcentaje == 0,
+        )
+        .correlate(Comprobante)
+        .scalar_subquery()
+    )
+    tiene_items = (
+        select(ComprobanteItem.id)
+        .where(ComprobanteItem.comprobante_id == Comprobante.id)
+        .correlate(Comprobante)
+        .exists()
+    )
+    total_iva = Comprobante.iva_21 + Comprobante.iva_10_5 + Comprobante.iva_27
+    return type_coerce(
+        case(
+            (tiene_items, items_iva_cero),
+            (total_iva == 0, Comprobante.subtotal),
+            else_=0,
+        ),
+        Numeric(14, 2),
+    )
+
+
+def sentencias_reconstruccion(empresa_id: int | None = None) -> list[Executable]:
+    """
+    Sentencias que vacían y recalculan el resumen desde `comprobantes`.
+
+    Son sentencias Core, así sirven tanto para la sesión async de la API como
+    para una conexión síncrona de scripts.
+    """
+    filtros = [Comprobante.estado == ESTADO_COMPROBANTE_AUTORIZADO]
+    borrar = delete(ResumenVentasDiario)
+    if empresa_id is not None:
+        filtros.append(Comprobante.empresa_id == empresa_id)
+        borrar = borrar.where(ResumenVentasDiario.empresa_id == empresa_id)
+
+    origen = (
+        select(
+            Comprobante.empresa_id,
+            Comprobante.fecha_emision,
+            Comprobante.tipo_comprobante,
+            Comprobante.punto_venta_id,
+            func.count(Comprobante.id),
+            func.sum(Comprobante.subtotal),
+            func.sum(Comprobante.iva_21),
+            func.sum(Comprobante.iva_10_5),
+            func.sum(Comprobante.iva_27),
+            func.sum(expresion_importe_iva_cero()),
+            func.sum(Comprobante.total),
+        )
+        .where(*filtros)
+        .group_by(
+            Comprobante.empresa_id,
+            Comprobante.fecha_emision,
+            Comprobante.tipo_comprobante,
+            Comprobante.punto_venta_id,
+        )
+    )
+    insertar = insert(ResumenVentasDiario).from_select(
+        [*CLAVE_RESUMEN, *COLUMNAS_ACUMULADAS], origen
+    )
+    return [borrar, insertar]
+
+
+class ResumenVentasService:
+    """Mantiene `resumen_ventas_diario` al ritmo de las autorizaciones."""
+
+    def __init__(self, db: AsyncSession):
+        """Inicializa el servicio sobre la sesión del llamador."""
+        self.db = db
+
+    async def registrar_comprobante(
+        self, comprobante: Comprobante, items: Iterable[ComprobanteItem]
+    ) -> None:
+        """
+        Suma un comprobante autorizado a su fila diaria.
+
+        Corre en la transacción del llamador, así el resumen se confirma o se
+        descarta junto con el comprobante. El upsert evita la carrera entre
+        dos emisiones del mismo día.
+        """
+        if comprobante.estado != ESTADO_COMPROBANTE_AUTORIZADO:
+            return
+        valores: dict[str, Any] = {
+            "empresa_id": comprobante.empresa_id,
+            "fecha": comprobante.fecha_emision,
+            "tipo_comprobante": comprobante.tipo_comprobante,
+            "punto_venta_id": comprobante.punto_venta_id,
+            "cantidad": 1,
+            "subtotal": comprobante.subtotal,
+            "iva_21": comprobante.iva_21,
+            "iva_10_5": comprobante.iva_10_5,
+            "iva_27": comprobante.iva_27,
+            "importe_iva_cero": calcular_importe_iva_cero(comprobante, items),
+            "total": comprobante.total,
+        }
+        dialecto = self.db.get_bind().dialect.name
+        insert_dialecto = (
+            postgresql.insert if dialecto == "postgresql" else sqlite.insert
+        )
+        insertar = insert_dialecto(ResumenVentasDiario).values(**valores)
+        tabla = ResumenVentasDiario.__table__
+        await self.db.execute(
+            insertar.on_conflict_do_update(
+                index_elements=list(CLAVE_RESUMEN),
+                set_={
+                    columna: tabla.c[columna] + insertar.excluded[columna]
+                    for columna in COLUMNAS_ACUMULADAS
+                },
+            )
+        )
+
+    async def reconstruir(self, empresa_id: int | None = None) -> int:
+        """Recalcula el resumen de un emisor, o de todos, y devuelve sus filas."""
+        for sentencia in sentencias_reconstruccion(empresa_id):
+            await self.db.execute(sentencia)
+        contar = select(func.count(ResumenVentasDiario.id))
+        if empresa_id is not None:
+            contar = contar.where(ResumenVentasDiario.empresa_id == empresa_id)
+        return (await self.db.execute(contar)).scalar_one()
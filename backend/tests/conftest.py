@@ -8,6 +8,7 @@ from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 from app.main import app
+from app.arca.cache import get_token_cache
 from app.core.database import Base, _habilitar_foreign_keys_sqlite, get_db
 from app.core.security import get_password_hash
 from app.models.usuario import Usuario
@@ -39,6 +40,7 @@ def event_loop():
     """Create an instance of the default event loop for the test session."""
     loop = asyncio.get_event_loop_policy().new_event_loop()
     yield loop
+    loop.run_until_complete(get_token_cache().aclose())
     loop.close()
 
 
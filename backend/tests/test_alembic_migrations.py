@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+import importlib.util
 import os
 import shutil
 import sqlite3
 import subprocess
 import sys
+from datetime import date
+from decimal import Decimal
 from pathlib import Path
+from types import ModuleType
 
 import pytest
 
@@ -19,6 +23,10 @@ REVISION_ANTERIOR_INTEGRIDAD_FISCAL = "f7a8b9c0d1e2"
 REVISION_INTEGRIDAD_FISCAL = "a8b9c0d1e2f3"
 REVISION_ELEGIBILIDAD_RECE = "b9c0d1e2f3a4"
 REVISION_PF19C_LEGACY = "c0d1e2f3a4b"
+REVISION_LISTADO_COMPROBANTES = "d1e2f3a4b5c6"
+REVISION_RESUMEN_VENTAS = "f3a4b5c6d7e8"
+REVISION_HUELLA_LOGICA = "a4b5c6d7e8f9"
+REVISION_PAGINACION_GRUPOS_LOTE = "b5c6d7e8f9a0"
 COLUMNAS_FORMATOS_LOTE = {
     "mapeo_usado_json",
     "headers_detectados_json",
@@ -57,6 +65,15 @@ def _run_alembic(
     assert result.returncode == 0, result.stdout + result.stderr
 
 
+def _cargar_migracion(revision: str) -> ModuleType:
+    """Importa el módulo de una revisión para usar sus funciones congeladas."""
+    (ruta,) = (BACKEND_DIR / "alembic" / "versions").glob(f"{revision}_*.py")
+    spec = importlib.util.spec_from_file_location(f"migracion_{revision}", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
 def _run_alembic_failure(
     action: str,
     revision: str,
@@ -993,3 +1010,211 @@ def test_sqlite_pf19c_downgrade_no_confunde_json_null_con_evidencia(
         db_path,
         "intentos_emision_fiscal",
     )
+
+
+def test_sqlite_listado_comprobantes_reemplaza_indice_y_downgrade_lo_restaura(
+    tmp_path: Path,
+) -> None:
+    """El índice del listado por clave sustituye al índice previo de empresa y fecha."""
+    db_path = tmp_path / "listado-comprobantes.db"
+    database_url = f"sqlite:///{db_path.resolve().as_posix()}"
+    _run_alembic("upgrade", REVISION_INTEGRIDAD_FISCAL, database_url)
+    backup_env = _backup_env_pf19(db_path, tmp_path / "listado-pf19b-backup.db")
+    _run_alembic(
+        "upgrade",
+        REVISION_ELEGIBILIDAD_RECE,
+        database_url,
+        extra_env=backup_env,
+    )
+    _run_alembic("upgrade", REVISION_LISTADO_COMPROBANTES, database_url)
+
+    def _indices() -> dict[str, list[str]]:
+        with sqlite3.connect(db_path) as conn:
+            nombres = [
+                row[1] for row in conn.execute("PRAGMA index_list(comprobantes)")
+            ]
+            return {
+                nombre: [row[2] for row in conn.execute(f"PRAGMA index_info({nombre})")]
+                for nombre in nombres
+            }
+
+    indices = _indices()
+    assert _alembic_version(db_path) == REVISION_LISTADO_COMPROBANTES
+    assert indices["ix_comprobantes_empresa_fecha_numero_id"] == [
+        "empresa_id",
+        "fecha_emision",
+        "numero",
+        "id",
+    ]
+    assert "ix_comprobantes_empresa_fecha" not in indices
+
+    _run_alembic("downgrade", REVISION_PF19C_LEGACY, database_url)
+    indices = _indices()
+    assert indices["ix_comprobantes_empresa_fecha"] == ["empresa_id", "fecha_emision"]
+    assert "ix_comprobantes_empresa_fecha_numero_id" not in indices
+
+
+def test_sqlite_resumen_ventas_se_completa_con_comprobantes_autorizados(
+    tmp_path: Path,
+) -> None:
+    """La migración del resumen diario acumula lo ya autorizado y es reversible."""
+    db_path = tmp_path / "resumen-ventas.db"
+    database_url = f"sqlite:///{db_path.resolve().as_posix()}"
+    _run_alembic("upgrade", REVISION_INTEGRIDAD_FISCAL, database_url)
+    backup_env = _backup_env_pf19(db_path, tmp_path / "resumen-pf19b-backup.db")
+    _run_alembic(
+        "upgrade",
+        REVISION_ELEGIBILIDAD_RECE,
+        database_url,
+        extra_env=backup_env,
+    )
+    _run_alembic("upgrade", REVISION_LISTADO_COMPROBANTES, database_url)
+    _crear_contexto_fiscal_sintetico(db_path)
+    _insertar_comprobante_sintetico(
+        db_path,
+        estado="autorizado",
+        cae=CAE_SINTETICO,
+        cae_vencimiento=FECHA_SINTETICA,
+    )
+
+    _run_alembic("upgrade", REVISION_RESUMEN_VENTAS, database_url)
+
+    with sqlite3.connect(db_path) as conn:
+        filas = conn.execute(
+            "SELECT empresa_id, fecha, tipo_comprobante, punto_venta_id, cantidad, "
+            "subtotal, iva_21, importe_iva_cero, total FROM resumen_ventas_diario"
+        ).fetchall()
+    assert filas == [(1, FECHA_SINTETICA, 6, 1, 1, 100, 21, 0, 121)]
+
+    _run_alembic("downgrade", REVISION_LISTADO_COMPROBANTES, database_url)
+    assert _alembic_version(db_path) == REVISION_LISTADO_COMPROBANTES
+    with sqlite3.connect(db_path) as conn:
+        tablas = {
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+    assert "resumen_ventas_diario" not in tablas
+
+
+def test_sqlite_huella_logica_se_completa_con_la_regla_de_la_migracion(
+    tmp_path: Path,
+) -> None:
+    """El backfill de huellas aplica la regla congelada en la revisión y es reversible."""
+    db_path = tmp_path / "huella-logica.db"
+    database_url = f"sqlite:///{db_path.resolve().as_posix()}"
+    _run_alembic("upgrade", REVISION_INTEGRIDAD_FISCAL, database_url)
+    backup_env = _backup_env_pf19(db_path, tmp_path / "huella-pf19b-backup.db")
+    _run_alembic(
+        "upgrade",
+        REVISION_ELEGIBILIDAD_RECE,
+        database_url,
+        extra_env=backup_env,
+    )
+    _run_alembic("upgrade", REVISION_RESUMEN_VENTAS, database_url)
+    _crear_contexto_fiscal_sintetico(db_path)
+    _insertar_comprobante_sintetico(
+        db_path,
+        estado="autorizado",
+        cae=CAE_SINTETICO,
+        cae_vencimiento=FECHA_SINTETICA,
+    )
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            """
+            INSERT INTO comprobante_items (
+                id, codigo, descripcion, cantidad, unidad, precio_unitario,
+                descuento_porcentaje, iva_porcentaje, subtotal, orden,
+                comprobante_id
+            ) VALUES (1, NULL, ' Servicio ', 1.5, 'unidad', 66.6667, 0, 21, 100, 0, 1)
+            """
+        )
+
+    _run_alembic("upgrade", REVISION_HUELLA_LOGICA, database_url)
+
+    migracion = _cargar_migracion(REVISION_HUELLA_LOGICA)
+    esperado = migracion._huella_comprobante(
+        {
+            "empresa_id": 1,
+            "tipo_comprobante": 6,
+            "punto_venta_numero": 41,
+            "fecha_emision": date.fromisoformat(FECHA_SINTETICA),
+            "receptor_tipo_documento": None,
+            "receptor_numero_documento": None,
+            "total": Decimal("121.00"),
+        },
+        [
+            {
+                "codigo": None,
+                "descripcion": " Servicio ",
+                "cantidad": Decimal("1.5000"),
+                "precio_unitario": Decimal("66.6667"),
+                "descuento_porcentaje": Decimal("0.00"),
+                "iva_porcentaje": Decimal("21.00"),
+                "orden": 0,
+            }
+        ],
+    )
+    with sqlite3.connect(db_path) as conn:
+        huella = conn.execute(
+            "SELECT huella_logica FROM comprobantes WHERE id = 1"
+        ).fetchone()[0]
+    assert huella == esperado
+    with sqlite3.connect(db_path) as conn:
+        indices = {row[1] for row in conn.execute("PRAGMA index_list(comprobantes)")}
+    assert "ix_comprobantes_empresa_huella_logica" in indices
+
+    _run_alembic("downgrade", REVISION_RESUMEN_VENTAS, database_url)
+    assert _alembic_version(db_path) == REVISION_RESUMEN_VENTAS
+    assert "huella_logica" not in _table_columns(db_path, "comprobantes")
+
+
+def test_sqlite_paginacion_grupos_lote_agrega_indices_y_downgrade_los_quita(
+    tmp_path: Path,
+) -> None:
+    """Los grupos de lote quedan indexados por su clave de orden."""
+    db_path = tmp_path / "paginacion-grupos.db"
+    database_url = f"sqlite:///{db_path.resolve().as_posix()}"
+    _run_alembic("upgrade", REVISION_INTEGRIDAD_FISCAL, database_url)
+    backup_env = _backup_env_pf19(db_path, tmp_path / "grupos-pf19b-backup.db")
+    _run_alembic(
+        "upgrade",
+        REVISION_ELEGIBILIDAD_RECE,
+        database_url,
+        extra_env=backup_env,
+    )
+    _run_alembic("upgrade", REVISION_PAGINACION_GRUPOS_LOTE, database_url)
+
+    def _indices(tabla: str) -> dict[str, list[str]]:
+        with sqlite3.connect(db_path) as conn:
+            nombres = [row[1] for row in conn.execute(f"PRAGMA index_list({tabla})")]
+            return {
+                nombre: [row[2] for row in conn.execute(f"PRAGMA index_info({nombre})")]
+                for nombre in nombres
+            }
+
+    assert _alembic_version(db_path) == REVISION_PAGINACION_GRUPOS_LOTE
+    grupos = _indices("lotes_comprobantes_grupos")
+    assert grupos["ix_lotes_comprobantes_grupos_lote_orden"] == [
+        "lote_id",
+        "orden",
+        "id",
+    ]
+    assert grupos["ix_lotes_comprobantes_grupos_lote_estado_orden"] == [
+        "lote_id",
+        "estado",
+        "orden",
+        "id",
+    ]
+    assert _indices("lotes_comprobantes_filas")[
+        "ix_lotes_comprobantes_filas_grupo"
+    ] == ["grupo_id"]
+
+    _run_alembic("downgrade", REVISION_HUELLA_LOGICA, database_url)
+    assert "ix_lotes_comprobantes_grupos_lote_orden" not in _indices(
+        "lotes_comprobantes_grupos"
+    )
+    assert "ix_lotes_comprobantes_filas_grupo" not in _indices(
+        "lotes_comprobantes_filas"
+    )
@@ -1,5 +1,7 @@
 """Tests para el cache de tokens de ARCA."""
 
+import asyncio
+import json
 import os
 import stat
 
@@ -14,9 +16,21 @@ from app.arca.models import TicketAcceso
 class TestTokenCache:
     """Tests para TokenCache."""
 
-    def build_cache(self, tmp_path):
+    @pytest.fixture(autouse=True)
+    async def cerrar_caches(self):
+        """Cierra los caches del test para no dejar volcados pendientes."""
+        self.caches: list[TokenCache] = []
+        yield
+        for cache in self.caches:
+            await cache.aclose()
+
+    def build_cache(self, tmp_path, **kwargs):
         """Crea una instancia aislada del cache para tests."""
-        return TokenCache(storage_path=str(tmp_path / "arca-token-cache.json"))
+        cache = TokenCache(
+            storage_path=str(tmp_path / "arca-token-cache.json"), **kwargs
+        )
+        self.caches.append(cache)
+        return cache
 
     async def test_set_and_get_token(self, tmp_path):
         """Debe guardar y recuperar un token."""
@@ -182,6 +196,7 @@ class TestTokenCache:
         )
 
         await cache.set("persisted_key", ticket)
+        await cache.flush()
 
         reloaded = self.build_cache(tmp_path)
         restored_ticket = await reloaded.get("persisted_key")
@@ -200,12 +215,101 @@ class TestTokenCache:
         )
 
         await cache.set("persisted_key", ticket)
+        await cache.flush()
 
         assert cache.storage_path.exists()
         if os.name == "posix":
             file_mode = stat.S_IMODE(cache.storage_path.stat().st_mode)
             assert file_mode == stat.S_IRUSR | stat.S_IWUSR
 
+    async def test_coalesces_writes_off_the_request_path(self, tmp_path):
+        """Debe agrupar varios cambios en una sola escritura diferida."""
+        cache = self.build_cache(tmp_path, flush_delay=0.05)
+        for index in range(5):
+            await cache.set(
+                f"key_{index}",
+                TicketAcceso(
+                    token=f"token_{index}",
+                    sign="sign",
+                    expiracion=datetime.now(timezone.utc) + timedelta(hours=12),
+                    servicio="wsfe",
+                ),
+            )
+
+        assert not cache.storage_path.exists()
+        assert cache.stats()["escrituras_pendientes"] == 5
+
+        await asyncio.sleep(0.2)
+
+        stats = cache.stats()
+        assert stats["escrituras_pendientes"] == 0
+        assert stats["flushes"] == 1
+        assert stats["ultimo_flush_ms"] >= 0
+        assert len(json.loads(cache.storage_path.read_text(encoding="utf-8"))) == 5
+        assert list(tmp_path.iterdir()) == [cache.storage_path]
+
+    async def test_failed_flush_keeps_memory_and_pending_writes(
+        self, tmp_path, monkeypatch
+    ):
+        """Si falla el disco, el ticket sigue en memoria y el cambio pendiente."""
+        cache = self.build_cache(tmp_path)
+        ticket = TicketAcceso(
+            token="persisted_token",
+            sign="persisted_sign",
+            expiracion=datetime.now(timezone.utc) + timedelta(hours=12),
+            servicio="wsfe",
+        )
+
+        def fail_replace(*_args):
+            raise OSError("disco lleno")
+
+        monkeypatch.setattr("app.arca.cache.os.replace", fail_replace)
+        await cache.set("persisted_key", ticket)
+        await cache.flush()
+
+        assert (await cache.get("persisted_key")) is ticket
+        assert cache.stats()["escrituras_pendientes"] == 1
+        assert cache.stats()["flushes_fallidos"] == 1
+        assert list(tmp_path.iterdir()) == []
+
+        monkeypatch.undo()
+        await cache.flush()
+
+        assert cache.stats()["escrituras_pendientes"] == 0
+        assert self.build_cache(tmp_path)._cache.keys() == {"persisted_key"}
+
+    async def test_failed_serialization_keeps_pending_writes(
+        self, tmp_path, monkeypatch, caplog
+    ):
+        """Un error que no es de disco tampoco descarta los cambios pendientes."""
+        cache = self.build_cache(tmp_path, flush_delay=0.01)
+        ticket = TicketAcceso(
+            token="persisted_token",
+            sign="persisted_sign",
+            expiracion=datetime.now(timezone.utc) + timedelta(hours=12),
+            servicio="wsfe",
+        )
+
+        def fail_serialize():
+            raise TypeError("ticket no serializable")
+
+        monkeypatch.setattr(cache, "_serialize", fail_serialize)
+        await cache.set("persisted_key", ticket)
+        await asyncio.sleep(0.05)
+
+        assert cache._flush_task.done()
+        assert cache._flush_task.exception() is None
+        assert cache.stats()["escrituras_pendientes"] == 1
+        assert cache.stats()["flushes_fallidos"] == 1
+        assert "event=arca_token_cache_flush_fallido" in caplog.text
+
+        monkeypatch.undo()
+        await cache.aclose()
+
+        assert cache.stats()["escrituras_pendientes"] == 0
+        assert cache._flush_task is None
+        assert self.build_cache(tmp_path)._cache.keys() == {"persisted_key"}
+
     def test_get_cache_key(self, tmp_path):
         """Debe generar clave de cache scopiada por certificado."""
         cache = self.build_cache(tmp_path)
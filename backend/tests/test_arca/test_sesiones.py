@@ -0,0 +1,188 @@
+"""Tests para el gestor de sesiones ARCA."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.arca.config import ArcaAmbiente
+from app.arca.exceptions import ArcaAuthError
+from app.arca.models import TicketAcceso
+from app.arca.sesiones import GestorSesionesArca
+from app.arca.wsaa import CODIGO_TICKET_YA_EMITIDO
+
+
+def _ticket(token: str, vence_en: timedelta) -> TicketAcceso:
+    """Construye un ticket que vence dentro del plazo indicado."""
+    return TicketAcceso(
+        token=token,
+        sign=f"sign-{token}",
+        expiracion=datetime.now(timezone.utc) + vence_en,
+    )
+
+
+class FakeWSAA:
+    """Registra los logins y entrega tickets con el plazo configurado."""
+
+    def __init__(self, vence_en: timedelta = timedelta(hours=12)) -> None:
+        self.vence_en = vence_en
+        self.construcciones = 0
+        self.logins: list[dict] = []
+        self.fallar = False
+        self.ya_autenticado = False
+        self.liberar = asyncio.Event()
+        self.liberar.set()
+
+    def __call__(self, _ambiente: ArcaAmbiente) -> "FakeWSAA":
+        self.construcciones += 1
+        return self
+
+    async def login(self, **kwargs) -> TicketAcceso:
+        self.logins.append(kwargs)
+        await self.liberar.wait()
+        if self.fallar:
+            raise RuntimeError("WSAA no disponible")
+        if self.ya_autenticado:
+            raise ArcaAuthError(
+                "Error SOAP en WSAA: El CEE ya posee un TA valido",
+                codigo=CODIGO_TICKET_YA_EMITIDO,
+            )
+        return _ticket(f"token-{len(self.logins)}", self.vence_en)
+
+
+class FakeWSFE:
+    """Cliente WSFEv1 sin WSDL que conserva el ticket recibido."""
+
+    def __init__(self, *, ambiente: ArcaAmbiente, ticket: TicketAcceso, cuit: str):
+        self.ambiente = ambiente
+        self.ticket = ticket
+        self.cuit = cuit
+
+
+def _identidad() -> dict:
+    return {
+        "ambiente": ArcaAmbiente.HOMOLOGACION,
+        "cuit": "20-12345678-9",
+        "cert_path": "/certs/empresa.crt",
+        "key_path": "/certs/empresa.key",
+    }
+
+
+@pytest.mark.asyncio
+async def test_logins_concurrentes_comparten_un_unico_login_cms():
+    """Las emisiones concurrentes esperan el mismo login en vez de repetirlo."""
+    wsaa = FakeWSAA()
+    wsaa.liberar.clear()
+    gestor = GestorSesionesArca(margen_renovacion=timedelta(minutes=5))
+
+    tareas = [
+        asyncio.create_task(gestor.obtener_ticket(**_identidad(), crear_wsaa=wsaa))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    wsaa.liberar.set()
+    tickets = await asyncio.gather(*tareas)
+
+    assert len(wsaa.logins) == 1
+    assert wsaa.logins[0]["cuit"] == "20123456789"
+    assert {ticket.token for ticket in tickets} == {"token-1"}
+
+    otra = await gestor.obtener_ticket(**_identidad(), crear_wsaa=wsaa)
+    assert otra is tickets[0]
+    assert wsaa.construcciones == 1
+    assert gestor.stats()["hits"] == 5
+    await gestor.cerrar()
+
+
+@pytest.mark.asyncio
+async def test_renueva_el_ticket_antes_de_vencer_y_actualiza_el_cliente():
+    """La renovación en segundo plano reemplaza el ticket del cliente WSFE."""
+    wsaa = FakeWSAA(vence_en=timedelta(minutes=5, seconds=0.1))
+    gestor = GestorSesionesArca(margen_renovacion=timedelta(minutes=5))
+
+    cliente = await gestor.obtener_cliente_wsfe(
+        **_identidad(), crear_wsaa=wsaa, crear_wsfe=FakeWSFE
+    )
+    assert cliente.ticket.token == "token-1"
+    wsaa.vence_en = timedelta(hours=12)
+    await gestor.obtener_ticket(**_identidad(), crear_wsaa=wsaa)
+    await asyncio.sleep(0.3)
+
+    assert len(wsaa.logins) == 2
+    assert wsaa.logins[1]["force_new"] is True
+    assert cliente.ticket.token == "token-2"
+    assert (
+        await gestor.obtener_cliente_wsfe(
+            **_identidad(), crear_wsaa=wsaa, crear_wsfe=FakeWSFE
+        )
+        is cliente
+    )
+    assert gestor.stats()["renovaciones"] == 1
+    await gestor.cerrar()
+
+
+@pytest.mark.asyncio
+async def test_sesion_sin_uso_se_descarta_en_lugar_de_renovarse():
+    """Una sesión que nadie volvió a usar no mantiene logins en segundo plano."""
+    wsaa = FakeWSAA(vence_en=timedelta(minutes=5, seconds=0.1))
+    gestor = GestorSesionesArca(margen_renovacion=timedelta(minutes=5))
+
+    await gestor.obtener_ticket(**_identidad(), crear_wsaa=wsaa)
+    await asyncio.sleep(0.3)
+
+    assert len(wsaa.logins) == 1
+    assert gestor.stats()["sesiones"] == 0
+    await gestor.cerrar()
+
+
+@pytest.mark.asyncio
+async def test_renovacion_fallida_conserva_el_ticket_vigente(caplog):
+    """Si WSAA falla al renovar, se sigue usando el ticket que todavía vale."""
+    wsaa = FakeWSAA(vence_en=timedelta(minutes=5, seconds=0.1))
+    gestor = GestorSesionesArca(margen_renovacion=timedelta(minutes=5))
+
+    primero = await gestor.obtener_ticket(**_identidad(), crear_wsaa=wsaa)
+    wsaa.fallar = True
+    await gestor.obtener_ticket(**_identidad(), crear_wsaa=wsaa)
+    await asyncio.sleep(0.3)
+
+    assert len(wsaa.logins) == 2
+    assert await gestor.obtener_ticket(**_identidad(), crear_wsaa=wsaa) is primero
+    assert gestor.stats()["renovaciones_fallidas"] == 1
+    assert "event=arca_ticket_renovacion_fallida" in caplog.text
+    await gestor.cerrar()
+    assert gestor.stats()["sesiones"] == 0
+
+
+@pytest.mark.asyncio
+async def test_ticket_ya_emitido_aplaza_la_renovacion_hasta_el_vencimiento(caplog):
+    """
+    WSAA no emite otro ticket mientras el vigente vale.
+
+    La renovación anticipada conserva el ticket sin reintentar cada minuto y
+    vuelve a pedirlo una sola vez cuando el ticket vence.
+    """
+    caplog.set_level("INFO", logger="app.arca.sesiones")
+    wsaa = FakeWSAA(vence_en=timedelta(seconds=0.6))
+    gestor = GestorSesionesArca(margen_renovacion=timedelta(seconds=0.4))
+
+    primero = await gestor.obtener_ticket(**_identidad(), crear_wsaa=wsaa)
+    wsaa.ya_autenticado = True
+    await gestor.obtener_ticket(**_identidad(), crear_wsaa=wsaa)
+    await asyncio.sleep(0.3)
+
+    assert len(wsaa.logins) == 2
+    assert await gestor.obtener_ticket(**_identidad(), crear_wsaa=wsaa) is primero
+    assert gestor.stats()["renovaciones_aplazadas"] == 1
+    assert gestor.stats()["renovaciones_fallidas"] == 0
+    assert "event=arca_ticket_renovacion_aplazada" in caplog.text
+
+    wsaa.ya_autenticado = False
+    await asyncio.sleep(0.5)
+
+    assert len(wsaa.logins) == 3
+    assert wsaa.logins[2]["force_new"] is True
+    renovado = await gestor.obtener_ticket(**_identidad(), crear_wsaa=wsaa)
+    assert renovado.token == "token-3"
+    assert gestor.stats()["renovaciones"] == 1
+    await gestor.cerrar()
@@ -91,3 +91,81 @@ async def test_run_soap_call_no_bloquea_otras_coroutines() -> None:
 
     assert heartbeat_elapsed < 0.1
     assert await soap_task == "OK"
+
+
+def test_registry_parsea_cada_wsdl_una_sola_vez(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """El registro debe reutilizar el cliente por ambiente y URL."""
+
+    created: list[str] = []
+
+    def fake_create_soap_client(
+        wsdl_url: str, timeout: int = 30, pool_maxsize: int = 10
+    ) -> object:
+        created.append(wsdl_url)
+        return object()
+
+    monkeypatch.setattr(soap_module, "create_soap_client", fake_create_soap_client)
+    registry = soap_module.SoapClientRegistry()
+
+    wsfe = registry.get_client("homologacion", "https://arca.example.test/wsfe")
+    wsfe_replay = registry.get_client("homologacion", "https://arca.example.test/wsfe")
+    wsfe_prod = registry.get_client("produccion", "https://arca.example.test/wsfe")
+
+    assert wsfe is wsfe_replay
+    assert wsfe is not wsfe_prod
+    assert created == [
+        "https://arca.example.test/wsfe",
+        "https://arca.example.test/wsfe",
+    ]
+    assert registry.stats() == {"clientes": 2, "hits": 1, "misses": 2}
+
+
+def test_registry_serializa_creacion_concurrente(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Threads concurrentes no deben descargar el mismo WSDL en paralelo."""
+
+    created: list[str] = []
+
+    def slow_create_soap_client(
+        wsdl_url: str, timeout: int = 30, pool_maxsize: int = 10
+    ) -> object:
+        time.sleep(0.05)
+        created.append(wsdl_url)
+        return object()
+
+    monkeypatch.setattr(soap_module, "create_soap_client", slow_create_soap_client)
+    registry = soap_module.SoapClientRegistry()
+    results: list[object] = []
+
+    def worker() -> None:
+        results.append(registry.get_client("homologacion", "https://wsdl"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert len({id(result) for result in results}) == 1
+    assert registry.stats()["hits"] == 7
+
+
+def test_registry_invalida_por_ambiente(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Invalidar un ambiente obliga a reconstruir solo sus clientes."""
+
+    monkeypatch.setattr(
+        soap_module,
+        "create_soap_client",
+        lambda wsdl_url, timeout=30, pool_maxsize=10: object(),
+    )
+    registry = soap_module.SoapClientRegistry()
+    homologacion = registry.get_client("homologacion", "https://wsdl")
+    produccion = registry.get_client("produccion", "https://wsdl")
+
+    assert registry.invalidate("homologacion") == 1
+    assert registry.get_client("homologacion", "https://wsdl") is not homologacion
+    assert registry.get_client("produccion", "https://wsdl") is produccion
@@ -5,11 +5,13 @@ from pathlib import Path
 from types import SimpleNamespace
 
 import pytest
+from zeep.exceptions import Fault
 
 from app.arca import wsaa as wsaa_module
 from app.arca.cache import TokenCache
 from app.arca.config import ArcaAmbiente
-from app.arca.wsaa import WSAAClient
+from app.arca.exceptions import ArcaAuthError
+from app.arca.wsaa import CODIGO_TICKET_YA_EMITIDO, WSAAClient
 
 
 def _wsaa_response(token: str) -> str:
@@ -92,3 +94,36 @@ async def test_login_no_reutiliza_cache_entre_certificados_del_mismo_cuit(
         cert_activo.name,
     ]
     assert soap_calls == [f"cms:{cert_verificado.name}", f"cms:{cert_activo.name}"]
+    await client.cache.aclose()
+
+
+@pytest.mark.asyncio
+async def test_login_informa_ticket_ya_emitido_con_codigo(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """El rechazo por ticket vigente llega con un código reconocible."""
+    cert = tmp_path / "cert.crt"
+    cert.write_bytes(b"certificado")
+
+    def fake_login_cms(_cms: str) -> str:
+        raise Fault(
+            "El CEE ya posee un TA valido para el acceso al WSN solicitado",
+            code="ns1:coe.alreadyAuthenticated",
+        )
+
+    monkeypatch.setattr(wsaa_module, "create_signed_tra", lambda **_kwargs: "cms")
+    client = WSAAClient.__new__(WSAAClient)
+    client.config = SimpleNamespace(ambiente=ArcaAmbiente.HOMOLOGACION)
+    client.cache = TokenCache(storage_path=str(tmp_path / "arca-token-cache.json"))
+    client.client = SimpleNamespace(service=SimpleNamespace(loginCms=fake_login_cms))
+
+    with pytest.raises(ArcaAuthError) as exc_info:
+        await client.login(
+            cert_path=str(cert),
+            key_path=str(tmp_path / "cert.key"),
+            cuit="20123456789",
+            force_new=True,
+        )
+
+    assert exc_info.value.codigo == CODIGO_TICKET_YA_EMITIDO
+    await client.cache.aclose()
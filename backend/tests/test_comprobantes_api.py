@@ -11,6 +11,7 @@ from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.exc import TimeoutError as SQLAlchemyTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.paginacion import MENSAJE_CURSOR_INVALIDO, codificar_cursor
 from app.arca.exceptions import (
     ArcaErrorGlobalEstructurado,
     CabeceraRespuestaFecae,
@@ -1771,6 +1772,81 @@ async def test_get_comprobante_detalle_con_items(
     assert data["items"][0]["descripcion"] == "Producto API Test"
 
 
+@pytest.mark.asyncio
+async def test_listar_comprobantes_por_cursor_recorre_sin_saltos_ni_conteo(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session: AsyncSession,
+    test_empresa,
+):
+    """El cursor desempata por número e id y puede omitir el conteo total."""
+    puntos = [
+        PuntoVenta(numero=numero, nombre=f"PV {numero}", empresa_id=test_empresa.id)
+        for numero in (7, 8)
+    ]
+    db_session.add_all(puntos)
+    await db_session.flush()
+    for punto in puntos:
+        for numero, fecha in ((1, date(2026, 3, 1)), (2, date(2026, 3, 2))):
+            db_session.add(
+                Comprobante(
+                    tipo_comprobante=6,
+                    concepto=1,
+                    numero=numero,
+                    fecha_emision=fecha,
+                    subtotal=Decimal("100.00"),
+                    total=Decimal("100.00"),
+                    estado="borrador",
+                    empresa_id=test_empresa.id,
+                    punto_venta_id=punto.id,
+                    receptor_razon_social="Cliente listado",
+                )
+            )
+    await db_session.commit()
+
+    primera = await client.get(
+        "/api/comprobantes/", params={"per_page": 3}, headers=auth_headers
+    )
+    assert primera.status_code == 200
+    primera_data = primera.json()
+    assert primera_data["total"] == 4
+    assert primera_data["pages"] == 2
+    assert primera_data["next_cursor"]
+
+    segunda = await client.get(
+        "/api/comprobantes/",
+        params={
+            "per_page": 3,
+            "cursor": primera_data["next_cursor"],
+            "incluir_total": "false",
+        },
+        headers=auth_headers,
+    )
+    assert segunda.status_code == 200
+    segunda_data = segunda.json()
+    assert segunda_data["total"] is None
+    assert segunda_data["pages"] is None
+    assert segunda_data["next_cursor"] is None
+
+    recorridos = [
+        (item["fecha_emision"], item["numero"], item["punto_venta_numero"])
+        for item in primera_data["items"] + segunda_data["items"]
+    ]
+    assert recorridos == [
+        ("2026-03-02", 2, 8),
+        ("2026-03-02", 2, 7),
+        ("2026-03-01", 1, 8),
+        ("2026-03-01", 1, 7),
+    ]
+
+    for cursor in ("no-es-cursor", codificar_cursor((3, 7))):
+        invalido = await client.get(
+            "/api/comprobantes/", params={"cursor": cursor}, headers=auth_headers
+        )
+        assert invalido.status_code == 400
+        assert invalido.json()["detail"] == MENSAJE_CURSOR_INVALIDO
+
+
 @pytest.mark.asyncio
 async def test_proximo_numero_rechaza_punto_no_usable(
     client: AsyncClient,
@@ -151,7 +151,7 @@ def test_settings_parsea_limites_pool_validos(
         ("DATABASE_API_MAX_OVERFLOW", "-1"),
         ("DATABASE_API_MAX_OVERFLOW", "1"),
         ("DATABASE_WORKER_POOL_SIZE", "0"),
-        ("DATABASE_WORKER_POOL_SIZE", "2"),
+        ("DATABASE_WORKER_POOL_SIZE", "5"),
         ("DATABASE_POOL_TIMEOUT_SECONDS", "0"),
         ("DATABASE_POOL_TIMEOUT_SECONDS", "61"),
         ("DATABASE_POOL_HOLD_WARNING_SECONDS", "0"),
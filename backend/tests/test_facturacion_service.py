@@ -42,6 +42,7 @@ from app.models.lote_comprobante import (
     LoteComprobanteGrupo,
 )
 from app.models.punto_venta import PuntoVenta
+from app.models.resumen_ventas import ResumenVentasDiario
 from app.models.usuario import Usuario
 from app.schemas.comprobante import (
     ComprobanteAsociadoCreate,
@@ -62,6 +63,7 @@ from app.services.elegibilidad_rece_service import (
     ElegibilidadReceService,
 )
 from app.services.lote_comprobantes_service import LoteComprobantesService
+from app.services.resumen_ventas_service import ResumenVentasService
 
 
 FECHA_FISCAL_PRUEBA = date(2026, 8, 9)
@@ -513,6 +515,94 @@ async def test_guardar_comprobante_persiste_fechas_de_servicio(
     assert comprobante.fecha_vencimiento == date(2026, 4, 30)
 
 
+@pytest.mark.asyncio
+async def test_guardar_comprobante_acumula_resumen_diario_igual_a_reconstruccion(
+    db_session: AsyncSession,
+    test_empresa,
+):
+    """Cada autorización suma a su fila diaria y coincide con recalcular desde cero."""
+    punto_venta = PuntoVenta(
+        numero=1,
+        nombre="Principal",
+        activo=True,
+        es_webservice=True,
+        empresa_id=test_empresa.id,
+    )
+    db_session.add(punto_venta)
+    await db_session.flush()
+
+    service = FacturacionService(db_session)
+    for numero, iva in ((1, Decimal("21")), (2, Decimal("0"))):
+        request = service.normalizar_receptor(
+            EmitirComprobanteRequest(
+                empresa_id=test_empresa.id,
+                punto_venta_id=punto_venta.id,
+                tipo_comprobante=6,
+                concepto=1,
+                fecha_emision=date(2026, 4, 30),
+                tipo_documento=99,
+                numero_documento="0",
+                razon_social="",
+                condicion_iva="Consumidor Final",
+                guardar_cliente=False,
+                moneda="PES",
+                cotizacion=Decimal("1"),
+                items=[
+                    ItemComprobanteCreate(
+                        descripcion="Abono",
+                        cantidad=Decimal("1"),
+                        unidad="unidad",
+                        precio_unitario=Decimal("1000"),
+                        iva_porcentaje=iva,
+                    )
+                ],
+            )
+        )
+        await service._guardar_comprobante(
+            request=request,
+            numero=numero,
+            totales=service._calcular_totales(request.items),
+            resultado_arca=SimpleNamespace(
+                cae=f"9999999999999{numero}",
+                cae_vencimiento="20260510",
+            ),
+            punto_venta=punto_venta,
+        )
+
+    async def leer_resumen() -> list[tuple]:
+        filas = await db_session.scalars(
+            select(ResumenVentasDiario).execution_options(populate_existing=True)
+        )
+        return [
+            (
+                fila.fecha,
+                fila.tipo_comprobante,
+                fila.cantidad,
+                Decimal(fila.subtotal),
+                Decimal(fila.iva_21),
+                Decimal(fila.importe_iva_cero),
+                Decimal(fila.total),
+            )
+            for fila in filas
+        ]
+
+    incremental = await leer_resumen()
+    assert incremental == [
+        (
+            date(2026, 4, 30),
+            6,
+            2,
+            Decimal("2000.00"),
+            Decimal("210.00"),
+            Decimal("1000.00"),
+            Decimal("2210.00"),
+        )
+    ]
+
+    await ResumenVentasService(db_session).reconstruir(test_empresa.id)
+    assert await leer_resumen() == incremental
+
+
 @pytest.mark.asyncio
 async def test_validar_punto_venta_habilitado_acepta_bloqueado_n(
     db_session: AsyncSession,
@@ -2974,6 +3064,146 @@ async def test_emitir_comprobantes_lote_usa_un_request_arca_y_persiste_numeracio
     assert [comprobante.numero for comprobante in comprobantes] == [1, 2]
 
 
+@pytest.mark.asyncio
+async def test_emitir_comprobantes_lote_reutiliza_preparacion_y_referencias(
+    db_session: AsyncSession,
+    test_empresa,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """La preparación anticipada no se repite y las referencias se leen una vez."""
+    punto_venta = PuntoVenta(
+        numero=1,
+        nombre="Principal",
+        activo=True,
+        es_webservice=True,
+        empresa_id=test_empresa.id,
+    )
+    certificado = Certificado(
+        nombre="Certificado Test",
+        cuit=test_empresa.cuit,
+        fecha_emision=date(2026, 1, 1),
+        fecha_vencimiento=date(2027, 1, 1),
+        archivo_crt="empresa-test.crt",
+        archivo_key="empresa-test.key",
+        activo=True,
+        ambiente=settings.arca_env,
+        empresa_id=test_empresa.id,
+    )
+    db_session.add_all([punto_venta, certificado])
+    await db_session.commit()
+    await db_session.refresh(punto_venta)
+
+    class FakeWSFEClient:
+        """Cliente WSFE simulado que aprueba todo el sublote."""
+
+        def __init__(self, *args, **kwargs) -> None:
+            """Acepta la firma del cliente real."""
+
+        async def fe_comp_ultimo_autorizado(self, punto_venta_numero, tipo):
+            """Simula que ARCA no tiene comprobantes previos."""
+            return 0
+
+        async def fe_cae_solicitar_lote(self, arca_requests):
+            """Devuelve CAE aprobados para cada comprobante."""
+            return [
+                CAEResponse(
+                    cae=f"1234567890123{arca_request.cbte_desde}",
+                    cae_vencimiento="20260610",
+                    numero_comprobante=arca_request.cbte_desde,
+                    tipo_cbte=arca_request.tipo_cbte,
+                    punto_venta=arca_request.punto_venta,
+                    resultado="A",
+                )
+                for arca_request in arca_requests
+            ]
+
+    async def fake_ticket(self, empresa, certificado):
+        return SimpleNamespace(token="token", sign="sign")
+
+    async def fake_validar_punto(self, wsfe_client, punto_venta_numero):
+        return None
+
+    monkeypatch.setattr("app.services.facturacion_service.WSFEv1Client", FakeWSFEClient)
+    monkeypatch.setattr(FacturacionService, "_obtener_ticket_acceso", fake_ticket)
+    monkeypatch.setattr(
+        FacturacionService,
+        "_validar_punto_venta_habilitado",
+        fake_validar_punto,
+    )
+
+    def request_cliente(nombre: str) -> EmitirComprobanteRequest:
+        return EmitirComprobanteRequest(
+            empresa_id=test_empresa.id,
+            punto_venta_id=punto_venta.id,
+            tipo_comprobante=6,
+            concepto=1,
+            fecha_emision=FECHA_FISCAL_PRUEBA,
+            tipo_documento=99,
+            numero_documento="0",
+            razon_social=nombre,
+            condicion_iva="Consumidor Final",
+            guardar_cliente=False,
+            moneda="PES",
+            cotizacion=Decimal("1"),
+            items=[
+                ItemComprobanteCreate(
+                    descripcion="Producto",
+                    cantidad=Decimal("1"),
+                    unidad="unidad",
+                    precio_unitario=Decimal("1000"),
+                    iva_porcentaje=Decimal("0"),
+                )
+            ],
+        )
+
+    _fijar_reloj_facturacion(monkeypatch)
+    requests = [request_cliente(f"Cliente {indice}") for indice in range(3)]
+    _operacion, _contexto, metadata = await _crear_operacion_rece_sintetica(
+        db_session,
+        empresa=test_empresa,
+        punto_venta=punto_venta,
+        requests=requests,
+        batch=True,
+    )
+    service = FacturacionService(db_session)
+    preparado = service.preparar_sublote_emision(requests, max_registros=3)
+    assert preparado.error is None
+    assert [totales["total"] for totales in preparado.totales_por_request] == [
+        Decimal("1000.00")
+    ] * 3
+
+    normalizaciones = 0
+    consultas_punto = 0
+    normalizar_original = FacturacionService.normalizar_receptor
+    obtener_punto_original = FacturacionService._obtener_punto_venta
+
+    def contar_normalizacion(self, request):
+        nonlocal normalizaciones
+        normalizaciones += 1
+        return normalizar_original(self, request)
+
+    async def contar_punto(self, *args, **kwargs):
+        nonlocal consultas_punto
+        consultas_punto += 1
+        return await obtener_punto_original(self, *args, **kwargs)
+
+    monkeypatch.setattr(FacturacionService, "normalizar_receptor", contar_normalizacion)
+    monkeypatch.setattr(FacturacionService, "_obtener_punto_venta", contar_punto)
+
+    resultados = await service.emitir_comprobantes_lote(
+        requests,
+        max_registros=3,
+        contextos=metadata,
+        preparado=preparado,
+    )
+
+    assert [resultado.numero for resultado in resultados] == [1, 2, 3]
+    assert all(resultado.exito for resultado in resultados)
+    assert normalizaciones == 0
+    # Una consulta al validar el sublote y otra al reservar la numeración.
+    assert consultas_punto == 2
+
+
 async def _preparar_escenario_numeracion_batch(
     db_session: AsyncSession,
     test_empresa: Empresa,
@@ -5297,6 +5527,7 @@ async def test_duplicado_logico_nota_usa_huella_autorizada_con_asociado(
         receptor_numero_documento=request.numero_documento,
         receptor_razon_social=request.razon_social,
         receptor_condicion_iva="CF",
+        huella_logica=huella,
     )
     db_session.add(comprobante)
     await db_session.flush()
@@ -5346,6 +5577,219 @@ async def test_duplicado_logico_nota_usa_huella_autorizada_con_asociado(
     assert duplicado.id == comprobante.id
 
 
+@pytest.mark.asyncio
+async def test_duplicados_logicos_en_tramo_usan_consultas_constantes(
+    db_session: AsyncSession,
+    test_empresa,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Las consultas crecen por tramo de huellas, nunca por fila del lote."""
+    punto_venta = PuntoVenta(
+        numero=15,
+        nombre="Duplicados por tramo",
+        activo=True,
+        es_webservice=True,
+        empresa_id=test_empresa.id,
+    )
+    db_session.add(punto_venta)
+    await db_session.flush()
+    service = FacturacionService(db_session)
+    total = Decimal("100.00")
+
+    def crear_request(dia: int, descripcion: str) -> EmitirComprobanteRequest:
+        return service.normalizar_receptor(
+            EmitirComprobanteRequest(
+                empresa_id=test_empresa.id,
+                punto_venta_id=punto_venta.id,
+                tipo_comprobante=11,
+                concepto=1,
+                fecha_emision=date(2026, 6, dia),
+                tipo_documento=99,
+                numero_documento="0",
+                razon_social="A CONSUMIDOR FINAL",
+                condicion_iva="Consumidor Final",
+                guardar_cliente=False,
+                moneda="PES",
+                cotizacion=Decimal("1"),
+                items=[
+                    ItemComprobanteCreate(
+                        descripcion=descripcion,
+                        cantidad=Decimal("1"),
+                        unidad="unidad",
+                        precio_unitario=Decimal("100"),
+                        iva_porcentaje=Decimal("0"),
+                    )
+                ],
+            )
+        )
+
+    for dia in (1, 2, 3):
+        db_session.add(
+            Comprobante(
+                tipo_comprobante=11,
+                concepto=1,
+                numero=dia,
+                fecha_emision=date(2026, 6, dia),
+                subtotal=total,
+                descuento=Decimal("0.00"),
+                iva_21=Decimal("0.00"),
+                iva_10_5=Decimal("0.00"),
+                iva_27=Decimal("0.00"),
+                otros_impuestos=Decimal("0.00"),
+                total=total,
+                cae=f"1234567890124{dia}",
+                cae_vencimiento=date(2026, 6, 20),
+                estado="autorizado",
+                moneda="PES",
+                cotizacion=Decimal("1"),
+                empresa_id=test_empresa.id,
+                punto_venta_id=punto_venta.id,
+                receptor_tipo_documento=99,
+                receptor_numero_documento="0",
+                receptor_razon_social="A CONSUMIDOR FINAL",
+                receptor_condicion_iva="CF",
+                huella_logica=IdempotenciaFiscalService.calcular_huella_logica(
+                    request=crear_request(dia, f"Servicio {dia}"),
+                    punto_venta_numero=punto_venta.numero,
+                    total=total,
+                ),
+            )
+        )
+    await db_session.commit()
+
+    def candidatos(cantidad: int) -> list[tuple]:
+        existentes = [
+            (crear_request(dia, f"Servicio {dia}"), punto_venta, total)
+            for dia in (1, 2, 3)
+        ]
+        return existentes + [
+            (crear_request(indice % 28 + 1, f"Otro {indice}"), punto_venta, total)
+            for indice in range(cantidad - 3)
+        ]
+
+    async def contar_sentencias(cantidad: int) -> list[str]:
+        sentencias: list[str] = []
+
+        def registrar_sql(_conn, _cursor, statement, *_args) -> None:
+            sentencias.append(statement)
+
+        engine = db_session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", registrar_sql)
+        try:
+            duplicados = await IdempotenciaFiscalService(
+                db_session
+            ).buscar_duplicados_logicos(candidatos(cantidad))
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar_sql)
+        assert [duplicado.numero for duplicado in duplicados[:3]] == [1, 2, 3]
+        assert duplicados[3:] == [None] * (cantidad - 3)
+        return sentencias
+
+    pocas = await contar_sentencias(10)
+    muchas = await contar_sentencias(300)
+    assert len(pocas) == len(muchas) == 1
+
+    monkeypatch.setattr(IdempotenciaFiscalService, "TAMANO_TRAMO_DUPLICADOS", 100)
+    por_tramo = await contar_sentencias(300)
+    assert len(por_tramo) == 3
+    for sentencia in por_tramo:
+        assert "huella_logica IN" in sentencia
+        assert "comprobante_items" not in sentencia
+        assert "intentos_emision_fiscal" not in sentencia
+
+
+@pytest.mark.asyncio
+async def test_duplicados_logicos_se_resuelven_por_huella_persistida(
+    db_session: AsyncSession,
+    test_empresa,
+):
+    """El guardado persiste la huella y el detector la busca en una consulta."""
+    punto_venta = PuntoVenta(
+        numero=14,
+        nombre="Duplicados lote",
+        activo=True,
+        es_webservice=True,
+        empresa_id=test_empresa.id,
+    )
+    db_session.add(punto_venta)
+    await db_session.flush()
+    service = FacturacionService(db_session)
+
+    def crear_request(dia: int, descripcion: str) -> EmitirComprobanteRequest:
+        return service.normalizar_receptor(
+            EmitirComprobanteRequest(
+                empresa_id=test_empresa.id,
+                punto_venta_id=punto_venta.id,
+                tipo_comprobante=11,
+                concepto=1,
+                fecha_emision=date(2026, 6, dia),
+                tipo_documento=99,
+                numero_documento="0",
+                razon_social="A CONSUMIDOR FINAL",
+                condicion_iva="Consumidor Final",
+                guardar_cliente=False,
+                moneda="PES",
+                cotizacion=Decimal("1"),
+                items=[
+                    ItemComprobanteCreate(
+                        descripcion=descripcion,
+                        cantidad=Decimal("1"),
+                        unidad="unidad",
+                        precio_unitario=Decimal("100"),
+                        iva_porcentaje=Decimal("0"),
+                    )
+                ],
+            )
+        )
+
+    total = Decimal("100.00")
+    for dia in (1, 2, 3):
+        request = crear_request(dia, f"Servicio {dia}")
+        comprobante = await service._guardar_comprobante(
+            request=request,
+            numero=dia,
+            totales=service._calcular_totales(request.items),
+            resultado_arca=SimpleNamespace(
+                cae=f"1234567890123{dia}",
+                cae_vencimiento="20260620",
+            ),
+            punto_venta=punto_venta,
+        )
+        assert comprobante.huella_logica == (
+            IdempotenciaFiscalService.calcular_huella_logica(
+                request=request,
+                punto_venta_numero=punto_venta.numero,
+                total=total,
+            )
+        )
+
+    candidatos = [
+        (crear_request(dia, f"Servicio {dia}"), punto_venta, total) for dia in (1, 2, 3)
+    ]
+    candidatos += [
+        (crear_request(dia, "Otro servicio"), punto_venta, total)
+        for dia in range(1, 21)
+    ]
+    sentencias: list[str] = []
+
+    def registrar_sql(_conn, _cursor, statement, _params, _context, _many) -> None:
+        sentencias.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", registrar_sql)
+    try:
+        duplicados = await IdempotenciaFiscalService(
+            db_session
+        ).buscar_duplicados_logicos(candidatos)
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar_sql)
+
+    assert [duplicado.numero for duplicado in duplicados[:3]] == [1, 2, 3]
+    assert duplicados[3:] == [None] * 20
+    assert len(sentencias) == 1
+    assert "comprobante_items" not in sentencias[0]
+
+
 @pytest.mark.asyncio
 async def test_confirmacion_duplicado_toma_operacion_solo_una_vez(
     db_session: AsyncSession,
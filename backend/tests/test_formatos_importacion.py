@@ -13,8 +13,13 @@ from app.models.empresa import Empresa
 from app.models.formato_importacion import FormatoImportacionVersion
 from app.services.formatos_importacion_service import (
     FORMATO_BANCARIO_CONFIG,
+    CacheHojasImportacion,
     FormatoImportacionError,
     FormatosImportacionService,
+    HojaImportacion,
+    HojaImportacionEnStream,
+    cache_hojas_importacion,
+    cache_planes_mapeo,
 )
 
 
@@ -866,6 +871,352 @@ async def test_importacion_conserva_cuit_emisor_mapeado(
     assert importacion.filas[0]["empresa_cuit"] != test_empresa.cuit
 
 
+@pytest.mark.asyncio
+async def test_detectar_e_importar_parsean_el_archivo_una_sola_vez(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session: AsyncSession,
+    test_empresa: Empresa,
+):
+    """Detectar el formato y después importar reutiliza la hoja ya leída."""
+    crear = await client.post(
+        "/api/formatos-importacion",
+        headers=auth_headers,
+        json={
+            "nombre": "Plantilla leída una vez",
+            "descripcion": None,
+            "alcance": "emisor",
+            "configuracion_json": _config_plantilla_basica(tipo_comprobante=6),
+        },
+    )
+    assert crear.status_code == 201, crear.text
+    version_id = crear.json()["version_vigente"]["id"]
+    contenido = _xlsx_con_filas(
+        ["Fecha", "Descripción", "Importe"],
+        [["2026-05-31", "Servicio mensual", 100], ["2026-05-31", "Soporte", 50]],
+    )
+    cache_hojas_importacion.limpiar()
+    inicial = cache_hojas_importacion.stats()
+
+    detectar = await client.post(
+        "/api/formatos-importacion/detectar",
+        headers=auth_headers,
+        files={
+            "archivo": (
+                "externo.xlsx",
+                contenido,
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+        },
+    )
+    assert detectar.status_code == 200, detectar.text
+    service = FormatosImportacionService(db_session)
+    version = await service.obtener_version(version_id, test_empresa.id)
+    importacion = await service.importar_con_version(contenido, test_empresa, version)
+
+    stats = cache_hojas_importacion.stats()
+    assert stats["lecturas"] - inicial["lecturas"] == 1
+    assert stats["aciertos"] - inicial["aciertos"] == 1
+    assert [fila["comprobante_ref"] for fila in importacion.filas] == [
+        "FILA-00002",
+        "FILA-00003",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_plan_de_mapeo_se_compila_una_vez_por_version(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session: AsyncSession,
+    test_empresa: Empresa,
+):
+    """Importar dos veces reutiliza el plan; editar la plantilla lo descarta."""
+    config = _config_plantilla_basica(tipo_comprobante=6)
+    crear = await client.post(
+        "/api/formatos-importacion",
+        headers=auth_headers,
+        json={
+            "nombre": "Plantilla con plan",
+            "descripcion": None,
+            "alcance": "emisor",
+            "configuracion_json": config,
+        },
+    )
+    assert crear.status_code == 201, crear.text
+    formato_id = crear.json()["id"]
+    version_id = crear.json()["version_vigente"]["id"]
+    service = FormatosImportacionService(db_session)
+    version = await service.obtener_version(version_id, test_empresa.id)
+    contenido = _xlsx_con_filas(
+        ["Fecha", "Descripción", "Importe"],
+        [["2026-05-31", "Servicio mensual", "1.234,50"]],
+    )
+    # Otros tests pueden haber dejado un plan con el mismo id de versión.
+    cache_planes_mapeo.invalidar()
+    inicial = cache_planes_mapeo.stats()
+
+    primera = await service.importar_con_version(contenido, test_empresa, version)
+    segunda = await service.importar_con_version(contenido, test_empresa, version)
+
+    stats = cache_planes_mapeo.stats()
+    assert stats["compilaciones"] - inicial["compilaciones"] == 1
+    assert stats["aciertos"] - inicial["aciertos"] == 1
+    assert primera.filas == segunda.filas
+    assert primera.filas[0]["item_precio_unitario"] == "1234.50"
+    assert primera.filas[0]["empresa_cuit"] == test_empresa.cuit
+
+    config["plantilla"]["columnas"][4]["etiqueta"] = "Precio"
+    editar = await client.put(
+        f"/api/formatos-importacion/{formato_id}",
+        headers=auth_headers,
+        json={"configuracion_json": config},
+    )
+    assert editar.status_code == 200, editar.text
+    assert cache_planes_mapeo.stats()["planes"] == stats["planes"] - 1
+
+
+@pytest.mark.asyncio
+async def test_formato_rechaza_fuente_de_archivo_invalida(
+    client: AsyncClient,
+    auth_headers: dict,
+):
+    """El tipo de archivo, separador y codificación se validan al guardar."""
+    casos = [
+        ({"tipo": "ods"}, "xlsx, csv o tsv"),
+        ({"tipo": "csv", "delimitador": "#"}, "separador"),
+        ({"tipo": "csv", "codificacion": "no-existe"}, "codificación"),
+        ({"tipo": "tsv", "coma_decimal": "si"}, "coma decimal"),
+    ]
+    for archivo, mensaje in casos:
+        config = _config_plantilla_basica()
+        config["archivo"] = archivo
+        response = await client.post(
+            "/api/formatos-importacion",
+            headers=auth_headers,
+            json={
+                "nombre": "Plantilla CSV inválida",
+                "descripcion": None,
+                "alcance": "emisor",
+                "configuracion_json": config,
+            },
+        )
+        assert response.status_code == 400, archivo
+        assert mensaje in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_importar_tsv_con_punto_decimal_y_separador_de_miles(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session: AsyncSession,
+    test_empresa: Empresa,
+):
+    """Un TSV se lee sin openpyxl y respeta el separador decimal declarado."""
+    config = _config_plantilla_basica(tipo_comprobante=6)
+    config["archivo"] = {"tipo": "tsv", "codificacion": "utf-8"}
+    crear = await client.post(
+        "/api/formatos-importacion",
+        headers=auth_headers,
+        json={
+            "nombre": "Plantilla TSV",
+            "descripcion": None,
+            "alcance": "emisor",
+            "configuracion_json": config,
+        },
+    )
+    assert crear.status_code == 201, crear.text
+    service = FormatosImportacionService(db_session)
+    version = await service.obtener_version(
+        crear.json()["version_vigente"]["id"], test_empresa.id
+    )
+    contenido = (
+        "Fecha\tDescripción\tImporte\n"
+        "2026-05-31\tServicio mensual\t1,234.50\n"
+        "\t\t\n"
+        '2026-05-31\t"Soporte\tremoto"\t50\n'
+    ).encode("utf-8")
+
+    importacion = await service.importar_con_version(contenido, test_empresa, version)
+
+    assert [fila["comprobante_ref"] for fila in importacion.filas] == [
+        "FILA-00002",
+        "FILA-00004",
+    ]
+    assert importacion.filas[0]["item_precio_unitario"] == "1234.50"
+    assert importacion.filas[1]["item_descripcion"] == "Soporte\tremoto"
+    with pytest.raises(FormatoImportacionError, match="CSV/TSV"):
+        await service.importar_con_version(
+            _xlsx_con_filas(["Fecha"], [["2026-05-31"]]), test_empresa, version
+        )
+
+
+async def _version_csv_basica(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session: AsyncSession,
+    test_empresa: Empresa,
+    coma_decimal: bool,
+) -> FormatoImportacionVersion:
+    """Crea una plantilla CSV con `;` y el separador decimal indicado."""
+    config = _config_plantilla_basica(tipo_comprobante=6)
+    config["archivo"] = {
+        "tipo": "csv",
+        "delimitador": ";",
+        "codificacion": "utf-8",
+        "coma_decimal": coma_decimal,
+    }
+    crear = await client.post(
+        "/api/formatos-importacion",
+        headers=auth_headers,
+        json={
+            "nombre": f"Plantilla CSV coma {coma_decimal}",
+            "descripcion": None,
+            "alcance": "emisor",
+            "configuracion_json": config,
+        },
+    )
+    assert crear.status_code == 201, crear.text
+    return await FormatosImportacionService(db_session).obtener_version(
+        crear.json()["version_vigente"]["id"], test_empresa.id
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("coma_decimal", "importe", "esperado"),
+    [
+        (False, "1210.50", "1210.50"),
+        (False, "1,210.50", "1210.50"),
+        (False, "1,234,567", "1234567"),
+        (True, "1210,50", "1210.50"),
+        (True, "1.210,50", "1210.50"),
+        (True, "1.234.567", "1234567"),
+    ],
+)
+async def test_importar_csv_lee_numeros_segun_separador_declarado(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session: AsyncSession,
+    test_empresa: Empresa,
+    coma_decimal: bool,
+    importe: str,
+    esperado: str,
+):
+    """Con o sin miles, el CSV da el mismo importe que el Excel."""
+    version = await _version_csv_basica(
+        client, auth_headers, db_session, test_empresa, coma_decimal
+    )
+    contenido = (
+        f"Fecha;Descripción;Importe\n2026-05-31;Servicio mensual;{importe}\n"
+    ).encode("utf-8")
+
+    importacion = await FormatosImportacionService(db_session).importar_con_version(
+        contenido, test_empresa, version
+    )
+
+    assert [fila["item_precio_unitario"] for fila in importacion.filas] == [esperado]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("coma_decimal", "importe"),
+    [
+        (False, "1210,50"),
+        (False, "1.210,50"),
+        (False, "12,10.50"),
+        (True, "1210.50"),
+        (True, "1,210.50"),
+        (True, "12.10,50"),
+    ],
+)
+async def test_importar_csv_rechaza_numero_con_otro_separador(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session: AsyncSession,
+    test_empresa: Empresa,
+    coma_decimal: bool,
+    importe: str,
+):
+    """Un número que no respeta el formato es error de la fila, no otro importe."""
+    version = await _version_csv_basica(
+        client, auth_headers, db_session, test_empresa, coma_decimal
+    )
+    contenido = (
+        "Fecha;Descripción;Importe\n"
+        "2026-05-31;Servicio mensual;100\n"
+        f"2026-05-31;Soporte;{importe}\n"
+    ).encode("utf-8")
+
+    with pytest.raises(FormatoImportacionError, match="fila 3.*item_precio_unitario"):
+        await FormatosImportacionService(db_session).importar_con_version(
+            contenido, test_empresa, version
+        )
+
+
+def test_hoja_importacion_guarda_columnas_parejas_y_resuelve_hoja():
+    """Las filas cortas se completan y las vacías del final se descartan."""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Datos"
+    sheet.append(["A", "B", "C"])
+    sheet.append([1])
+    sheet.append([None, None, 3])
+    sheet.append([None])
+    output = BytesIO()
+    workbook.save(output)
+    sheet = load_workbook(BytesIO(output.getvalue()), read_only=True)["Datos"]
+
+    hoja = HojaImportacion.desde_hoja(sheet, ("Datos", "Otra"), "Datos")
+
+    assert hoja.total_filas == 3
+    assert hoja.columnas == (("A", 1, None), ("B", None, None), ("C", None, 3))
+    assert hoja.fila(2) == (1, None, None)
+    assert hoja.fila(9) == ()
+    assert list(hoja.iterar_filas(desde=3)) == [(3, (None, None, 3))]
+    assert hoja.resolver_titulo("Otra") == "Otra"
+    assert hoja.resolver_titulo("Inexistente") == "Datos"
+
+
+def test_cache_de_hojas_respeta_presupuesto_de_celdas():
+    """Las hojas grandes se leen en stream y el total de celdas queda acotado."""
+    cache = CacheHojasImportacion(max_hojas=4, max_celdas=20, max_celdas_hoja=10)
+    chicas = [
+        _xlsx_con_filas(["Fecha", "Importe", "Nota"], [[f"2026-05-0{dia}", dia, "x"]])
+        for dia in range(1, 4)
+    ]
+    grande = _xlsx_con_filas(
+        ["Fecha", "Importe", "Nota"],
+        [["2026-05-01", 1, "a"], ["2026-05-02", 2, None], [], ["2026-05-04", 4, "d"]],
+    )
+
+    for contenido in chicas[:2]:
+        assert isinstance(cache.obtener(contenido), HojaImportacion)
+    assert cache.stats()["celdas"] == 12
+    cache.obtener(chicas[2])
+    assert cache.stats()["hojas"] == 3
+    assert cache.stats()["celdas"] == 18
+
+    hoja = cache.obtener(grande)
+    assert isinstance(hoja, HojaImportacionEnStream)
+    assert cache.stats()["hojas"] == 3
+    completa = CacheHojasImportacion().obtener(grande)
+    assert hoja.fila(1) == completa.fila(1)
+    assert hoja.fila(99) == ()
+    assert [
+        (numero, fila)
+        for numero, fila in hoja.iterar_filas(desde=2)
+        if any(valor is not None for valor in fila)
+    ] == [
+        (numero, fila)
+        for numero, fila in completa.iterar_filas(desde=2)
+        if any(valor is not None for valor in fila)
+    ]
+
+    cache.obtener(_xlsx_con_filas(["A", "B", "C"], [[1, 2, 3], [4, 5, 6]]))
+    assert cache.stats()["celdas"] <= 20
+    assert cache.stats()["hojas"] == 2
+
+
 @pytest.mark.asyncio
 async def test_compatibilidad_exige_iva_explicito(
     client: AsyncClient,
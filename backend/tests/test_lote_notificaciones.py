@@ -0,0 +1,183 @@
+"""Tests para las señales de cola y de avance de lotes."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.lote_comprobante import LoteComprobante
+from app.services import lote_notificaciones
+from app.services.lote_notificaciones import (
+    desuscribir_cola_lotes,
+    desuscribir_progreso_lote,
+    marcar_lote_encolado,
+    marcar_progreso_lote,
+    notificar_cola_lotes,
+    publicar_progreso_lote,
+    seguir_progreso_lote,
+    suscribir_cola_lotes,
+    suscribir_progreso_lote,
+)
+from app.services.lote_worker import LoteWorker, ResultadoCicloLoteWorker
+
+
+@pytest.mark.asyncio
+async def test_senal_de_lote_encolado_se_emite_solo_al_confirmar(
+    db_session: AsyncSession,
+) -> None:
+    """El worker no debe despertar por un encolado que todavía no es visible."""
+    senales: list[int] = []
+
+    def registrar() -> None:
+        senales.append(1)
+
+    suscribir_cola_lotes(registrar)
+    try:
+        await marcar_lote_encolado(db_session)
+        await db_session.flush()
+        assert senales == []
+
+        await db_session.commit()
+        assert senales == [1]
+
+        await marcar_lote_encolado(db_session)
+        await db_session.execute(text("SELECT 1"))
+        await db_session.rollback()
+        await db_session.commit()
+        assert senales == [1]
+    finally:
+        desuscribir_cola_lotes(registrar)
+
+
+@pytest.mark.asyncio
+async def test_worker_despierta_por_senal_sin_esperar_polling(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Un lote encolado debe adelantar el ciclo aunque el polling sea lento."""
+    monkeypatch.setattr(settings, "batch_worker_poll_seconds", 30)
+    ciclos: list[int] = []
+    primer_ciclo = asyncio.Event()
+    segundo_ciclo = asyncio.Event()
+
+    async def fake_procesar(self) -> ResultadoCicloLoteWorker:
+        ciclos.append(1)
+        (segundo_ciclo if len(ciclos) > 1 else primer_ciclo).set()
+        return ResultadoCicloLoteWorker()
+
+    monkeypatch.setattr(LoteWorker, "procesar_pendientes", fake_procesar)
+    worker = LoteWorker()
+    tarea = asyncio.create_task(worker.run())
+    try:
+        await asyncio.wait_for(primer_ciclo.wait(), timeout=2)
+        notificar_cola_lotes()
+        await asyncio.wait_for(segundo_ciclo.wait(), timeout=2)
+    finally:
+        worker.stop()
+        await asyncio.wait_for(tarea, timeout=2)
+
+    assert len(ciclos) == 2
+    assert worker.despertar not in lote_notificaciones._suscriptores
+
+
+def test_worker_espacia_polling_mientras_no_hay_trabajo(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Sin trabajo la espera crece hasta el tope y con cola pendiente no espera."""
+    monkeypatch.setattr(settings, "batch_worker_poll_seconds", 5)
+    monkeypatch.setattr(settings, "batch_worker_idle_max_seconds", 30)
+    worker = LoteWorker()
+    ocioso = ResultadoCicloLoteWorker()
+
+    espera = 5.0
+    esperas = []
+    for _ in range(4):
+        espera = worker._calcular_espera(ocioso, espera)
+        esperas.append(espera)
+
+    assert esperas == [10.0, 20.0, 30.0, 30.0]
+    assert (
+        worker._calcular_espera(
+            ResultadoCicloLoteWorker(lotes_en_cola_detectados=1, lotes_procesados=1),
+            30.0,
+        )
+        == 5.0
+    )
+    assert (
+        worker._calcular_espera(
+            ResultadoCicloLoteWorker(lotes_procesados=1, quedan_en_cola=True),
+            30.0,
+        )
+        == 0
+    )
+    assert worker._calcular_espera(None, 30.0) == 5.0
+
+
+@pytest.mark.asyncio
+async def test_progreso_de_lote_se_publica_solo_al_confirmar(
+    db_session: AsyncSession,
+    test_empresa,
+) -> None:
+    """El avance publicado debe ser el confirmado, una vez por commit."""
+    lote = LoteComprobante(
+        nombre_archivo="progreso.xlsx",
+        archivo_hash="hash-progreso-lote",
+        estado="procesando",
+        total_grupos=3,
+        grupos_validos=3,
+        empresa_id=test_empresa.id,
+    )
+    db_session.add(lote)
+    await db_session.commit()
+    lote_id = lote.id
+    publicados: list[dict] = []
+    suscribir_progreso_lote(lote_id, publicados.append)
+    try:
+        lote.grupos_validos = 2
+        lote.grupos_emitidos = 1
+        marcar_progreso_lote(db_session, lote)
+        lote.mensaje_resumen = "Procesando comprobante 1 de 3..."
+        marcar_progreso_lote(db_session, lote)
+        await db_session.flush()
+        assert publicados == []
+
+        await db_session.commit()
+        assert len(publicados) == 1
+        assert publicados[0]["grupos_emitidos"] == 1
+        assert publicados[0]["mensaje_resumen"] == "Procesando comprobante 1 de 3..."
+
+        lote.grupos_emitidos = 2
+        marcar_progreso_lote(db_session, lote)
+        await db_session.rollback()
+        await db_session.commit()
+        assert len(publicados) == 1
+    finally:
+        desuscribir_progreso_lote(lote_id, publicados.append)
+    assert lote_id not in lote_notificaciones._suscriptores_progreso
+
+
+@pytest.mark.asyncio
+async def test_seguir_progreso_lote_entrega_cambios_hasta_terminar() -> None:
+    """El stream refresca desde la base sin publicaciones y corta al terminar."""
+    lecturas = [
+        {"id": 7, "estado": "procesando", "grupos_emitidos": 0},
+        {"id": 7, "estado": "procesando", "grupos_emitidos": 1},
+    ]
+
+    async def leer_seguimiento() -> dict:
+        return lecturas.pop(0)
+
+    stream = seguir_progreso_lote(7, leer_seguimiento, intervalo_refresco=0.05)
+    assert (await anext(stream))["grupos_emitidos"] == 0
+    assert 7 in lote_notificaciones._suscriptores_progreso
+
+    publicar_progreso_lote({"id": 7, "estado": "procesando", "grupos_emitidos": 1})
+    assert (await anext(stream))["grupos_emitidos"] == 1
+    assert await anext(stream) is None
+
+    publicar_progreso_lote({"id": 7, "estado": "completado", "grupos_emitidos": 2})
+    assert (await anext(stream))["estado"] == "completado"
+    with pytest.raises(StopAsyncIteration):
+        await anext(stream)
+    assert 7 not in lote_notificaciones._suscriptores_progreso
@@ -1,22 +1,27 @@
 """Tests para emision masiva de comprobantes."""
 
+import asyncio
+from collections import Counter, defaultdict
 from copy import deepcopy
 from datetime import date, datetime, timedelta
 from decimal import Decimal
 import hashlib
 from io import BytesIO
 import json
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
 
 import pytest
 from httpx import AsyncClient
 from openpyxl import Workbook, load_workbook
 from openpyxl.utils.datetime import to_excel
-from sqlalchemy import JSON, func, select, update
+from sqlalchemy import JSON, event, func, select, update
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.exc import TimeoutError as SQLAlchemyTimeoutError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.api.paginacion import MENSAJE_CURSOR_INVALIDO, codificar_cursor
 from app.arca.exceptions import (
     ArcaErrorGlobalEstructurado,
     ArcaServiceError,
@@ -50,17 +55,28 @@ from app.schemas.lote_comprobante import (
     LoteProcesamientoResponse,
     LoteReconciliacionExternaItem,
 )
-from app.services.facturacion_service import FacturacionService
+from app.services.facturacion_service import FacturacionService, FaseSolicitudArca
 from app.services.lote_comprobantes_service import (
+    ConfiguracionBatchArca,
+    CorteEmisionLote,
+    EmisionLoteEnCurso,
+    GrupoPendienteEmision,
     LoteComprobanteConflictoError,
     LoteComprobanteError,
     LoteComprobantesService,
+    OpcionesConceptoLote,
+    OpcionesDescripcionItemLote,
+    OpcionesFechasLote,
+    OpcionesPuntoVentaLote,
+    validar_archivo_lote_en_proceso,
+    validar_grupos_en_proceso,
 )
 from app.services.idempotencia_fiscal_service import IdempotenciaFiscalService
 from app.services.elegibilidad_rece_service import (
     ContextoElegibilidadRece,
     ElegibilidadReceService,
 )
+from app.services.lote_validacion_trabajos import validacion_lote_trabajos
 from app.services.lote_worker import LoteWorker, get_lote_worker_status
 
 
@@ -489,6 +505,20 @@ def _build_cano_factura_b_excel(fecha_movimiento: date | None = None) -> bytes:
     return stream.getvalue()
 
 
+def _build_cano_factura_b_csv(fecha_movimiento: date | None = None) -> bytes:
+    """Genera la muestra Cano como la exporta un ERP: CSV con `;` y coma decimal."""
+    fecha = fecha_movimiento or FECHA_FISCAL_CONTROLADA_PF19B
+    lineas = [
+        "Fecha;Tipo;Punto de Venta;Número Desde;Número Hasta;Cód. Autorización;"
+        "Tipo Doc. Receptor;Nro. Doc. Receptor;Denominación Receptor;Tipo Cambio;"
+        "Moneda;Imp. Neto Gravado;Imp. Neto No Gravado;Imp. Op. Exentas;"
+        "Otros Tributos;IVA;Imp. Total",
+        f"{fecha:%d/%m/%Y};6 - Factura B;2;1;;;DNI;HEBER YOEL ASANCHEZ CA -;;1;$;"
+        "74.380,1652892562;0;0;;15.619,8347107438;90.000,00",
+    ]
+    return ("\r\n".join(lineas) + "\r\n").encode("cp1252")
+
+
 def _config_formato_cano_factura_b() -> dict:
     """Devuelve la configuración del formato Cano Factura B con IVA 21%."""
     return {
@@ -1260,6 +1290,130 @@ async def test_obtener_resumen_y_grupos_paginados_lote(
     assert {item["estado"] for item in filtrada_data["items"]} == {"validado"}
 
 
+@pytest.mark.asyncio
+async def test_grupos_paginados_por_cursor_sin_contar_ni_cargar_datos_de_filas(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session: AsyncSession,
+    test_empresa,
+):
+    """El cursor avanza por (orden, id) y el total sale de los contadores."""
+    lote = LoteComprobante(
+        nombre_archivo="lote-cursor.xlsx",
+        archivo_hash="hash-lote-cursor-grupos",
+        estado="validado",
+        total_filas=5,
+        total_grupos=5,
+        grupos_validos=4,
+        grupos_con_error=1,
+        empresa_id=test_empresa.id,
+    )
+    db_session.add(lote)
+    await db_session.flush()
+    lote_id = lote.id
+    estados = ["validado", "con_error", "validado", "validado", "validado"]
+    for index, estado in enumerate(estados, start=1):
+        grupo = LoteComprobanteGrupo(
+            lote_id=lote_id,
+            empresa_id=test_empresa.id,
+            comprobante_ref=f"CUR-{index:03d}",
+            orden=1 if index <= 3 else index,
+            estado=estado,
+            total_estimado=Decimal("100"),
+            payload_json={},
+            mensajes_json=[],
+        )
+        db_session.add(grupo)
+        await db_session.flush()
+        db_session.add(
+            LoteComprobanteFila(
+                lote_id=lote_id,
+                grupo_id=grupo.id,
+                fila_excel=index + 1,
+                comprobante_ref=grupo.comprobante_ref,
+                estado=estado,
+                datos_json={"item_descripcion": f"Servicio {index}"},
+                mensajes_json=[],
+            )
+        )
+    await db_session.commit()
+
+    sentencias: list[str] = []
+
+    def registrar_sql(_conn, _cursor, statement, _params, _context, _many) -> None:
+        sentencias.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", registrar_sql)
+    try:
+        primera = await client.get(
+            f"/api/lotes-comprobantes/{lote_id}/grupos" "?per_page=2&filas=omitir",
+            headers=auth_headers,
+        )
+        assert primera.status_code == 200, primera.text
+        primera_data = primera.json()
+        segunda = await client.get(
+            f"/api/lotes-comprobantes/{lote_id}/grupos?per_page=2&filas=resumen"
+            f"&cursor={primera_data['next_cursor']}",
+            headers=auth_headers,
+        )
+        assert segunda.status_code == 200, segunda.text
+        segunda_data = segunda.json()
+        filtrada = await client.get(
+            f"/api/lotes-comprobantes/{lote_id}/grupos?estado=validado&per_page=3"
+            f"&cursor={primera_data['next_cursor']}&filas=omitir",
+            headers=auth_headers,
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar_sql)
+
+    assert not [sql for sql in sentencias if "count(" in sql.lower()]
+    assert not [
+        sql
+        for sql in sentencias
+        if "FROM lotes_comprobantes_filas" in sql and "datos_json" in sql
+    ]
+    assert primera_data["total"] == 5
+    assert [item["comprobante_ref"] for item in primera_data["items"]] == [
+        "CUR-001",
+        "CUR-002",
+    ]
+    assert all(item["filas"] is None for item in primera_data["items"])
+    assert all(item["descripcion_facturada"] is None for item in primera_data["items"])
+
+    assert [item["comprobante_ref"] for item in segunda_data["items"]] == [
+        "CUR-003",
+        "CUR-004",
+    ]
+    assert segunda_data["items"][0]["filas"] == [
+        {
+            "id": segunda_data["items"][0]["filas"][0]["id"],
+            "fila_excel": 4,
+            "estado": "validado",
+        }
+    ]
+    assert segunda_data["next_cursor"]
+
+    assert filtrada.status_code == 200, filtrada.text
+    filtrada_data = filtrada.json()
+    assert filtrada_data["total"] == 4
+    assert [item["comprobante_ref"] for item in filtrada_data["items"]] == [
+        "CUR-003",
+        "CUR-004",
+        "CUR-005",
+    ]
+    assert filtrada_data["next_cursor"] is None
+
+    for cursor in ("no-es-cursor", codificar_cursor((date(2026, 3, 1), 1, 7))):
+        invalido = await client.get(
+            f"/api/lotes-comprobantes/{lote_id}/grupos",
+            params={"cursor": cursor},
+            headers=auth_headers,
+        )
+        assert invalido.status_code == 400
+        assert invalido.json()["detail"] == MENSAJE_CURSOR_INVALIDO
+
+
 @pytest.mark.asyncio
 async def test_seguimiento_lote_es_liviano_y_no_muta_updated_at(
     client: AsyncClient,
@@ -1387,6 +1541,50 @@ async def test_seguimiento_lote_respeta_scope_del_emisor(
     assert "permiso" in response.json()["detail"]
 
 
+@pytest.mark.asyncio
+async def test_seguimiento_en_vivo_emite_estado_y_cierra_lote_terminado(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session: AsyncSession,
+    test_empresa,
+) -> None:
+    """El stream arranca con el estado persistido y termina si no está activo."""
+    lote = LoteComprobante(
+        nombre_archivo="lote-seguimiento-stream.xlsx",
+        archivo_hash="hash-lote-seguimiento-stream",
+        estado="completado",
+        total_filas=2,
+        total_grupos=2,
+        grupos_emitidos=2,
+        mensaje_resumen="Todos los comprobantes del lote fueron emitidos.",
+        empresa_id=test_empresa.id,
+    )
+    db_session.add(lote)
+    await db_session.commit()
+    lote_id = lote.id
+
+    response = await client.get(
+        f"/api/lotes-comprobantes/{lote_id}/seguimiento/stream",
+        headers=auth_headers,
+    )
+    inexistente = await client.get(
+        "/api/lotes-comprobantes/999999/seguimiento/stream",
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/event-stream")
+    eventos = [bloque for bloque in response.text.split("\n\n") if bloque]
+    assert len(eventos) == 1
+    tipo, datos = eventos[0].split("\n")
+    assert tipo == "event: seguimiento"
+    seguimiento = json.loads(datos.removeprefix("data: "))
+    assert seguimiento["id"] == lote_id
+    assert seguimiento["estado"] == "completado"
+    assert seguimiento["grupos_emitidos"] == 2
+    assert inexistente.status_code == 404
+
+
 @pytest.mark.asyncio
 async def test_validar_lote_registra_grupos_y_filas(
     client: AsyncClient,
@@ -1426,6 +1624,65 @@ async def test_validar_lote_registra_grupos_y_filas(
     assert detalle_data["grupos"][0]["estado"] == "validado"
 
 
+@pytest.mark.asyncio
+async def test_validar_lote_inserta_grupos_y_filas_por_tramos(
+    client: AsyncClient,
+    auth_headers: dict,
+    monkeypatch: pytest.MonkeyPatch,
+    db_session: AsyncSession,
+    test_empresa,
+    test_punto_venta,
+    test_certificado,
+):
+    """Los ids devueltos por el INSERT masivo quedan asociados a sus filas."""
+    monkeypatch.setattr(LoteComprobantesService, "GRUPOS_POR_INSERCION", 2)
+    monkeypatch.setattr(LoteComprobantesService, "FILAS_POR_INSERCION", 1)
+    consultas_elegibilidad = 0
+    exigir_original = ElegibilidadReceService.exigir_contexto_preautorizacion
+
+    async def contar_exigir(self, **kwargs):
+        nonlocal consultas_elegibilidad
+        consultas_elegibilidad += 1
+        return await exigir_original(self, **kwargs)
+
+    monkeypatch.setattr(
+        ElegibilidadReceService, "exigir_contexto_preautorizacion", contar_exigir
+    )
+
+    response = await client.post(
+        "/api/lotes-comprobantes/validar",
+        headers=auth_headers,
+        data=_opciones_fechas(),
+        files={
+            "archivo": (
+                "lote-tramos.xlsx",
+                _build_lote_excel_multi_grupo(test_empresa.cuit, total_grupos=5),
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+        },
+    )
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["lote"]["grupos_validos"] == 5
+    assert consultas_elegibilidad == 1
+
+    filas = (
+        await db_session.execute(
+            select(LoteComprobanteFila.comprobante_ref, LoteComprobanteGrupo)
+            .join(
+                LoteComprobanteGrupo,
+                LoteComprobanteFila.grupo_id == LoteComprobanteGrupo.id,
+            )
+            .where(LoteComprobanteFila.lote_id == data["lote"]["id"])
+            .order_by(LoteComprobanteFila.fila_excel)
+        )
+    ).all()
+    assert [grupo.orden for _ref, grupo in filas] == [1, 2, 3, 4, 5]
+    assert all(ref == grupo.comprobante_ref for ref, grupo in filas)
+    assert all(grupo.punto_venta_id == test_punto_venta.id for _ref, grupo in filas)
+
+
 @pytest.mark.asyncio
 async def test_validar_lote_productos_acepta_fechas_servicio_omitidas(
     client: AsyncClient,
@@ -1529,6 +1786,327 @@ async def test_validar_lote_rechaza_xlsx_malformado(
     assert "No se pudo leer el archivo Excel" in response.json()["detail"]
 
 
+def _sesion_trabajos_validacion(
+    monkeypatch: pytest.MonkeyPatch, db_session: AsyncSession, tmp_path
+) -> None:
+    """Hace que los trabajos de validación usen la sesión y un tmp de pruebas."""
+
+    class SessionFactory:
+        async def __aenter__(self):
+            return db_session
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    monkeypatch.setattr(
+        "app.services.lote_validacion_trabajos.AsyncSessionLocal", SessionFactory
+    )
+    monkeypatch.setattr(validacion_lote_trabajos, "max_workers", 0)
+    monkeypatch.setattr(settings, "storage_tmp_path", str(tmp_path))
+
+
+@pytest.mark.asyncio
+async def test_validacion_lote_en_segundo_plano_informa_avance_y_resultado(
+    client: AsyncClient,
+    auth_headers: dict,
+    monkeypatch: pytest.MonkeyPatch,
+    db_session: AsyncSession,
+    tmp_path,
+    test_empresa,
+    test_punto_venta,
+    test_certificado,
+):
+    """El upload responde con un trabajo y el resultado se consulta después."""
+    _sesion_trabajos_validacion(monkeypatch, db_session, tmp_path)
+    validaciones_en_request = 0
+    validar_original = LoteComprobantesService.validar_y_registrar_lote
+
+    async def contar_validacion_en_request(self, *args, **kwargs):
+        nonlocal validaciones_en_request
+        validaciones_en_request += 1
+        return await validar_original(self, *args, **kwargs)
+
+    monkeypatch.setattr(
+        LoteComprobantesService,
+        "validar_y_registrar_lote",
+        contar_validacion_en_request,
+    )
+
+    def validar_como_en_proceso(entrada):
+        # El pool de procesos serializa la entrada y el resultado con pickle.
+        resultado = validar_archivo_lote_en_proceso(pickle.loads(pickle.dumps(entrada)))
+        return pickle.loads(pickle.dumps(resultado))
+
+    monkeypatch.setattr(
+        "app.services.lote_validacion_trabajos.validar_archivo_lote_en_proceso",
+        validar_como_en_proceso,
+    )
+
+    response = await client.post(
+        "/api/lotes-comprobantes/validaciones",
+        headers=auth_headers,
+        data=_opciones_fechas(),
+        files={
+            "archivo": (
+                "lote-trabajo.xlsx",
+                _build_lote_excel_multi_grupo(test_empresa.cuit, total_grupos=3),
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+        },
+    )
+
+    assert response.status_code == 202, response.text
+    trabajo = response.json()
+    assert trabajo["estado"] == "en_cola"
+    assert trabajo["resultado"] is None
+    await validacion_lote_trabajos.obtener(trabajo["id"], test_empresa.id).tarea
+
+    estado = await client.get(
+        f"/api/lotes-comprobantes/validaciones/{trabajo['id']}",
+        headers=auth_headers,
+    )
+    assert estado.status_code == 200, estado.text
+    data = estado.json()
+    assert data["estado"] == "completado"
+    assert data["total_grupos"] == 3
+    assert data["grupos_registrados"] == 3
+    assert data["resultado"]["puede_emitirse"] is True
+    assert data["resultado"]["lote"]["grupos_validos"] == 3
+    assert data["resultado"]["lote"]["nombre_archivo"] == "lote-trabajo.xlsx"
+    assert validaciones_en_request == 0
+    assert list((tmp_path / "validaciones_lote").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_validacion_lote_en_segundo_plano_no_retiene_sesion_mientras_valida(
+    client: AsyncClient,
+    auth_headers: dict,
+    monkeypatch: pytest.MonkeyPatch,
+    db_session: AsyncSession,
+    tmp_path,
+    test_empresa,
+    test_punto_venta,
+    test_certificado,
+):
+    """La sesión de las consultas previas se cierra antes de validar el archivo."""
+    _sesion_trabajos_validacion(monkeypatch, db_session, tmp_path)
+    sesiones_abiertas = 0
+    sesiones_durante_validacion: list[int] = []
+
+    class SessionFactory:
+        async def __aenter__(self):
+            nonlocal sesiones_abiertas
+            sesiones_abiertas += 1
+            return db_session
+
+        async def __aexit__(self, exc_type, exc, tb):
+            nonlocal sesiones_abiertas
+            sesiones_abiertas -= 1
+            return False
+
+    def validar_contando_sesiones(entrada):
+        sesiones_durante_validacion.append(sesiones_abiertas)
+        return validar_archivo_lote_en_proceso(entrada)
+
+    monkeypatch.setattr(
+        "app.services.lote_validacion_trabajos.AsyncSessionLocal", SessionFactory
+    )
+    monkeypatch.setattr(
+        "app.services.lote_validacion_trabajos.validar_archivo_lote_en_proceso",
+        validar_contando_sesiones,
+    )
+
+    response = await client.post(
+        "/api/lotes-comprobantes/validaciones",
+        headers=auth_headers,
+        data=_opciones_fechas(),
+        files={
+            "archivo": (
+                "lote-sin-sesion.xlsx",
+                _build_lote_excel_multi_grupo(test_empresa.cuit, total_grupos=2),
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+        },
+    )
+
+    assert response.status_code == 202, response.text
+    trabajo = validacion_lote_trabajos.obtener(response.json()["id"], test_empresa.id)
+    await trabajo.tarea
+    assert trabajo.estado == "completado", trabajo.error
+    assert trabajo.grupos_registrados == 2
+    assert sesiones_durante_validacion == [0]
+    assert sesiones_abiertas == 0
+
+
+@pytest.mark.asyncio
+async def test_validacion_lote_en_segundo_plano_informa_error_funcional(
+    client: AsyncClient,
+    auth_headers: dict,
+    monkeypatch: pytest.MonkeyPatch,
+    db_session: AsyncSession,
+    tmp_path,
+    test_empresa,
+    test_punto_venta,
+    test_certificado,
+):
+    """Un archivo inválido deja el trabajo en error con el mensaje funcional."""
+    _sesion_trabajos_validacion(monkeypatch, db_session, tmp_path)
+
+    response = await client.post(
+        "/api/lotes-comprobantes/validaciones",
+        headers=auth_headers,
+        data=_opciones_fechas(),
+        files={
+            "archivo": (
+                "corrupto.xlsx",
+                b"esto no es un zip",
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+        },
+    )
+
+    assert response.status_code == 202, response.text
+    trabajo_id = response.json()["id"]
+    await validacion_lote_trabajos.obtener(trabajo_id, test_empresa.id).tarea
+
+    estado = await client.get(
+        f"/api/lotes-comprobantes/validaciones/{trabajo_id}",
+        headers=auth_headers,
+    )
+    assert estado.status_code == 200
+    assert estado.json()["estado"] == "error"
+    assert "No se pudo leer el archivo Excel" in estado.json()["error"]
+    assert validacion_lote_trabajos.obtener(trabajo_id, test_empresa.id + 1) is None
+
+    ajeno = await client.get(
+        "/api/lotes-comprobantes/validaciones/inexistente",
+        headers=auth_headers,
+    )
+    assert ajeno.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_validar_lote_grande_reparte_grupos_en_tramos_y_conserva_orden(
+    client: AsyncClient,
+    auth_headers: dict,
+    monkeypatch: pytest.MonkeyPatch,
+    test_empresa,
+    test_punto_venta,
+    test_certificado,
+):
+    """Los grupos se validan por tramos en el pool de trabajos y en orden."""
+    monkeypatch.setattr(LoteComprobantesService, "MIN_GRUPOS_VALIDACION_PARALELA", 1)
+    monkeypatch.setattr(LoteComprobantesService, "GRUPOS_POR_TRAMO_VALIDACION", 2)
+    tramos_validados: list[list[str]] = []
+
+    def validar_como_en_proceso(tramo):
+        # El pool de procesos serializa los tramos y los resultados con pickle.
+        tramo = pickle.loads(pickle.dumps(tramo))
+        tramos_validados.append(
+            [comprobante_ref for comprobante_ref, _ in tramo.grupos]
+        )
+        return pickle.loads(pickle.dumps(validar_grupos_en_proceso(tramo)))
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        monkeypatch.setattr(validacion_lote_trabajos, "_obtener_pool", lambda: pool)
+        monkeypatch.setattr(
+            "app.services.lote_comprobantes_service.validar_grupos_en_proceso",
+            validar_como_en_proceso,
+        )
+        response = await client.post(
+            "/api/lotes-comprobantes/validar",
+            headers=auth_headers,
+            data=_opciones_fechas(),
+            files={
+                "archivo": (
+                    "lote-paralelo.xlsx",
+                    _build_lote_excel_multi_grupo(test_empresa.cuit, total_grupos=5),
+                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                )
+            },
+        )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["lote"]["grupos_validos"] == 5
+    assert sorted(tramos_validados) == [
+        ["LOTE-001", "LOTE-002"],
+        ["LOTE-003", "LOTE-004"],
+        ["LOTE-005"],
+    ]
+    detalle = await client.get(
+        f"/api/lotes-comprobantes/{response.json()['lote']['id']}",
+        headers=auth_headers,
+    )
+    assert detalle.status_code == 200, detalle.text
+    assert [
+        (grupo["orden"], grupo["comprobante_ref"]) for grupo in detalle.json()["grupos"]
+    ] == [(orden, f"LOTE-{orden:03d}") for orden in range(1, 6)]
+
+
+@pytest.mark.asyncio
+async def test_validacion_lote_en_segundo_plano_valida_grupos_en_el_mismo_worker(
+    client: AsyncClient,
+    auth_headers: dict,
+    monkeypatch: pytest.MonkeyPatch,
+    db_session: AsyncSession,
+    tmp_path,
+    test_empresa,
+    test_punto_venta,
+    test_certificado,
+):
+    """El worker del archivo valida sus grupos sin reenviarlos por tramos."""
+    _sesion_trabajos_validacion(monkeypatch, db_session, tmp_path)
+    monkeypatch.setattr(LoteComprobantesService, "MIN_GRUPOS_VALIDACION_PARALELA", 1)
+    monkeypatch.setattr(LoteComprobantesService, "GRUPOS_POR_TRAMO_VALIDACION", 2)
+    grupos_del_worker: list[int] = []
+    tramos_validados: list[list[str]] = []
+
+    def validar_archivo_como_en_proceso(entrada):
+        resultado = validar_archivo_lote_en_proceso(pickle.loads(pickle.dumps(entrada)))
+        grupos_del_worker.append(len(resultado.grupos))
+        return pickle.loads(pickle.dumps(resultado))
+
+    def validar_tramo_como_en_proceso(tramo):
+        tramos_validados.append(
+            [comprobante_ref for comprobante_ref, _ in tramo.grupos]
+        )
+        return validar_grupos_en_proceso(tramo)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        monkeypatch.setattr(validacion_lote_trabajos, "_obtener_pool", lambda: pool)
+        monkeypatch.setattr(
+            "app.services.lote_comprobantes_service.validar_grupos_en_proceso",
+            validar_tramo_como_en_proceso,
+        )
+        monkeypatch.setattr(
+            "app.services.lote_validacion_trabajos.validar_archivo_lote_en_proceso",
+            validar_archivo_como_en_proceso,
+        )
+        response = await client.post(
+            "/api/lotes-comprobantes/validaciones",
+            headers=auth_headers,
+            data=_opciones_fechas(),
+            files={
+                "archivo": (
+                    "lote-trabajo-paralelo.xlsx",
+                    _build_lote_excel_multi_grupo(test_empresa.cuit, total_grupos=3),
+                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                )
+            },
+        )
+        assert response.status_code == 202, response.text
+        trabajo = validacion_lote_trabajos.obtener(
+            response.json()["id"], test_empresa.id
+        )
+        await trabajo.tarea
+
+    assert trabajo.estado == "completado", trabajo.error
+    assert grupos_del_worker == [3]
+    assert tramos_validados == []
+    assert trabajo.total_grupos == 3
+    assert trabajo.grupos_registrados == 3
+
+
 @pytest.mark.asyncio
 async def test_validar_lote_rechaza_archivo_demasiado_grande(
     client: AsyncClient,
@@ -2281,20 +2859,110 @@ async def test_validar_lote_formato_cano_factura_b_iva_21(
     assert response.status_code == 200, response.text
     data = response.json()
     assert data["puede_emitirse"] is True
-    assert data["lote"]["grupos_validos"] == 1
-
+    assert data["lote"]["grupos_validos"] == 1
+
+    detalle = await client.get(
+        f"/api/lotes-comprobantes/{data['lote']['id']}",
+        headers=auth_headers,
+    )
+    grupo = detalle.json()["grupos"][0]
+    fila = detalle.json()["filas"][0]["datos_json"]
+    assert grupo["tipo_comprobante"] == 6
+    assert grupo["punto_venta_numero"] == 2
+    assert grupo["cliente_documento"] == "0"
+    assert grupo["total_estimado"] == "90000.00"
+    assert fila["item_precio_unitario"] == "74380.1652892562"
+    assert fila["item_iva_porcentaje"] == 21
+
+
+@pytest.mark.asyncio
+async def test_validar_lote_formato_cano_desde_csv(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session: AsyncSession,
+    test_empresa,
+    test_user,
+    test_punto_venta,
+    test_certificado,
+):
+    """Un formato declarado como CSV se detecta y valida sin pasar por Excel."""
+    test_empresa.condicion_iva = "RI"
+    await _crear_punto_venta_rece_verificado(
+        db_session,
+        test_empresa,
+        usuario_id=int(test_user.id),
+        numero=2,
+        nombre="Cano PV 2",
+        documento_emitido_en=FECHA_DOCUMENTO_RECE_TEST,
+        vigente_hasta=FECHA_VIGENCIA_RECE_TEST,
+        observado_en=INSTANTE_RECE_TEST,
+    )
+    await db_session.commit()
+
+    configuracion = _config_formato_cano_factura_b()
+    configuracion["archivo"] = {
+        "tipo": "csv",
+        "delimitador": ";",
+        "codificacion": "cp1252",
+        "coma_decimal": True,
+    }
+    crear = await client.post(
+        "/api/formatos-importacion",
+        headers=auth_headers,
+        json={
+            "nombre": "Cano CSV - Factura B IVA 21%",
+            "descripcion": None,
+            "configuracion_json": configuracion,
+        },
+    )
+    assert crear.status_code == 201, crear.text
+
+    contenido = _build_cano_factura_b_csv(FECHA_FISCAL_CONTROLADA_PF19B)
+    detectar = await client.post(
+        "/api/formatos-importacion/detectar",
+        headers=auth_headers,
+        files={"archivo": ("cano-factura-b.csv", contenido, "text/csv")},
+    )
+    assert detectar.status_code == 200, detectar.text
+    assert "Denominación Receptor" in detectar.json()["headers_detectados"]
+    formato_version_id = detectar.json()["formato_sugerido_version_id"]
+    assert formato_version_id == crear.json()["version_vigente"]["id"]
+
+    sin_formato = await client.post(
+        "/api/lotes-comprobantes/validar",
+        headers=auth_headers,
+        data=_opciones_fechas(concepto_modo="productos"),
+        files={"archivo": ("cano-factura-b.csv", contenido, "text/csv")},
+    )
+    assert sin_formato.status_code == 400
+    assert "CSV/TSV" in sin_formato.json()["detail"]
+
+    response = await client.post(
+        "/api/lotes-comprobantes/validar",
+        headers=auth_headers,
+        data={
+            **_opciones_fechas(
+                concepto_modo="productos",
+                descripcion_item_modo="fija",
+                descripcion_item_fija="Venta mostrador",
+            ),
+            "formato_version_id": str(formato_version_id),
+        },
+        files={"archivo": ("cano-factura-b.csv", contenido, "text/csv")},
+    )
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["puede_emitirse"] is True
     detalle = await client.get(
         f"/api/lotes-comprobantes/{data['lote']['id']}",
         headers=auth_headers,
     )
     grupo = detalle.json()["grupos"][0]
     fila = detalle.json()["filas"][0]["datos_json"]
-    assert grupo["tipo_comprobante"] == 6
     assert grupo["punto_venta_numero"] == 2
-    assert grupo["cliente_documento"] == "0"
     assert grupo["total_estimado"] == "90000.00"
     assert fila["item_precio_unitario"] == "74380.1652892562"
-    assert fila["item_iva_porcentaje"] == 21
 
 
 @pytest.mark.asyncio
@@ -3782,6 +4450,145 @@ async def test_procesar_lote_actualiza_contadores_parciales(
     assert data["lote"]["grupos_emitidos"] == 2
 
 
+@pytest.mark.asyncio
+async def test_procesar_lote_lleva_contadores_sin_recontar_por_grupo(
+    client: AsyncClient,
+    auth_headers: dict,
+    monkeypatch: pytest.MonkeyPatch,
+    db_session: AsyncSession,
+    test_empresa,
+    test_punto_venta,
+    test_certificado,
+):
+    """El avance por grupo no debe recontar el lote; solo al abrir y cerrar."""
+    test_certificado.ambiente = settings.arca_env
+    validar = await client.post(
+        "/api/lotes-comprobantes/validar",
+        headers=auth_headers,
+        data=_opciones_fechas(),
+        files={
+            "archivo": (
+                "lote-contadores-incrementales.xlsx",
+                _build_lote_excel_multi_grupo(test_empresa.cuit, total_grupos=4),
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+        },
+    )
+    assert validar.status_code == 200, validar.text
+    lote_id = validar.json()["lote"]["id"]
+    llamadas = 0
+
+    async def fake_emitir(self, request, **kwargs):
+        nonlocal llamadas
+        llamadas += 1
+        if llamadas == 3:
+            return EmitirComprobanteResponse(
+                exito=False,
+                tipo_comprobante=request.tipo_comprobante,
+                punto_venta=1,
+                numero=0,
+                fecha=request.fecha_emision,
+                total=Decimal("1210.00"),
+                mensaje="Comprobante rechazado",
+                errores=["Rechazado por ARCA"],
+                categoria_error="arca_no_aprobado",
+            )
+        numero = 300 + llamadas
+        cae = f"{CAE_TEST_NO_REAL_PREFIX}{llamadas}"
+        comprobante_id = await _persistir_comprobante_autorizado(
+            db_session,
+            test_empresa,
+            test_punto_venta,
+            tipo_comprobante=request.tipo_comprobante,
+            numero=numero,
+            fecha_emision=request.fecha_emision,
+            cae=cae,
+            cae_vencimiento=date(2026, 3, 31),
+            total=Decimal("1210.00"),
+        )
+        return EmitirComprobanteResponse(
+            exito=True,
+            comprobante_id=comprobante_id,
+            tipo_comprobante=request.tipo_comprobante,
+            punto_venta=1,
+            numero=numero,
+            fecha=request.fecha_emision,
+            cae=cae,
+            cae_vencimiento=date(2026, 3, 31),
+            total=Decimal("1210.00"),
+            mensaje="Comprobante autorizado",
+            errores=[],
+        )
+
+    monkeypatch.setattr(
+        "app.services.facturacion_service.FacturacionService.emitir_comprobante",
+        fake_emitir,
+    )
+    headers_procesar = await _confirmacion_fecha_fiscal_header_lote(
+        db_session,
+        lote_id=lote_id,
+        estados={"validado"},
+    )
+    recuentos: list[str] = []
+
+    def registrar_sql(_conn, _cursor, statement, _params, _context, _many) -> None:
+        if "GROUP BY lotes_comprobantes_grupos.estado" in statement:
+            recuentos.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", registrar_sql)
+    try:
+        procesar = await client.post(
+            f"/api/lotes-comprobantes/{lote_id}/procesar",
+            headers={**auth_headers, **headers_procesar},
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar_sql)
+
+    assert procesar.status_code == 200, procesar.text
+    assert llamadas == 4
+    assert len(recuentos) == 2
+    data = procesar.json()
+    assert data["lote"]["estado"] == "autorizado_parcial"
+    assert data["lote"]["grupos_emitidos"] == 3
+    assert data["lote"]["grupos_fallidos"] == 1
+    assert data["lote"]["grupos_validos"] == 0
+
+
+@pytest.mark.asyncio
+async def test_verificar_conteos_lote_registra_desvio_y_recuenta(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session: AsyncSession,
+    test_empresa,
+    test_punto_venta,
+    test_certificado,
+    caplog: pytest.LogCaptureFixture,
+):
+    """El recuento de cierre debe corregir y registrar conteos desviados."""
+    test_certificado.ambiente = settings.arca_env
+    lote_id = await _crear_lote_validado_por_api(
+        client,
+        auth_headers,
+        test_empresa.cuit,
+        total_grupos=2,
+    )
+    service = LoteComprobantesService(db_session)
+    lote = await service.obtener_lote_resumen(lote_id, test_empresa.id)
+    lote.estado = "cargado"
+
+    with caplog.at_level("WARNING"):
+        await service._verificar_conteos_lote(
+            lote, Counter({"validado": 1, "autorizado": 1})
+        )
+
+    assert "event=lote_contadores_desvio" in caplog.text
+    assert "'autorizado': -1" in caplog.text
+    assert lote.grupos_validos == 2
+    assert lote.grupos_emitidos == 0
+    assert lote.estado == "validado"
+
+
 @pytest.mark.asyncio
 async def test_procesar_lote_usa_sublotes_arca_segun_regxreq(
     client: AsyncClient,
@@ -3792,7 +4599,7 @@ async def test_procesar_lote_usa_sublotes_arca_segun_regxreq(
     test_punto_venta,
     test_certificado,
 ):
-    """Un lote elegible se divide en sublotes según RegXReq."""
+    """Un lote elegible se divide en sublotes preparados según RegXReq."""
     test_certificado.ambiente = settings.arca_env
     monkeypatch.setattr(settings, "arca_fecaesolicitar_batch_enabled", True)
     llamadas_batch: list[int] = []
@@ -3808,9 +4615,12 @@ async def test_procesar_lote_usa_sublotes_arca_segun_regxreq(
         contextos=None,
         fase_solicitud_arca=None,
         commit_rechazo_global=True,
+        preparado=None,
     ):
         nonlocal numero
         assert fase_solicitud_arca.iniciada is False
+        assert preparado is not None and preparado.origen is requests
+        assert preparado.error is None
         llamadas_batch.append(len(requests))
         respuestas = []
         for request in requests:
@@ -3894,6 +4704,257 @@ async def test_procesar_lote_usa_sublotes_arca_segun_regxreq(
     assert data["lote"]["metadata_json"]["arca_batch"]["modo"] == "batch"
 
 
+async def _emision_por_claves_con_sesiones_propias(
+    monkeypatch: pytest.MonkeyPatch,
+    db_session: AsyncSession,
+    empresa: Empresa,
+    claves: list[tuple[int, int, int]],
+) -> tuple[LoteComprobantesService, EmisionLoteEnCurso, list]:
+    """Arma un lote con grupos por clave y cadenas con sesiones propias."""
+    monkeypatch.setattr(settings, "batch_worker_concurrency", 1)
+    monkeypatch.setattr(
+        "app.services.lote_comprobantes_service.get_worker_connection_capacity",
+        lambda: 3,
+    )
+    monkeypatch.setattr(
+        "app.services.lote_comprobantes_service.WorkerSessionLocal",
+        async_sessionmaker(db_session.bind, expire_on_commit=False, autoflush=False),
+    )
+
+    async def fake_acquire(session: AsyncSession, role: str) -> None:
+        assert role == "worker"
+
+    monkeypatch.setattr(
+        "app.services.lote_comprobantes_service.acquire_database_connection",
+        fake_acquire,
+    )
+    total = sum(cantidad for _, _, cantidad in claves)
+    lote = LoteComprobante(
+        nombre_archivo="lote-cadenas.xlsx",
+        archivo_hash="hash-lote-cadenas",
+        estado="procesando",
+        total_filas=total,
+        total_grupos=total,
+        grupos_validos=total,
+        empresa_id=empresa.id,
+    )
+    db_session.add(lote)
+    await db_session.flush()
+    pendientes: list[GrupoPendienteEmision] = []
+    for punto_venta_id, tipo_comprobante, cantidad in claves:
+        for indice in range(1, cantidad + 1):
+            grupo = LoteComprobanteGrupo(
+                lote_id=lote.id,
+                comprobante_ref=f"PV{punto_venta_id}-T{tipo_comprobante}-{indice}",
+                orden=len(pendientes) + 1,
+                estado="validado",
+                empresa_id=empresa.id,
+                punto_venta_numero=punto_venta_id,
+                tipo_comprobante=tipo_comprobante,
+            )
+            db_session.add(grupo)
+            payload = _payload_lote_basico(
+                empresa.id, punto_venta_id, FECHA_FISCAL_CONTROLADA_PF19B
+            )
+            payload["tipo_comprobante"] = tipo_comprobante
+            pendientes.append(
+                GrupoPendienteEmision(
+                    grupo=grupo,
+                    request=EmitirComprobanteRequest.model_validate(payload),
+                    contexto_rece=None,
+                )
+            )
+    await db_session.commit()
+    config = ConfiguracionBatchArca(habilitado=True, reg_x_req=2, chunk_size=2)
+    emision = EmisionLoteEnCurso(
+        lote_id=int(lote.id),
+        operacion_id=None,
+        usuario_id=None,
+        contextos_rece=[],
+        config_batch=config,
+        conteos=Counter({"validado": total}),
+        grupos_procesados_ids=set(),
+        cortes=[],
+        locks_punto_venta=defaultdict(asyncio.Lock),
+    )
+    service = LoteComprobantesService(db_session)
+    return service, emision, service._iterar_sublotes_emision(pendientes, config)
+
+
+def _respuesta_sublote_rechazado(
+    request: EmitirComprobanteRequest, requiere_reconciliacion: bool = False
+) -> EmitirComprobanteResponse:
+    """Respuesta de ARCA sin CAE para un comprobante del sublote."""
+    return EmitirComprobanteResponse(
+        exito=False,
+        tipo_comprobante=request.tipo_comprobante,
+        punto_venta=request.punto_venta_id,
+        numero=0,
+        fecha=request.fecha_emision,
+        total=Decimal("0"),
+        mensaje="Rechazado",
+        errores=["Rechazado por ARCA"],
+        requiere_reconciliacion=requiere_reconciliacion,
+    )
+
+
+def _grupos_por_clave(
+    sublotes: list[list[GrupoPendienteEmision]],
+) -> dict[tuple[int, int], list[list[int]]]:
+    """Ids de grupo de cada sublote, agrupados por clave de numeración."""
+    por_clave: dict[tuple[int, int], list[list[int]]] = {}
+    for sublote in sublotes:
+        request = sublote[0].request
+        por_clave.setdefault(
+            (request.punto_venta_id, request.tipo_comprobante), []
+        ).append([int(pendiente.grupo.id) for pendiente in sublote])
+    return por_clave
+
+
+@pytest.mark.asyncio
+async def test_emision_por_claves_corre_cadenas_concurrentes_con_sesiones_propias(
+    monkeypatch: pytest.MonkeyPatch,
+    db_session: AsyncSession,
+    test_empresa,
+) -> None:
+    """Cada clave emite en orden; solo esperan entre sí las del mismo punto."""
+    service, emision, sublotes = await _emision_por_claves_con_sesiones_propias(
+        monkeypatch,
+        db_session,
+        test_empresa,
+        [(1, 6, 4), (1, 11, 2), (2, 6, 2)],
+    )
+    en_vuelo: list[tuple[int, int]] = []
+    solapados: list[set[tuple[int, int]]] = []
+    enviados: dict[tuple[int, int], list[list[int]]] = {}
+    sesiones: dict[tuple[int, int], set[int]] = {}
+    fases: set[int] = set()
+
+    async def fake_emitir_lote(self, requests, **kwargs):
+        clave = (requests[0].punto_venta_id, requests[0].tipo_comprobante)
+        en_vuelo.append(clave)
+        solapados.append(set(en_vuelo))
+        sesiones.setdefault(clave, set()).add(id(self.db))
+        fases.add(id(kwargs["fase_solicitud_arca"]))
+        enviados.setdefault(clave, []).append(
+            [contexto["grupo_id"] for contexto in kwargs["contextos"]]
+        )
+        await asyncio.sleep(0.02)
+        en_vuelo.remove(clave)
+        return [_respuesta_sublote_rechazado(request) for request in requests]
+
+    monkeypatch.setattr(
+        FacturacionService, "emitir_comprobantes_lote", fake_emitir_lote
+    )
+    fase_lote = FaseSolicitudArca()
+    esperados = _grupos_por_clave(sublotes)
+
+    await service._emitir_por_claves(sublotes, emision, fase_lote, concurrente=True)
+
+    assert enviados == esperados
+    assert any(
+        (2, 6) in claves and ((1, 6) in claves or (1, 11) in claves)
+        for claves in solapados
+    )
+    assert not any({(1, 6), (1, 11)} <= claves for claves in solapados)
+    sesiones_usadas = set().union(*sesiones.values())
+    assert all(len(ids) == 1 for ids in sesiones.values())
+    assert len(sesiones_usadas) == 3 and id(db_session) not in sesiones_usadas
+    assert len(fases) == 3 and id(fase_lote) not in fases
+    assert emision.cortes == []
+    assert emision.conteos == Counter({"fallido": 8})
+    estados = (
+        await db_session.execute(
+            select(LoteComprobanteGrupo.estado).where(
+                LoteComprobanteGrupo.lote_id == emision.lote_id
+            )
+        )
+    ).scalars()
+    assert set(estados) == {"fallido"}
+
+
+@pytest.mark.asyncio
+async def test_emision_por_claves_corta_las_demas_cadenas_ante_incertidumbre(
+    monkeypatch: pytest.MonkeyPatch,
+    db_session: AsyncSession,
+    test_empresa,
+) -> None:
+    """Tras un sublote incierto ninguna cadena envía otro, aunque sea de otra clave."""
+    service, emision, sublotes = await _emision_por_claves_con_sesiones_propias(
+        monkeypatch, db_session, test_empresa, [(1, 6, 2), (2, 6, 4)]
+    )
+    enviados: dict[int, list[list[int]]] = {}
+
+    async def fake_emitir_lote(self, requests, **kwargs):
+        punto_venta_id = requests[0].punto_venta_id
+        enviados.setdefault(punto_venta_id, []).append(
+            [contexto["grupo_id"] for contexto in kwargs["contextos"]]
+        )
+        await asyncio.sleep(0.01 if punto_venta_id == 1 else 0.05)
+        return [
+            _respuesta_sublote_rechazado(
+                request, requiere_reconciliacion=punto_venta_id == 1
+            )
+            for request in requests
+        ]
+
+    monkeypatch.setattr(
+        FacturacionService, "emitir_comprobantes_lote", fake_emitir_lote
+    )
+    esperados = _grupos_por_clave(sublotes)
+
+    await service._emitir_por_claves(
+        sublotes, emision, FaseSolicitudArca(), concurrente=True
+    )
+
+    assert enviados == {1: esperados[(1, 6)], 2: esperados[(2, 6)][:1]}
+    assert emision.cortes == [
+        CorteEmisionLote(
+            rechazo_global=False, grupo_ids=frozenset(esperados[(1, 6)][0])
+        )
+    ]
+    assert emision.grupos_procesados_ids == {
+        *esperados[(1, 6)][0],
+        *esperados[(2, 6)][0],
+    }
+
+
+@pytest.mark.asyncio
+async def test_emision_por_claves_propaga_error_con_la_guarda_de_su_cadena(
+    monkeypatch: pytest.MonkeyPatch,
+    db_session: AsyncSession,
+    test_empresa,
+) -> None:
+    """La fase del lote queda con la guarda de la cadena que perdió la base."""
+    service, emision, sublotes = await _emision_por_claves_con_sesiones_propias(
+        monkeypatch, db_session, test_empresa, [(1, 6, 4), (2, 6, 2)]
+    )
+    enviados: list[int] = []
+
+    async def fake_emitir_lote(self, requests, **kwargs):
+        punto_venta_id = requests[0].punto_venta_id
+        enviados.append(punto_venta_id)
+        if punto_venta_id == 2:
+            kwargs["fase_solicitud_arca"].guarda_rece_id = 99
+            kwargs["fase_solicitud_arca"].guarda_rece_token = "token-cadena"
+            raise SQLAlchemyTimeoutError()
+        await asyncio.sleep(0.03)
+        return [_respuesta_sublote_rechazado(request) for request in requests]
+
+    monkeypatch.setattr(
+        FacturacionService, "emitir_comprobantes_lote", fake_emitir_lote
+    )
+    fase_lote = FaseSolicitudArca()
+
+    with pytest.raises(SQLAlchemyTimeoutError):
+        await service._emitir_por_claves(sublotes, emision, fase_lote, concurrente=True)
+
+    assert sorted(enviados) == [1, 2]
+    assert fase_lote.guarda_rece_id == 99
+    assert fase_lote.guarda_rece_token == "token-cadena"
+    assert fase_lote.guarda_actual_iniciada is False
+
+
 @pytest.mark.asyncio
 async def test_procesar_lote_10005_cierra_sublote_y_aborta_remanentes_sin_replay_arca(
     client: AsyncClient,
@@ -4468,6 +5529,7 @@ async def test_procesar_lote_error_inesperado_post_arca_inmoviliza_todo_y_detien
         contextos=None,
         fase_solicitud_arca=None,
         commit_rechazo_global=True,
+        preparado=None,
     ):
         nonlocal llamadas_batch
         llamadas_batch += 1
@@ -11352,6 +12414,101 @@ async def test_worker_no_procesa_en_cola_si_quedan_stale_fuera_del_batch(
     assert procesados == []
 
 
+@pytest.mark.asyncio
+async def test_worker_paraleliza_lotes_y_serializa_misma_numeracion(
+    monkeypatch: pytest.MonkeyPatch,
+    db_session: AsyncSession,
+    test_empresa,
+) -> None:
+    """Solo esperan entre sí los lotes con emisor, punto de venta y tipo comunes."""
+
+    class SessionFactory:
+        async def __aenter__(self):
+            return db_session
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    monkeypatch.setattr(settings, "batch_worker_concurrency", 2)
+    monkeypatch.setattr(settings, "batch_worker_batch_size", 3)
+    monkeypatch.setattr(
+        "app.services.lote_worker.get_worker_connection_capacity", lambda: 2
+    )
+    creado = datetime.utcnow() - timedelta(minutes=5)
+    lotes = []
+    for indice, tipo_comprobante in enumerate((6, 6, 11)):
+        lote = LoteComprobante(
+            nombre_archivo=f"lote-worker-paralelo-{indice}.xlsx",
+            archivo_hash=f"hash-lote-worker-paralelo-{indice}",
+            estado="en_cola",
+            total_filas=1,
+            total_grupos=1,
+            grupos_validos=1,
+            empresa_id=test_empresa.id,
+            created_at=creado + timedelta(seconds=indice),
+        )
+        db_session.add(lote)
+        await db_session.flush()
+        db_session.add(
+            LoteComprobanteGrupo(
+                lote_id=lote.id,
+                comprobante_ref=f"paralelo-{indice}",
+                estado="valido",
+                empresa_id=test_empresa.id,
+                punto_venta_numero=1,
+                tipo_comprobante=tipo_comprobante,
+            )
+        )
+        lotes.append(lote)
+    await db_session.commit()
+    primero, mismo_tipo, otro_tipo = (lote.id for lote in lotes)
+
+    eventos: list[tuple[str, int]] = []
+
+    async def fake_acquire(session: AsyncSession, role: str) -> None:
+        assert role == "worker"
+
+    async def record_procesar(self, lote_id, empresa_id, **kwargs):
+        eventos.append(("inicio", lote_id))
+        await asyncio.sleep(0.01)
+        eventos.append(("fin", lote_id))
+
+    monkeypatch.setattr("app.services.lote_worker.WorkerSessionLocal", SessionFactory)
+    monkeypatch.setattr(
+        "app.services.lote_worker.acquire_database_connection",
+        fake_acquire,
+    )
+    monkeypatch.setattr(LoteComprobantesService, "procesar_lote", record_procesar)
+
+    resultado = await LoteWorker().procesar_pendientes()
+
+    assert resultado.lotes_procesados == 3
+    assert resultado.tuvo_error is False
+    assert eventos[:2] == [("inicio", primero), ("inicio", otro_tipo)]
+    assert eventos.index(("inicio", mismo_tipo)) > eventos.index(("fin", primero))
+
+
+def test_worker_alterna_emisores_en_la_cola() -> None:
+    """Un emisor con muchos lotes no debe postergar a los demás."""
+    worker = LoteWorker()
+    pendientes = [(1, 10), (2, 10), (3, 20), (4, 10)]
+
+    assert worker._ordenar_round_robin(pendientes) == [
+        (1, 10),
+        (3, 20),
+        (2, 10),
+        (4, 10),
+    ]
+
+    worker._ultima_empresa_atendida = 10
+    assert worker._ordenar_round_robin(pendientes) == [
+        (3, 20),
+        (1, 10),
+        (2, 10),
+        (4, 10),
+    ]
+
+
 @pytest.mark.asyncio
 async def test_procesar_lote_legacy_sin_descripcion_item_bloquea_emision(
     client: AsyncClient,
@@ -11478,3 +12635,58 @@ async def test_procesar_lote_grande_encola_y_se_reanuda(
 
     assert lote.estado == "completado"
     assert lote.grupos_emitidos == 1
+
+
+def test_agrupar_filas_lote_consume_una_vez_y_corta_al_superar_tope(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Las filas se agrupan en una pasada y un archivo excedido no se lee entero."""
+    service = LoteComprobantesService(db=None)
+    empresa = SimpleNamespace(cuit="20-12345678-6")
+    opciones = {
+        "empresa": empresa,
+        "opciones_fechas": OpcionesFechasLote(
+            fecha_emision_modo="fija",
+            fecha_servicio_desde_modo="",
+            fecha_servicio_hasta_modo="",
+            fecha_vto_pago_modo="",
+            fecha_emision_fija=date(2026, 7, 1),
+        ),
+        "opciones_concepto": OpcionesConceptoLote(concepto_modo="productos"),
+        "opciones_descripcion_item": OpcionesDescripcionItemLote(
+            descripcion_item_modo="fija", descripcion_item_fija=" Servicio "
+        ),
+        "opciones_punto_venta": OpcionesPuntoVentaLote(
+            punto_venta_modo="fijo", punto_venta_numero=3
+        ),
+    }
+    leidas = 0
+
+    def filas(refs: list[str]):
+        nonlocal leidas
+        for ref in refs:
+            leidas += 1
+            yield {"empresa_cuit": "20123456786", "comprobante_ref": ref}
+
+    grupos, total = service._agrupar_filas_lote(filas(["A", "B", "A"]), **opciones)
+
+    assert total == 3
+    assert list(grupos) == ["A", "B"]
+    assert [fila for fila, _row in grupos["A"]] == [2, 4]
+    assert grupos["B"][0][1] == {
+        "empresa_cuit": "20123456786",
+        "comprobante_ref": "B",
+        "concepto": 1,
+        "item_descripcion": "Servicio",
+        "fecha_emision": "2026-07-01",
+        "fecha_servicio_desde": "",
+        "fecha_servicio_hasta": "",
+        "fecha_vto_pago": "",
+        "punto_venta_numero": 3,
+    }
+
+    monkeypatch.setattr(settings, "batch_max_rows", 2)
+    leidas = 0
+    with pytest.raises(LoteComprobanteError, match="máximo permitido de 2 filas"):
+        service._agrupar_filas_lote(filas(["A"] * 10), **opciones)
+    assert leidas == 3
@@ -1,5 +1,7 @@
 """Tests para endpoints de PDF."""
 
+import io
+import zipfile
 from datetime import date
 from decimal import Decimal
 from unittest.mock import AsyncMock, patch
@@ -9,6 +11,7 @@ from httpx import AsyncClient
 
 from app.models.comprobante import Comprobante
 from app.models.punto_venta import PuntoVenta
+from app.services.pdf_service import PdfRenderSaturadoError
 
 
 async def _crear_comprobante_pdf(
@@ -113,3 +116,170 @@ async def test_pdf_permite_comprobante_autorizado(
     assert response.content == b"%PDF-test"
     assert response.headers["content-type"] == "application/pdf"
     generar_pdf.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_pdf_responde_503_cuando_el_render_esta_saturado(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session,
+    test_empresa,
+):
+    """La saturación del executor de render debe aplicar backpressure HTTP."""
+    comprobante = await _crear_comprobante_pdf(
+        db_session,
+        test_empresa.id,
+        estado="autorizado",
+        cae="12345678901234",
+        cae_vencimiento=date(2026, 2, 13),
+    )
+
+    with patch(
+        "app.api.pdf.pdf_service.generar_pdf_comprobante",
+        new_callable=AsyncMock,
+        side_effect=PdfRenderSaturadoError("El generador de PDF está saturado."),
+    ):
+        response = await client.get(
+            f"/api/pdf/comprobante/{comprobante.id}/preview", headers=auth_headers
+        )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "2"
+    assert "saturado" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_pdf_autorizado_responde_304_con_etag_vigente(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session,
+    test_empresa,
+):
+    """Un PDF inmutable debe revalidarse por ETag sin volver a generarse."""
+    comprobante = await _crear_comprobante_pdf(
+        db_session,
+        test_empresa.id,
+        estado="autorizado",
+        cae="12345678901234",
+        cae_vencimiento=date(2026, 2, 13),
+    )
+    ruta = f"/api/pdf/comprobante/{comprobante.id}"
+
+    with patch(
+        "app.api.pdf.pdf_service.generar_pdf_comprobante",
+        new_callable=AsyncMock,
+    ) as generar_pdf:
+        generar_pdf.return_value = b"%PDF-test"
+        primera = await client.get(ruta, headers=auth_headers)
+        etag = primera.headers["etag"]
+        revalidada = await client.get(
+            ruta, headers={**auth_headers, "If-None-Match": etag}
+        )
+
+    assert primera.status_code == 200
+    assert revalidada.status_code == 304
+    assert revalidada.headers["etag"] == etag
+    generar_pdf.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_exportar_pdfs_devuelve_zip_con_autorizados_del_emisor(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session,
+    test_empresa,
+):
+    """La exportación masiva debe empaquetar solo comprobantes autorizados."""
+    comprobante = await _crear_comprobante_pdf(
+        db_session,
+        test_empresa.id,
+        estado="autorizado",
+        cae="12345678901234",
+        cae_vencimiento=date(2026, 2, 13),
+    )
+
+    with patch(
+        "app.api.pdf.pdf_service.generar_pdf_comprobante",
+        new_callable=AsyncMock,
+        return_value=b"%PDF-lote",
+    ) as generar_pdf:
+        response = await client.post(
+            "/api/pdf/exportar",
+            json={"comprobante_ids": [comprobante.id, 999999]},
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert response.headers["x-comprobantes-total"] == "1"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+        assert zf.namelist() == ["FACTURA_B_0001-00000001.pdf"]
+        assert zf.read("FACTURA_B_0001-00000001.pdf") == b"%PDF-lote"
+    generar_pdf.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_exportar_pdfs_lista_fallos_de_render_en_el_zip(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session,
+    test_empresa,
+):
+    """Un PDF fallido no debe abortar la descarga del resto del ZIP."""
+    await _crear_comprobante_pdf(
+        db_session,
+        test_empresa.id,
+        estado="autorizado",
+        cae="12345678901234",
+        cae_vencimiento=date(2026, 2, 13),
+    )
+
+    with patch(
+        "app.api.pdf.pdf_service.generar_pdf_comprobante",
+        new_callable=AsyncMock,
+        side_effect=RuntimeError("render roto"),
+    ):
+        response = await client.post(
+            "/api/pdf/exportar",
+            json={"desde": "2026-02-01", "hasta": "2026-02-28"},
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+        assert zf.namelist() == ["errores_exportacion.txt"]
+        assert b"FACTURA_B_0001-00000001.pdf" in zf.read("errores_exportacion.txt")
+
+
+@pytest.mark.asyncio
+async def test_exportar_pdfs_sin_autorizados_responde_404(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session,
+    test_empresa,
+):
+    """Los comprobantes sin CAE no deben entrar en la exportación."""
+    comprobante = await _crear_comprobante_pdf(db_session, test_empresa.id)
+
+    response = await client.post(
+        "/api/pdf/exportar",
+        json={"comprobante_ids": [comprobante.id]},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_exportar_pdfs_exige_un_unico_criterio(
+    client: AsyncClient,
+    auth_headers: dict,
+):
+    """Combinar criterios de selección debe rechazarse en la validación."""
+    response = await client.post(
+        "/api/pdf/exportar",
+        json={"lote_id": 1, "desde": "2026-02-01", "hasta": "2026-02-28"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 422
@@ -0,0 +1,136 @@
+"""Tests de la caché en disco de PDFs autorizados."""
+
+import os
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from app.services.pdf_cache_service import PdfCache
+
+
+def _crear_templates(tmp_path: Path) -> Path:
+    """Crea templates mínimos para calcular el digest."""
+    template_path = tmp_path / "templates"
+    template_path.mkdir()
+    (template_path / "factura.html").write_text("<html>{{ numero_str }}</html>")
+    (template_path / "styles.css").write_text("body { margin: 0; }")
+    return template_path
+
+
+def _crear_cache(tmp_path: Path, max_bytes: int = 1024) -> PdfCache:
+    """Crea una caché aislada con límite configurable."""
+    return PdfCache(
+        base_path=tmp_path / "pdf_cache",
+        max_bytes=max_bytes,
+        template_path=_crear_templates(tmp_path),
+    )
+
+
+@pytest.mark.asyncio
+async def test_guarda_y_lee_pdf_por_clave(tmp_path: Path):
+    """Un PDF guardado debe servirse desde disco con la misma clave."""
+    cache = _crear_cache(tmp_path)
+    clave = cache.calcular_clave(7, {"empresa": {"razon_social": "Emisor"}})
+
+    assert await cache.leer(clave) is None
+    await cache.guardar(clave, b"%PDF-7")
+
+    assert await cache.leer(clave) == b"%PDF-7"
+    uso = await cache.uso()
+    assert uso["archivos"] == 1
+    assert uso["bytes_usados"] == len(b"%PDF-7")
+    assert uso["hits"] == 1
+    assert uso["misses"] == 1
+    assert not list((tmp_path / "pdf_cache").rglob("*.tmp"))
+
+
+def test_clave_cambia_con_templates_y_datos_visibles(tmp_path: Path):
+    """Editar el template o los datos del emisor debe invalidar la clave."""
+    cache = _crear_cache(tmp_path)
+    datos = {"empresa": {"inicio_actividades": date(2020, 1, 1)}}
+    clave = cache.calcular_clave(1, datos)
+
+    assert cache.calcular_clave(1, datos) == clave
+    assert cache.calcular_clave(2, datos) != clave
+    assert (
+        cache.calcular_clave(1, {"empresa": {"inicio_actividades": date(2021, 1, 1)}})
+        != clave
+    )
+
+    (cache.template_path / "styles.css").write_text("body { margin: 1cm; }")
+    cache_nueva = PdfCache(
+        base_path=cache.base_path, max_bytes=1024, template_path=cache.template_path
+    )
+    assert cache_nueva.calcular_clave(1, datos) != clave
+
+
+@pytest.mark.asyncio
+async def test_poda_lru_respeta_limite(tmp_path: Path):
+    """Al superar el límite deben eliminarse los PDFs menos usados."""
+    cache = _crear_cache(tmp_path, max_bytes=300)
+    claves = [cache.calcular_clave(numero, {}) for numero in range(3)]
+
+    await cache.guardar(claves[0], b"a" * 100)
+    await cache.guardar(claves[1], b"b" * 100)
+    antiguo = cache._path_clave(claves[1])
+    os.utime(antiguo, (1, 1))
+    await cache.leer(claves[0])
+    await cache.guardar(claves[2], b"c" * 150)
+
+    assert await cache.leer(claves[1]) is None
+    assert await cache.leer(claves[0]) == b"a" * 100
+    assert await cache.leer(claves[2]) == b"c" * 150
+    assert (await cache.uso())["bytes_usados"] <= 300
+
+
+@pytest.mark.asyncio
+async def test_cache_deshabilitada_no_escribe(tmp_path: Path):
+    """Con límite cero la caché no debe tocar el disco."""
+    cache = _crear_cache(tmp_path, max_bytes=0)
+    clave = cache.calcular_clave(1, {})
+
+    await cache.guardar(clave, b"%PDF")
+
+    assert await cache.leer(clave) is None
+    assert not (tmp_path / "pdf_cache").exists()
+
+
+@pytest.mark.asyncio
+async def test_rechaza_claves_que_no_son_digest(tmp_path: Path):
+    """Una clave arbitraria no debe poder escapar de la carpeta de caché."""
+    cache = _crear_cache(tmp_path)
+
+    with pytest.raises(ValueError):
+        await cache.leer("../../etc/passwd")
+
+
+@pytest.mark.asyncio
+async def test_poda_no_recorre_la_carpeta(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Tras el primer guardado, el total y el orden LRU se llevan en memoria."""
+    cache = _crear_cache(tmp_path, max_bytes=300)
+    claves = [cache.calcular_clave(numero, {}) for numero in range(6)]
+    await cache.guardar(claves[0], b"a" * 100)
+    recorridos = 0
+    archivos = cache._archivos
+
+    def contar_archivos():
+        nonlocal recorridos
+        recorridos += 1
+        return archivos()
+
+    monkeypatch.setattr(cache, "_archivos", contar_archivos)
+    for clave in claves[1:]:
+        await cache.guardar(clave, b"x" * 100)
+        await cache.leer(claves[0])
+
+    assert recorridos == 0
+    assert await cache.leer(claves[0]) == b"a" * 100
+    assert await cache.leer(claves[4]) is None
+    assert await cache.leer(claves[5]) == b"x" * 100
+    uso = await cache.uso()
+    assert recorridos == 1
+    assert uso["bytes_usados"] == cache._bytes_usados == 200
+    assert uso["evictados"] == 4
@@ -1,13 +1,20 @@
 """Tests para el servicio de PDF."""
 
+import asyncio
 import base64
 import json
+import pickle
 import pytest
 from unittest.mock import Mock
 from datetime import date
 from types import SimpleNamespace
 
-from app.services.pdf_service import PDFService
+from app.services import pdf_service as pdf_service_module
+from app.services.pdf_service import (
+    PDFService,
+    PdfRenderExecutor,
+    PdfRenderSaturadoError,
+)
 from app.models.comprobante import Comprobante
 from app.models.empresa import Empresa
 from app.models.cliente import Cliente
@@ -284,3 +291,135 @@ class TestPDFService:
         assert len(pdf_bytes) > 0
         # Verificar que sea un PDF válido (comienza con %PDF)
         assert pdf_bytes[:4] == b"%PDF"
+
+
+def _comprobante_serializable():
+    """Comprobante mínimo con atributos planos, apto para pickle."""
+    empresa = SimpleNamespace(
+        razon_social="Mi Empresa SRL",
+        cuit="30-12345678-9",
+        condicion_iva="Responsable Inscripto",
+        ingresos_brutos=None,
+        domicilio="Av. Corrientes 1234",
+        localidad="CABA",
+        provincia="Buenos Aires",
+        inicio_actividades=date(2020, 1, 1),
+    )
+    return empresa, SimpleNamespace(
+        tipo_comprobante=6,
+        concepto=1,
+        numero=127,
+        fecha_emision=date(2026, 2, 3),
+        fecha_servicio_desde=None,
+        fecha_servicio_hasta=None,
+        fecha_vto_pago=None,
+        subtotal=100,
+        otros_impuestos=0,
+        total=121,
+        cae="74123456789012",
+        cae_vencimiento=date(2026, 2, 13),
+        moneda="PES",
+        cotizacion=1,
+        empresa=empresa,
+        cliente=SimpleNamespace(
+            razon_social="Cliente",
+            tipo_documento="CUIT",
+            numero_documento="20-98765432-1",
+            condicion_iva="Responsable Inscripto",
+            domicilio="",
+            localidad="",
+        ),
+        punto_venta=SimpleNamespace(numero=1),
+        items=[],
+    )
+
+
+class TestPdfRenderExecutor:
+    """Tests del executor de render PDF fuera del event loop."""
+
+    def test_contexto_pdf_es_serializable_para_procesos(self, pdf_service):
+        """El contexto no debe arrastrar objetos ORM ni sesiones."""
+        empresa, comprobante = _comprobante_serializable()
+
+        contexto = pdf_service.preparar_contexto_pdf(comprobante, empresa)
+        restaurado = pickle.loads(pickle.dumps(contexto))
+
+        assert restaurado["comprobante"].cae == "74123456789012"
+        assert restaurado["empresa"].razon_social == "Mi Empresa SRL"
+        assert restaurado["qr_url"].startswith("https://www.afip.gob.ar/fe/qr/?p=")
+        assert "qr_base64" not in restaurado
+
+    @pytest.mark.asyncio
+    async def test_executor_sin_procesos_renderiza_y_registra_metricas(
+        self, monkeypatch
+    ):
+        """Con cero workers debe renderizar en un thread y medir el tiempo."""
+        monkeypatch.setattr(
+            pdf_service_module,
+            "renderizar_pdf_en_proceso",
+            lambda contexto: b"%PDF-" + contexto["numero_str"].encode(),
+        )
+        executor = PdfRenderExecutor(max_workers=0, max_pendientes=2, timeout_seconds=5)
+
+        pdf = await executor.renderizar({"numero_str": "00000127"})
+        metricas = executor.metricas()
+
+        assert pdf == b"%PDF-00000127"
+        assert metricas["renders"] == 1
+        assert metricas["pendientes"] == 0
+        assert metricas["ultimo_ms"] is not None
+
+    @pytest.mark.asyncio
+    async def test_executor_rechaza_trabajos_sobre_el_limite(self, monkeypatch):
+        """Debe aplicar backpressure cuando la cola de renders está llena."""
+        liberar = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def render_lento(contexto):
+            asyncio.run_coroutine_threadsafe(liberar.wait(), loop).result()
+            return b"%PDF-test"
+
+        monkeypatch.setattr(
+            pdf_service_module, "renderizar_pdf_en_proceso", render_lento
+        )
+        executor = PdfRenderExecutor(max_workers=0, max_pendientes=1, timeout_seconds=5)
+
+        en_curso = asyncio.create_task(executor.renderizar({}))
+        await asyncio.sleep(0.01)
+        with pytest.raises(PdfRenderSaturadoError):
+            await executor.renderizar({})
+        liberar.set()
+
+        assert await en_curso == b"%PDF-test"
+        assert executor.metricas()["rechazados"] == 1
+
+    @pytest.mark.asyncio
+    async def test_executor_conserva_el_lugar_de_un_render_vencido(self, monkeypatch):
+        """Un render vencido sigue contando como pendiente hasta que termina."""
+        liberar = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def render_lento(contexto):
+            asyncio.run_coroutine_threadsafe(liberar.wait(), loop).result()
+            return b"%PDF-test"
+
+        monkeypatch.setattr(
+            pdf_service_module, "renderizar_pdf_en_proceso", render_lento
+        )
+        executor = PdfRenderExecutor(
+            max_workers=0, max_pendientes=1, timeout_seconds=0.05
+        )
+
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.renderizar({})
+        assert executor.metricas()["pendientes"] == 1
+        with pytest.raises(PdfRenderSaturadoError):
+            await executor.renderizar({})
+
+        liberar.set()
+        for _ in range(100):
+            if executor.metricas()["pendientes"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert executor.metricas()["pendientes"] == 0
+        assert executor.metricas()["timeouts"] == 1
@@ -1,13 +1,65 @@
 """Tests para el servicio de reportes."""
 
+import csv
+import io
+
 import pytest
 from datetime import date
 from decimal import Decimal
 
+from openpyxl import load_workbook
+
+from app.models.cliente import Cliente
 from app.models.comprobante import Comprobante
 from app.models.comprobante_item import ComprobanteItem
 from app.models.punto_venta import PuntoVenta
+from app.services.exportacion_iva_service import ExportacionIvaService
 from app.services.reportes_service import ReportesService
+from app.services.resumen_ventas_service import ResumenVentasService
+
+
+def _comprobante_autorizado(
+    *,
+    empresa_id: int,
+    punto_venta_id: int,
+    tipo: int,
+    numero: int,
+    total: str,
+    iva_21: str = "0.00",
+    cliente_id: int | None = None,
+    documento: str | None = None,
+    razon_social: str | None = None,
+) -> Comprobante:
+    """Construye un comprobante autorizado mínimo para reportes."""
+    return Comprobante(
+        tipo_comprobante=tipo,
+        concepto=1,
+        numero=numero,
+        fecha_emision=date(2026, 6, numero),
+        subtotal=Decimal(total) - Decimal(iva_21),
+        descuento=Decimal("0.00"),
+        iva_21=Decimal(iva_21),
+        iva_10_5=Decimal("0.00"),
+        iva_27=Decimal("0.00"),
+        otros_impuestos=Decimal("0.00"),
+        total=Decimal(total),
+        cae=f"4234567890{numero:04d}",
+        cae_vencimiento=date(2026, 6, 30),
+        estado="autorizado",
+        moneda="PES",
+        cotizacion=Decimal("1"),
+        empresa_id=empresa_id,
+        punto_venta_id=punto_venta_id,
+        cliente_id=cliente_id,
+        receptor_numero_documento=documento,
+        receptor_razon_social=razon_social,
+    )
+
+
+async def _reconstruir_resumen(db_session, empresa_id: int) -> None:
+    """Recalcula el resumen diario de comprobantes insertados directo en la base."""
+    await ResumenVentasService(db_session).reconstruir(empresa_id)
+    await db_session.commit()
 
 
 @pytest.fixture
@@ -165,6 +217,7 @@ class TestReportesService:
             ]
         )
         await db_session.commit()
+        await _reconstruir_resumen(db_session, test_empresa.id)
 
         reporte = await reportes_service.generar_reporte_iva(
             db_session,
@@ -246,6 +299,7 @@ class TestReportesService:
             ]
         )
         await db_session.commit()
+        await _reconstruir_resumen(db_session, test_empresa.id)
 
         reporte = await reportes_service.generar_reporte_iva(
             db_session,
@@ -358,6 +412,7 @@ class TestReportesService:
             ]
         )
         await db_session.commit()
+        await _reconstruir_resumen(db_session, test_empresa.id)
 
         reporte = await reportes_service.generar_reporte_iva(
             db_session,
@@ -390,3 +445,217 @@ class TestReportesService:
 
         assert isinstance(ranking, list)
         assert len(ranking) == 0
+
+    @pytest.mark.asyncio
+    async def test_ranking_y_resumenes_se_agregan_en_la_base(
+        self, reportes_service, db_session, test_empresa
+    ):
+        """Ranking y resúmenes sin detalle deben coincidir con la suma por comprobante."""
+        punto_venta = PuntoVenta(
+            numero=4,
+            nombre="Punto ranking",
+            activo=True,
+            es_webservice=True,
+            empresa_id=test_empresa.id,
+        )
+        cliente = Cliente(
+            razon_social="Cliente Registrado SA",
+            tipo_documento="CUIT",
+            numero_documento="30712345678",
+            condicion_iva="RI",
+            empresa_id=test_empresa.id,
+        )
+        db_session.add_all([punto_venta, cliente])
+        await db_session.flush()
+        comunes = {"empresa_id": test_empresa.id, "punto_venta_id": punto_venta.id}
+        db_session.add_all(
+            [
+                _comprobante_autorizado(
+                    **comunes,
+                    tipo=1,
+                    numero=1,
+                    total="1210.00",
+                    iva_21="210.00",
+                    cliente_id=cliente.id,
+                ),
+                _comprobante_autorizado(
+                    **comunes,
+                    tipo=3,
+                    numero=2,
+                    total="121.00",
+                    iva_21="21.00",
+                    cliente_id=cliente.id,
+                ),
+                _comprobante_autorizado(
+                    **comunes,
+                    tipo=6,
+                    numero=3,
+                    total="500.00",
+                    documento="20111111112",
+                    razon_social="Receptor Uno",
+                ),
+                _comprobante_autorizado(
+                    **comunes,
+                    tipo=7,
+                    numero=4,
+                    total="700.00",
+                    documento="20111111112",
+                    razon_social="Receptor Uno Renombrado",
+                ),
+                _comprobante_autorizado(**comunes, tipo=6, numero=5, total="50.00"),
+            ]
+        )
+        await db_session.commit()
+        await _reconstruir_resumen(db_session, test_empresa.id)
+
+        ranking = await reportes_service.obtener_ranking_clientes(
+            db_session,
+            empresa_id=test_empresa.id,
+            desde=date(2026, 6, 1),
+            hasta=date(2026, 6, 30),
+            limite=2,
+        )
+        ventas = await reportes_service.generar_reporte_ventas(
+            db_session,
+            empresa_id=test_empresa.id,
+            desde=date(2026, 6, 1),
+            hasta=date(2026, 6, 30),
+            incluir_detalle=False,
+        )
+        iva = await reportes_service.generar_reporte_iva(
+            db_session,
+            empresa_id=test_empresa.id,
+            periodo_mes=6,
+            periodo_anio=2026,
+            incluir_detalle=False,
+        )
+
+        assert ranking == [
+            {
+                "cliente_id": 0,
+                "razon_social": "Receptor Uno",
+                "numero_documento": "20111111112",
+                "total_facturado": 1200.0,
+                "cantidad_comprobantes": 2,
+            },
+            {
+                "cliente_id": cliente.id,
+                "razon_social": "Cliente Registrado SA",
+                "numero_documento": "30712345678",
+                "total_facturado": 1089.0,
+                "cantidad_comprobantes": 2,
+            },
+        ]
+        assert ventas["comprobantes"] == []
+        assert ventas["resumen"]["total_facturas"] == 1760.0
+        assert ventas["resumen"]["total_notas_credito"] == 121.0
+        assert ventas["resumen"]["total_notas_debito"] == 700.0
+        assert ventas["resumen"]["cantidad_comprobantes"] == 5
+        assert iva["comprobantes"] == []
+        assert iva["resumen"]["gravado_21"] == 900.0
+        assert iva["resumen"]["iva_21"] == 189.0
+        assert iva["resumen"]["no_gravado"] == 1250.0
+
+    @pytest.mark.asyncio
+    async def test_exportacion_iva_por_cursor_coincide_con_el_detalle(
+        self, reportes_service, db_session, test_empresa
+    ):
+        """CSV y XLSX del subdiario deben repetir las líneas del reporte JSON."""
+        punto_venta = PuntoVenta(
+            numero=5,
+            nombre="Punto exportación",
+            activo=True,
+            es_webservice=True,
+            empresa_id=test_empresa.id,
+        )
+        cliente = Cliente(
+            razon_social="Cliente Exportado SA",
+            tipo_documento="CUIT",
+            numero_documento="30798765432",
+            condicion_iva="RI",
+            empresa_id=test_empresa.id,
+        )
+        db_session.add_all([punto_venta, cliente])
+        await db_session.flush()
+        comunes = {"empresa_id": test_empresa.id, "punto_venta_id": punto_venta.id}
+        factura = _comprobante_autorizado(
+            **comunes, tipo=1, numero=1, total="1210.00", iva_21="210.00"
+        )
+        factura.cliente_id = cliente.id
+        nota_credito = _comprobante_autorizado(
+            **comunes,
+            tipo=8,
+            numero=2,
+            total="300.00",
+            documento="20111111112",
+            razon_social="Receptor Ñandú",
+        )
+        db_session.add_all(
+            [
+                factura,
+                nota_credito,
+                _comprobante_autorizado(**comunes, tipo=11, numero=3, total="80.00"),
+            ]
+        )
+        await db_session.flush()
+        db_session.add(
+            ComprobanteItem(
+                descripcion="Servicio sin IVA",
+                cantidad=Decimal("1.0000"),
+                unidad="unidad",
+                precio_unitario=Decimal("300.0000"),
+                descuento_porcentaje=Decimal("0.00"),
+                iva_porcentaje=Decimal("0.00"),
+                subtotal=Decimal("300.00"),
+                orden=1,
+                comprobante_id=nota_credito.id,
+            )
+        )
+        await db_session.commit()
+
+        reporte = await reportes_service.generar_reporte_iva(
+            db_session, empresa_id=test_empresa.id, periodo_mes=6, periodo_anio=2026
+        )
+        lineas = [
+            linea
+            async for linea in reportes_service.iterar_detalle_iva(
+                db_session, test_empresa.id, 6, 2026
+            )
+        ]
+        assert lineas == reporte["comprobantes"]
+        assert lineas[0]["razon_social_receptor"] == "Cliente Exportado SA"
+        assert lineas[1]["no_gravado"] == -300.0
+        assert lineas[2]["exento"] == 80.0
+
+        exportador = ExportacionIvaService(reportes_service)
+        csv_bytes = b"".join(
+            [
+                tramo
+                async for tramo in exportador.iterar(
+                    db_session, test_empresa.id, 6, 2026, "csv"
+                )
+            ]
+        )
+        filas_csv = list(csv.reader(io.StringIO(csv_bytes.decode("utf-8-sig"))))
+        assert filas_csv[0][:4] == ["Fecha", "Letra", "Tipo", "Número"]
+        assert len(filas_csv) == 4
+        assert filas_csv[2][3:6] == [
+            "0005-00000002",
+            "20111111112",
+            "Receptor Ñandú",
+        ]
+        assert filas_csv[2][12] == "-300.00"
+
+        xlsx_bytes = b"".join(
+            [
+                tramo
+                async for tramo in exportador.iterar(
+                    db_session, test_empresa.id, 6, 2026, "xlsx"
+                )
+            ]
+        )
+        hoja = load_workbook(io.BytesIO(xlsx_bytes), read_only=True).active
+        filas_xlsx = list(hoja.iter_rows(values_only=True))
+        assert len(filas_xlsx) == 4
+        assert filas_xlsx[1][6:8] == (1000.0, 210.0)
+        assert filas_xlsx[3][13] == 80.0
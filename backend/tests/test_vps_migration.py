@@ -4834,6 +4834,11 @@ def test_import_usa_una_sola_conexion_transaccional(
         "validate_imported_database",
         lambda conn, manifest, rows: events.append("postflight"),
     )
+    monkeypatch.setattr(
+        vps_migration,
+        "rebuild_derived_tables",
+        lambda conn: events.append("derived"),
+    )
     monkeypatch.setattr(
         vps_migration,
         "verify_postgres_sequences",
@@ -4857,8 +4862,9 @@ def test_import_usa_una_sola_conexion_transaccional(
     )
 
     assert events[0:5] == ["begin", "lock", "ready", "restore", "clear"]
-    assert events[-4:] == [
+    assert events[-5:] == [
         "postflight",
+        "derived",
         "seq",
         "seq-check",
         "cert-check",
@@ -5259,6 +5265,7 @@ def test_import_commit_ambiguo_conserva_certificados_para_validar(
         "validate_imported_database",
         lambda conn, manifest, rows: None,
     )
+    monkeypatch.setattr(vps_migration, "rebuild_derived_tables", lambda conn: None)
     monkeypatch.setattr(vps_migration, "reset_postgres_sequences", lambda conn: None)
     monkeypatch.setattr(vps_migration, "verify_postgres_sequences", lambda conn: None)
 
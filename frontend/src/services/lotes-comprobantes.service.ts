@@ -1,21 +1,28 @@
 import apiClient from "./api";
+import { getEmpresaActivaIdForRequest } from "@/utils/empresa-activa-storage";
 import type {
   LoteComprobante,
   LoteComprobanteDetalle,
   LoteComprobanteSeguimiento,
   LoteComprobanteGruposPage,
+  LoteGruposFilasModo,
   LoteComprobanteResumen,
   LoteAccionResponse,
   LoteOpcionesFechas,
   LoteProcesamientoResponse,
   ReconciliacionExternaItem,
   LoteValidacionResponse,
+  LoteValidacionTrabajo,
 } from "@/types/lote-comprobante";
 
+const INTERVALO_VALIDACION_MS = 1000;
+
 interface ObtenerGruposParams {
   page?: number;
   perPage?: number;
   estado?: string | null;
+  cursor?: string | null;
+  filas?: LoteGruposFilasModo;
 }
 
 class LotesComprobantesService {
@@ -47,6 +54,55 @@ class LotesComprobantesService {
     return response.data;
   }
 
+  /**
+   * Sigue un lote por server-sent events hasta que deja de estar activo.
+   *
+   * Usa `fetch` porque `EventSource` no permite enviar el token. Devuelve
+   * `false` si el stream no pudo abrirse, para que el llamador siga con
+   * polling; un corte a mitad de camino se propaga como error.
+   */
+  async seguirProgreso(
+    id: number,
+    alRecibir: (seguimiento: LoteComprobanteSeguimiento) => void,
+    signal: AbortSignal,
+  ): Promise<boolean> {
+    if (typeof fetch !== "function" || typeof TextDecoder === "undefined") {
+      return false;
+    }
+    const headers: Record<string, string> = { Accept: "text/event-stream" };
+    const token = localStorage.getItem("token");
+    const empresaActivaId = getEmpresaActivaIdForRequest();
+    if (token) headers.Authorization = `Bearer ${token}`;
+    if (empresaActivaId) headers["X-Empresa-Id"] = empresaActivaId;
+
+    const response = await fetch(
+      `${apiClient.defaults.baseURL ?? ""}/api/lotes-comprobantes/${id}/seguimiento/stream`,
+      { headers, signal },
+    );
+    if (!response.ok || !response.body) return false;
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let pendiente = "";
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) return true;
+      pendiente += decoder.decode(value, { stream: true });
+      let separador = pendiente.indexOf("\n\n");
+      while (separador >= 0) {
+        const bloque = pendiente.slice(0, separador);
+        pendiente = pendiente.slice(separador + 2);
+        const datos = bloque
+          .split("\n")
+          .filter((linea) => linea.startsWith("data:"))
+          .map((linea) => linea.slice(5).trim())
+          .join("\n");
+        if (datos) alRecibir(JSON.parse(datos) as LoteComprobanteSeguimiento);
+        separador = pendiente.indexOf("\n\n");
+      }
+    }
+  }
+
   async obtenerGrupos(
     id: number,
     params: ObtenerGruposParams = {},
@@ -58,12 +114,20 @@ class LotesComprobantesService {
           page: params.page,
           per_page: params.perPage,
           estado: params.estado || undefined,
+          cursor: params.cursor || undefined,
+          filas: params.filas,
         },
       },
     );
     return response.data;
   }
 
+  /**
+   * Sube el archivo como validación en segundo plano y espera el resultado.
+   *
+   * El backend responde apenas guarda el archivo, así el request no queda
+   * abierto mientras se lee el Excel; el avance se consulta hasta que termina.
+   */
   async validar(
     archivo: File,
     formatoVersionId?: number | null,
@@ -86,8 +150,8 @@ class LotesComprobantesService {
       });
     }
 
-    const response = await apiClient.post<LoteValidacionResponse>(
-      "/api/lotes-comprobantes/validar",
+    const response = await apiClient.post<LoteValidacionTrabajo>(
+      "/api/lotes-comprobantes/validaciones",
       formData,
       {
         headers: {
@@ -96,6 +160,26 @@ class LotesComprobantesService {
       },
     );
 
+    let trabajo = response.data;
+    while (trabajo.estado !== "completado" && trabajo.estado !== "error") {
+      await new Promise((resolve) =>
+        setTimeout(resolve, INTERVALO_VALIDACION_MS),
+      );
+      trabajo = await this.obtenerValidacion(trabajo.id);
+    }
+    if (!trabajo.resultado) {
+      const detail = trabajo.error || "No se pudo validar el lote.";
+      throw Object.assign(new Error(detail), {
+        response: { data: { detail } },
+      });
+    }
+    return trabajo.resultado;
+  }
+
+  async obtenerValidacion(id: string): Promise<LoteValidacionTrabajo> {
+    const response = await apiClient.get<LoteValidacionTrabajo>(
+      `/api/lotes-comprobantes/validaciones/${id}`,
+    );
     return response.data;
   }
 
@@ -128,6 +128,25 @@ class ReportesService {
     return response.data;
   }
 
+  /**
+   * Descarga el subdiario de IVA ventas como CSV o XLSX
+   */
+  async descargarReporteIVA(
+    mes: number,
+    anio: number,
+    formato: "csv" | "xlsx" = "csv",
+  ): Promise<Blob> {
+    const response = await api.get("/api/reportes/iva-ventas/exportar", {
+      params: {
+        periodo_mes: mes,
+        periodo_anio: anio,
+        formato,
+      },
+      responseType: "blob",
+    });
+    return response.data;
+  }
+
   /**
    * Obtiene el ranking de clientes por facturación
    */
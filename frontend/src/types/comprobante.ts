@@ -127,6 +127,7 @@ export interface PaginatedComprobantesResponse {
   page: number;
   per_page: number;
   pages: number;
+  next_cursor?: string | null;
 }
 
 export type EstadoNumeracion =
@@ -19,6 +19,13 @@ export interface FormatoImportacion {
   version_vigente: FormatoImportacionVersion | null;
 }
 
+export interface FormatoImportacionArchivo {
+  tipo: "xlsx" | "csv" | "tsv";
+  delimitador?: string;
+  codificacion?: string;
+  coma_decimal?: boolean;
+}
+
 export interface FormatoImportacionPayload {
   nombre: string;
   descripcion?: string | null;
@@ -30,8 +30,17 @@ export interface LoteComprobanteGrupo {
   comprobante_id: number | null;
 }
 
+export interface LoteComprobanteFilaEstado {
+  id: number;
+  fila_excel: number;
+  estado: string;
+}
+
+export type LoteGruposFilasModo = "descripcion" | "resumen" | "omitir";
+
 export interface LoteComprobanteGrupoDetalle extends LoteComprobanteGrupo {
   descripcion_facturada: string | null;
+  filas?: LoteComprobanteFilaEstado[] | null;
 }
 
 export interface LoteComprobante {
@@ -117,6 +126,7 @@ export interface LoteComprobanteGruposPage {
   total: number;
   total_pages: number;
   estado: string | null;
+  next_cursor?: string | null;
 }
 
 export interface LoteValidacionResponse {
@@ -126,6 +136,19 @@ export interface LoteValidacionResponse {
   mensaje: string;
 }
 
+export interface LoteValidacionTrabajo {
+  id: string;
+  estado: "en_cola" | "validando" | "registrando" | "completado" | "error";
+  nombre_archivo: string;
+  creado_at: string;
+  actualizado_at: string;
+  total_filas: number | null;
+  total_grupos: number | null;
+  grupos_registrados: number;
+  error: string | null;
+  resultado: LoteValidacionResponse | null;
+}
+
 export interface LoteProcesamientoResponse {
   lote: LoteComprobante;
   mensaje: string;
@@ -46,6 +46,7 @@ vi.mock("@/services/lotes-comprobantes.service", () => ({
     obtener: vi.fn(),
     obtenerResumen: vi.fn(),
     obtenerSeguimiento: vi.fn(),
+    seguirProgreso: vi.fn(),
     obtenerGrupos: vi.fn(),
     reintentarFallidos: vi.fn(),
     descartarGrupos: vi.fn(),
@@ -213,6 +214,7 @@ const mockedLotesDetalle = lotesComprobantesService as unknown as {
   obtener: Mock;
   obtenerResumen: Mock;
   obtenerSeguimiento: Mock;
+  seguirProgreso: Mock;
   obtenerGrupos: Mock;
   procesar: Mock;
   reintentarFallidos: Mock;
@@ -887,6 +889,50 @@ describe("LotesComprobantesView", () => {
     wrapper.unmount();
   });
 
+  it("sigue el avance por stream y consulta solo al cerrarse", async () => {
+    vi.useFakeTimers();
+    const activo = loteActivoMock();
+    const avance = loteActivoMock({
+      grupos_validos: 1430,
+      grupos_emitidos: 2,
+    });
+    const terminal = loteActivoMock({
+      estado: "completado",
+      grupos_validos: 0,
+      grupos_emitidos: 1432,
+      finished_at: "2026-05-01T00:10:00",
+    });
+    const cierre = deferred<boolean>();
+    let alRecibir: ((seguimiento: LoteComprobanteResumen) => void) | undefined;
+    mockedLotesDetalle.seguirProgreso.mockImplementationOnce(
+      (_id: number, callback: (seguimiento: LoteComprobanteResumen) => void) => {
+        alRecibir = callback;
+        return cierre.promise;
+      },
+    );
+    const wrapper = await mountView([], [activo], activo);
+    mockedLotesDetalle.obtenerSeguimiento.mockClear();
+    mockedLotesDetalle.obtenerSeguimiento.mockResolvedValue(terminal);
+    mockedLotesDetalle.listar.mockResolvedValue([terminal]);
+    mockedLotesDetalle.obtenerResumen.mockResolvedValue(terminal);
+
+    expect(mockedLotesDetalle.seguirProgreso).toHaveBeenCalledWith(
+      activo.id,
+      expect.any(Function),
+      expect.any(AbortSignal),
+    );
+    alRecibir?.(avance);
+    await vi.advanceTimersByTimeAsync(9000);
+    expect(mockedLotesDetalle.obtenerSeguimiento).not.toHaveBeenCalled();
+
+    alRecibir?.(terminal);
+    cierre.resolve(true);
+    await flushPromises();
+    expect(mockedLotesDetalle.obtenerSeguimiento).toHaveBeenCalledTimes(1);
+    expect(mockedLotesDetalle.listar).toHaveBeenCalled();
+    wrapper.unmount();
+  });
+
   it("no solapa callbacks mientras el seguimiento anterior está pendiente", async () => {
     vi.useFakeTimers();
     const activo = loteActivoMock();